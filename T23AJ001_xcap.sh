@@ -14,6 +14,9 @@ do
 done
 
 # execute xcap_tool.py
+# オプション(--profile等)は位置引数の後に指定し、そのままxcap_tool.pyに渡す
+# 例: T23AJ001_xcap.sh tys1tb1edns02 DOWN --profile
+#     (計測結果はログディレクトリ(2nd-log/T23AJ001)に xcap_tool_{実行ID}.* として出力される)
 python3 -O ${TOOL} "${ARGV[@]}" "${HEISOKU_LIST}" "${@}"
 EXIT_CODE=${?}
 
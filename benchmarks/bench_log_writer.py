@@ -0,0 +1,71 @@
+"""xgnlogのログ書込み方式ベンチマーク
+
+1st-log(2nd-log同時出力あり)を指定件数出力する場合の所要時間を、
+直接書込み(メッセージ毎にファイルを開閉)とバッファリング書込みで比較する
+
+実行例:
+    python -m benchmarks.bench_log_writer --count 20000
+"""
+import argparse
+import pathlib
+import tempfile
+import time
+from unittest import mock
+
+import xgnlog.Log as xgnlog
+
+JOB_ID = "T23AJ001"
+MSG_ID = "I00101"
+
+
+def make_config(root: pathlib.Path) -> pathlib.Path:
+    """make_config 計測用の設定ファイル・メッセージファイルを作成する
+
+    Args:
+        root (pathlib.Path): ログ出力先・メッセージファイルのディレクトリ
+
+    Returns:
+        pathlib.Path: 設定ファイルのパス
+    """
+    root.joinpath(f"msg_{JOB_ID}.txt").write_text(f"INFO,{MSG_ID},start xCAP tool\n", encoding="utf-8")
+    config_path = root.joinpath("Log_config.ini")
+    config_path.write_text(f"[common]\ntool_root_log_dir = {root}\ntool_message_dir = {root}\n", encoding="utf-8")
+    return config_path
+
+
+def measure(buffered: bool, count: int) -> float:
+    """measure ログ出力count件の所要時間(ミリ秒)を計測する
+
+    Args:
+        buffered (bool): バッファリング書込みを行うか
+        count (int): 出力件数
+
+    Returns:
+        float: 所要時間(ミリ秒)
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with mock.patch("xgnlog.Log.CONFIG_PATH", new=make_config(pathlib.Path(tmpdir))):
+            log = xgnlog.Log(JOB_ID, buffered=buffered)
+        start = time.perf_counter()
+        for i in range(count):
+            log.output_1st_log(MSG_ID, f"[nf_name:a1-er-s01-smfvo-{i:03}]")
+        log.flush()
+        elapsed = (time.perf_counter() - start) * 1000
+        if log.writer:
+            log.writer.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="xgnlog writer benchmark")
+    parser.add_argument("--count", type=int, default=20000, help="number of 1st-log records")
+    args = parser.parse_args()
+
+    print(f"{'writer':<10}{'total':>10}{'per record':>12}  (ms)")
+    for (name, buffered) in (("direct", False), ("buffered", True)):
+        elapsed = measure(buffered, args.count)
+        print(f"{name:<10}{elapsed:>10.1f}{elapsed / args.count:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""EriSmfvoXCAPProcess・XcapToolのエンドツーエンドベンチマーク
+
+SHOW・DOWNモードで、指定数のNFに対して以下を実行し、フェーズ毎の所要時間、スループット(NF/分)、最大RSSを計測する
+    process: NF毎にEriSmfvoXCAPProcess.run()を実行する(--parallelのワーカープール)
+    tool   : XcapTool.main()を実行する(--batch、--parallel)
+接続先は以下のいずれか
+    stub   : スタブクライアント(仮想時計で実行するため、スタブの待ち合わせ時間は含まない)
+    standin: ローカルに起動したEPG CLIスタンドインサーバ(NFShellClientで接続する)
+ログはxgnlogの設定(Log_config.iniの[writer])のまま一時ディレクトリに出力する
+
+計測結果は--jsonでJSON形式で保存でき、--baselineで保存済みの結果と比較する
+比較で--threshold(%)を超えて悪化した項目がある場合は終了コード1で終了する
+
+実行例:
+    python -m benchmarks.bench_process --nfs 1,10,100 --json result.json
+    python -m benchmarks.bench_process --nfs 1,10,100 --baseline result.json --threshold 20
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import configparser
+import contextlib
+import functools
+import io
+import json
+from pathlib import Path
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List
+from unittest import mock
+
+import xgnlog.Log as xgnlog
+
+# リポジトリのルートディレクトリ
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# 計測対象eDNS
+EDNS_NAME = "tys1tb1edns02"
+EDNS_IPADDR = "2001:268:200d:1010::6"
+# 計測対象NFのxCAP設定(スタブ・スタンドインのいずれの応答でもDOWNが完了する組み合わせ)
+XCAP = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+# 計測対象NF名
+NF_NAME = "a1-er-s01-smfvoroout-{:04}"
+# 計測フェーズ(プロセスのメソッド名)
+PHASES = ("open_client", "pre_check", "change_status", "commit", "wait_converged", "post_check", "close_client")
+# 比較項目(結果のキー, 大きいほど良い項目か)
+METRICS = (("nfs_per_min", True), ("peak_rss_kb", False))
+PHASE_METRICS = ("p50_ms", "p95_ms")
+
+
+def make_config(root: Path) -> Path:
+    """make_config 計測用のログ設定ファイルを作成する
+
+    ログ出力先・メッセージファイルを一時ディレクトリに置き換え、それ以外はリポジトリの設定を引き継ぐ
+
+    Args:
+        root (Path): ログ出力先・メッセージファイルのディレクトリ
+
+    Returns:
+        Path: 設定ファイルのパス
+    """
+    for msg_file in ROOT_DIR.joinpath("other_settings", "messages").glob("msg_*.txt"):
+        shutil.copy(msg_file, root)
+    config = configparser.ConfigParser()
+    config.read(ROOT_DIR.joinpath("xgnlog", "Log_config.ini"), encoding="utf-8")
+    config["common"]["tool_root_log_dir"] = str(root.joinpath("logs"))
+    config["common"]["tool_message_dir"] = str(root)
+    config_path = root.joinpath("Log_config.ini")
+    with open(config_path, "w", encoding="utf-8") as f:
+        config.write(f)
+    return config_path
+
+
+class PhaseRecorder(object):
+    """PhaseRecorder プロセスのフェーズ毎の所要時間を記録する
+
+    計測中はEriSmfvoXCAPProcessのフェーズのメソッドを、所要時間を記録するメソッドに置き換える
+    (同期実行では処理ステップからのプロセス呼び出しも同名メソッドを経由するため、入れ子のcommitも記録される)
+    """
+
+    def __init__(self) -> None:
+        self.elapsed: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def patch(self, process_class: type) -> Iterator[None]:
+        """patch 計測中のみフェーズのメソッドを置き換える
+
+        Args:
+            process_class (type): プロセスクラス
+        """
+        with contextlib.ExitStack() as stack:
+            for phase in PHASES:
+                stack.enter_context(mock.patch.object(process_class, phase, self._wrap(phase, getattr(process_class, phase))))
+            yield
+
+    def _wrap(self, phase: str, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    self.elapsed[phase].append(elapsed)
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """summary フェーズ毎の集計
+
+        Returns:
+            Dict[str, Dict[str, float]]: フェーズ毎の回数・平均・p50・p95・最大(ミリ秒)
+        """
+        result = {}
+        for (phase, values) in self.elapsed.items():
+            if not values:
+                continue
+            values = sorted(values)
+            result[phase] = {"count": len(values),
+                             "mean_ms": round(statistics.mean(values), 3),
+                             "p50_ms": round(statistics.median(values), 3),
+                             "p95_ms": round(values[min(int(len(values) * 0.95), len(values) - 1)], 3),
+                             "max_ms": round(values[-1], 3)}
+        return result
+
+
+@contextlib.contextmanager
+def backend(name: str, nf_names: List[str], latency: float) -> Iterator[None]:
+    """backend 接続先を準備する
+
+    Args:
+        name (str): 接続先(stub / standin)
+        nf_names (List[str]): NF名
+        latency (float): スタンドインサーバの応答遅延(秒)
+    """
+    if name == "stub":
+        yield
+        return
+    from src import eri_connection as nfshell
+    from tests.standin_server import EriStandinServer
+    with EriStandinServer(latency=latency, backlog=max(len(nf_names), 128)) as server:
+        (host, port) = server.address
+        conn_conf = {
+            "common": {"password": server.password},
+            "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name} for nf_name in nf_names},
+            "bastions": {}
+        }
+        with mock.patch.object(nfshell, "CONN_CONF", conn_conf):
+            yield
+
+
+def run_processes(mode: Any, backend_name: str, nf_names: List[str], parallel: int) -> List[Any]:
+    """run_processes NF毎にEriSmfvoXCAPProcess.run()を実行する
+
+    Args:
+        mode (Mode): 実行モード
+        backend_name (str): 接続先
+        nf_names (List[str]): NF名
+        parallel (int): 同時実行数
+
+    Returns:
+        List[ProcessStatus]: NF毎のプロセスの完了ステータス
+    """
+    from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+    from src.vclock import VirtualClock
+
+    stub = backend_name == "stub"
+
+    def run(nf_name: str) -> Any:
+        process = EriSmfvoXCAPProcess(EDNS_NAME, nf_name, mode, EDNS_IPADDR, XCAP, stub, "T23AJ003",
+                                      clock=VirtualClock() if stub else None)
+        return process.run()
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        return list(executor.map(run, nf_names))
+
+
+def run_tool(mode: Any, backend_name: str, nf_names: List[str], parallel: int) -> List[Any]:
+    """run_tool XcapTool.main()を実行する
+
+    Args:
+        mode (Mode): 実行モード
+        backend_name (str): 接続先
+        nf_names (List[str]): NF名
+        parallel (int): 同時実行数
+
+    Returns:
+        List[bool]: ツールの実行結果
+    """
+    from src.xcap_tool import XcapTool
+
+    stub = backend_name == "stub"
+    tool = XcapTool()
+    tool.args = argparse.Namespace(edns_name=EDNS_NAME, mode=mode, blocked_nflist=[], batch=True, stub=stub,
+                                   parallel=parallel, agent=None, asyncio=False, converge_timeout=5.0,
+                                   record=None, replay=None, replay_speed=1.0, vclock=stub, metrics=None, trace=None,
+                                   collect=False, fresh=False, snapshot_ttl=0, profile=False, profile_memory=False,
+                                   xcap_parser="native")
+    tool.tool_conf = {"edns_infos": {EDNS_NAME: {"ipaddr": EDNS_IPADDR}},
+                      "nf_infos": {nf_name: {"xCAP": XCAP} for nf_name in nf_names}}
+    return [tool.main()]
+
+
+def run_scenario(target: str, backend_name: str, mode_name: str, nfs: int, parallel: int, latency: float) -> Dict[str, Any]:
+    """run_scenario 1シナリオの計測
+
+    Args:
+        target (str): 計測対象(process / tool)
+        backend_name (str): 接続先(stub / standin)
+        mode_name (str): 実行モード(SHOW / DOWN)
+        nfs (int): NF数
+        parallel (int): 同時実行数
+        latency (float): スタンドインサーバの応答遅延(秒)
+
+    Returns:
+        Dict[str, Any]: 計測結果
+    """
+    from src.abc_process import Mode
+    from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+
+    nf_names = [NF_NAME.format(i) for i in range(nfs)]
+    recorder = PhaseRecorder()
+    run = run_processes if target == "process" else run_tool
+    # 画面出力は計測対象外とする
+    with backend(backend_name, nf_names, latency), recorder.patch(EriSmfvoXCAPProcess), contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = run(Mode(mode_name), backend_name, nf_names, parallel)
+        elapsed = time.perf_counter() - start
+    statuses: Dict[str, int] = {}
+    for result in results:
+        key = getattr(result, "name", str(result))
+        statuses[key] = statuses.get(key, 0) + 1
+    return {"scenario": f"{target}/{backend_name}/{mode_name}/{nfs}",
+            "target": target,
+            "backend": backend_name,
+            "mode": mode_name,
+            "nfs": nfs,
+            "parallel": parallel,
+            "elapsed_s": round(elapsed, 3),
+            "nfs_per_min": round(nfs / elapsed * 60, 1),
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "statuses": statuses,
+            "phases": recorder.summary()}
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float, min_delta_ms: float) -> List[str]:
+    """compare 保存済みの計測結果と比較する
+
+    Args:
+        results (List[Dict[str, Any]]): 計測結果
+        baseline (List[Dict[str, Any]]): 比較元の計測結果
+        threshold (float): 悪化と判定する変化率(%)
+        min_delta_ms (float): フェーズの所要時間を悪化と判定する最小の増加量(ミリ秒、計測誤差の除外用)
+
+    Returns:
+        List[str]: 悪化と判定した項目
+    """
+    regressions = []
+    base_by_scenario = {x["scenario"]: x for x in baseline}
+    print(f"{'scenario':<32}{'metric':<28}{'baseline':>12}{'current':>12}{'change':>9}")
+    for result in results:
+        base = base_by_scenario.get(result["scenario"])
+        if base is None:
+            continue
+        items = [(key, base[key], result[key], higher_is_better) for (key, higher_is_better) in METRICS]
+        for (phase, summary) in result["phases"].items():
+            for key in PHASE_METRICS:
+                if phase in base["phases"]:
+                    items.append((f"{phase}.{key}", base["phases"][phase][key], summary[key], False))
+        for (name, before, after, higher_is_better) in items:
+            if not before:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if higher_is_better else change
+            noise = name.endswith("_ms") and after - before < min_delta_ms
+            mark = "  REGRESSION" if worse > threshold and not noise else ""
+            print(f"{result['scenario']:<32}{name:<28}{before:>12.1f}{after:>12.1f}{change:>+8.1f}%{mark}")
+            if mark:
+                regressions.append(f"{result['scenario']} {name}")
+    return regressions
+
+
+def csv_list(val: str) -> List[str]:
+    return [x for x in val.split(",") if x]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="end-to-end benchmark of EriSmfvoXCAPProcess / XcapTool")
+    parser.add_argument("--nfs", type=lambda x: [int(n) for n in csv_list(x)], default=[1, 10, 100], help="comma separated NF counts (1 to 1000)")
+    parser.add_argument("--modes", type=csv_list, default=["SHOW", "DOWN"], help="comma separated modes")
+    parser.add_argument("--targets", type=csv_list, default=["process", "tool"], help="comma separated targets (process, tool)")
+    parser.add_argument("--backends", type=csv_list, default=["stub", "standin"], help="comma separated backends (stub, standin)")
+    parser.add_argument("--parallel", type=int, default=10, help="number of NFs processed concurrently")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response latency per command (seconds)")
+    parser.add_argument("--json", type=Path, default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare with the results saved by --json")
+    parser.add_argument("--threshold", type=float, default=20.0, help="regression threshold for --baseline (percent)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore phase latency increases smaller than this (ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(xgnlog, "CONFIG_PATH", make_config(Path(tmpdir))):
+        from src import eri_connection as nfshell
+        with mock.patch.object(nfshell, "TRANSCRIPT_DIR", Path(tmpdir).joinpath("transcripts")):
+            results = []
+            print(f"{'scenario':<32}{'elapsed(s)':>11}{'NFs/min':>10}{'RSS(KB)':>10}  statuses / phase p50 (ms)")
+            for backend_name in args.backends:
+                for target in args.targets:
+                    for mode_name in args.modes:
+                        for nfs in args.nfs:
+                            result = run_scenario(target, backend_name, mode_name, nfs, args.parallel, args.latency)
+                            results.append(result)
+                            phases = " ".join(f"{phase}={x['p50_ms']:.1f}" for (phase, x) in result["phases"].items())
+                            print(f"{result['scenario']:<32}{result['elapsed_s']:>11.2f}{result['nfs_per_min']:>10.0f}"
+                                  f"{result['peak_rss_kb']:>10}  {result['statuses']} {phases}")
+        xgnlog.get_writer().flush()
+
+    document = {"python": platform.python_version(), "platform": platform.platform(), "parallel": args.parallel,
+                "latency": args.latency, "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""NFShellClientのコマンド応答待ち時間ベンチマーク
+
+ローカルに起動したEPG CLIスタンドインサーバに対してNFShellClientで接続し、
+ログイン・設定モード移行/解除・コマンド投入1回あたりの所要時間を計測する
+比較のため、変更前の受信処理(0.1秒間隔のsleepによるポーリング)を再現したクライアントでも同じ計測を行う
+
+実行例:
+    python -m benchmarks.bench_read_latency --count 50
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from src import eri_connection as nfshell
+from tests.standin_server import DEFAULT_USERNAME, EriStandinServer
+
+# 計測対象NF名
+NF_NAME = "a1-er-s01-smfvo-001"
+# 計測コマンド
+COMMAND = "show running-config epg pgw apn xcap ipv6-name-server"
+
+
+class PollingNFShellClient(nfshell.NFShellClient):
+    """変更前の受信処理(0.1秒間隔のポーリング)を再現するクライアント
+    """
+
+    def _wait_readable(self, timeout: float = None) -> bool:
+        time.sleep(0.1)
+        return True
+
+
+def measure(func: Callable[[], None], count: int) -> List[float]:
+    """measure 処理の所要時間をcount回計測する
+
+    Args:
+        func (Callable[[], None]): 計測対象処理
+        count (int): 計測回数
+
+    Returns:
+        List[float]: 所要時間(ミリ秒)のリスト
+    """
+    elapsed = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        elapsed.append((time.perf_counter() - start) * 1000)
+    return elapsed
+
+
+def run(client_class: type, server: EriStandinServer, count: int) -> Dict[str, List[float]]:
+    """run 1クライアント分の計測
+
+    Args:
+        client_class (type): 計測するクライアントクラス
+        server (EriStandinServer): スタンドインサーバ
+        count (int): 計測回数
+
+    Returns:
+        Dict[str, List[float]]: 計測項目毎の所要時間(ミリ秒)
+    """
+    clients: List[nfshell.NFShellClient] = []
+
+    def login() -> None:
+        client = client_class(NF_NAME)
+        client.connect()
+        clients.append(client)
+
+    results = {"login": measure(login, max(count // 10, 1))}
+    client = clients[-1]
+    try:
+        results["command"] = measure(lambda: client.command(COMMAND), count)
+
+        def config_round_trip() -> None:
+            client.enter_config_mode()
+            client.exit_config_mode()
+        results["config/end"] = measure(config_round_trip, max(count // 5, 1))
+    finally:
+        for c in clients:
+            c.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NFShellClient read latency benchmark")
+    parser.add_argument("--count", type=int, default=50, help="number of commands to measure")
+    args = parser.parse_args()
+
+    with EriStandinServer() as server:
+        (host, port) = server.address
+        nfshell.CONN_CONF = {
+            "common": {"password": server.password},
+            "connections": {NF_NAME: {"ipaddr": host, "port": port, "username": DEFAULT_USERNAME}},
+            "bastions": {}
+        }
+        print(f"{'client':<22}{'item':<12}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}  (ms)")
+        for client_class in (PollingNFShellClient, nfshell.NFShellClient):
+            for (item, elapsed) in run(client_class, server, args.count).items():
+                elapsed.sort()
+                p95 = elapsed[min(int(len(elapsed) * 0.95), len(elapsed) - 1)]
+                print(f"{client_class.__name__:<22}{item:<12}{statistics.mean(elapsed):>9.1f}"
+                      f"{statistics.median(elapsed):>9.1f}{p95:>9.1f}{elapsed[-1]:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""受信バッファ・プロンプト判定のベンチマーク
+
+show running-config相当の大量出力をREAD_SIZEずつ受信する場合に、
+受信データ追記・プロンプト判定・投入コマンド/プロンプト除去に要する時間を出力サイズ毎に計測する
+比較のため、変更前の処理(bytesの連結、受信毎の全体復号・行分割)でも同じ計測を行う
+
+実行例:
+    python -m benchmarks.bench_receive_buffer
+"""
+import re
+import time
+from typing import Callable, List
+
+from src.eri_connection import READ_SIZE, ReceiveBuffer, decode_prompt
+
+# 計測用プロンプト
+PROMPT = "kddiadmin@eric-cm-yang-provider-c676ff7f9-cfk9w#"
+# 計測する出力サイズ(バイト)
+SIZES = [100_000, 400_000, 1_600_000, 6_400_000]
+
+
+def make_chunks(size: int) -> List[bytes]:
+    """make_chunks 受信データをREAD_SIZE毎に分割して生成する
+
+    Args:
+        size (int): 出力サイズ(バイト)
+
+    Returns:
+        List[bytes]: 受信データ
+    """
+    line = b"epg pgw apn xcap ipv6-name-server 2001:268:200d:1010::6 priority 100\r\n"
+    data = b"show running-config\r\n" + line * (size // len(line)) + b"\x1b[?7h" + PROMPT.encode("utf-8")
+    return [data[i:i + READ_SIZE] for i in range(0, len(data), READ_SIZE)]
+
+
+def read_legacy(chunks: List[bytes]) -> bytes:
+    """read_legacy 変更前の受信処理"""
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        prompt = re.compile(r'(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]').sub("", buffer.decode('utf-8').splitlines()[-1])
+        if prompt == PROMPT:
+            break
+    return b"\n".join((buffer.splitlines())[1:-1])
+
+
+def read_buffer(chunks: List[bytes]) -> bytes:
+    """read_buffer ReceiveBufferを利用した受信処理"""
+    buffer = ReceiveBuffer()
+    for chunk in chunks:
+        buffer.extend(chunk)
+        if decode_prompt(buffer.last_line()) == PROMPT:
+            break
+    return buffer.body()
+
+
+def elapsed_ms(func: Callable[[List[bytes]], bytes], chunks: List[bytes]) -> float:
+    start = time.perf_counter()
+    func(chunks)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    print(f"{'size':>10}{'legacy':>12}{'buffer':>12}  (ms)")
+    for size in SIZES:
+        chunks = make_chunks(size)
+        assert read_legacy(chunks) == read_buffer(chunks)
+        print(f"{size:>10}{elapsed_ms(read_legacy, chunks):>12.1f}{elapsed_ms(read_buffer, chunks):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
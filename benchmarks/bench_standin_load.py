@@ -0,0 +1,133 @@
+"""EPG CLIスタンドインサーバに対するNFShellClientの負荷試験
+
+ローカルに起動したEPG CLIスタンドインサーバに対して、指定数のNFShellClientセッションを同時に実行し、
+ログイン・コマンド投入・設定モード移行/解除の応答時間とスループットを計測する
+スタンドインサーバの応答遅延・送信帯域、xCAP設定の件数(応答サイズ)を指定して実機に近い条件で計測できる
+
+実行例:
+    python -m benchmarks.bench_standin_load --sessions 50 --commands 20 --latency 0.05 --bandwidth 65536
+"""
+import argparse
+from pathlib import Path
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from src import eri_connection as nfshell
+from tests.standin_server import EriStandinServer
+
+# 計測対象NF名(セッション毎に連番を付与する)
+NF_NAME = "a1-er-s01-smfvo-{:04}"
+# 計測コマンド
+COMMAND = "show running-config epg pgw apn xcap ipv6-name-server"
+# 計測項目
+ITEMS = ("login", "command", "config/end", "close")
+
+
+def make_xcap(entries: int) -> List[Tuple[str, str]]:
+    """make_xcap スタンドインサーバの初期状態のipv6-name-server設定を生成する
+
+    Args:
+        entries (int): 設定件数
+
+    Returns:
+        List[Tuple[str, str]]: ipv6-name-server設定(IPアドレス, 優先度)
+    """
+    return [(f"2001:268:200d:{1010 + i:x}::6", str(100 * (i + 1))) for i in range(entries)]
+
+
+def timed(results: Dict[str, List[float]], item: str, func: Callable[[], None]) -> None:
+    """timed 処理の所要時間(ミリ秒)を計測項目に追加する
+
+    Args:
+        results (Dict[str, List[float]]): 計測項目毎の所要時間
+        item (str): 計測項目
+        func (Callable[[], None]): 計測対象処理
+    """
+    start = time.perf_counter()
+    func()
+    results[item].append((time.perf_counter() - start) * 1000)
+
+
+def session(nf_name: str, commands: int, barrier: threading.Barrier, results: Dict[str, List[float]], errors: List[str]) -> None:
+    """session 1セッション分の処理(ログイン、コマンド投入、設定モード移行/解除、切断)
+
+    Args:
+        nf_name (str): NF名
+        commands (int): コマンド投入回数
+        barrier (threading.Barrier): 全セッションの開始を揃えるバリア
+        results (Dict[str, List[float]]): 計測項目毎の所要時間
+        errors (List[str]): 発生した例外
+    """
+    client = nfshell.NFShellClient(nf_name)
+    barrier.wait()
+    try:
+        timed(results, "login", client.connect)
+        for _ in range(commands):
+            timed(results, "command", lambda: client.command(COMMAND))
+
+        def config_round_trip() -> None:
+            client.enter_config_mode()
+            client.exit_config_mode()
+        timed(results, "config/end", config_round_trip)
+    except Exception as e:
+        errors.append(f"{nf_name}: {e.__class__.__name__} {e}")
+    finally:
+        timed(results, "close", client.close)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NFShellClient load test against the EPG CLI stand-in")
+    parser.add_argument("--sessions", type=int, default=20, help="number of concurrent sessions")
+    parser.add_argument("--commands", type=int, default=10, help="number of show commands per session")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response latency per command (seconds)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="stand-in send bandwidth per session (bytes/sec, 0 = unlimited)")
+    parser.add_argument("--entries", type=int, default=2, help="number of ipv6-name-server entries in the show output")
+    args = parser.parse_args()
+
+    nf_names = [NF_NAME.format(i) for i in range(args.sessions)]
+    results: Dict[str, List[float]] = {item: [] for item in ITEMS}
+    errors: List[str] = []
+
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            EriStandinServer(xcap=make_xcap(args.entries), latency=args.latency, bandwidth=args.bandwidth,
+                             backlog=max(args.sessions, 128)) as server:
+        (host, port) = server.address
+        nfshell.TRANSCRIPT_DIR = Path(tmpdir)
+        nfshell.CONN_CONF = {
+            "common": {"password": server.password},
+            "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name} for nf_name in nf_names},
+            "bastions": {}
+        }
+        barrier = threading.Barrier(args.sessions + 1)
+        threads = [threading.Thread(target=session, args=(nf_name, args.commands, barrier, results, errors), daemon=True)
+                   for nf_name in nf_names]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        peak = server.peak_sessions
+
+    print(f"sessions={args.sessions} commands={args.commands} latency={args.latency}s "
+          f"bandwidth={args.bandwidth or 'unlimited'} entries={args.entries}")
+    print(f"{'item':<12}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}  (ms)")
+    for item in ITEMS:
+        values = sorted(results[item])
+        if not values:
+            continue
+        p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+        print(f"{item:<12}{len(values):>7}{statistics.mean(values):>9.1f}"
+              f"{statistics.median(values):>9.1f}{p95:>9.1f}{values[-1]:>9.1f}")
+    print(f"elapsed {elapsed:.2f}s, {len(results['command']) / elapsed:.1f} commands/s, "
+          f"{args.sessions / elapsed * 60:.0f} sessions/min, peak concurrent sessions {peak}, errors {len(errors)}")
+    for error in errors:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""xCAP設定解析のベンチマーク
+
+show running-config epg pgw apn xcap ipv6-name-server相当の出力を、
+xCAPテンプレート(TextFSM)と専用パーサ(xcap_parser)で解析する時間を出力サイズ毎に計測する
+複数NFを並行処理する場合を想定し、複数スレッドから同時に解析する場合も計測する
+計測前に、スタブ定義(stub.json)の全応答・指定したセッション記録(--recordで記録)の応答・計測用の出力で
+両者の解析結果が一致することを確認する
+
+実行例:
+    python -m benchmarks.bench_xcap_parser [セッション記録ファイル ...]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pathlib
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from src.eri_connection_replay import ReplayShellClient
+from src.eri_smfvo_xcap_process import parse_xcap_template
+from src.xcap_parser import parse_xcap
+from src.xcap_snapshot import SHOW_COMMAND
+
+# スタブ定義
+STUB_FILE = pathlib.Path(__file__).resolve().parent.parent.joinpath("config", "stub.json")
+# 計測するxCAP設定の件数
+SIZES = [2, 100, 1_000, 10_000]
+# 計測するスレッド数
+THREADS = 8
+# 1スレッドあたりの解析回数
+REPEAT = 20
+
+
+def make_output(count: int) -> str:
+    """make_output xCAP設定の確認コマンドの出力を生成する
+
+    Args:
+        count (int): xCAP設定の件数
+
+    Returns:
+        str: 出力
+    """
+    blocks = "".join(f" ipv6-name-server 2001:268:200d:{i:x}::6\r\n  priority {i % 1000}\r\n !\r\n" for i in range(count))
+    return f"epg pgw apn xcap\r\n{blocks}!"
+
+
+def stub_outputs() -> List[str]:
+    """stub_outputs スタブ定義のxCAP設定の確認コマンドの全応答を取得する
+
+    Returns:
+        List[str]: 応答
+    """
+    with open(STUB_FILE, "r", encoding="utf-8") as f:
+        replies: Dict[str, Dict[str, str]] = json.load(f)["status_check"]["reply"]
+    return [raw for reply in replies.values() for raw in reply.values()]
+
+
+def recorded_outputs(paths: List[str]) -> List[str]:
+    """recorded_outputs セッション記録のxCAP設定の確認コマンドの応答を取得する
+
+    Args:
+        paths (List[str]): セッション記録ファイルのパス
+
+    Returns:
+        List[str]: 応答
+    """
+    return [ReplayShellClient(pathlib.Path(path).stem, pathlib.Path(path), time_scale=0).command(SHOW_COMMAND).decode()
+            for path in paths]
+
+
+def elapsed_ms(func: Callable[[str], Any], raw: str, threads: int) -> float:
+    def run(_: int) -> None:
+        for _ in range(REPEAT):
+            func(raw)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run, range(threads)))
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    for raw in stub_outputs() + recorded_outputs(sys.argv[1:]):
+        assert parse_xcap(raw) == parse_xcap_template(raw)
+    print(f"{'size':>10}{'threads':>8}{'textfsm':>12}{'native':>12}  (ms, {REPEAT} parses per thread)")
+    for size in SIZES:
+        raw = make_output(size)
+        assert parse_xcap(raw) == parse_xcap_template(raw)
+        for threads in (1, THREADS):
+            print(f"{size:>10}{threads:>8}{elapsed_ms(parse_xcap_template, raw, threads):>12.1f}"
+                  f"{elapsed_ms(parse_xcap, raw, threads):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
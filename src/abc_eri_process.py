@@ -1,10 +1,47 @@
 from abc import abstractmethod
+from typing import Any, Generator, NamedTuple, Tuple, Union
 
 from xgnlog.Log import Level
 
 from src.abc_process import AbcProcess, Mode, SoutSeverity
 from src.eri_connection import NFShellClient, ProxyCommandException, SocketTimeoutException, SSHConnectException
 from src.eri_connection_stub import NFStubShellClient as StubClient
+from src.metrics import PHASES
+from src.tracing import TRACER
+from src.vclock import SYSTEM_CLOCK
+
+
+class ClientCall(NamedTuple):
+    """処理ステップから要求する接続クライアントの呼び出し
+    """
+    name: str
+    """接続クライアントのメソッド名"""
+    args: Tuple = ()
+    """呼び出し引数"""
+
+
+class ProcessCall(NamedTuple):
+    """処理ステップから要求するプロセスの他処理の呼び出し
+
+    同期実行時は同名のメソッド、非同期実行時は"_{name}_steps"の処理ステップを実行する
+    """
+    name: str
+    """プロセスの処理名"""
+    args: Tuple = ()
+    """呼び出し引数"""
+
+
+class Wait(NamedTuple):
+    """処理ステップから要求する待ち合わせ
+    """
+    seconds: float
+    """待ち合わせ時間(秒)"""
+
+
+Call = Union[ClientCall, ProcessCall, Wait]
+"""処理ステップが要求するI/O処理"""
+Steps = Generator[Call, Any, Any]
+"""I/O処理を要求し、その結果を受け取りながら進行する処理ステップ"""
 
 
 class AbcEricssonProcess(AbcProcess):
@@ -17,7 +54,9 @@ class AbcEricssonProcess(AbcProcess):
                  nf_name: str,
                  mode: Mode,
                  stub: bool,
-                 job_id: str = None):
+                 job_id: str = None,
+                 client: Any = None,
+                 clock: Any = None):
         """コンストラクタ
 
         Args:
@@ -26,11 +65,16 @@ class AbcEricssonProcess(AbcProcess):
             mode (Mode): 実行モード
             stub (bool): スタブ実行設定
             job_id (str, optional): JOBID. Defaults to None.
+            client (Any, optional): 接続クライアント。指定時はスタブ実行設定に関わらず本クライアントを利用する. Defaults to None.
+            clock (Any, optional): 待ち合わせ・経過時間計測に利用する時計。スタブ実行時はスタブの待ち合わせにも利用する. Defaults to SYSTEM_CLOCK.
         """
         super().__init__(alias, nf_name, mode, job_id)
+        self.clock = clock or SYSTEM_CLOCK
         self.__client = None
-        if stub:
-            self.__client = StubClient(mode, nf_name)
+        if client is not None:
+            self.__client = client
+        elif stub:
+            self.__client = StubClient(mode, nf_name, self.clock)
         else:
             self.__client = NFShellClient(nf_name)
 
@@ -43,6 +87,69 @@ class AbcEricssonProcess(AbcProcess):
         """
         return self.__client
 
+    def _drive(self, steps: Steps) -> Any:
+        """処理ステップを同期実行する
+
+        処理ステップが要求したI/O処理を実行して結果(例外発生時は例外)を処理ステップに返し、
+        処理ステップの戻り値を返す
+        計測対象のフェーズ(PHASES)の呼び出しは、所要時間をrecord_phaseで記録する
+
+        Args:
+            steps (Steps): 処理ステップ
+
+        Returns:
+            Any: 処理ステップの戻り値
+        """
+        (result, error) = (None, None)
+        while True:
+            try:
+                call = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as e:
+                return e.value
+            (result, error) = (None, None)
+            try:
+                if isinstance(call, ClientCall):
+                    result = getattr(self.client, call.name)(*call.args)
+                elif isinstance(call, ProcessCall):
+                    result = self._timed(call.name, getattr(self, call.name), *call.args)
+                else:
+                    self.clock.sleep(call.seconds)
+            except BaseException as e:
+                error = e
+
+    def _timed(self, phase: str, func: Any, *args) -> Any:
+        """処理を実行し、計測対象のフェーズの場合は所要時間を記録してスパンを出力する
+
+        Args:
+            phase (str): フェーズ名
+            func (Any): 処理
+
+        Returns:
+            Any: 処理の戻り値
+        """
+        if phase not in PHASES:
+            return func(*args)
+        start = self.clock.monotonic()
+        try:
+            with TRACER.span(f"process.{phase}", nf_name=self.nf_name):
+                return func(*args)
+        finally:
+            self.record_phase(phase, self.clock.monotonic() - start)
+
+    def _command_steps(self, command: str) -> Steps:
+        """コマンドを投入し、受信データを文字列で返す処理ステップ
+
+        Args:
+            command (str): 投入コマンド
+
+        Returns:
+            Steps: 処理ステップ(戻り値は受信データ)
+        """
+        self.logger.output_1st_log("I00309", command)
+        result = (yield ClientCall("command", (command,))).decode("utf-8")
+        self.logger.output_1st_log("I00310", result)
+        return result
+
     @abstractmethod
     def get_commit_comment(self, *args, **kwargs) -> str:  # pragma no cover
         """コミット時に適用するコミットコメントを取得する
@@ -58,16 +165,49 @@ class AbcEricssonProcess(AbcProcess):
         Returns:
             bool: 接続成功ならTrue、失敗ならFalse
         """
+        return self._drive(self._open_client_steps())
+
+    def close_client(self) -> None:
+        """対向ノードとのSSHクライアントを切断
+
+        Returns:
+            None: なし
+        """
+        return self._drive(self._close_client_steps())
+
+    def commit(self) -> bool:
+        """対象NFに対して変更内容を保存する
+
+        Raises:
+            ValueError: 正常性検証が正常に終了しなかった場合
+            ValueError: 設定コミットが正常に終了しなかった場合
+
+        Returns:
+            bool: 正常終了完了ならTrue、例外発生ならFalse
+        """
+        return self._drive(self._commit_steps())
+
+    def do_abort(self) -> bool:
+        """コマンドエラー発生時に設定を元に戻す
+
+        Returns:
+            bool: 元に戻すが正常に完了したらTrue、何らかの異常が発生したらFalse
+        """
+        return self._drive(self._do_abort_steps())
+
+    def _open_client_steps(self) -> Steps:
+        """open_clientの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は接続成功ならTrue、失敗ならFalse)
+        """
         self.logger.output_1st_log("I00301", self.nf_name)
 
         try:
-            self.client.connect()
+            yield ClientCall("connect")
 
             # 事前コマンド実行
-            command = "screen-length 0"
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
+            yield from self._command_steps("screen-length 0")
         except KeyError as e:
             self.sout_message(SoutSeverity.error, "nf configuration not found.")
             self.logger.output_1st_log("E00301", self.nf_name)
@@ -89,7 +229,7 @@ class AbcEricssonProcess(AbcProcess):
             self.logger.output_1st_log("E00302", self.nf_name)
             return False
         except SSHConnectException as e:
-            self.client.close()
+            yield ClientCall("close")
             self.sout_message(SoutSeverity.error, "ssh process coundn't connect to nf or bastion. [ UNKNOWN ]")
             self.logger.output_1st_log("E00304", self.nf_name)
             self.logger.output_2nd_log(Level.CRITICAL,
@@ -99,7 +239,7 @@ class AbcEricssonProcess(AbcProcess):
                                        f" Trace: {e.__class__.__name__} {e}")
             return False
         except SocketTimeoutException as e:
-            self.client.close()
+            yield ClientCall("close")
             self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
             self.logger.output_1st_log("E00304", self.nf_name)
             self.logger.output_2nd_log(Level.CRITICAL,
@@ -112,61 +252,51 @@ class AbcEricssonProcess(AbcProcess):
         self.logger.output_1st_log("I00302", self.nf_name)
         return True
 
-    def close_client(self) -> None:
-        """対向ノードとのSSHクライアントを切断
+    def _close_client_steps(self) -> Steps:
+        """close_clientの処理ステップ
 
         Returns:
-            None: なし
+            Steps: 処理ステップ
         """
         self.logger.output_1st_log("I00303", self.nf_name)
-        self.client.close()
+        yield ClientCall("close")
         self.logger.output_1st_log("I00304", self.nf_name)
 
-    def commit(self) -> bool:
-        """対象NFに対して変更内容を保存する
-
-        Raises:
-            ValueError: 正常性検証が正常に終了しなかった場合
-            ValueError: 設定コミットが正常に終了しなかった場合
+    def _commit_steps(self) -> Steps:
+        """commitの処理ステップ
 
         Returns:
-            bool: 正常終了完了ならTrue、例外発生ならFalse
+            Steps: 処理ステップ(戻り値は正常終了完了ならTrue、例外発生ならFalse)
         """
         self.logger.output_1st_log("I00305", self.nf_name)
 
         try:
             # 設定変更モード開始
             self.logger.output_1st_log("I00309", "config")
-            self.client.enter_config_mode()
+            yield ClientCall("enter_config_mode")
             self.logger.output_1st_log("I00310", None)
 
             # 差分確認
             command = "show configuration diff"
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
+            yield from self._command_steps(command)
 
             # 正常性検証
             command = "validate"
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
+            result = yield from self._command_steps(command)
             pattern = "Validation complete"
             if not result.count(pattern):
                 raise ValueError("Validate for status change was failed.")
 
             # 設定投入
             command = f"commit comment {self.get_commit_comment()}"
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
+            result = yield from self._command_steps(command)
             pattern = "Commit complete"
             if not result.count(pattern):
                 raise ValueError("Commit for status change was failed.")
 
             # 設定変更モード終了
             self.logger.output_1st_log("I00309", "end")
-            self.client.exit_config_mode()
+            yield ClientCall("exit_config_mode")
             self.logger.output_1st_log("I00310", None)
 
         except SocketTimeoutException as e:
@@ -194,17 +324,17 @@ class AbcEricssonProcess(AbcProcess):
         self.logger.output_1st_log("I00306", self.nf_name)
         return True
 
-    def do_abort(self) -> bool:
-        """コマンドエラー発生時に設定を元に戻す
+    def _do_abort_steps(self) -> Steps:
+        """do_abortの処理ステップ
 
         Returns:
-            bool: 元に戻すが正常に完了したらTrue、何らかの異常が発生したらFalse
+            Steps: 処理ステップ(戻り値は元に戻すが正常に完了したらTrue、何らかの異常が発生したらFalse)
         """
         self.logger.output_1st_log("I00307", self.nf_name)
 
         try:
             self.logger.output_1st_log("I00309", "abort")
-            self.client.abort()
+            yield ClientCall("abort")
             self.logger.output_1st_log("I00310", None)
         except Exception as e:
             self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
@@ -1,10 +1,18 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum, IntFlag, auto
-from typing import Any
+import threading
+from typing import Any, Callable, Dict, List
 
 from xgnlog.Log import Log
 
+# 標準出力排他ロック(複数NFの並行実行時に出力行が混在しないようにする)
+SOUT_LOCK = threading.Lock()
+# 設定変更後、変更反映を待つ上限時間(秒)の既定値
+CONVERGE_TIMEOUT = 5.0
+# フェーズ終了時に呼び出す関数(NF名、フェーズ名を引数とする。プロファイル時のメモリスナップショット取得等に利用する)
+PHASE_HOOKS: List[Callable[[str, str], None]] = []
+
 
 def logtime() -> str:
     """logtime ログ表示時間を取得する
@@ -149,6 +157,8 @@ class AbcProcess(ABC):
             self.__logger: Log = Log(job_id)
         else:
             self.__logger = self.LogStub()
+        # フェーズ毎の所要時間(秒)
+        self.phase_times: Dict[str, float] = {}
 
     @property
     def alias(self) -> str:
@@ -229,6 +239,19 @@ class AbcProcess(ABC):
     def changed(self, changed: ProcessStatus):
         self.__changed = changed
 
+    def record_phase(self, phase: str, seconds: float) -> None:
+        """フェーズの所要時間を記録する。同じフェーズを複数回実行した場合は合計する
+
+        記録後、フェーズ終了時に呼び出す関数(PHASE_HOOKS)を呼び出す
+
+        Args:
+            phase (str): フェーズ名
+            seconds (float): 所要時間(秒)
+        """
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+        for hook in PHASE_HOOKS:
+            hook(self.nf_name, phase)
+
     @property
     def logger(self) -> Log:
         """共通ログ出力用ロガーを取得。コンストラクタ時にJOB_IDを指定しない場合はログ出力しない
@@ -312,7 +335,8 @@ class AbcProcess(ABC):
             body (str): ログメッセージ
         """
         message = f"{severity}:{self.mode}:{logtime()}:{self.alias}({self.nf_name}):{body}"
-        print(message)
+        with SOUT_LOCK:
+            print(message)
 
     def pre_check(self, *args, **kwargs) -> bool:
         """対象ステータスの事前確認を実施
@@ -320,9 +344,7 @@ class AbcProcess(ABC):
         Returns:
             bool: 変更要否確認が取得できた場合はTrue、それ以外の場合はFalse
         """
-        self.before_status = self.get_status()
-        self.necessity = self.necessity_check(self.before_status)
-        return self.before_status is not None and self.necessity is not ProcessStatus.exception_ng
+        return self._pre_check_result(self.get_status())
 
     def post_check(self, *args, **kwargs) -> bool:
         """対象ステータスの事後確認を実施
@@ -330,7 +352,31 @@ class AbcProcess(ABC):
         Returns:
             bool: 変更完了の場合はTrue、それ以外の場合はFalse
         """
-        self.after_status = self.get_status()
+        return self._post_check_result(self.get_status())
+
+    def _pre_check_result(self, status: TargetStatus) -> bool:
+        """取得した事前状態から変更要否を判定し、事前確認結果を返す
+
+        Args:
+            status (TargetStatus): statusの事前状態
+
+        Returns:
+            bool: 変更要否確認が取得できた場合はTrue、それ以外の場合はFalse
+        """
+        self.before_status = status
+        self.necessity = self.necessity_check(self.before_status)
+        return self.before_status is not None and self.necessity is not ProcessStatus.exception_ng
+
+    def _post_check_result(self, status: TargetStatus) -> bool:
+        """取得した事後状態から変更反映を判定し、事後確認結果を返す
+
+        Args:
+            status (TargetStatus): statusの事後状態
+
+        Returns:
+            bool: 変更完了の場合はTrue、それ以外の場合はFalse
+        """
+        self.after_status = status
         self.changed = self.changed_check(self.after_status)
         return self.after_status in (TargetStatus.up, TargetStatus.down) and self.changed is ProcessStatus.change_ok
 
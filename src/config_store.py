@@ -0,0 +1,265 @@
+import hashlib
+import ipaddress
+import json
+import marshal
+import os
+from pathlib import Path
+import re
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 定数宣言
+# ツールローカル設定ディレクトリ
+LOCAL_CONFIG_DIR = Path(__file__).resolve().parent.parent.joinpath("config")
+# コンパイル済み設定バンドル
+BUNDLE_FILE = Path(__file__).resolve().parent.parent.joinpath("cache", "config_bundle.marshal")
+# 設定バンドルの形式バージョン(marshal形式はPythonのバージョン毎に異なるため、バージョンも照合する)
+BUNDLE_VERSION = 1
+BUNDLE_PYTHON = tuple(sys.version_info[:2])
+
+# 設定の検証関数(異常がある場合は例外を送出する)
+Validator = Callable[[Any], None]
+
+
+def require_keys(*keys: str) -> Validator:
+    """require_keys 必須キーを検証する検証関数を取得
+
+    Args:
+        *keys (str): 必須キー
+
+    Returns:
+        Validator: 必須キーがない場合にKeyErrorを送出する検証関数
+    """
+    def validate(conf: Any) -> None:
+        for key in keys:
+            if key not in conf:
+                raise KeyError(key)
+    return validate
+
+
+def validate_nf_infos(conf: Any) -> None:
+    """validate_nf_infos NF情報(nf-infos.json)を検証する
+
+    Args:
+        conf (Any): NF情報
+
+    Raises:
+        KeyError: NFにxCAPがない場合
+        ValueError: xCAPがIPアドレスのリストでない場合
+    """
+    for (nf_name, value) in conf.items():
+        if not isinstance(value["xCAP"], list):
+            raise ValueError(f"xCAP must be a list. nf_name: {nf_name}")
+        for ipaddr in value["xCAP"]:
+            ipaddress.ip_address(ipaddr)
+
+
+def validate_edns_infos(conf: Any) -> None:
+    """validate_edns_infos eDNS情報(edns-infos.json)を検証する
+
+    Args:
+        conf (Any): eDNS情報
+
+    Raises:
+        KeyError: eDNSにipaddrがない場合
+        ValueError: ipaddrがIPアドレスでない場合
+    """
+    for value in conf.values():
+        ipaddress.ip_address(value["ipaddr"])
+
+
+def validate_stub(conf: Any) -> None:
+    """validate_stub スタブ定義(stub.json)を検証する
+
+    Args:
+        conf (Any): スタブ定義
+
+    Raises:
+        KeyError: 定義にcommand、reply、waitがない場合
+        re.error: commandが正規表現として不正な場合
+    """
+    for value in conf.values():
+        require_keys("command", "reply", "wait")(value)
+        re.compile(value["command"])
+
+
+class ConfigStore(object):
+    """ConfigStore JSON設定ファイルの共有ストア
+
+    読み込んだ設定ファイルを検証済みのまま1つの設定バンドル(marshal形式)にまとめ、次回以降はバンドルから読み込む
+    設定ファイルは更新日時・サイズが変わった場合のみハッシュを照合し、内容が変わった場合のみ解析・検証し直す
+    同じ設定ファイルはプロセス内で同じオブジェクトを返し、reloadでは変更された設定をそのオブジェクトに反映する
+    バンドル形式:
+        {"version": BUNDLE_VERSION, "python": BUNDLE_PYTHON,
+         "sources": {設定ファイルのパス: {"mtime_ns": 更新日時, "size": サイズ, "sha256": ハッシュ, "data": 設定内容}, ...,
+                     "derived:派生データ名": {"digests": [元の設定ファイルのハッシュ, ...], "data": 派生データ}, ...}}
+    """
+
+    def __init__(self, bundle_path: Path = BUNDLE_FILE) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            bundle_path (Path, optional): 設定バンドルのパス. Defaults to BUNDLE_FILE.
+        """
+        self.bundle_path = Path(bundle_path)
+        self.lock = threading.RLock()
+        self.sources: Optional[Dict[str, Dict[str, Any]]] = None
+        self.loaded: Dict[str, Tuple[Any, Optional[Validator]]] = {}
+        self.listeners: Dict[str, List[Callable[[Any], None]]] = {}
+
+    def get(self, path: Path, validator: Validator = None) -> Any:
+        """get 設定ファイルの内容を取得する
+
+        Args:
+            path (Path): 設定ファイルのパス
+            validator (Validator, optional): 設定の検証関数. Defaults to None.
+
+        Raises:
+            FileNotFoundError: 設定ファイルがない場合
+            JSONDecodeError: 設定ファイルがJSONとして解析できない場合
+            Exception: 検証関数で異常を検出した場合
+
+        Returns:
+            Any: 設定内容
+        """
+        key = str(path)
+        with self.lock:
+            if key not in self.loaded:
+                self.loaded[key] = (self._compile(Path(path), validator), validator)
+            return self.loaded[key][0]
+
+    def get_derived(self, name: str, paths: List[Path], builder: Callable[..., Any]) -> Any:
+        """get_derived 設定ファイルから生成する派生データ(索引等)を取得する
+
+        派生データは元の設定ファイルのハッシュとともに設定バンドルに保存し、元の設定ファイルの内容が変わった場合のみ生成し直す
+
+        Args:
+            name (str): 派生データ名
+            paths (List[Path]): 元の設定ファイルのパス
+            builder (Callable[..., Any]): 元の設定内容(pathsの順)を引数として派生データを生成する関数(marshal形式で保存できる値を返す)
+
+        Returns:
+            Any: 派生データ
+        """
+        key = f"derived:{name}"
+        with self.lock:
+            confs = [self.get(path) for path in paths]
+            sources = self._load_bundle()
+            digests = [sources[str(path)]["sha256"] for path in paths]
+            entry = sources.get(key)
+            if entry is None or entry["digests"] != digests:
+                entry = {"digests": digests, "data": builder(*confs)}
+                sources[key] = entry
+                self._save_bundle()
+            return entry["data"]
+
+    def add_listener(self, path: Path, listener: Callable[[Any], None]) -> None:
+        """add_listener reloadで設定ファイルの変更を反映した後に呼び出す関数を登録する
+
+        Args:
+            path (Path): 設定ファイルのパス
+            listener (Callable[[Any], None]): 変更後の設定内容を引数とする関数
+        """
+        with self.lock:
+            self.listeners.setdefault(str(path), []).append(listener)
+
+    def reload(self) -> Tuple[List[str], Dict[str, Exception]]:
+        """reload 取得済みの設定ファイルの変更を反映する
+
+        変更された設定内容は取得済みのオブジェクトに上書きし(dictの場合)、登録された関数を呼び出す
+        解析・検証に失敗した設定ファイルは変更前の設定内容を保持する
+
+        Returns:
+            Tuple[List[str], Dict[str, Exception]]: 変更を反映した設定ファイルのパス、反映に失敗した設定ファイルのエラー
+        """
+        changed: List[str] = []
+        errors: Dict[str, Exception] = {}
+        with self.lock:
+            for (key, (current, validator)) in list(self.loaded.items()):
+                try:
+                    data = self._compile(Path(key), validator)
+                except Exception as e:
+                    errors[key] = e
+                    continue
+                if data == current:
+                    continue
+                if isinstance(current, dict) and isinstance(data, dict):
+                    current.clear()
+                    current.update(data)
+                else:
+                    self.loaded[key] = (data, validator)
+                changed.append(key)
+            for key in changed:
+                for listener in self.listeners.get(key, []):
+                    listener(self.loaded[key][0])
+        return (changed, errors)
+
+    def _compile(self, path: Path, validator: Optional[Validator]) -> Any:
+        """_compile 設定バンドルまたは設定ファイルから設定内容を取得する
+
+        Args:
+            path (Path): 設定ファイルのパス
+            validator (Optional[Validator]): 設定の検証関数
+
+        Returns:
+            Any: 設定内容
+        """
+        key = str(path)
+        sources = self._load_bundle()
+        stat = os.stat(path)
+        entry = sources.get(key)
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return entry["data"]
+
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        if entry is None or entry["sha256"] != sha256:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if validator is not None:
+                validator(data)
+        else:
+            data = entry["data"]
+        sources[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256, "data": data}
+        self._save_bundle()
+        return data
+
+    def _load_bundle(self) -> Dict[str, Dict[str, Any]]:
+        """_load_bundle 設定バンドルを読み込む(初回のみ)
+
+        バンドルがない、または形式・Pythonのバージョンが異なる場合は空とする
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 設定ファイルのパスをキーとした設定内容
+        """
+        if self.sources is None:
+            try:
+                bundle = marshal.loads(self.bundle_path.read_bytes())
+                if bundle["version"] != BUNDLE_VERSION or tuple(bundle["python"]) != BUNDLE_PYTHON:
+                    raise ValueError(f"unsupported bundle: {bundle['version']}, {bundle['python']}")
+                self.sources = bundle["sources"]
+            except Exception:
+                self.sources = {}
+        return self.sources
+
+    def _save_bundle(self) -> None:
+        """_save_bundle 設定バンドルを書き込む
+
+        読込途中のバンドルを他プロセスが読まないよう、一時ファイルに書き込んでから置き換える
+        書込みできない場合(読取専用の配置先など)は、バンドルを使わずに設定ファイルから読み込む
+        """
+        tmp_path = self.bundle_path.with_name(f".{self.bundle_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.bundle_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                marshal.dump({"version": BUNDLE_VERSION, "python": BUNDLE_PYTHON, "sources": self.sources}, f)
+            os.replace(tmp_path, self.bundle_path)
+        except (OSError, ValueError):
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+# 共通設定ストア
+CONFIG_STORE = ConfigStore()
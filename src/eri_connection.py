@@ -1,12 +1,20 @@
-import json
+import atexit
+import codecs
 import logging
 from pathlib import Path
 import re
+import select
 import socket
+import threading
 import time
+from typing import Any, Dict, Set, Tuple, Union
 import paramiko
 
-from xgnlog.Log import Level, Log
+from xgnlog.Log import Lazy, Level, Log
+
+from src.config_store import CONFIG_STORE, require_keys
+from src.tracing import TRACER
+from src.transcript import COMMAND_CAP, PREVIEW_SIZE, SESSION_CAP, TranscriptSpool
 
 paramikologger = logging.getLogger("paramiko")
 paramikologger.addHandler(logging.NullHandler())
@@ -21,36 +29,287 @@ LOCAL_CONFIG_DIR = Path(__file__).resolve().parent.parent.joinpath("config")
 
 # E///接続用設定ファイル
 CONN_FILE = LOCAL_CONFIG_DIR.joinpath("connections.json")
-# 接続設定ファイル読込
-with open(CONN_FILE, "r", encoding="utf-8") as f:
-    CONN_CONF = json.load(f)
 (CONN_COMMON, CONN_CONNECTIONS, CONN_BASTIONS) = ("common", "connections", "bastions")
+# 接続設定ファイル読込(共通設定ストアのreloadで変更が反映される)
+CONN_CONF = CONFIG_STORE.get(CONN_FILE, require_keys(CONN_COMMON, CONN_CONNECTIONS, CONN_BASTIONS))
 
 # shell読込バッファ
 READ_SIZE = 10240
+# 初回読み込み時、受信が途切れてから読込完了とみなすまでの待ち時間(秒)の上限・下限
+FIRST_READ_QUIET = 0.1
+FIRST_READ_QUIET_MIN = 0.02
+# 初回読み込み(ログイン・設定モード移行/解除)のタイムアウト(秒)
+FIRST_READ_TIMEOUT = 15.0
+# 踏み台接続タイムアウト(秒)
+BASTION_TIMEOUT = 10
+# プロンプトに付与されるANSIエスケープシーケンス
+ANSI_ESCAPE = re.compile(r'(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]')
+# プロンプトの形式(ユーザ名@ホスト名#、設定モードはユーザ名@ホスト名(config)#)
+PROMPT_SHAPE = re.compile(r'^[\w.-]+@[\w.-]+(\([\w-]+\))?[#>]\s*$')
+# NF毎に受信したプロンプト(プロセス内で共有し、以降のモード移行で再利用する)
+LEARNED_PROMPTS: Dict[str, Set[str]] = {}
+# セッション記録(受信データの圧縮スプール)の出力先ディレクトリ
+TRANSCRIPT_DIR = LOGGER.logdir_2nd.joinpath("transcripts")
+
+
+class ReceiveBuffer(object):
+    """ReceiveBuffer シェル受信バッファ
+
+    受信データをbytearrayに追記し、プロンプト判定では最終行のみを参照します
+    投入コマンド・プロンプトの除去もmemoryviewのスライスで行うため、
+    受信データ量に対して線形時間で処理できます
+    """
+
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        self.data = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+
+    def extend(self, chunk: bytes) -> None:
+        """extend 受信データ追記
+
+        Args:
+            chunk (bytes): 受信データ
+        """
+        self.data += chunk
+
+    def last_line(self) -> bytes:
+        """last_line 最終行取得
+
+        bytes.splitlines()の最終要素と同じく、末尾の改行は最終行に含めません
+        末尾から直前の改行までのみを走査します
+
+        Returns:
+            bytes: 最終行
+        """
+        (start, end) = self._last_line_span()
+        return bytes(memoryview(self.data)[start:end])
+
+    def body(self) -> bytes:
+        """body 1行目(投入コマンド)と最終行(プロンプト)を除いた受信データ取得
+
+        改行コードはb"\\n"に統一します(b"\\n".join(data.splitlines()[1:-1])と同じ結果となります)
+
+        Returns:
+            bytes: 受信データ
+        """
+        data = self.data
+        breaks = [i for i in (data.find(b"\r"), data.find(b"\n")) if i >= 0]
+        if not breaks:
+            return b""
+        first = min(breaks)
+        first += 2 if data[first:first + 2] == b"\r\n" else 1
+        (last, _) = self._last_line_span()
+        if last <= first:
+            return b""
+        # 最終行直前の改行を除去
+        last -= 2 if data[last - 2:last] == b"\r\n" else 1
+        body = bytes(memoryview(data)[first:last])
+        return body.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    def _last_line_span(self) -> Tuple[int, int]:
+        """_last_line_span 最終行の範囲取得
+
+        Returns:
+            Tuple[int, int]: 最終行の開始位置、終了位置
+        """
+        data = self.data
+        end = len(data)
+        if data.endswith(b"\r\n"):
+            end -= 2
+        elif data.endswith((b"\r", b"\n")):
+            end -= 1
+        # 直前の改行(b"\n")を探してから、最終行内のb"\r"を探す(走査範囲を最終行に限定する)
+        newline = data.rfind(b"\n", 0, end)
+        start = max(newline, data.rfind(b"\r", newline + 1, end)) + 1
+        return (start, end)
+
+
+class PromptDetector(object):
+    """PromptDetector モード移行時の受信完了判定クラス
+
+    ログイン・設定モード移行/解除では移行後のプロンプトが事前に分からないため、
+    受信データの最終行が以下のいずれかであれば、その時点で受信完了とします
+    ・同一NFで過去に受信したプロンプト
+    ・プロンプトの形式(PROMPT_SHAPE)に一致する文字列
+    いずれにも該当しない場合は、受信間隔に応じて待ち時間を調整しながら受信が途切れるまで待ちます
+    """
+
+    def __init__(self, nf_name: str) -> None:
+        """__init__ インスタンス生成
 
+        Args:
+            nf_name (str): NFノード名
+        """
+        self.nf_name = nf_name
+        self.quiet = FIRST_READ_QUIET_MIN
+        self._received_at: float = None
+
+    def is_prompt(self, buffer: ReceiveBuffer) -> bool:
+        """is_prompt 受信完了判定
+
+        データ受信毎に呼び出し、受信間隔から受信途切れの待ち時間(quiet)を更新します
+
+        Args:
+            buffer (ReceiveBuffer): 受信データ
+
+        Returns:
+            bool: 最終行がプロンプトの場合True
+        """
+        now = time.monotonic()
+        if self._received_at is not None:
+            # 受信間隔の2倍を待ち時間とする(FIRST_READ_QUIET_MIN～FIRST_READ_QUIETの範囲)
+            self.quiet = min(FIRST_READ_QUIET, max(self.quiet, 2 * (now - self._received_at)))
+        self._received_at = now
+        prompt = decode_prompt(buffer.last_line())
+        return prompt in LEARNED_PROMPTS.get(self.nf_name, ()) or PROMPT_SHAPE.match(prompt) is not None
+
+    def learn(self, prompt: str) -> None:
+        """learn プロンプトの学習
+
+        Args:
+            prompt (str): 受信したプロンプト
+        """
+        if prompt:
+            LEARNED_PROMPTS.setdefault(self.nf_name, set()).add(prompt)
+
+
+def decode_prompt(buffer: bytes) -> str:
+    """decode_prompt 受信データの最終行からプロンプトを取得する
 
-def get_sock(bastion_name: str, hostname: str, port: int = 22) -> paramiko.ProxyCommand:
+    UTF-8のマルチバイト文字が受信途中で分割されている場合は、末尾の未完成の文字を除いて復号します
+
+    Args:
+        buffer (bytes): 受信データ
+
+    Returns:
+        str: ANSIエスケープシーケンスを除去したプロンプト文字列
+    """
+    lines = codecs.getincrementaldecoder("utf-8")().decode(buffer).splitlines()
+    return ANSI_ESCAPE.sub("", lines[-1]) if lines else ""
+
+
+class BastionPool(object):
+    """BastionPool 踏み台SSHトランスポート共有クラス
+
+    踏み台(接続先・ポート・ユーザ)毎に認証済みのSSHトランスポートを1つだけ保持し、
+    踏み台配下の各NFへの接続はトランスポート上のdirect-tcpipチャネルとして開設します
+    NF毎のProxyCommandサブプロセス生成、踏み台への鍵交換・認証を省略できます
+    複数NFの並行接続から同時に利用できます
+    """
+
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, int, str], paramiko.SSHClient] = {}
+        self._locks: Dict[Tuple[str, int, str], threading.Lock] = {}
+
+    def open_channel(self, bastion_info: Dict[str, Any], hostname: str, port: int = 22) -> paramiko.Channel:
+        """open_channel 踏み台経由のチャネル開設
+
+        踏み台のトランスポートが未接続または切断済みの場合は接続してから、direct-tcpipチャネルを開設します
+
+        Args:
+            bastion_info (Dict[str, Any]): 踏み台設定(host, port, username, password, key_filename, passphrase)
+            hostname (str): 対向ホスト名
+            port (int, optional): 対向接続ポート番号. Defaults to 22.
+
+        Returns:
+            paramiko.Channel: 対向ホストに接続したチャネル
+        """
+        key = (bastion_info["host"], bastion_info.get("port", 22), bastion_info.get("username"))
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        # 同一踏み台への接続は1回のみとし、異なる踏み台への接続は並行して行う
+        with lock:
+            client = self._clients.get(key)
+            if client is None or not client.get_transport() or not client.get_transport().is_active():
+                LOGGER.output_1st_log("I00234", key)
+                client = self._connect(bastion_info)
+                self._clients[key] = client
+            else:
+                LOGGER.output_1st_log("I00235", key)
+            transport = client.get_transport()
+        LOGGER.output_1st_log("I00236", [key, hostname, port])
+        return transport.open_channel("direct-tcpip", (hostname, port), ("127.0.0.1", 0), timeout=BASTION_TIMEOUT)
+
+    def close_all(self) -> None:
+        """close_all 全踏み台トランスポート切断
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    def _connect(self, bastion_info: Dict[str, Any]) -> paramiko.SSHClient:
+        """_connect 踏み台への接続
+
+        Args:
+            bastion_info (Dict[str, Any]): 踏み台設定
+
+        Returns:
+            paramiko.SSHClient: 接続済みの踏み台クライアント
+        """
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(bastion_info["host"],
+                       port=bastion_info.get("port", 22),
+                       username=bastion_info.get("username"),
+                       password=bastion_info.get("password"),
+                       key_filename=bastion_info.get("key_filename"),
+                       passphrase=bastion_info.get("passphrase"),
+                       timeout=BASTION_TIMEOUT)
+        return client
+
+
+# 踏み台トランスポート(プロセス内で共有し、終了時に切断する)
+BASTION_POOL = BastionPool()
+atexit.register(BASTION_POOL.close_all)
+
+
+def get_sock(bastion_name: str, hostname: str, port: int = 22) -> Union[paramiko.ProxyCommand, paramiko.Channel]:
     """get_sock ProxyCommand取得
 
     SSH接続時に踏み台が必要な場合、ProxyCommandを生成します
     sshコマンドで利用する"-W"オプションで%hや%pといったパラメータは自動展開されません
     hostname、portを指定することで内部で置換を行います
 
+    踏み台設定に接続先(host)が指定されている場合は、ProxyCommandの代わりに
+    踏み台毎に共有するSSHトランスポート上のdirect-tcpipチャネルを返却します
+
     Args:
         bastion_name (str): 踏み台名
         hostname (str): 対向ホスト名。%hを置換するために利用
         port (int, optional): 対向接続ポート番号 %pを置換するために利用. Defaults to 22.
 
     Raises:
-        ProxyCommandException: ProxyCommand生成で異常があった場合
+        ProxyCommandException: ProxyCommand生成または踏み台経由のチャネル開設で異常があった場合
 
     Returns:
-        paramiko.ProxyCommand: ProxyCommandオブジェクト。commandがない場合はNone
+        Union[paramiko.ProxyCommand, paramiko.Channel]: ProxyCommandオブジェクトまたは踏み台経由のチャネル。commandがない場合はNone
     """
     LOGGER.output_1st_log("I00203")
 
-    proxy_command = CONN_CONF[CONN_BASTIONS].get(bastion_name, {}).get("proxycommand")
+    bastion_info = CONN_CONF[CONN_BASTIONS].get(bastion_name, {})
+    if "host" in bastion_info:
+        try:
+            channel = BASTION_POOL.open_channel(bastion_info, hostname, port)
+        except Exception as e:
+            LOGGER.output_1st_log("E00206")
+            LOGGER.output_2nd_log(Level.CRITICAL, f"踏み台経由チャネル開設異常:\nパラメータ:\n bastion: {bastion_name}\n hostname: {hostname}\n port: {port}\n Trace: {e.__class__.__name__} {e}")
+            raise ProxyCommandException(bastion_name)
+        LOGGER.output_1st_log("I00205")
+        return channel
+
+    proxy_command = bastion_info.get("proxycommand")
 
     if proxy_command is None:
         LOGGER.output_1st_log("I00204")
@@ -68,6 +327,48 @@ def get_sock(bastion_name: str, hostname: str, port: int = 22) -> paramiko.Proxy
     return sock
 
 
+def get_connect_params(nf_name: str) -> Tuple[str, str, str, Dict[str, Any]]:
+    """get_connect_params SSH接続パラメータ取得
+
+    接続設定ファイルからNFの接続先、認証情報、踏み台のProxyCommandを取得します
+    NF個別設定がない項目は共通設定(common)の値を利用します
+
+    Args:
+        nf_name (str): NFノード名
+
+    Raises:
+        KeyError: CONN_CONFから値の取得に失敗した場合
+        ProxyCommandException: ProxyCommand生成で異常があった場合
+
+    Returns:
+        Tuple[str, str, str, Dict[str, Any]]: 接続先IPアドレス、パスワード、パスフレーズ、paramiko連携キーワード引数
+    """
+    connection_info = CONN_CONF[CONN_CONNECTIONS][nf_name]
+    common_info = CONN_CONF[CONN_COMMON]
+    ipaddr: str = connection_info["ipaddr"]
+    port: int = connection_info.get("port", common_info.get("port", 22))
+    username: str = connection_info.get("username", common_info.get("username", None))
+    password: str = connection_info.get("password", common_info.get("password", None))
+    key_filename: str = connection_info.get("key_filename", common_info.get("key_filename", None))
+    passphrase: str = connection_info.get("passphrase", common_info.get("passphrase", None))
+
+    # 踏み台設定取得
+    bastion = connection_info.get("bastion", None)
+    with TRACER.span("nf.bastion", nf_name=nf_name, bastion=str(bastion)) as span:
+        sock = get_sock(bastion, ipaddr, port)
+        span.set_status(True)
+
+    # paramiko連携キーワード引数(パスワードは別途指定する)
+    paramiko_args = {
+        "username": username,
+        "port": port,
+        "key_filename": key_filename,
+        "sock": sock,
+        "timeout": 10
+    }
+    return (ipaddr, password, passphrase, paramiko_args)
+
+
 class NFShellClient(paramiko.SSHClient):
     """NFShellClient E/// NFShell接続用クラス
 
@@ -93,6 +394,7 @@ class NFShellClient(paramiko.SSHClient):
         self.shell: paramiko.Channel = None
         self.prompt: str = None
         self.is_config_mode = False
+        self.transcript = new_transcript(nf_name)
         LOGGER.output_1st_log("I00202", nf_name)
 
     def connect(self) -> None:
@@ -106,38 +408,20 @@ class NFShellClient(paramiko.SSHClient):
         """
         LOGGER.output_1st_log("I00206", self.nf_name)
 
-        connection_info = CONN_CONF[CONN_CONNECTIONS][self.nf_name]
-        common_info = CONN_CONF[CONN_COMMON]
-        ipaddr: str = connection_info["ipaddr"]
-        port: int = connection_info.get("port", common_info.get("port", 22))
-        username: str = connection_info.get("username", common_info.get("username", None))
-        password: str = connection_info.get("password", common_info.get("password", None))
-        key_filename: str = connection_info.get("key_filename", common_info.get("key_filename", None))
-        passphrase: str = connection_info.get("passphrase", common_info.get("passphrase", None))
-
-        # 踏み台設定取得
-        bastion = connection_info.get("bastion", None)
-        sock = get_sock(bastion, ipaddr)
-
-        # paramiko連携キーワード引数(パスワードは別途指定する)
-        paramiko_args = {
-            "username": username,
-            "port": port,
-            "key_filename": key_filename,
-            "sock": sock,
-            "timeout": 10
-        }
-
-        try:
-            super().connect(ipaddr, password=password, passphrase=passphrase, **paramiko_args)
-            self.shell = super().invoke_shell()
-            # ログインプロンプトまで読み飛しプロンプトを取得
-            _ = self._read_first()
-        except Exception as e:
-            LOGGER.output_1st_log("E00203", self.nf_name)
-            LOGGER.output_2nd_log(Level.CRITICAL, f"SSH接続異常:\nパラメータ:\n nf_name: {self.nf_name}\n hostname: {ipaddr}\n password: ************\n passphrase: ************\n kwargs: {paramiko_args}\n Trace: {e.__class__.__name__} {e}")
-            self.close()
-            raise SSHConnectException(str(e))
+        with TRACER.span("nf.connect", nf_name=self.nf_name) as span:
+            (ipaddr, password, passphrase, paramiko_args) = get_connect_params(self.nf_name)
+
+            try:
+                super().connect(ipaddr, password=password, passphrase=passphrase, **paramiko_args)
+                self.shell = super().invoke_shell()
+                # ログインプロンプトまで読み飛しプロンプトを取得
+                _ = self._read_first()
+            except Exception as e:
+                LOGGER.output_1st_log("E00203", self.nf_name)
+                LOGGER.output_2nd_log(Level.CRITICAL, f"SSH接続異常:\nパラメータ:\n nf_name: {self.nf_name}\n hostname: {ipaddr}\n password: ************\n passphrase: ************\n kwargs: {paramiko_args}\n Trace: {e.__class__.__name__} {e}")
+                self.close()
+                raise SSHConnectException(str(e))
+            span.set_status(True)
 
         LOGGER.output_1st_log("I00207", self.nf_name)
 
@@ -150,6 +434,7 @@ class NFShellClient(paramiko.SSHClient):
             self.shell.close()
         # clientをクローズ
         super().close()
+        self.transcript.close()
 
         LOGGER.output_1st_log("I00212", self.nf_name)
 
@@ -170,8 +455,10 @@ class NFShellClient(paramiko.SSHClient):
             return None
 
         LOGGER.output_1st_log("I00217", self.nf_name)
-        self.shell.send(f"config\n")
-        self._read_first()
+        with TRACER.span("nf.enter_config_mode", nf_name=self.nf_name) as span:
+            self.shell.send(f"config\n")
+            self._read_first(command="config")
+            span.set_status(True)
         self.is_config_mode = True
         LOGGER.output_1st_log("I00218", self.nf_name)
 
@@ -198,7 +485,7 @@ class NFShellClient(paramiko.SSHClient):
         else:
             LOGGER.output_1st_log("I00219", self.nf_name)
             self.shell.send(f"end\n")
-            self._read_first()
+            self._read_first(command="end")
             self.is_config_mode = False
             LOGGER.output_1st_log("I00220", self.nf_name)
 
@@ -220,7 +507,7 @@ class NFShellClient(paramiko.SSHClient):
 
         LOGGER.output_1st_log("I00221", self.nf_name)
         self.shell.send(f"abort\n")
-        self._read_first()
+        self._read_first(command="abort")
         self.is_config_mode = False
         LOGGER.output_1st_log("I00222", self.nf_name)
 
@@ -247,79 +534,142 @@ class NFShellClient(paramiko.SSHClient):
             LOGGER.output_1st_log("I00216", self.nf_name)
             return b""
         LOGGER.output_1st_log("I00209", command)
-        self.shell.send(f"{command}\n")
-        self.shell.settimeout(timeout)
-        try:
-            result = self._read()
-        except socket.timeout as e:
-            LOGGER.output_1st_log("E00204", self.nf_name)
-            LOGGER.output_2nd_log(Level.CRITICAL, f"コマンド投入タイムアウト発生:\nパラメータ:\n nf_name: {self.nf_name}\n command: {command}\n timeout: {timeout}\n Trace: {e.__class__.__name__} {e}")
-            raise SocketTimeoutException(str(e))
-        finally:
-            self.shell.settimeout(None)
+        with TRACER.span("nf.command", nf_name=self.nf_name, command=command, timeout=timeout) as span:
+            self.shell.send(f"{command}\n")
+            span.set_attribute("bytes_sent", len(command) + 1)
+            self.shell.settimeout(timeout)
+            try:
+                result = self._read(timeout, command)
+            except socket.timeout as e:
+                LOGGER.output_1st_log("E00204", self.nf_name)
+                LOGGER.output_2nd_log(Level.CRITICAL, f"コマンド投入タイムアウト発生:\nパラメータ:\n nf_name: {self.nf_name}\n command: {command}\n timeout: {timeout}\n Trace: {e.__class__.__name__} {e}")
+                raise SocketTimeoutException(str(e))
+            finally:
+                self.shell.settimeout(None)
+            span.set_attribute("bytes_received", len(result))
+            span.set_status(True)
 
         LOGGER.output_1st_log("I00210", self.nf_name)
         return result
 
-    def _read(self) -> bytes:
+    def _read(self, timeout: float = None, command: str = None) -> bytes:
         """_read データ受信
 
         invoke_shellで投入したコマンド結果を受信します
-        recv_ready()を確認し、recv_ready()がFalseになるまでREAD_SIZEずつ読み込みます
-        受信データは投入コマンドおよびプロンプトが前後1行ずつ付与されるため、
+        プロンプトを受信するまで、チャネルが受信可能になるのを待ち合わせて読み込みます
+        受信データはセッション記録に保存し、ログには記録の参照と先頭部分のみを出力します
+        受信データは投入コマンドおよびプロンプトが前後1行ずつ付与されるため、削除します
+
+        Args:
+            timeout (float, optional): プロンプト受信までの待ち時間(秒)。Noneの場合は無期限. Defaults to None.
+            command (str, optional): 投入コマンド(セッション記録の見出し). Defaults to None.
+
+        Raises:
+            socket.timeout: 待ち時間内にプロンプトを受信できなかった場合
+            EOFError: 受信途中でチャネルが閉じられた場合
 
         Returns:
             bytes: 受信データ
         """
         LOGGER.output_1st_log("I00213")
-        buffer = b""
+        buffer = ReceiveBuffer()
         # shellが利用不可能な場合
         if not self._is_shell_enable():
             LOGGER.output_1st_log("I00215")
-            return buffer
+            return b""
+        deadline = None if timeout is None else time.monotonic() + timeout
         # プロンプトを受信するまでループ
         while True:
             # 受信待ち状態の場合
             while self.shell.recv_ready():
-                buffer += self.shell.recv(READ_SIZE)
-            if len(buffer) != 0 and self.prompt == self._get_prompt(buffer):
+                buffer.extend(self.shell.recv(READ_SIZE))
+            # プロンプト判定は最終行のみを対象とする
+            if len(buffer) != 0 and self.prompt == self._get_prompt(buffer.last_line()):
                 break
-            time.sleep(0.1)
-        LOGGER.output_2nd_log(Level.DEBUG, f"RAW data: {buffer}")
-
-        # 1行目に投入コマンド、最終行にプロンプトが表示されるため、削除
-        buffer = b"\n".join((buffer.splitlines())[1:-1])
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if (remaining is not None and remaining <= 0) or not self._wait_readable(remaining):
+                raise socket.timeout(f"prompt was not received within {timeout} seconds")
+        ref = self.transcript.record(command, buffer.data)
+        LOGGER.output_2nd_log(Level.DEBUG, Lazy("RAW data: {}".format, ref))
 
         LOGGER.output_1st_log("I00215")
-        return buffer
+        # 1行目に投入コマンド、最終行にプロンプトが表示されるため、削除
+        return buffer.body()
 
-    def _read_first(self) -> None:
+    def _read_first(self, timeout: float = FIRST_READ_TIMEOUT, command: str = "login") -> None:
         """_read_first 初回読み込み
 
         ログイン時にプロンプトを取得する必要があるため、個別の読込関数を準備する
         設定モードの移行・解除においてもプロンプトが変化するため本関数を利用する
+        最終行がプロンプトであれば即座に、そうでなければ受信が途切れた時点で読込完了とする(PromptDetector参照)
+        受信データ(ログインバナーなど)はセッション記録に保存する
+
+        Args:
+            timeout (float, optional): 最初のデータ受信までのタイムアウト. Defaults to FIRST_READ_TIMEOUT.
+            command (str, optional): 投入コマンド(セッション記録の見出し). Defaults to "login".
 
         Raises:
-            Exception: _description_
+            SocketTimeoutException: タイムアウトが発生した場合
         """
         LOGGER.output_1st_log("I00223")
-        buffer = b""
+        buffer = ReceiveBuffer()
         if not self._is_shell_enable():
             LOGGER.output_1st_log("I00216", self.nf_name)
             return None
-        # 受信待ち状態になるまで待つ
-        while not self.shell.recv_ready():
-            time.sleep(0.1)
-
-        # 受信待ち状態の間受信する
-        while self.shell.recv_ready():
-            buffer += self.shell.recv(1024 * 32)
-            time.sleep(0.1)
+        detector = PromptDetector(self.nf_name)
+        deadline = time.monotonic() + timeout
+        with TRACER.span("nf.read_first", nf_name=self.nf_name, command=command, timeout=timeout) as span:
+            try:
+                # 受信待ち状態になるまで待つ
+                while not self.shell.recv_ready():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._wait_readable(remaining):
+                        raise socket.timeout(f"no data was received within {timeout} seconds")
+
+                # プロンプトを受信するか、受信が途切れるまで受信する
+                while self.shell.recv_ready():
+                    buffer.extend(self.shell.recv(1024 * 32))
+                    if detector.is_prompt(buffer):
+                        break
+                    self._wait_readable(detector.quiet)
+            except socket.timeout as e:
+                LOGGER.output_1st_log("E00204", self.nf_name)
+                LOGGER.output_2nd_log(Level.CRITICAL, f"コマンド投入タイムアウト発生:\nパラメータ:\n nf_name: {self.nf_name}\n command: {None}\n timeout: {timeout}\n Trace: {e.__class__.__name__} {e}")
+                raise SocketTimeoutException(str(e))
+            span.set_attribute("bytes_received", len(buffer))
+            span.set_status(True)
 
         # 最終行のプロンプトを取得
-        self.prompt = self._get_prompt(buffer)
+        self.prompt = self._get_prompt(buffer.last_line())
+        detector.learn(self.prompt)
         LOGGER.output_1st_log("I00224", self.prompt)
-        LOGGER.output_1st_log("I00225", buffer)
+        LOGGER.output_1st_log("I00225", self.transcript.record(command, buffer.data))
+
+    def _wait_readable(self, timeout: float = None) -> bool:
+        """_wait_readable 受信可能待ち
+
+        チャネルのファイルディスクリプタをselectで監視し、受信可能になるまで待ち合わせます
+        待ち合わせ中はスリープによるポーリングを行わず、データ到着時に即座に復帰します
+
+        Args:
+            timeout (float, optional): 待ち合わせ時間(秒)。Noneの場合は無期限. Defaults to None.
+
+        Raises:
+            EOFError: 受信データがない状態でチャネルが閉じられた場合
+
+        Returns:
+            bool: 受信可能になった場合True、タイムアウトした場合False
+        """
+        if self.shell.recv_ready():
+            return True
+        if self.shell.closed or self.shell.eof_received:
+            raise EOFError(f"channel closed. nf_name: {self.nf_name}")
+        (readable, _, _) = select.select([self.shell], [], [], timeout)
+        if not readable:
+            return False
+        if not self.shell.recv_ready() and (self.shell.closed or self.shell.eof_received):
+            raise EOFError(f"channel closed. nf_name: {self.nf_name}")
+        return True
 
     def _get_prompt(self, buffer: bytes) -> str:
         """_get_prompt プロンプトを取得する
@@ -330,7 +680,7 @@ class NFShellClient(paramiko.SSHClient):
         Returns:
             str: プロンプト文字列
         """
-        return re.compile(r'(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]').sub("", buffer.decode('utf-8').splitlines()[-1])
+        return decode_prompt(buffer)
 
     def _is_shell_enable(self) -> bool:
         """_is_shell_enable シェル状態確認
@@ -343,6 +693,27 @@ class NFShellClient(paramiko.SSHClient):
         return not (self.shell is None or self.shell.closed)
 
 
+def new_transcript(nf_name: str) -> TranscriptSpool:
+    """new_transcript セッション記録生成
+
+    CONN_CONFのcommon.transcriptで出力先・記録上限を変更できます
+    (dir: 出力先ディレクトリ、command_cap: 1コマンドあたりの記録上限、session_cap: 1セッションあたりの記録上限、
+    preview_size: ログに出力するプレビューの長さ)
+
+    Args:
+        nf_name (str): NFノード名
+
+    Returns:
+        TranscriptSpool: セッション記録
+    """
+    conf = CONN_CONF.get(CONN_COMMON, {}).get("transcript", {})
+    return TranscriptSpool(nf_name,
+                           Path(conf.get("dir", TRANSCRIPT_DIR)),
+                           conf.get("command_cap", COMMAND_CAP),
+                           conf.get("session_cap", SESSION_CAP),
+                           conf.get("preview_size", PREVIEW_SIZE))
+
+
 class SSHConnectException(Exception):
     """SSHConnectException SSH接続エラー
     """
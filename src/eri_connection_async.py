@@ -0,0 +1,479 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import sys
+from typing import Any, Awaitable, Callable, Coroutine
+
+import paramiko
+
+from xgnlog.Log import Lazy, Level, Log
+
+from src.eri_connection import (FIRST_READ_TIMEOUT, READ_SIZE, PromptDetector, ReceiveBuffer, SocketTimeoutException, SSHConnectException,
+                                decode_prompt, get_connect_params, new_transcript)
+from src.tracing import TRACER
+
+# 定数宣言
+# 共通ロガー
+JOB_ID = "T23AJ002"
+LOGGER = Log(JOB_ID)
+
+
+
+def run_event_loop(main: Coroutine, max_workers: int = None) -> Any:
+    """run_event_loop コルーチンを新しいイベントループで実行する
+
+    シェルの受信待ちはイベントループのadd_readerを利用するため、
+    add_readerに対応していないWindows既定のProactorEventLoopではなくSelectorEventLoopを利用する
+    max_workersを指定した場合、SSHの鍵交換・認証などのブロッキング処理を実行する既定Executorを
+    max_workers個のワーカースレッドで生成する(未指定時はasyncioの既定値min(32, CPU数+4)となる)
+
+    Args:
+        main (Coroutine): 実行するコルーチン
+        max_workers (int, optional): 既定Executorのワーカースレッド数. Defaults to None.
+
+    Returns:
+        Any: コルーチンの戻り値
+    """
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    async def with_executor() -> Any:
+        if max_workers is not None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="xcap-io")
+            asyncio.get_running_loop().set_default_executor(executor)
+        return await main
+
+    return asyncio.run(with_executor())
+
+
+class AsyncNFShellClient(object):
+    """AsyncNFShellClient E/// NFShell接続用クラス(asyncio版)
+
+    NFShellClientと同じ接続・コマンド投入・設定モード操作をコルーチンとして提供します
+    シェルの受信はチャネルのファイルディスクリプタをイベントループに登録して待ち合わせるため、
+    1つのイベントループで多数のNFセッションを同時に扱えます
+    SSHの鍵交換・認証はparamikoがブロッキング処理のため、イベントループの既定Executorで実行します
+    同時に実行できる鍵交換・認証の数は既定Executorのワーカースレッド数が上限となります(run_event_loop参照)
+    また、paramikoは接続中のNF毎にトランスポートスレッドを1つ生成するため、スレッド数はNF接続数に比例します
+    Windowsではadd_readerに対応したSelectorEventLoopで実行する必要があります
+    """
+
+    def __init__(self, nf_name: str) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str, optional): NFノード名
+
+        Raises:
+            ValueError: nf_nameにNoneが指定された場合
+        """
+        LOGGER.output_1st_log("I00201", nf_name)
+        if nf_name is None:
+            LOGGER.output_1st_log("E00201", nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"インスタンス生成異常:\nパラメータ:\n nf_name: {nf_name}")
+            raise ValueError("nf_name: None is not allowed value.")
+        self.nf_name = nf_name
+        self.client = paramiko.SSHClient()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.shell: paramiko.Channel = None
+        self.prompt: str = None
+        self.is_config_mode = False
+        self.transcript = new_transcript(nf_name)
+        LOGGER.output_1st_log("I00202", nf_name)
+
+    async def connect(self) -> None:
+        """connect SSH接続開始
+
+        SSH接続を開始します
+
+        Raises:
+            KeyError: CONN_CONFから値の取得に失敗した場合
+            SSHConnectException: SSH接続に失敗した場合
+        """
+        LOGGER.output_1st_log("I00206", self.nf_name)
+
+        # 踏み台への接続・チャネル開設を伴うため、接続パラメータの取得もExecutorで実行する
+        with TRACER.span("nf.connect", nf_name=self.nf_name) as span:
+            (ipaddr, password, passphrase, paramiko_args) = await self._run_blocking(get_connect_params, self.nf_name)
+
+            try:
+                await self._run_blocking(self._open_shell, ipaddr, password, passphrase, paramiko_args)
+                # ログインプロンプトまで読み飛しプロンプトを取得
+                _ = await self._read_first()
+            except Exception as e:
+                LOGGER.output_1st_log("E00203", self.nf_name)
+                LOGGER.output_2nd_log(Level.CRITICAL, f"SSH接続異常:\nパラメータ:\n nf_name: {self.nf_name}\n hostname: {ipaddr}\n password: ************\n passphrase: ************\n kwargs: {paramiko_args}\n Trace: {e.__class__.__name__} {e}")
+                await self.close()
+                raise SSHConnectException(str(e))
+            span.set_status(True)
+
+        LOGGER.output_1st_log("I00207", self.nf_name)
+
+    async def close(self) -> None:
+        """close SSH切断処理
+        """
+        LOGGER.output_1st_log("I00211", self.nf_name)
+        if self._is_shell_enable():
+            # shellをクローズ
+            self.shell.close()
+        # clientをクローズ
+        self.client.close()
+        self.transcript.close()
+
+        LOGGER.output_1st_log("I00212", self.nf_name)
+
+    async def enter_config_mode(self) -> None:
+        """config_mode 設定モード移行
+
+        設定モードに移行する
+        設定モードではプロンプトが変わるため、プロンプト情報を更新する
+
+        """
+        # シェル利用不可の為
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00216", self.nf_name)
+            return None
+        # 設定モード中の為
+        if self.is_config_mode:
+            LOGGER.output_1st_log("I00226", self.nf_name)
+            return None
+
+        LOGGER.output_1st_log("I00217", self.nf_name)
+        with TRACER.span("nf.enter_config_mode", nf_name=self.nf_name) as span:
+            self.shell.send("config\n")
+            await self._read_first(command="config")
+            span.set_status(True)
+        self.is_config_mode = True
+        LOGGER.output_1st_log("I00218", self.nf_name)
+
+    async def exit_config_mode(self, forced=False) -> None:
+        """config_mode 設定モード解除
+
+        設定モードを解除する
+        解除後はプロンプトが変わるため、プロンプト情報を更新する
+
+        Args:
+            forced (bool, optional): 設定モードの強制終了
+        """
+        # シェル利用不可の為
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00216", self.nf_name)
+            return None
+        # 設定モード外の為
+        if not self.is_config_mode:
+            LOGGER.output_1st_log("I00227", self.nf_name)
+            return None
+
+        if forced:
+            await self.abort()
+        else:
+            LOGGER.output_1st_log("I00219", self.nf_name)
+            self.shell.send("end\n")
+            await self._read_first(command="end")
+            self.is_config_mode = False
+            LOGGER.output_1st_log("I00220", self.nf_name)
+
+    async def abort(self) -> None:
+        """config_mode 設定モード強制終了(元に戻す)
+
+        設定モードを強制終了する
+        強制終了すると、設定中の情報を反映せずに元に戻すことができる
+
+        """
+        # シェル利用不可の為
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00216", self.nf_name)
+            return None
+        # 設定モード外の為
+        if not self.is_config_mode:
+            LOGGER.output_1st_log("I00227", self.nf_name)
+            return None
+
+        LOGGER.output_1st_log("I00221", self.nf_name)
+        self.shell.send("abort\n")
+        await self._read_first(command="abort")
+        self.is_config_mode = False
+        LOGGER.output_1st_log("I00222", self.nf_name)
+
+    async def command(self, command: str, timeout: float = 15.0) -> bytes:
+        """command コマンド投入
+
+        E///装置に対してコマンドを投入します
+
+        Args:
+            command (str): 投入コマンド
+            timeout (float, optional): タイムアウト. Defaults to 15.0.
+
+        Raises:
+            SocketTimeoutException: タイムアウトが発生した場合
+
+        Returns:
+            bytes: 受信データ
+        """
+        LOGGER.output_1st_log("I00208", self.nf_name)
+        # shellが利用不可能な場合
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00216", self.nf_name)
+            return b""
+        LOGGER.output_1st_log("I00209", command)
+        with TRACER.span("nf.command", nf_name=self.nf_name, command=command, timeout=timeout) as span:
+            self.shell.send(f"{command}\n")
+            span.set_attribute("bytes_sent", len(command) + 1)
+            result = await self._with_deadline(self._read(command), timeout, command)
+            span.set_attribute("bytes_received", len(result))
+            span.set_status(True)
+
+        LOGGER.output_1st_log("I00210", self.nf_name)
+        return result
+
+    async def _read(self, command: str = None) -> bytes:
+        """_read データ受信
+
+        invoke_shellで投入したコマンド結果を受信します
+        プロンプトを受信するまで、チャネルが受信可能になるのを待ち合わせて読み込みます
+        受信データはセッション記録に保存し、ログには記録の参照と先頭部分のみを出力します
+        受信データは投入コマンドおよびプロンプトが前後1行ずつ付与されるため、削除します
+
+        Args:
+            command (str, optional): 投入コマンド(セッション記録の見出し). Defaults to None.
+
+        Raises:
+            EOFError: 受信途中でチャネルが閉じられた場合
+
+        Returns:
+            bytes: 受信データ
+        """
+        LOGGER.output_1st_log("I00213")
+        buffer = ReceiveBuffer()
+        # shellが利用不可能な場合
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00215")
+            return b""
+        # プロンプトを受信するまでループ
+        while True:
+            while self.shell.recv_ready():
+                buffer.extend(self.shell.recv(READ_SIZE))
+            # プロンプト判定は最終行のみを対象とする
+            if len(buffer) != 0 and self.prompt == self._get_prompt(buffer.last_line()):
+                break
+            await self._wait_readable()
+        ref = self.transcript.record(command, buffer.data)
+        LOGGER.output_2nd_log(Level.DEBUG, Lazy("RAW data: {}".format, ref))
+
+        LOGGER.output_1st_log("I00215")
+        # 1行目に投入コマンド、最終行にプロンプトが表示されるため、削除
+        return buffer.body()
+
+    async def _read_first(self, timeout: float = FIRST_READ_TIMEOUT, command: str = "login") -> None:
+        """_read_first 初回読み込み
+
+        ログイン時にプロンプトを取得する必要があるため、個別の読込関数を準備する
+        設定モードの移行・解除においてもプロンプトが変化するため本関数を利用する
+        最終行がプロンプトであれば即座に、そうでなければ受信が途切れた時点で読込完了とする(PromptDetector参照)
+        受信データ(ログインバナーなど)はセッション記録に保存する
+
+        Args:
+            timeout (float, optional): タイムアウト. Defaults to FIRST_READ_TIMEOUT.
+            command (str, optional): 投入コマンド(セッション記録の見出し). Defaults to "login".
+
+        Raises:
+            SocketTimeoutException: タイムアウトが発生した場合
+        """
+        LOGGER.output_1st_log("I00223")
+        if not self._is_shell_enable():
+            LOGGER.output_1st_log("I00216", self.nf_name)
+            return None
+        detector = PromptDetector(self.nf_name)
+        with TRACER.span("nf.read_first", nf_name=self.nf_name, command=command, timeout=timeout) as span:
+            buffer = await self._with_deadline(self._read_until_quiet(detector), timeout, None)
+            span.set_attribute("bytes_received", len(buffer))
+            span.set_status(True)
+
+        # 最終行のプロンプトを取得
+        self.prompt = self._get_prompt(buffer.last_line())
+        detector.learn(self.prompt)
+        LOGGER.output_1st_log("I00224", self.prompt)
+        LOGGER.output_1st_log("I00225", self.transcript.record(command, buffer.data))
+
+    async def _read_until_quiet(self, detector: PromptDetector) -> ReceiveBuffer:
+        """_read_until_quiet プロンプトを受信するか、受信が途切れるまで受信する
+
+        Args:
+            detector (PromptDetector): 受信完了判定
+
+        Returns:
+            ReceiveBuffer: 受信データ
+        """
+        buffer = ReceiveBuffer()
+        # 受信待ち状態になるまで待つ
+        await self._wait_readable()
+
+        # プロンプトを受信するか、受信が途切れるまで受信する
+        while True:
+            while self.shell.recv_ready():
+                buffer.extend(self.shell.recv(1024 * 32))
+            if detector.is_prompt(buffer) or not await self._wait_readable(detector.quiet):
+                return buffer
+
+    async def _with_deadline(self, receiver: Awaitable, timeout: float, command: str) -> Any:
+        """_with_deadline 受信処理をタイムアウト付きで待ち合わせる
+
+        Args:
+            receiver (Awaitable): 受信処理
+            timeout (float): タイムアウト
+            command (str): 投入コマンド(ログ出力用)
+
+        Raises:
+            SocketTimeoutException: タイムアウトが発生した場合
+
+        Returns:
+            Any: 受信処理の戻り値
+        """
+        try:
+            return await asyncio.wait_for(receiver, timeout)
+        except asyncio.TimeoutError as e:
+            LOGGER.output_1st_log("E00204", self.nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"コマンド投入タイムアウト発生:\nパラメータ:\n nf_name: {self.nf_name}\n command: {command}\n timeout: {timeout}\n Trace: {e.__class__.__name__} {e}")
+            raise SocketTimeoutException(f"timed out after {timeout} seconds")
+
+    async def _wait_readable(self, timeout: float = None) -> bool:
+        """_wait_readable 受信可能待ち
+
+        チャネルのファイルディスクリプタをイベントループに登録し、受信可能になるまで待ち合わせます
+
+        Args:
+            timeout (float, optional): 待ち合わせ時間(秒)。Noneの場合は無期限. Defaults to None.
+
+        Raises:
+            EOFError: 受信データがない状態でチャネルが閉じられた場合
+
+        Returns:
+            bool: 受信可能になった場合True、タイムアウトした場合False
+        """
+        if self.shell.recv_ready():
+            return True
+        if self.shell.closed or self.shell.eof_received:
+            raise EOFError(f"channel closed. nf_name: {self.nf_name}")
+
+        loop = asyncio.get_running_loop()
+        fd = self.shell.fileno()
+        ready = loop.create_future()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(True))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+        if not self.shell.recv_ready() and (self.shell.closed or self.shell.eof_received):
+            raise EOFError(f"channel closed. nf_name: {self.nf_name}")
+        return True
+
+    def _open_shell(self, ipaddr: str, password: str, passphrase: str, paramiko_args: dict) -> None:
+        """_open_shell SSH接続とシェル生成(ブロッキング処理)
+
+        Args:
+            ipaddr (str): 接続先IPアドレス
+            password (str): パスワード
+            passphrase (str): パスフレーズ
+            paramiko_args (dict): paramiko連携キーワード引数
+        """
+        self.client.connect(ipaddr, password=password, passphrase=passphrase, **paramiko_args)
+        self.shell = self.client.invoke_shell()
+
+    async def _run_blocking(self, func: Callable, *args) -> Any:
+        """_run_blocking ブロッキング処理をイベントループの既定Executorで実行する
+
+        実行中のスパンを親とするため、呼び出し元のコンテキストで実行する
+
+        Args:
+            func (Callable): 実行関数
+
+        Returns:
+            Any: 関数の戻り値
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(contextvars.copy_context().run, func, *args))
+
+    def _get_prompt(self, buffer: bytes) -> str:
+        """_get_prompt プロンプトを取得する
+
+        Args:
+            buffer (bytes): 受信メッセージ
+
+        Returns:
+            str: プロンプト文字列
+        """
+        return decode_prompt(buffer)
+
+    def _is_shell_enable(self) -> bool:
+        """_is_shell_enable シェル状態確認
+
+         invoke shell有効・無効を確認する
+
+        Returns:
+            bool: invoke shellが有効ならTrue、無効ならFalse
+        """
+        return not (self.shell is None or self.shell.closed)
+
+
+class AsyncClientAdapter(object):
+    """AsyncClientAdapter 同期クライアントのasyncio版アダプタ
+
+    NFStubShellClientなど同期APIのクライアントを、AsyncNFShellClientと同じコルーチンAPIで利用するためのアダプタ
+    同期クライアントの各処理はイベントループの既定Executorで実行する
+    """
+
+    def __init__(self, client: Any) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            client (Any): 同期クライアント
+        """
+        self.client = client
+
+    @property
+    def nf_name(self) -> str:
+        """NF名
+
+        Returns:
+            str: NF名
+        """
+        return self.client.nf_name
+
+    async def connect(self) -> None:
+        """connect SSH接続開始
+        """
+        await self._run(self.client.connect)
+
+    async def close(self) -> None:
+        """close SSH切断処理
+        """
+        await self._run(self.client.close)
+
+    async def enter_config_mode(self) -> None:
+        """config_mode 設定モード移行
+        """
+        await self._run(self.client.enter_config_mode)
+
+    async def exit_config_mode(self, forced=False) -> None:
+        """config_mode 設定モード解除
+        """
+        await self._run(self.client.exit_config_mode, forced)
+
+    async def abort(self) -> None:
+        """config_mode 設定モード強制終了(元に戻す)
+        """
+        await self._run(self.client.abort)
+
+    async def command(self, command: str, timeout: float = 15.0) -> bytes:
+        """command コマンド投入
+        """
+        return await self._run(self.client.command, command, timeout)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """_run 同期クライアントの処理を既定Executorで呼び出し元のコンテキストで実行する
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(contextvars.copy_context().run, func, *args))
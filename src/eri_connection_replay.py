@@ -0,0 +1,339 @@
+import base64
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import paramiko
+from xgnlog.Log import Log
+
+from src.eri_connection import FIRST_READ_TIMEOUT, NFShellClient, ReceiveBuffer, decode_prompt
+
+# 定数宣言
+# 共通ロガー
+JOB_ID = "T23AJ002"
+LOGGER = Log(JOB_ID)
+
+# セッション記録ファイルの形式バージョン
+RECORDING_VERSION = 1
+# ログイン時の受信データを示すコマンド名
+LOGIN = "login"
+
+
+class ReplayMismatchException(Exception):
+    """ReplayMismatchException 再生対象のセッション記録に投入コマンドがない場合のエラー
+    """
+    pass
+
+
+class SessionRecorder(object):
+    """SessionRecorder NFセッションの記録
+
+    投入コマンド毎に、受信データのチャンクと投入からの経過時間、受信後のプロンプトを記録する
+    記録形式:
+        {"version": RECORDING_VERSION, "nf_name": NF名, "recorded_at": 記録開始日時,
+         "exchanges": [{"command": 投入コマンド(ログイン時はLOGIN), "prompt": 受信後のプロンプト,
+                        "chunks": [[投入からの経過時間(秒), 受信データ(base64)], ...]}, ...]}
+    """
+
+    def __init__(self, nf_name: str) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+        """
+        self.nf_name = nf_name
+        self.recorded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.exchanges: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._started = 0.0
+
+    def begin(self, command: str) -> None:
+        """begin 投入コマンドの記録開始
+
+        Args:
+            command (str): 投入コマンド
+        """
+        self._current = {"command": command, "prompt": None, "chunks": []}
+        self.exchanges.append(self._current)
+        self._started = time.monotonic()
+
+    def chunk(self, data: bytes) -> None:
+        """chunk 受信データの記録
+
+        Args:
+            data (bytes): 受信データ
+        """
+        if self._current is None:
+            self.begin(LOGIN)
+        offset = round(time.monotonic() - self._started, 6)
+        self._current["chunks"].append([offset, base64.b64encode(data).decode("ascii")])
+
+    def finish(self, prompt: str) -> None:
+        """finish 投入コマンドの記録終了
+
+        Args:
+            prompt (str): 受信後のプロンプト
+        """
+        if self._current is not None:
+            self._current["prompt"] = prompt
+        self._current = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """to_dict 記録内容を取得
+
+        Returns:
+            Dict[str, Any]: 記録内容
+        """
+        return {"version": RECORDING_VERSION, "nf_name": self.nf_name, "recorded_at": self.recorded_at,
+                "exchanges": self.exchanges}
+
+    def save(self, path: Path) -> None:
+        """save セッション記録ファイルに保存
+
+        Args:
+            path (Path): セッション記録ファイルのパス
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+
+class _RecordingChannel(object):
+    """_RecordingChannel 送受信を記録するチャネル
+
+    送信をコマンド投入、受信を受信データとしてSessionRecorderに記録し、それ以外の操作はチャネルに委譲する
+    """
+
+    def __init__(self, channel: paramiko.Channel, recorder: SessionRecorder) -> None:
+        self._channel = channel
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._channel, name)
+
+    def fileno(self) -> int:
+        return self._channel.fileno()
+
+    def send(self, data: Union[str, bytes]) -> int:
+        command = data.decode("utf-8") if isinstance(data, bytes) else data
+        self._recorder.begin(command.rstrip("\n"))
+        return self._channel.send(data)
+
+    def recv(self, nbytes: int) -> bytes:
+        data = self._channel.recv(nbytes)
+        self._recorder.chunk(data)
+        return data
+
+
+class RecordingNFShellClient(NFShellClient):
+    """RecordingNFShellClient セッションを記録するE/// NFShell接続クラス
+
+    NFShellClientと同じ処理を行い、投入コマンド・受信データ(チャンク毎の受信時間)・プロンプトを記録する
+    切断時に記録内容をセッション記録ファイルに保存する(ReplayShellClientで再生できる)
+    """
+
+    def __init__(self, nf_name: str, path: Path) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+            path (Path): セッション記録ファイルのパス
+        """
+        super().__init__(nf_name)
+        self.recorder = SessionRecorder(nf_name)
+        self.recording_path = Path(path)
+
+    def close(self) -> None:
+        """close SSH切断処理
+
+        切断後、記録内容をセッション記録ファイルに保存する
+        """
+        super().close()
+        if self.recorder.exchanges:
+            self.recorder.save(self.recording_path)
+
+    def _read(self, timeout: float = None, command: str = None) -> bytes:
+        self._record_channel()
+        try:
+            return super()._read(timeout, command)
+        finally:
+            self.recorder.finish(self.prompt)
+
+    def _read_first(self, timeout: float = FIRST_READ_TIMEOUT, command: str = LOGIN) -> None:
+        if not isinstance(self.shell, _RecordingChannel) and self.shell is not None:
+            # ログイン時は送信がないため、受信開始時点から記録する
+            self.recorder.begin(command)
+        self._record_channel()
+        try:
+            return super()._read_first(timeout, command)
+        finally:
+            self.recorder.finish(self.prompt)
+
+    def _record_channel(self) -> None:
+        """_record_channel 以降の送受信を記録するようチャネルを置き換える
+        """
+        if self.shell is not None and not isinstance(self.shell, _RecordingChannel):
+            self.shell = _RecordingChannel(self.shell, self.recorder)
+
+
+def load_recording(path: Path) -> Dict[str, Any]:
+    """load_recording セッション記録ファイル読み込み
+
+    Args:
+        path (Path): セッション記録ファイルのパス
+
+    Raises:
+        ValueError: 形式バージョンが異なる場合
+
+    Returns:
+        Dict[str, Any]: 記録内容
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        recording = json.load(f)
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"unsupported recording version: {recording.get('version')} (expected {RECORDING_VERSION}) [{path}]")
+    return recording
+
+
+class ReplayShellClient(object):
+    """ReplayShellClient セッション記録を再生する接続クラス
+
+    NFShellClientと同じAPIで、RecordingNFShellClientが記録した受信データを再生する
+    投入コマンドは記録の未再生部分から先頭一致するものを再生し、
+    未再生部分にない場合(状態確認の繰り返しなど)は最後に再生した同じコマンドを再度再生する
+    受信データはチャンク毎の受信時間をtime_scale倍して待ち合わせてから返す(0の場合は待ち合わせない)
+    """
+
+    def __init__(self, nf_name: str, recording: Union[Path, Dict[str, Any]], time_scale: float = 1.0) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+            recording (Path | Dict[str, Any]): セッション記録ファイルのパスまたは記録内容
+            time_scale (float, optional): 受信時間の倍率. Defaults to 1.0.
+        """
+        LOGGER.output_1st_log("I00201", nf_name)
+        self.nf_name = nf_name
+        self.recording = recording if isinstance(recording, dict) else load_recording(recording)
+        self.time_scale = time_scale
+        self.prompt: str = None
+        self.is_config_mode = False
+        self._cursor = 0
+        LOGGER.output_1st_log("I00202", nf_name)
+
+    def connect(self) -> None:
+        """connect 接続開始(ログイン時の受信データを再生)
+        """
+        LOGGER.output_1st_log("I00206", self.nf_name)
+        self._play(LOGIN)
+        LOGGER.output_1st_log("I00207", self.nf_name)
+
+    def close(self) -> None:
+        """close 切断処理
+        """
+        LOGGER.output_1st_log("I00211", self.nf_name)
+        LOGGER.output_1st_log("I00212", self.nf_name)
+
+    def enter_config_mode(self) -> None:
+        """enter_config_mode 設定モード移行
+        """
+        if self.is_config_mode:
+            LOGGER.output_1st_log("I00226", self.nf_name)
+            return None
+        LOGGER.output_1st_log("I00217", self.nf_name)
+        self._play("config")
+        self.is_config_mode = True
+        LOGGER.output_1st_log("I00218", self.nf_name)
+
+    def exit_config_mode(self, forced=False) -> None:
+        """exit_config_mode 設定モード解除
+
+        Args:
+            forced (bool, optional): 設定モードの強制終了
+        """
+        if not self.is_config_mode:
+            LOGGER.output_1st_log("I00227", self.nf_name)
+            return None
+        if forced:
+            self.abort()
+        else:
+            LOGGER.output_1st_log("I00219", self.nf_name)
+            self._play("end")
+            self.is_config_mode = False
+            LOGGER.output_1st_log("I00220", self.nf_name)
+
+    def abort(self) -> None:
+        """abort 設定モード強制終了
+        """
+        if not self.is_config_mode:
+            LOGGER.output_1st_log("I00227", self.nf_name)
+            return None
+        LOGGER.output_1st_log("I00221", self.nf_name)
+        self._play("abort")
+        self.is_config_mode = False
+        LOGGER.output_1st_log("I00222", self.nf_name)
+
+    def command(self, command: str, timeout: float = 15.0) -> bytes:
+        """command コマンド投入
+
+        Args:
+            command (str): 投入コマンド
+            timeout (float, optional): タイムアウト(再生では利用しない). Defaults to 15.0.
+
+        Raises:
+            ReplayMismatchException: セッション記録に投入コマンドがない場合
+
+        Returns:
+            bytes: 受信データ(投入コマンド・プロンプトを除く)
+        """
+        LOGGER.output_1st_log("I00208", self.nf_name)
+        LOGGER.output_1st_log("I00209", command)
+        result = self._play(command).body()
+        LOGGER.output_1st_log("I00210", self.nf_name)
+        return result
+
+    def _play(self, command: str) -> ReceiveBuffer:
+        """_play 投入コマンドの受信データを再生する
+
+        Args:
+            command (str): 投入コマンド
+
+        Raises:
+            ReplayMismatchException: セッション記録に投入コマンドがない場合
+
+        Returns:
+            ReceiveBuffer: 受信データ
+        """
+        exchange = self._next_exchange(command)
+        buffer = ReceiveBuffer()
+        elapsed = 0.0
+        for (offset, data) in exchange["chunks"]:
+            if self.time_scale > 0 and offset > elapsed:
+                time.sleep((offset - elapsed) * self.time_scale)
+            elapsed = max(elapsed, offset)
+            buffer.extend(base64.b64decode(data))
+        self.prompt = exchange["prompt"] or decode_prompt(buffer.last_line())
+        return buffer
+
+    def _next_exchange(self, command: str) -> Dict[str, Any]:
+        """_next_exchange 再生する記録を取得する
+
+        Args:
+            command (str): 投入コマンド
+
+        Raises:
+            ReplayMismatchException: セッション記録に投入コマンドがない場合
+
+        Returns:
+            Dict[str, Any]: 再生する記録
+        """
+        exchanges = self.recording["exchanges"]
+        for index in range(self._cursor, len(exchanges)):
+            if exchanges[index]["command"] == command:
+                self._cursor = index + 1
+                return exchanges[index]
+        for index in reversed(range(self._cursor)):
+            if exchanges[index]["command"] == command:
+                return exchanges[index]
+        raise ReplayMismatchException(f"command is not in the recording. nf_name: {self.nf_name}, command: {command}")
@@ -1,25 +1,67 @@
-import json
 from pathlib import Path
 import re
-import time
+from typing import Any, Dict, Optional, Tuple
 import paramiko
 
 from xgnlog.Log import Log
 
 from src.abc_process import Mode
+from src.config_store import CONFIG_STORE, validate_stub
+from src.vclock import SYSTEM_CLOCK
 
 # ツールローカル設定ディレクトリ
 LOCAL_CONFIG_DIR = Path(__file__).resolve().parent.parent.joinpath("config")
 
 TOOL_CONF = LOCAL_CONFIG_DIR.joinpath("stub.json")
 
-with open(TOOL_CONF, "r", encoding="utf-8") as f:
-    stub_dict = json.load(f)
+# スタブ定義読込(共通設定ストアのreloadで変更が反映される)
+stub_dict = CONFIG_STORE.get(TOOL_CONF, validate_stub)
 
 JOB_ID = "T23AJ002"
 LOGGER = Log(JOB_ID)
 
 
+class StubDispatcher(object):
+    """StubDispatcher スタブ応答の検索
+
+    スタブ定義の全コマンドパターンを定義順の選択肢として1つの正規表現にコンパイルし、
+    1回の照合で最初に一致する定義を返す(定義毎にre.matchを行う場合と同じ結果となる)
+    """
+
+    def __init__(self, table: Dict[str, Dict[str, Any]]) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            table (Dict[str, Dict[str, Any]]): スタブ定義
+        """
+        self.load(table)
+
+    def load(self, table: Dict[str, Dict[str, Any]]) -> None:
+        """load スタブ定義をコンパイルする
+
+        Args:
+            table (Dict[str, Dict[str, Any]]): スタブ定義
+        """
+        self.entries = list(table.items())
+        self.pattern = re.compile("|".join(f"(?P<_{i}>{value['command']})" for (i, (_, value)) in enumerate(self.entries)))
+
+    def match(self, command: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """match 投入コマンドに一致するスタブ定義を取得
+
+        Args:
+            command (str): 投入コマンド
+
+        Returns:
+            Optional[Tuple[str, Dict[str, Any]]]: (定義名, 定義内容)。一致しない場合はNone
+        """
+        m = self.pattern.match(command)
+        return self.entries[int(m.lastgroup[1:])] if m else None
+
+
+STUB_DISPATCHER = StubDispatcher(stub_dict)
+CONFIG_STORE.add_listener(TOOL_CONF, STUB_DISPATCHER.load)
+
+
 def get_sock(proxy_command: str, hostname: str, port: int = 22) -> paramiko.ProxyCommand:
     """
     """
@@ -32,8 +74,12 @@ class NFStubShellClient(paramiko.SSHClient):
     """
     """
 
-    def __init__(self, mode: Mode, nf_name: str = None) -> None:
+    def __init__(self, mode: Mode, nf_name: str = None, clock: Any = None) -> None:
         """
+        Args:
+            mode (Mode): 実行モード
+            nf_name (str, optional): NFノード名. Defaults to None.
+            clock (Any, optional): 待ち合わせに利用する時計(VirtualClockの場合は実際には待たない). Defaults to SYSTEM_CLOCK.
         """
         LOGGER.output_1st_log("I00201")
         self.client = object
@@ -41,6 +87,7 @@ class NFStubShellClient(paramiko.SSHClient):
         self.flags = []
         self.mode = mode
         self.nf_name = nf_name
+        self.clock = clock or SYSTEM_CLOCK
         self.blocked_nfs = []
         LOGGER.output_1st_log("I00202")
 
@@ -49,7 +96,7 @@ class NFStubShellClient(paramiko.SSHClient):
         """
         LOGGER.output_1st_log("I00206", self.nf_name)
         try:
-            time.sleep(1)
+            self.clock.sleep(1)
             # ログインプロンプトを読み飛ばす
             if self.nf_name in self.blocked_nfs:
                 raise Exception()
@@ -63,23 +110,23 @@ class NFStubShellClient(paramiko.SSHClient):
         """
         LOGGER.output_1st_log("I00208", self.nf_name)
         # shellが利用不可能な場合
-        time.sleep(0)
+        self.clock.sleep(0)
         LOGGER.output_1st_log("I00209", command)
         LOGGER.output_1st_log("I00213")
 
         reply = "error".encode()
-        for key, value in stub_dict.items():
-            if re.match(str(value["command"]), command):
-                if key in self.flags:
-                    before_after = "after"
-                else:
-                    before_after = "before"
-                reply = str(value["reply"][self.mode.value][before_after]).encode()
-                flag = value.get("flag", None)
-                if flag:
-                    self.flags.append(flag)
-                time.sleep(value["wait"])
-                break
+        matched = STUB_DISPATCHER.match(command)
+        if matched:
+            (key, value) = matched
+            if key in self.flags:
+                before_after = "after"
+            else:
+                before_after = "before"
+            reply = str(value["reply"][self.mode.value][before_after]).encode()
+            flag = value.get("flag", None)
+            if flag:
+                self.flags.append(flag)
+            self.clock.sleep(value["wait"])
 
         LOGGER.output_1st_log("I00215")
         LOGGER.output_1st_log("I00210", self.nf_name)
@@ -95,7 +142,7 @@ class NFStubShellClient(paramiko.SSHClient):
         """
         """
         LOGGER.output_1st_log("I00217", self.nf_name)
-        time.sleep(0.1)
+        self.clock.sleep(0.1)
         LOGGER.output_1st_log("I00218", self.nf_name)
 
     def exit_config_mode(self, forced=False) -> None:
@@ -105,12 +152,12 @@ class NFStubShellClient(paramiko.SSHClient):
             self.abort()
         else:
             LOGGER.output_1st_log("I00219", self.nf_name)
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
             LOGGER.output_1st_log("I00220", self.nf_name)
 
     def abort(self) -> None:
         """
         """
         LOGGER.output_1st_log("I00221", self.nf_name)
-        time.sleep(0.1)
+        self.clock.sleep(0.1)
         LOGGER.output_1st_log("I00222", self.nf_name)
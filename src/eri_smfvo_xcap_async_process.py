@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, List
+
+from src.abc_eri_process import ClientCall, ProcessCall, Steps
+from src.abc_process import Mode, ProcessStatus
+from src.eri_connection_async import AsyncClientAdapter, AsyncNFShellClient
+from src.eri_connection_stub import NFStubShellClient as StubClient
+from src.eri_smfvo_xcap_process import CONVERGE_TIMEOUT, XCAP_PARSER, EriSmfvoXCAPProcess
+from src.metrics import PHASES
+from src.tracing import TRACER
+
+
+class AsyncEriSmfvoXCAPProcess(EriSmfvoXCAPProcess):
+    """Ericsson SMF xCAPIP更新プロセスクラス(asyncio版)
+
+    EriSmfvoXCAPProcessと同じ処理ステップを、AsyncNFShellClientを用いたコルーチンとして実行する
+    1つのイベントループで複数NFのプロセスを並行して実行できる
+
+    コマンド投入順序・結果判定・エラー処理はEriSmfvoXCAPProcessの処理ステップをそのまま利用し、
+    本クラスは処理ステップが要求するI/O処理の待ち合わせのみを行う
+    """
+
+    def __init__(self,
+                 edns_name: str,
+                 nf_name: str,
+                 mode: Mode,
+                 edns_ipaddr: str,
+                 ipaddr_list: List[str],
+                 stub: bool,
+                 job_id: str = None,
+                 client: Any = None,
+                 converge_timeout: float = CONVERGE_TIMEOUT,
+                 clock: Any = None,
+                 xcap_parser: str = XCAP_PARSER):
+        """コンストラクタ
+
+        Args:
+            edns_name (str): eDNSホスト名
+            nf_name (str): SMFv NF名
+            mode (Mode): 実行モード
+            edns_ipaddr (str): eDNSホストのIPアドレス
+            ipaddr_list (List[str]): SMFvが設定可能なIPアドレスリスト
+            stub (bool): スタブモード
+            job_id (str, optional): JOB ID. Defaults to None.
+            client (Any, optional): 接続クライアント(コルーチンAPI). Defaults to None.
+            converge_timeout (float, optional): 設定変更後、変更反映を待つ上限時間(秒). Defaults to CONVERGE_TIMEOUT.
+            clock (Any, optional): 待ち合わせ・経過時間計測に利用する時計. Defaults to SYSTEM_CLOCK.
+            xcap_parser (str, optional): xCAP設定の解析方式(XCAP_PARSERSのキー). Defaults to XCAP_PARSER.
+        """
+        if client is None:
+            client = AsyncClientAdapter(StubClient(mode, nf_name, clock)) if stub else AsyncNFShellClient(nf_name)
+        super().__init__(edns_name, nf_name, mode, edns_ipaddr, ipaddr_list, stub, job_id, client, converge_timeout, clock, xcap_parser)
+
+    async def run_async(self) -> ProcessStatus:
+        """NFに対してxCAP IPアドレスの現状確認・変更処理をコルーチンとして実行する
+
+        Returns:
+            ProcessStatus: プロセスの完了ステータス
+        """
+        with TRACER.span("process.run", nf_name=self.nf_name, mode=self.mode.name) as span:
+            status: ProcessStatus = await self._drive_async(self._run_steps())
+            span.set_attribute("status", status.name)
+            span.set_status(not (status & ProcessStatus.ng), status.name)
+        return status
+
+    async def _drive_async(self, steps: Steps) -> Any:
+        """処理ステップを非同期実行する
+
+        処理ステップが要求したI/O処理を待ち合わせて結果(例外発生時は例外)を処理ステップに返し、
+        処理ステップの戻り値を返す
+        プロセスの他処理の呼び出しは、同名メソッドではなく対応する処理ステップを非同期実行する
+
+        Args:
+            steps (Steps): 処理ステップ
+
+        Returns:
+            Any: 処理ステップの戻り値
+        """
+        (result, error) = (None, None)
+        while True:
+            try:
+                call = steps.send(result) if error is None else steps.throw(error)
+            except StopIteration as e:
+                return e.value
+            (result, error) = (None, None)
+            try:
+                if isinstance(call, ClientCall):
+                    result = await getattr(self.client, call.name)(*call.args)
+                elif isinstance(call, ProcessCall):
+                    result = await self._timed_async(call.name, self._drive_async(getattr(self, f"_{call.name}_steps")(*call.args)))
+                elif self.clock.virtual:
+                    # 仮想時計の場合は仮想時刻のみ進め、他NFの処理に切り替える
+                    self.clock.sleep(call.seconds)
+                    await asyncio.sleep(0)
+                else:
+                    # 待ち合わせ中もイベントループは他NFの処理を継続する
+                    await asyncio.sleep(call.seconds)
+            except BaseException as e:
+                error = e
+
+    async def _timed_async(self, phase: str, coro: Any) -> Any:
+        """コルーチンを待ち合わせ、計測対象のフェーズの場合は所要時間を記録してスパンを出力する
+
+        Args:
+            phase (str): フェーズ名
+            coro (Any): コルーチン
+
+        Returns:
+            Any: コルーチンの戻り値
+        """
+        if phase not in PHASES:
+            return await coro
+        start = self.clock.monotonic()
+        try:
+            with TRACER.span(f"process.{phase}", nf_name=self.nf_name):
+                return await coro
+        finally:
+            self.record_phase(phase, self.clock.monotonic() - start)
@@ -1,19 +1,59 @@
+import functools
 from pathlib import Path
-import time
-from typing import Any, Dict, List, Set
+import threading
+from typing import Any, Dict, List, Set, Tuple, Union
 
 from xgnlog.Log import Level
-from textfsm import TextFSM
 
-from src.abc_eri_process import AbcEricssonProcess
-from src.abc_process import Mode, ProcessStatus, SoutSeverity, TargetStatus, logtime
+from src.abc_eri_process import AbcEricssonProcess, ClientCall, ProcessCall, Steps, Wait
+from src.abc_process import CONVERGE_TIMEOUT, Mode, ProcessStatus, SoutSeverity, TargetStatus, logtime
 from src.eri_connection import SocketTimeoutException
+from src.tracing import TRACER
+from src.xcap_parser import XCAP_PARSER, XCAP_PARSER_NATIVE, XCAP_PARSER_TEXTFSM, parse_xcap
 
 # ツールローカル設定ディレクトリ
 LOCAL_CONFIG_DIR = Path(__file__).resolve().parent.parent.joinpath("config")
-# xCAPテンプレート
-with open(LOCAL_CONFIG_DIR.joinpath("xcap_template.textfsm"), "r") as f:
-    XCAP_TEMPLATE: TextFSM = TextFSM(f)
+# xCAPテンプレートファイル
+XCAP_TEMPLATE_FILE = LOCAL_CONFIG_DIR.joinpath("xcap_template.textfsm")
+# xCAPテンプレート排他ロック(TextFSMは解析状態を保持するため、並行実行時は排他する)
+XCAP_TEMPLATE_LOCK = threading.Lock()
+# 変更反映確認の初回ポーリング間隔(秒)、間隔の増加率、上限(秒)
+CONVERGE_INTERVAL = 0.25
+CONVERGE_BACKOFF = 2
+CONVERGE_INTERVAL_MAX = 2.0
+
+
+@functools.lru_cache(maxsize=None)
+def get_xcap_template() -> Any:
+    """get_xcap_template xCAPテンプレートを取得する
+
+    初回呼び出し時にtextfsmをインポートしてテンプレートファイルを読み込む(SSH接続しない実行モードでは読み込まない)
+
+    Returns:
+        TextFSM: xCAPテンプレート
+    """
+    from textfsm import TextFSM
+    with open(XCAP_TEMPLATE_FILE, "r") as f:
+        return TextFSM(f)
+
+
+def parse_xcap_template(result: str) -> List[Dict[str, Any]]:
+    """parse_xcap_template xCAP設定をxCAPテンプレートで解析する
+
+    Args:
+        result (str): xCAP設定
+
+    Returns:
+        List[Dict[str, Any]]: xCAP設定毎のipaddr・priority
+    """
+    with XCAP_TEMPLATE_LOCK:
+        template = get_xcap_template()
+        template.Reset()
+        return [dict(zip(template.header, pr)) for pr in template.ParseText(result)]
+
+
+# 解析方式毎のxCAP設定の解析関数
+XCAP_PARSERS = {XCAP_PARSER_NATIVE: parse_xcap, XCAP_PARSER_TEXTFSM: parse_xcap_template}
 
 
 class EriSmfvoXCAPProcess(AbcEricssonProcess):
@@ -28,36 +68,57 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
                  edns_name: str,
                  nf_name: str,
                  mode: Mode,
-                 edns_ipaddr: str,
+                 edns_ipaddr: Union[str, List[str]],
                  ipaddr_list: List[str],
                  stub: bool,
-                 job_id: str = None):
+                 job_id: str = None,
+                 client: Any = None,
+                 converge_timeout: float = CONVERGE_TIMEOUT,
+                 clock: Any = None,
+                 xcap_parser: str = XCAP_PARSER):
         """コンストラクタ
 
         Args:
             edns_name (str): eDNSホスト名
             nf_name (str): SMFv NF名
             mode (Mode): 実行モード
-            edns_ipaddr (str): eDNSホストのIPアドレス
+            edns_ipaddr (Union[str, List[str]]): eDNSホストのIPアドレス(複数eDNSを同時に切り替える場合はリスト)
             ipaddr_list (List[str]): SMFvが設定可能なIPアドレスリスト
             stub (bool): スタブモード
             job_id (str, optional): JOB ID. Defaults to None.
+            client (Any, optional): 接続クライアント. Defaults to None.
+            converge_timeout (float, optional): 設定変更後、変更反映を待つ上限時間(秒). Defaults to CONVERGE_TIMEOUT.
+            clock (Any, optional): 待ち合わせ・経過時間計測に利用する時計. Defaults to SYSTEM_CLOCK.
+            xcap_parser (str, optional): xCAP設定の解析方式(XCAP_PARSERSのキー). Defaults to XCAP_PARSER.
         """
-        super().__init__(edns_name, nf_name, mode, stub, job_id)
-        self.__edns_ipaddr = edns_ipaddr
+        super().__init__(edns_name, nf_name, mode, stub, job_id, client, clock)
+        self.parse_xcap = XCAP_PARSERS[xcap_parser]
+        self.__edns_ipaddrs: List[str] = [edns_ipaddr] if isinstance(edns_ipaddr, str) else list(edns_ipaddr)
         self.__add_ipaddr: str = None
         self.__priority: str = None
         self.__ipaddr_list = ipaddr_list
+        self.changes: List[Tuple[str, str, str]] = []
         self.status_result = None
+        self.converge_timeout = converge_timeout
+        self.converge_time: float = None
 
     @property
     def edns_ipaddr(self) -> str:
         """eDNS IPアドレスプロパティ
 
         Returns:
-            str: eDNS IPアドレス
+            str: eDNS IPアドレス(複数eDNSの場合は先頭)
         """
-        return self.__edns_ipaddr
+        return self.__edns_ipaddrs[0]
+
+    @property
+    def edns_ipaddrs(self) -> List[str]:
+        """eDNS IPアドレスリストプロパティ
+
+        Returns:
+            List[str]: 切り替え対象の全eDNS IPアドレス
+        """
+        return self.__edns_ipaddrs
 
     @property
     def add_ipaddr(self) -> str:
@@ -112,6 +173,46 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
             command = "show running-config epg pgw apn xcap ipv6-name-server"
         return command
 
+    def get_changes(self) -> List[Tuple[str, str, str]]:
+        """付け替え内容(削除IPアドレス, 追加IPアドレス, 優先度)のリストを取得する
+
+        単一eDNSの場合はeDNS IPアドレス・追加IPアドレス・優先度の1件、
+        複数eDNSの場合はNFに設定されている全eDNS IPアドレス分(parse_resultで解析)となる
+
+        Returns:
+            List[Tuple[str, str, str]]: 付け替え内容のリスト
+        """
+        if len(self.edns_ipaddrs) == 1:
+            return [(self.edns_ipaddr, self.add_ipaddr, self.priority)]
+        return self.changes
+
+    def get_change_commands(self, mode: Mode) -> List[str]:
+        """付け替え内容の全件について、xCAP IPアドレスを変更するコマンドを実行モードを元に取得
+
+        Args:
+            mode (Mode): 実行モード(削除はMode.down、追加はMode.up)
+
+        Returns:
+            List[str]: xCAP IPアドレスを変更するコマンドのリスト
+        """
+        if len(self.edns_ipaddrs) == 1:
+            return [self.get_command(mode)]
+        if mode == Mode.up:
+            return [f"epg pgw apn xcap ipv6-name-server {add_ipaddr} priority {priority}" for (_, add_ipaddr, priority) in self.changes]
+        return [f"no epg pgw apn xcap ipv6-name-server {edns_ipaddr}" for (edns_ipaddr, _, _) in self.changes]
+
+    def is_added(self, result: str) -> bool:
+        """取得したxCAP設定に全ての追加IPアドレスが設定されているか判定する
+
+        Args:
+            result (str): xCAP設定
+
+        Returns:
+            bool: 全ての追加IPアドレスが設定されている場合True
+        """
+        changes = self.get_changes()
+        return bool(changes) and all(add_ipaddr and result.lower().count(add_ipaddr) for (_, add_ipaddr, _) in changes)
+
     def get_status_word(self, value: TargetStatus) -> str:
         """対象のステータスからステータスを示す文字列取得
 
@@ -143,45 +244,7 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         Returns:
             TargetStatus: 削除IPアドレスがある場合up、ない場合down、例外発生ならNone
         """
-        self.logger.output_1st_log("I00321", self.nf_name)
-
-        try:
-            # 現状のステータス取得
-            command = self.get_command(Mode.show)
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
-
-            self.status_result = result
-
-            up_pattern = self.edns_ipaddr
-            # up_patternを含む場合はTargetStatus.up、無ければTargetStatus.down
-            status: TargetStatus = TargetStatus.up if result.lower().count(up_pattern.lower()) else TargetStatus.down
-        except SocketTimeoutException as e:
-            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00304", self.nf_name)
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr状態取得失敗:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return None
-
-        except Exception as e:
-            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00304", self.nf_name)
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr状態取得失敗:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return None
-
-        self.logger.output_1st_log("I00322", [self.nf_name, status])
-
-        return status
+        return self._drive(self._get_status_steps())
 
     def change_status(self) -> ProcessStatus:
         """対象ステータスの状態変更を実施
@@ -189,44 +252,7 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         Returns:
             ProcessStatus: 正常に状態変更が完了した場合はcommit_ok、保存失敗の場合はcommit_ng、変更失敗の場合はchange_ng
         """
-        self.logger.output_1st_log("I00323", self.nf_name)
-
-        # NF取得情報を解析
-        self.parse_result(self.status_result)
-
-        # 追加(予備)IPアドレスが存在しない場合
-        if not self.add_ipaddr:
-            # 追加(予備)IPアドレスがない旨を表示
-            self.sout_message(SoutSeverity.error,
-                              f"xcap ipaddr change was failed due to no reserved ipaddr. current status is"
-                              f" {self.get_status_word(self.before_status)}. [ {self.before_status} ]")
-            self.logger.output_1st_log("E00321", [self.nf_name, self.mode])
-
-            return ProcessStatus.change_ng
-
-        # 現在の設定を削除 & 追加(予備)IPアドレスへ付け替え
-        if not self.to_down() or not self.to_up():
-            # 何らかの異常が発生した場合、事前状態に戻す
-            self.do_abort()
-            # 設定を戻した旨、事前のステータスとともに表示
-            self.sout_message(SoutSeverity.error,
-                              f"xcap ipaddr change was failed. abort has done. current status is"
-                              f" {self.get_status_word(self.before_status)}. [ {self.before_status} ]")
-            self.logger.output_1st_log("E00321", [self.nf_name, self.mode])
-
-            return ProcessStatus.change_ng
-        elif not self.commit():
-            # commitで異常が発生した場合、事前状態に戻す
-            self.do_abort()
-            # 設定を戻した旨を表示
-            self.sout_message(SoutSeverity.error, "commit was failed. abort has done.")
-            self.logger.output_1st_log("E00322", [self.nf_name, self.mode])
-
-            return ProcessStatus.commit_ng
-        else:
-            self.logger.output_1st_log("I00324", self.nf_name)
-
-            return ProcessStatus.commit_ok
+        return self._drive(self._change_status_steps())
 
     def to_down(self) -> bool:
         """指定されたxCAP IPアドレスを無効(down)にするコマンドを投入。commit実行までは反映されない。
@@ -234,44 +260,7 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         Returns:
             bool: xCAP IPアドレスの無効化コマンドが投入できた場合True、例外発生ならFalse
         """
-        self.logger.output_1st_log("I00325", self.nf_name)
-
-        try:
-            command = None
-            # 設定変更モード開始
-            self.logger.output_1st_log("I00309", "config")
-            self.client.enter_config_mode()
-            self.logger.output_1st_log("I00310", None)
-
-            command = self.get_command(Mode.down)
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
-
-        except SocketTimeoutException as e:
-            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr削除変更異常:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return False
-
-        except Exception as e:
-            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr削除変更異常:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return False
-
-        self.logger.output_1st_log("I00326", [self.nf_name, self.mode, True])
-        return True
+        return self._drive(self._to_down_steps())
 
     def to_up(self) -> bool:
         """指定されたxCAP IPアドレスを有効(up)にするコマンドを投入。commit実行までは反映されない。
@@ -279,44 +268,18 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         Returns:
             bool: xCAP IPアドレスの有効化コマンドが投入できた場合True、例外発生ならFalse
         """
-        self.logger.output_1st_log("I00327", self.nf_name)
+        return self._drive(self._to_up_steps())
 
-        try:
-            command = None
-            # 設定変更モード開始
-            self.logger.output_1st_log("I00309", "config")
-            self.client.enter_config_mode()
-            self.logger.output_1st_log("I00310", None)
-
-            command = self.get_command(Mode.up)
-            self.logger.output_1st_log("I00309", command)
-            result = self.client.command(command).decode("utf-8")
-            self.logger.output_1st_log("I00310", result)
-
-        except SocketTimeoutException as e:
-            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr追加変更異常:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return False
+    def wait_converged(self) -> bool:
+        """設定変更の反映を待ち合わせる
 
-        except Exception as e:
-            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
-            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
-            self.logger.output_2nd_log(Level.CRITICAL,
-                                       f"xCAP ipaddr追加変更異常:\n"
-                                       "パラメータ:\n"
-                                       f" NF名: {self.nf_name}\n"
-                                       f" コマンド: {command}\n"
-                                       f" Trace: {e.__class__.__name__} {e}")
-            return False
+        xCAP設定を間隔を延ばしながらポーリングし、削除IPアドレスがなく追加IPアドレスがある状態になった時点で完了とする
+        反映までに要した時間はconverge_timeに保持する
 
-        self.logger.output_1st_log("I00328", [self.nf_name, self.mode, True])
-        return True
+        Returns:
+            bool: 上限時間内に変更反映を確認できた場合True、それ以外の場合False
+        """
+        return self._drive(self._wait_converged_steps())
 
     def pre_check(self) -> bool:
         """対象ステータスの事前確認を実施
@@ -409,7 +372,7 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         res = super().changed_check(status)
 
         # 追加IPアドレスチェック
-        is_added = bool(self.status_result.lower().count(self.add_ipaddr))
+        is_added = self.is_added(self.status_result)
         added_status = TargetStatus.up if is_added else TargetStatus.down
 
         changed: ProcessStatus = res
@@ -467,12 +430,13 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         """
         self.logger.output_1st_log("I00337", self.nf_name)
         # NFから取得した結果を辞書型で保存
-        XCAP_TEMPLATE.Reset()
-        parsed_list: List[Dict[str, Any]] = [
-            dict(zip(XCAP_TEMPLATE.header, pr))
-            for pr in XCAP_TEMPLATE.ParseText(result)]
+        parsed_list: List[Dict[str, Any]] = self.parse_xcap(result)
         # NFに設定されているxCAP ipaddrのリストを生成
         included_ipaddr_set: Set[str] = {x["ipaddr"] for x in parsed_list}
+        if len(self.edns_ipaddrs) > 1:
+            self.parse_changes(parsed_list, included_ipaddr_set)
+            self.logger.output_1st_log("I00338", [self.nf_name, parsed_list, self.changes])
+            return
         # ツール設定で保持しているxCAP ipaddrリストに含まれていないipaddrを付け替えipaddrとして選定
         exclude_ipaddr_set: Set[str] = set(self.ipaddr_list) ^ included_ipaddr_set
         self.add_ipaddr = exclude_ipaddr_set.pop() if exclude_ipaddr_set and included_ipaddr_set else None
@@ -483,23 +447,292 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
                 break
         self.logger.output_1st_log("I00338", [self.nf_name, parsed_list, self.add_ipaddr, self.priority])
 
+    def parse_changes(self, parsed_list: List[Dict[str, Any]], included_ipaddr_set: Set[str]) -> None:
+        """複数eDNSの場合に、NFに設定されている全eDNS IPアドレスの付け替え内容を取得する
+
+        NFに設定されているeDNS IPアドレス毎に、ツール設定のIPアドレスリストの順に未設定かつ切り替え対象外のIPアドレスを割り当て、
+        削除IPアドレスの優先度を引き継ぐ
+        予備IPアドレスが不足する場合は付け替え内容を空とし、追加IPアドレスなしとする
+
+        Args:
+            parsed_list (List[Dict[str, Any]]): NFから取得したxCAP設定の解析結果
+            included_ipaddr_set (Set[str]): NFに設定されているxCAP ipaddr
+        """
+        priorities: Dict[str, str] = {x["ipaddr"]: x["priority"] for x in parsed_list}
+        removes: List[str] = [x for x in self.edns_ipaddrs if x in included_ipaddr_set]
+        reserves: List[str] = [x for x in self.ipaddr_list if x not in included_ipaddr_set and x not in self.edns_ipaddrs]
+        if removes and len(reserves) >= len(removes):
+            self.changes = [(remove, add, priorities[remove]) for (remove, add) in zip(removes, reserves)]
+        else:
+            self.changes = []
+        self.add_ipaddr = self.changes[0][1] if self.changes else None
+        self.priority = self.changes[0][2] if self.changes else None
+
     def run(self) -> ProcessStatus:
         """NFに対してxCAP IPアドレスの現状確認・変更処理を実行する
 
         Returns:
             ProcessStatus: プロセスの完了ステータス
         """
+        with TRACER.span("process.run", nf_name=self.nf_name, mode=self.mode.name) as span:
+            status: ProcessStatus = self._drive(self._run_steps())
+            span.set_attribute("status", status.name)
+            span.set_status(not (status & ProcessStatus.ng), status.name)
+        return status
+
+    def _get_status_steps(self) -> Steps:
+        """get_statusの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は削除IPアドレスがある場合up、ない場合down、例外発生ならNone)
+        """
+        self.logger.output_1st_log("I00321", self.nf_name)
+
+        try:
+            # 現状のステータス取得
+            command = self.get_command(Mode.show)
+            result = yield from self._command_steps(command)
+
+            self.status_result = result
+
+            # いずれかのeDNS IPアドレスを含む場合はTargetStatus.up、無ければTargetStatus.down
+            status: TargetStatus = TargetStatus.up if any(result.lower().count(x.lower()) for x in self.edns_ipaddrs) else TargetStatus.down
+        except SocketTimeoutException as e:
+            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00304", self.nf_name)
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr状態取得失敗:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return None
+
+        except Exception as e:
+            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00304", self.nf_name)
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr状態取得失敗:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return None
+
+        self.logger.output_1st_log("I00322", [self.nf_name, status])
+
+        return status
+
+    def _change_status_steps(self) -> Steps:
+        """change_statusの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は正常に状態変更が完了した場合はcommit_ok、保存失敗の場合はcommit_ng、変更失敗の場合はchange_ng)
+        """
+        self.logger.output_1st_log("I00323", self.nf_name)
+
+        # NF取得情報を解析
+        self.parse_result(self.status_result)
+
+        # 追加(予備)IPアドレスが存在しない場合
+        if not self.add_ipaddr:
+            # 追加(予備)IPアドレスがない旨を表示
+            self.sout_message(SoutSeverity.error,
+                              f"xcap ipaddr change was failed due to no reserved ipaddr. current status is"
+                              f" {self.get_status_word(self.before_status)}. [ {self.before_status} ]")
+            self.logger.output_1st_log("E00321", [self.nf_name, self.mode])
+
+            return ProcessStatus.change_ng
+
+        # 現在の設定を削除 & 追加(予備)IPアドレスへ付け替え
+        if not (yield ProcessCall("to_down")) or not (yield ProcessCall("to_up")):
+            # 何らかの異常が発生した場合、事前状態に戻す
+            yield ProcessCall("do_abort")
+            # 設定を戻した旨、事前のステータスとともに表示
+            self.sout_message(SoutSeverity.error,
+                              f"xcap ipaddr change was failed. abort has done. current status is"
+                              f" {self.get_status_word(self.before_status)}. [ {self.before_status} ]")
+            self.logger.output_1st_log("E00321", [self.nf_name, self.mode])
+
+            return ProcessStatus.change_ng
+        elif not (yield ProcessCall("commit")):
+            # commitで異常が発生した場合、事前状態に戻す
+            yield ProcessCall("do_abort")
+            # 設定を戻した旨を表示
+            self.sout_message(SoutSeverity.error, "commit was failed. abort has done.")
+            self.logger.output_1st_log("E00322", [self.nf_name, self.mode])
+
+            return ProcessStatus.commit_ng
+        else:
+            self.logger.output_1st_log("I00324", self.nf_name)
+
+            return ProcessStatus.commit_ok
+
+    def _to_down_steps(self) -> Steps:
+        """to_downの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値はコマンドが投入できた場合True、例外発生ならFalse)
+        """
+        self.logger.output_1st_log("I00325", self.nf_name)
+
+        try:
+            command = None
+            # 設定変更モード開始
+            self.logger.output_1st_log("I00309", "config")
+            yield ClientCall("enter_config_mode")
+            self.logger.output_1st_log("I00310", None)
+
+            for command in self.get_change_commands(Mode.down):
+                yield from self._command_steps(command)
+
+        except SocketTimeoutException as e:
+            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr削除変更異常:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return False
+
+        except Exception as e:
+            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr削除変更異常:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return False
+
+        self.logger.output_1st_log("I00326", [self.nf_name, self.mode, True])
+        return True
+
+    def _to_up_steps(self) -> Steps:
+        """to_upの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値はコマンドが投入できた場合True、例外発生ならFalse)
+        """
+        self.logger.output_1st_log("I00327", self.nf_name)
+
+        try:
+            command = None
+            # 設定変更モード開始
+            self.logger.output_1st_log("I00309", "config")
+            yield ClientCall("enter_config_mode")
+            self.logger.output_1st_log("I00310", None)
+
+            for command in self.get_change_commands(Mode.up):
+                yield from self._command_steps(command)
+
+        except SocketTimeoutException as e:
+            self.sout_message(SoutSeverity.error, "ssh connection timeout was happened. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr追加変更異常:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return False
+
+        except Exception as e:
+            self.sout_message(SoutSeverity.error, "unexpected error occurred. [ UNKNOWN ]")
+            self.logger.output_1st_log("E00303", [self.nf_name, self.mode])
+            self.logger.output_2nd_log(Level.CRITICAL,
+                                       f"xCAP ipaddr追加変更異常:\n"
+                                       "パラメータ:\n"
+                                       f" NF名: {self.nf_name}\n"
+                                       f" コマンド: {command}\n"
+                                       f" Trace: {e.__class__.__name__} {e}")
+            return False
+
+        self.logger.output_1st_log("I00328", [self.nf_name, self.mode, True])
+        return True
+
+    def _wait_converged_steps(self) -> Steps:
+        """wait_convergedの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は上限時間内に変更反映を確認できた場合True、それ以外の場合False)
+        """
+        self.logger.output_1st_log("I00344", [self.nf_name, self.converge_timeout])
+        start = self.clock.monotonic()
+        deadline = start + self.converge_timeout
+        interval = CONVERGE_INTERVAL
+        while True:
+            status = yield ProcessCall("get_status")
+            converged = self._is_converged(status)
+            remaining = deadline - self.clock.monotonic()
+            # 反映済み、状態取得失敗、上限時間超過のいずれかで終了する(最終判定は事後確認で行う)
+            if converged or status is None or remaining <= 0:
+                break
+            yield Wait(min(interval, remaining))
+            interval = min(interval * CONVERGE_BACKOFF, CONVERGE_INTERVAL_MAX)
+        self.converge_time = self.clock.monotonic() - start
+        self.logger.output_1st_log("I00345", [self.nf_name, converged, f"{self.converge_time:.3f}s"])
+        return converged
+
+    def _is_converged(self, status: TargetStatus) -> bool:
+        """取得したxCAP設定に変更が反映済みか判定する
+
+        事後確認(changed_check)と同じ条件を、結果表示・ログ出力なしで判定する
+
+        Args:
+            status (TargetStatus): statusの事後状態
+
+        Returns:
+            bool: 削除IPアドレスの状態が実行モードの状態となり、追加IPアドレスが設定されている場合True
+        """
+        if status is None or not self.add_ipaddr:
+            return False
+        return super().changed_check(status) == ProcessStatus.change_ok and self.is_added(self.status_result)
+
+    def _pre_check_steps(self) -> Steps:
+        """pre_checkの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は変更要否確認が取得できた場合はTrue、それ以外の場合はFalse)
+        """
+        self.logger.output_1st_log("I00329", self.nf_name)
+        res = self._pre_check_result((yield ProcessCall("get_status")))
+        self.logger.output_1st_log("I00330", [self.nf_name, f"pre_check: {res}"])
+        return res
+
+    def _post_check_steps(self) -> Steps:
+        """post_checkの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値は変更完了の場合はTrue、それ以外の場合はFalse)
+        """
+        self.logger.output_1st_log("I00331", self.nf_name)
+        res = self._post_check_result((yield ProcessCall("get_status")))
+        self.logger.output_1st_log("I00332", [self.nf_name, f"post_check: {(res)}"])
+        return res
+
+    def _run_steps(self) -> Steps:
+        """runの処理ステップ
+
+        Returns:
+            Steps: 処理ステップ(戻り値はプロセスの完了ステータス)
+        """
         self.logger.output_1st_log("I00339", self.nf_name)
+        start = self.clock.monotonic()
 
         # プロセス状態初期化
         status: ProcessStatus
-        if not self.open_client():
+        if not (yield ProcessCall("open_client")):
             # SSH接続に失敗した場合
             status = ProcessStatus.ssh_ng
             self.logger.output_1st_log("I00340", [self.nf_name, f"process status: {status.name}"])
+            self.record_phase("run", self.clock.monotonic() - start)
             return status
         try:
-            if not self.pre_check():
+            if not (yield ProcessCall("pre_check")):
                 # xCAPの事前状態確認に失敗した場合
                 status = ProcessStatus.pre_check_ng
                 return status
@@ -509,15 +742,15 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
                 status = ProcessStatus.need_not_to_change
                 return status
 
-            if not self.change_status() == ProcessStatus.commit_ok:
+            if not (yield ProcessCall("change_status")) == ProcessStatus.commit_ok:
                 # S-out/S-in処理に失敗した場合
                 status = ProcessStatus.change_ng
                 return status
 
-            # 設定変更後の処理待ち
-            time.sleep(5)
+            # 設定変更の反映待ち(反映を確認した時点で事後確認に進む)
+            yield ProcessCall("wait_converged")
 
-            if self.post_check():
+            if (yield ProcessCall("post_check")):
                 # 事後確認が正常に完了した場合
                 status = ProcessStatus.post_check_ok
                 return status
@@ -540,4 +773,5 @@ class EriSmfvoXCAPProcess(AbcEricssonProcess):
         finally:
             self.logger.output_1st_log("I00340", [self.nf_name, f"process status: {status.name}"])
             # SSH接続を終了する
-            self.close_client()
+            yield ProcessCall("close_client")
+            self.record_phase("run", self.clock.monotonic() - start)
@@ -0,0 +1,156 @@
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Tuple
+
+# 定数宣言
+# 所要時間を計測するプロセスのフェーズ(runはプロセス全体)
+PHASES = ("open_client", "pre_check", "change_status", "to_down", "to_up", "commit", "do_abort", "post_check", "close_client", "run")
+# ヒストグラムのバケット上限(秒)
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Prometheusのメトリクス名の接頭辞
+METRIC_PREFIX = "xcap_tool"
+# Prometheus textfile形式で出力するファイルの拡張子(それ以外はJSON形式)
+PROMETHEUS_SUFFIX = ".prom"
+
+
+class Histogram(object):
+    """Histogram 所要時間のヒストグラム(Prometheusのhistogramと同じ累積バケット)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            buckets (Tuple[float, ...], optional): バケット上限(秒). Defaults to BUCKETS.
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """observe 所要時間を追加
+
+        Args:
+            seconds (float): 所要時間(秒)
+        """
+        for (i, bound) in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """to_dict 集計結果を取得
+
+        Returns:
+            Dict[str, Any]: バケット毎の累積件数、件数、合計(秒)
+        """
+        buckets = {format_bound(bound): count for (bound, count) in zip(self.buckets, self.counts)}
+        buckets["+Inf"] = self.count
+        return {"buckets": buckets, "count": self.count, "sum": round(self.sum, 6)}
+
+
+class ProcessMetrics(object):
+    """ProcessMetrics NF毎のプロセスのフェーズ所要時間の集計
+
+    NF毎の所要時間と、フェーズ・実行モード・完了ステータス毎のヒストグラムを保持し、
+    Prometheus textfile形式またはJSON形式で出力する
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            buckets (Tuple[float, ...], optional): バケット上限(秒). Defaults to BUCKETS.
+        """
+        self.buckets = buckets
+        self.nfs: List[Dict[str, Any]] = []
+        self.histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self.outcomes: Dict[Tuple[str, str], int] = {}
+
+    def add(self, nf_name: str, mode: str, outcome: str, phase_times: Dict[str, float]) -> None:
+        """add 1NF分のプロセスの所要時間を追加
+
+        Args:
+            nf_name (str): NF名
+            mode (str): 実行モード
+            outcome (str): プロセスの完了ステータス
+            phase_times (Dict[str, float]): フェーズ毎の所要時間(秒)
+        """
+        self.nfs.append({"nf_name": nf_name, "mode": mode, "outcome": outcome,
+                         "phases": {phase: round(seconds, 6) for (phase, seconds) in phase_times.items()}})
+        self.outcomes[(mode, outcome)] = self.outcomes.get((mode, outcome), 0) + 1
+        for (phase, seconds) in phase_times.items():
+            key = (phase, mode, outcome)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(self.buckets)
+            self.histograms[key].observe(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """to_dict JSON形式の出力内容を取得
+
+        Returns:
+            Dict[str, Any]: 出力日時、NF毎の所要時間、ヒストグラム
+        """
+        return {"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "nfs": self.nfs,
+                "histograms": [dict(phase=phase, mode=mode, outcome=outcome, **histogram.to_dict())
+                               for ((phase, mode, outcome), histogram) in sorted(self.histograms.items())]}
+
+    def to_prometheus(self) -> str:
+        """to_prometheus Prometheus textfile形式の出力内容を取得
+
+        Returns:
+            str: Prometheus textfile形式の文字列
+        """
+        lines = [f"# HELP {METRIC_PREFIX}_phase_duration_seconds Duration of each xCAP process phase per NF.",
+                 f"# TYPE {METRIC_PREFIX}_phase_duration_seconds histogram"]
+        for ((phase, mode, outcome), histogram) in sorted(self.histograms.items()):
+            labels = f'phase="{phase}",mode="{mode}",outcome="{outcome}"'
+            for (bound, count) in histogram.to_dict()["buckets"].items():
+                lines.append(f'{METRIC_PREFIX}_phase_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{METRIC_PREFIX}_phase_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{METRIC_PREFIX}_phase_duration_seconds_count{{{labels}}} {histogram.count}")
+        lines += [f"# HELP {METRIC_PREFIX}_processes Number of NF processes per mode and outcome in the last run.",
+                  f"# TYPE {METRIC_PREFIX}_processes gauge"]
+        for ((mode, outcome), count) in sorted(self.outcomes.items()):
+            lines.append(f'{METRIC_PREFIX}_processes{{mode="{mode}",outcome="{outcome}"}} {count}')
+        lines += [f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds Time the metrics were written.",
+                  f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+                  f"{METRIC_PREFIX}_last_run_timestamp_seconds {time.time():.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """write メトリクスファイル出力
+
+        拡張子が.promの場合はPrometheus textfile形式、それ以外はJSON形式で出力する
+        収集側が書込み途中のファイルを読まないよう、一時ファイルに書き込んでから置き換える
+
+        Args:
+            path (Path): メトリクスファイルのパス
+        """
+        path = Path(path)
+        if path.suffix == PROMETHEUS_SUFFIX:
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def format_bound(bound: float) -> str:
+    """format_bound バケット上限をラベル文字列に変換
+
+    Args:
+        bound (float): バケット上限(秒)
+
+    Returns:
+        str: ラベル文字列
+    """
+    return repr(float(bound))
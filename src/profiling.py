@@ -0,0 +1,179 @@
+import cProfile
+import io
+import os
+from pathlib import Path
+import pstats
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, List
+
+from src.abc_process import PHASE_HOOKS
+
+# 定数宣言
+# プロジェクトルートディレクトリ(インポート時間計測用のPYTHONPATH)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# 2nd-logに出力する累積時間上位の関数の件数
+PROFILE_TOP = 20
+# メモリスナップショットで保持するスタックトレースのフレーム数
+TRACEMALLOC_FRAMES = 10
+# インポート時間計測のタイムアウト(秒)
+IMPORTTIME_TIMEOUT = 60.0
+# 計測結果の出力で発生する例外
+PROFILE_ERRORS = (OSError, subprocess.SubprocessError)
+
+
+def make_run_id() -> str:
+    """make_run_id 実行IDを生成する
+
+    Returns:
+        str: 実行ID(実行日時_プロセスID)
+    """
+    return f"{time.strftime('%Y%m%d%H%M%S')}_{os.getpid()}"
+
+
+class RunProfiler(object):
+    """RunProfiler ツール実行のプロファイラ
+
+    実行中のCPU時間をcProfileで計測し、実行後に以下をログディレクトリへ出力する(ファイル名に実行IDを付与する)
+        xcap_tool_{実行ID}.prof: cProfileの計測結果(pstats形式)
+        xcap_tool_{実行ID}.importtime.txt: xcap_toolと実行中に読み込んだツールのモジュールのインポート時間内訳(python -X importtime形式)
+        xcap_tool_{実行ID}_{連番}_{NF名}_{フェーズ名}.tracemalloc: フェーズ終了時のメモリスナップショット(memory指定時のみ)
+    Python 3.11以前のcProfileは有効化したスレッドのみ計測するため、実行中に開始したスレッドは個別に計測して合算する
+    """
+
+    def __init__(self, log_dir: Path, run_id: str, memory: bool = False) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            log_dir (Path): 出力先ディレクトリ
+            run_id (str): 実行ID
+            memory (bool, optional): フェーズ終了時のメモリスナップショットを取得する場合True. Defaults to False.
+        """
+        self.log_dir = Path(log_dir)
+        self.run_id = run_id
+        self.memory = memory
+        self.prefix = f"xcap_tool_{run_id}"
+        self.lock = threading.Lock()
+        self.profiles: List[cProfile.Profile] = []
+        self.snapshot_count = 0
+        self.snapshots: List[Path] = []
+
+    def start(self) -> None:
+        """start 計測開始
+        """
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            PHASE_HOOKS.append(self.on_phase)
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._profile_thread)
+        self.profile = self._enable()
+
+    def stop(self) -> None:
+        """stop 計測終了
+        """
+        self.profile.disable()
+        if sys.version_info < (3, 12):
+            threading.setprofile(None)
+        if self.memory:
+            PHASE_HOOKS.remove(self.on_phase)
+            tracemalloc.stop()
+
+    def _enable(self) -> cProfile.Profile:
+        """_enable 実行中のスレッドの計測を開始する
+
+        Returns:
+            cProfile.Profile: 実行中のスレッドのプロファイラ
+        """
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append(profile)
+        profile.enable()
+        return profile
+
+    def _profile_thread(self, frame: Any, event: str, arg: Any) -> None:
+        """_profile_thread 開始したスレッドの最初のイベントで、そのスレッドの計測を開始する(threading.setprofileに登録する)
+        """
+        self._enable()
+
+    def on_phase(self, nf_name: str, phase: str) -> None:
+        """on_phase フェーズ終了時にメモリスナップショットを出力する
+
+        Args:
+            nf_name (str): NF名
+            phase (str): フェーズ名
+        """
+        snapshot = tracemalloc.take_snapshot()
+        with self.lock:
+            self.snapshot_count += 1
+            path = self.log_dir.joinpath(f"{self.prefix}_{self.snapshot_count:03d}_{nf_name}_{phase}.tracemalloc")
+            self.snapshots.append(path)
+        snapshot.dump(str(path))
+
+    def get_stats(self) -> pstats.Stats:
+        """get_stats 全スレッドの計測結果を合算する
+
+        Returns:
+            pstats.Stats: 計測結果
+        """
+        return pstats.Stats(*self.profiles, stream=io.StringIO())
+
+    def write(self) -> List[Path]:
+        """write 計測結果・インポート時間内訳を出力する
+
+        Raises:
+            OSError: ファイル出力に失敗した場合
+            subprocess.SubprocessError: インポート時間の計測に失敗した場合
+
+        Returns:
+            List[Path]: 出力したファイルのパス(メモリスナップショットを含む)
+        """
+        prof_path = self.log_dir.joinpath(f"{self.prefix}.prof")
+        self.get_stats().dump_stats(str(prof_path))
+        importtime_path = self.log_dir.joinpath(f"{self.prefix}.importtime.txt")
+        importtime_path.write_text(measure_import_time(list(dict.fromkeys(["src.xcap_tool"] + loaded_modules()))), encoding="utf-8")
+        return [prof_path, importtime_path] + self.snapshots
+
+    def summary(self, top: int = PROFILE_TOP) -> str:
+        """summary 累積時間上位の関数を取得する
+
+        Args:
+            top (int, optional): 件数. Defaults to PROFILE_TOP.
+
+        Returns:
+            str: pstatsの累積時間順の出力
+        """
+        stats = self.get_stats()
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        return stats.stream.getvalue()
+
+
+def loaded_modules() -> List[str]:
+    """loaded_modules 読み込み済みのツールのモジュール名を取得する
+
+    Returns:
+        List[str]: モジュール名リスト
+    """
+    return sorted(name for name in sys.modules if name.startswith("src.") or name == "xgnlog.Log")
+
+
+def measure_import_time(modules: List[str]) -> str:
+    """measure_import_time 新しいPythonプロセスでモジュールを読み込み、インポート時間の内訳を取得する
+
+    Args:
+        modules (List[str]): モジュール名リスト
+
+    Raises:
+        subprocess.SubprocessError: インポートに失敗した場合、またはタイムアウトした場合
+
+    Returns:
+        str: python -X importtimeの出力
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(x for x in (str(PROJECT_ROOT), env.get("PYTHONPATH")) if x)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "".join(f"import {m}\n" for m in modules)],
+                            cwd=os.getcwd(), env=env, capture_output=True, text=True, timeout=IMPORTTIME_TIMEOUT, check=True)
+    return result.stderr
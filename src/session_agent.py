@@ -0,0 +1,562 @@
+import argparse
+import base64
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from xgnlog.Log import Lazy, Level, Log
+
+from src.config_store import CONFIG_STORE
+from src.eri_connection import NFShellClient, ProxyCommandException, SocketTimeoutException, SSHConnectException
+
+# 定数宣言
+# 共通ロガー
+JOB_ID = "T23AJ002"
+LOGGER = Log(JOB_ID)
+
+# アイドルセッションの破棄までの時間(秒)
+DEFAULT_IDLE_TIMEOUT = 600.0
+# ヘルスチェック・アイドルセッション破棄の実行間隔(秒)
+DEFAULT_HEALTH_INTERVAL = 60.0
+# エージェントへのソケット接続タイムアウト(秒)
+AGENT_CONNECT_TIMEOUT = 10.0
+# コマンド投入以外のエージェント要求の応答待ち時間(秒)。NFへのSSH接続を含むため長めに設定する
+AGENT_REQUEST_TIMEOUT = 60.0
+# コマンド投入時、コマンドタイムアウトに加算するエージェント応答待ちの余裕(秒)
+AGENT_TIMEOUT_MARGIN = 5.0
+# 貸し出し前の疎通確認(空行送信)のタイムアウト(秒)
+PROBE_TIMEOUT = 5.0
+
+# エージェント・クライアント間で受け渡す例外
+AGENT_ERRORS: Dict[str, type] = {
+    e.__name__: e for e in (SSHConnectException, ProxyCommandException, SocketTimeoutException, KeyError, ValueError)
+}
+
+
+class PooledSession(object):
+    """PooledSession プール管理するNFセッション
+
+    1セッションは同時に1つの利用者にのみ貸し出す
+    """
+
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        self.client: NFShellClient = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionPool(object):
+    """SessionPool NF名をキーとしたNFShellClientの接続済みセッションプール
+
+    接続済みのセッションを貸し出し、返却後も切断せずに保持して次回の貸し出しで再利用する
+    貸し出し時にセッションの状態を確認し、切断されている場合は再接続する
+    """
+
+    def __init__(self,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 client_factory: Callable[[str], NFShellClient] = NFShellClient) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            idle_timeout (float, optional): アイドルセッションの破棄までの時間(秒). Defaults to DEFAULT_IDLE_TIMEOUT.
+            client_factory (Callable[[str], NFShellClient], optional): NF名からクライアントを生成する関数. Defaults to NFShellClient.
+        """
+        self.idle_timeout = idle_timeout
+        self.client_factory = client_factory
+        self.sessions: Dict[str, PooledSession] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, nf_name: str) -> NFShellClient:
+        """acquire セッション貸し出し
+
+        接続済みのセッションがあれば再利用し、なければ接続する
+        同一NFのセッションが貸し出し中の場合は返却を待つ
+
+        Args:
+            nf_name (str): NF名
+
+        Raises:
+            KeyError: 接続設定にNFが存在しない場合
+            SSHConnectException: SSH接続に失敗した場合
+
+        Returns:
+            NFShellClient: 接続済みクライアント
+        """
+        with self._lock:
+            session = self.sessions.setdefault(nf_name, PooledSession())
+        session.lock.acquire()
+        try:
+            if session.client is not None and not self.is_healthy(session.client, probe=True):
+                self._discard(nf_name, session)
+            if session.client is None:
+                LOGGER.output_1st_log("I00230", nf_name)
+                client = self.client_factory(nf_name)
+                client.connect()
+                session.client = client
+            else:
+                LOGGER.output_1st_log("I00231", nf_name)
+        except Exception:
+            session.lock.release()
+            raise
+        return session.client
+
+    def release(self, nf_name: str, discard: bool = False) -> None:
+        """release セッション返却
+
+        設定モードのまま返却された場合は設定を破棄(abort)してから返却する
+
+        Args:
+            nf_name (str): NF名
+            discard (bool, optional): セッションを再利用せずに破棄する場合True. Defaults to False.
+        """
+        session = self.sessions[nf_name]
+        try:
+            if session.client is not None and not discard and session.client.is_config_mode:
+                session.client.abort()
+        except Exception:
+            discard = True
+        finally:
+            if discard:
+                self._discard(nf_name, session)
+            session.last_used = time.monotonic()
+            session.lock.release()
+
+    def evict_idle(self) -> None:
+        """evict_idle アイドルセッション破棄
+
+        貸し出し中でないセッションのうち、アイドル時間を超過したもの・切断されているものを破棄する
+        """
+        with self._lock:
+            sessions = list(self.sessions.items())
+        now = time.monotonic()
+        for nf_name, session in sessions:
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                if session.client is None:
+                    continue
+                # 定期確認は送受信を伴わない状態確認のみとし、疎通確認は貸し出し時に行う
+                if now - session.last_used >= self.idle_timeout or not self.is_healthy(session.client):
+                    LOGGER.output_1st_log("I00233", nf_name)
+                    self._discard(nf_name, session)
+            finally:
+                session.lock.release()
+
+    def close_all(self) -> None:
+        """close_all 全セッション切断
+
+        エージェント停止時に利用するため、貸し出し中のセッションも返却を待たずに切断する
+        """
+        with self._lock:
+            sessions = list(self.sessions.items())
+        for nf_name, session in sessions:
+            if session.client is not None:
+                self._discard(nf_name, session)
+
+    def is_healthy(self, client: NFShellClient, probe: bool = False) -> bool:
+        """is_healthy セッション状態確認
+
+        シェルおよびSSHトランスポートの状態を確認する
+        疎通確認を行う場合は空行を送信し、PROBE_TIMEOUT秒以内に現在のプロンプトが返ることを確認する
+        (踏み台経由の経路が切れている場合や、シェルが応答しない・設定モードのまま残っている場合を検出する)
+
+        Args:
+            client (NFShellClient): クライアント
+            probe (bool, optional): 疎通確認を行う場合True. Defaults to False.
+
+        Returns:
+            bool: セッションが利用可能ならTrue
+        """
+        transport = client.get_transport()
+        if not (client._is_shell_enable() and transport is not None and transport.is_active()):
+            return False
+        if client.is_config_mode:
+            return False
+        if not probe:
+            return True
+        try:
+            client.command("", PROBE_TIMEOUT)
+        except Exception as e:
+            LOGGER.output_2nd_log(Level.DEBUG, Lazy(lambda: f"セッション疎通確認異常:\nパラメータ:\n nf_name: {client.nf_name}\n Trace: {e.__class__.__name__} {e}"))
+            return False
+        return True
+
+    def _discard(self, nf_name: str, session: PooledSession) -> None:
+        """_discard セッション破棄
+
+        Args:
+            nf_name (str): NF名
+            session (PooledSession): 破棄するセッション
+        """
+        LOGGER.output_1st_log("I00232", nf_name)
+        try:
+            session.client.close()
+        except Exception as e:
+            LOGGER.output_2nd_log(Level.DEBUG, Lazy(lambda: f"セッション切断異常:\nパラメータ:\n nf_name: {nf_name}\n Trace: {e.__class__.__name__} {e}"))
+        session.client = None
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    """_AgentRequestHandler セッションエージェントの要求処理
+
+    1接続につき1NFのセッションを貸し出し、JSON Lines形式の要求を順に処理する
+    """
+
+    def handle(self) -> None:
+        pool: SessionPool = self.server.pool
+        nf_name: str = None
+        client: NFShellClient = None
+        discard = False
+        try:
+            for line in self.rfile:
+                request: Dict[str, Any] = json.loads(line)
+                (op, args) = (request.get("op"), request.get("args", []))
+                try:
+                    if op == "connect":
+                        if client is None:
+                            nf_name = request["nf_name"]
+                            client = pool.acquire(nf_name)
+                        result = b""
+                    elif op == "close":
+                        if client is not None:
+                            pool.release(nf_name, discard)
+                            (nf_name, client, discard) = (None, None, False)
+                        result = b""
+                    elif client is None:
+                        raise SSHConnectException("session is not connected.")
+                    elif op == "command":
+                        result = client.command(*args)
+                    elif op in ("enter_config_mode", "exit_config_mode", "abort"):
+                        getattr(client, op)(*args)
+                        result = b""
+                    else:
+                        raise ValueError(f"unknown operation. [{op}]")
+                    response = {"ok": True, "result": base64.b64encode(result).decode("ascii")}
+                except Exception as e:
+                    # タイムアウト後は受信途中のデータが残るため、セッションを再利用しない
+                    discard = discard or isinstance(e, SocketTimeoutException)
+                    message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                    response = {"ok": False, "error": e.__class__.__name__, "message": message}
+                self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+        except (OSError, ValueError) as e:
+            discard = True
+            LOGGER.output_2nd_log(Level.DEBUG, Lazy(lambda: f"エージェント要求処理異常:\nパラメータ:\n nf_name: {nf_name}\n Trace: {e.__class__.__name__} {e}"))
+        finally:
+            if client is not None:
+                pool.release(nf_name, discard)
+
+
+class _AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """_AgentServer セッションエージェントのUNIXソケットサーバ
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str, pool: SessionPool) -> None:
+        self.pool = pool
+        super().__init__(path, _AgentRequestHandler)
+
+
+class SessionAgent(object):
+    """SessionAgent 接続済みNFセッションを保持する常駐エージェント
+
+    UNIXソケットで要求を受け付け、SessionPoolのセッションをAgentShellClientに貸し出す
+    一定間隔でアイドルセッションの破棄・切断済みセッションの削除を行う
+    """
+
+    def __init__(self,
+                 path: str,
+                 pool: SessionPool = None,
+                 health_interval: float = DEFAULT_HEALTH_INTERVAL) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            path (str): UNIXソケットパス
+            pool (SessionPool, optional): セッションプール. Defaults to None.
+            health_interval (float, optional): ヘルスチェック実行間隔(秒). Defaults to DEFAULT_HEALTH_INTERVAL.
+        """
+        self.path = str(path)
+        self.pool = pool if pool is not None else SessionPool()
+        self.health_interval = health_interval
+        self._server: _AgentServer = None
+        self._stopped = threading.Event()
+
+    def start(self) -> "SessionAgent":
+        """start 待受開始
+
+        Raises:
+            OSError: 既にエージェントが起動している場合
+
+        Returns:
+            SessionAgent: 自インスタンス
+        """
+        LOGGER.output_1st_log("I00228", self.path)
+        if os.path.exists(self.path):
+            if is_agent_running(self.path):
+                raise OSError(f"session agent is already running. [{self.path}]")
+            # 前回起動時のソケットファイルが残っている場合は削除する
+            os.unlink(self.path)
+        # ソケットファイルは生成時点から所有者のみ読み書き可能とする
+        umask = os.umask(0o177)
+        try:
+            self._server = _AgentServer(self.path, self.pool)
+        finally:
+            os.umask(umask)
+        threading.Thread(target=self._server.serve_forever, name="agent-server", daemon=True).start()
+        threading.Thread(target=self._housekeeping, name="agent-health", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """stop 待受終了
+
+        全セッションを切断し、ソケットファイルを削除する
+        """
+        LOGGER.output_1st_log("I00229", self.path)
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.pool.close_all()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def wait(self) -> None:
+        """wait 待受終了まで待機する
+        """
+        self._stopped.wait()
+
+    def __enter__(self) -> "SessionAgent":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def reload_config(self) -> None:
+        """reload_config 接続設定などの設定ファイルの変更を反映する
+
+        変更後に接続するセッションから反映される。反映に失敗した設定ファイルは変更前の設定を保持する
+        """
+        (changed, errors) = CONFIG_STORE.reload()
+        if changed:
+            LOGGER.output_1st_log("I00237", changed)
+        for (path, e) in errors.items():
+            LOGGER.output_1st_log("E00207", path)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"設定ファイル再読込異常:\nパラメータ:\n ファイルパス: {path}\n Trace: {e.__class__.__name__} {e}")
+
+    def _housekeeping(self) -> None:
+        while not self._stopped.wait(self.health_interval):
+            self.pool.evict_idle()
+            self.reload_config()
+
+
+class AgentShellClient(object):
+    """AgentShellClient セッションエージェント経由のNFShell接続用クラス
+
+    NFShellClientと同じ接続・コマンド投入・設定モード操作を、セッションエージェントが保持するセッションで行う
+    connectでセッションを借り、closeでセッションを切断せずにエージェントへ返却する
+    """
+
+    def __init__(self, nf_name: str, path: str) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+            path (str): セッションエージェントのUNIXソケットパス
+
+        Raises:
+            ValueError: nf_nameにNoneが指定された場合
+        """
+        LOGGER.output_1st_log("I00201", nf_name)
+        if nf_name is None:
+            LOGGER.output_1st_log("E00201", nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"インスタンス生成異常:\nパラメータ:\n nf_name: {nf_name}")
+            raise ValueError("nf_name: None is not allowed value.")
+        self.nf_name = nf_name
+        self.path = str(path)
+        self.sock: socket.socket = None
+        self.is_config_mode = False
+        self._rfile = None
+        LOGGER.output_1st_log("I00202", nf_name)
+
+    def connect(self) -> None:
+        """connect セッション貸し出し
+
+        Raises:
+            KeyError: エージェント側で接続設定の取得に失敗した場合
+            SSHConnectException: エージェントへの接続またはSSH接続に失敗した場合
+        """
+        LOGGER.output_1st_log("I00206", self.nf_name)
+        try:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(AGENT_CONNECT_TIMEOUT)
+            self.sock.connect(self.path)
+            self._rfile = self.sock.makefile("rb")
+        except OSError as e:
+            LOGGER.output_1st_log("E00205", self.nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"セッションエージェント接続異常:\nパラメータ:\n nf_name: {self.nf_name}\n path: {self.path}\n Trace: {e.__class__.__name__} {e}")
+            self.close()
+            raise SSHConnectException(str(e))
+        self._request("connect")
+        LOGGER.output_1st_log("I00207", self.nf_name)
+
+    def close(self) -> None:
+        """close セッション返却
+        """
+        LOGGER.output_1st_log("I00211", self.nf_name)
+        if self.sock is not None:
+            try:
+                self._request("close")
+            except Exception:
+                pass
+            finally:
+                self._disconnect()
+        self.is_config_mode = False
+        LOGGER.output_1st_log("I00212", self.nf_name)
+
+    def _disconnect(self) -> None:
+        """_disconnect エージェントとのソケット切断
+        """
+        if self._rfile is not None:
+            self._rfile.close()
+        if self.sock is not None:
+            self.sock.close()
+        (self.sock, self._rfile) = (None, None)
+
+    def enter_config_mode(self) -> None:
+        """config_mode 設定モード移行
+        """
+        LOGGER.output_1st_log("I00217", self.nf_name)
+        self._request("enter_config_mode")
+        self.is_config_mode = True
+        LOGGER.output_1st_log("I00218", self.nf_name)
+
+    def exit_config_mode(self, forced=False) -> None:
+        """config_mode 設定モード解除
+
+        Args:
+            forced (bool, optional): 設定モードの強制終了
+        """
+        LOGGER.output_1st_log("I00219", self.nf_name)
+        self._request("exit_config_mode", forced)
+        self.is_config_mode = False
+        LOGGER.output_1st_log("I00220", self.nf_name)
+
+    def abort(self) -> None:
+        """config_mode 設定モード強制終了(元に戻す)
+        """
+        LOGGER.output_1st_log("I00221", self.nf_name)
+        self._request("abort")
+        self.is_config_mode = False
+        LOGGER.output_1st_log("I00222", self.nf_name)
+
+    def command(self, command: str, timeout: float = 15.0) -> bytes:
+        """command コマンド投入
+
+        Args:
+            command (str): 投入コマンド
+            timeout (float, optional): タイムアウト. Defaults to 15.0.
+
+        Raises:
+            SocketTimeoutException: エージェント側でタイムアウトが発生した場合
+
+        Returns:
+            bytes: 受信データ
+        """
+        LOGGER.output_1st_log("I00208", self.nf_name)
+        LOGGER.output_1st_log("I00209", command)
+        # コマンドのタイムアウトはエージェント側で判定し、エージェント無応答に備えて余裕を加算して待つ
+        result = self._request("command", command, timeout, wait=timeout + AGENT_TIMEOUT_MARGIN)
+        LOGGER.output_1st_log("I00210", self.nf_name)
+        return result
+
+    def _request(self, op: str, *args, wait: float = AGENT_REQUEST_TIMEOUT) -> bytes:
+        """_request エージェントへの要求送信
+
+        Args:
+            op (str): 操作名
+            wait (float, optional): エージェントの応答待ち時間(秒). Defaults to AGENT_REQUEST_TIMEOUT.
+
+        Raises:
+            SocketTimeoutException: エージェントの応答待ち時間を超過した場合
+            SSHConnectException: エージェントとの通信に失敗した場合
+            Exception: エージェント側で発生した例外
+
+        Returns:
+            bytes: 操作結果
+        """
+        if self.sock is None:
+            raise SSHConnectException("session agent is not connected.")
+        request = {"op": op, "nf_name": self.nf_name, "args": list(args)}
+        try:
+            self.sock.settimeout(wait)
+            self.sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            line = self._rfile.readline()
+            if not line:
+                raise EOFError("session agent closed the connection.")
+            response: Dict[str, Any] = json.loads(line)
+        except (OSError, EOFError, ValueError) as e:
+            LOGGER.output_1st_log("E00205", self.nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL, f"セッションエージェント通信異常:\nパラメータ:\n nf_name: {self.nf_name}\n op: {op}\n Trace: {e.__class__.__name__} {e}")
+            # 応答途中の可能性があるため、以降の要求では利用しない
+            self._disconnect()
+            if isinstance(e, socket.timeout):
+                raise SocketTimeoutException(f"session agent did not respond within {wait} seconds")
+            raise SSHConnectException(str(e))
+        if not response["ok"]:
+            raise AGENT_ERRORS.get(response["error"], SSHConnectException)(response["message"])
+        return base64.b64decode(response["result"])
+
+
+def is_agent_running(path: str) -> bool:
+    """is_agent_running セッションエージェント起動確認
+
+    Args:
+        path (str): UNIXソケットパス
+
+    Returns:
+        bool: エージェントが接続を受け付けた場合True
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(AGENT_CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def main() -> int:  # pragma: no cover
+    """main セッションエージェント起動
+
+    SIGINT/SIGTERMを受信するまで待ち受ける。SIGHUP受信時とヘルスチェック毎に設定ファイルの変更を反映する
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="T23AJ001 NF session agent")
+    parser.add_argument("socket_path", help="UNIX socket path")
+    parser.add_argument("--idle-timeout", help="seconds before an idle session is closed", type=float, default=DEFAULT_IDLE_TIMEOUT)
+    parser.add_argument("--health-interval", help="seconds between health checks", type=float, default=DEFAULT_HEALTH_INTERVAL)
+    args = parser.parse_args()
+
+    agent = SessionAgent(args.socket_path, SessionPool(args.idle_timeout), args.health_interval)
+    signal.signal(signal.SIGTERM, lambda *_: agent._stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: agent._stopped.set())
+    signal.signal(signal.SIGHUP, lambda *_: agent.reload_config())
+    agent.start()
+    try:
+        agent.wait()
+    finally:
+        agent.stop()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
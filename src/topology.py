@@ -0,0 +1,184 @@
+import functools
+import ipaddress
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# 定数宣言
+# 設定バンドルに保存する索引の派生データ名
+INDEX_NAME = "topology"
+
+
+def normalize_ipaddr(ipaddr: str) -> str:
+    """normalize_ipaddr IPアドレスを正規化する(IPv6の大文字・ゼロ省略の表記揺れを吸収する)
+
+    Args:
+        ipaddr (str): IPアドレス
+
+    Returns:
+        str: 正規化したIPアドレス。IPアドレスとして解析できない場合はそのまま
+    """
+    try:
+        return ipaddress.ip_address(ipaddr).compressed
+    except ValueError:
+        return ipaddr
+
+
+def site_of(nf_name: str) -> str:
+    """site_of NF名から局舎プレフィックスを取得する
+
+    Args:
+        nf_name (str): NF名(例: tam5-er-s01-smfvo-001)
+
+    Returns:
+        str: 局舎プレフィックス(例: tam5)
+    """
+    return nf_name.split("-", 1)[0]
+
+
+class TopologyIndex(object):
+    """TopologyIndex 対象ノード情報(nf-infos.json・edns-infos.json)の索引
+
+    eDNS名→IPアドレス、IPアドレス→参照するNF、NF→xCAP候補リスト、局舎プレフィックス→NFを保持し、
+    対象NFの検索をNF数によらず参照するキーの数だけで行う
+    各索引は初回参照時に生成し、to_dict/from_dictで設定バンドルに保存・復元する
+    """
+
+    # 設定バンドルに保存する索引
+    MAPS = ("edns_ipaddrs", "nf_candidates", "nf_ranks", "ipaddr_nfs", "site_nfs")
+
+    def __init__(self, nf_infos: Dict[str, Dict[str, Any]] = None, edns_infos: Dict[str, Dict[str, Any]] = None) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_infos (Dict[str, Dict[str, Any]], optional): NF情報. Defaults to None.
+            edns_infos (Dict[str, Dict[str, Any]], optional): eDNS情報. Defaults to None.
+        """
+        self.nf_infos = nf_infos if nf_infos is not None else {}
+        self.edns_infos = edns_infos if edns_infos is not None else {}
+
+    @functools.cached_property
+    def edns_ipaddrs(self) -> Dict[str, str]:
+        """eDNS名をキーとしたIPアドレス
+        """
+        return {edns_name: value["ipaddr"] for (edns_name, value) in self.edns_infos.items()}
+
+    @functools.cached_property
+    def nf_candidates(self) -> Dict[str, List[str]]:
+        """NF名をキーとしたxCAP候補リスト(nf-infos.jsonの定義順)
+        """
+        return {nf_name: list(value["xCAP"]) for (nf_name, value) in self.nf_infos.items()}
+
+    @functools.cached_property
+    def nf_ranks(self) -> Dict[str, int]:
+        """NF名をキーとしたnf-infos.jsonの定義順
+        """
+        return {nf_name: rank for (rank, nf_name) in enumerate(self.nf_candidates)}
+
+    @functools.cached_property
+    def ipaddr_nfs(self) -> Dict[str, List[str]]:
+        """正規化したIPアドレスをキーとした、xCAP候補に含むNF名リスト
+        """
+        index: Dict[str, List[str]] = {}
+        for (nf_name, candidates) in self.nf_candidates.items():
+            for ipaddr in dict.fromkeys(map(normalize_ipaddr, candidates)):
+                index.setdefault(ipaddr, []).append(nf_name)
+        return index
+
+    @functools.cached_property
+    def site_nfs(self) -> Dict[str, List[str]]:
+        """局舎プレフィックスをキーとしたNF名リスト
+        """
+        index: Dict[str, List[str]] = {}
+        for nf_name in self.nf_candidates:
+            index.setdefault(site_of(nf_name), []).append(nf_name)
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """to_dict 全索引を生成して取得する(設定バンドル保存用)
+
+        Returns:
+            Dict[str, Any]: 索引名をキーとした索引
+        """
+        return {name: getattr(self, name) for name in self.MAPS}
+
+    @classmethod
+    def from_dict(cls, maps: Dict[str, Any]) -> "TopologyIndex":
+        """from_dict 設定バンドルに保存した索引から復元する
+
+        Args:
+            maps (Dict[str, Any]): 索引名をキーとした索引
+
+        Returns:
+            TopologyIndex: 索引
+        """
+        index = cls()
+        index.__dict__.update({name: maps[name] for name in cls.MAPS})
+        return index
+
+    def edns_ipaddr(self, edns_name: str) -> str:
+        """edns_ipaddr eDNS名からIPアドレスを取得する
+
+        Args:
+            edns_name (str): eDNS名
+
+        Raises:
+            KeyError: eDNS名が定義されていない場合
+
+        Returns:
+            str: eDNS IPアドレス(edns-infos.jsonの表記のまま)
+        """
+        return self.edns_ipaddrs[edns_name]
+
+    def candidates(self, nf_name: str) -> List[str]:
+        """candidates NFのxCAP候補リストを取得する
+
+        Args:
+            nf_name (str): NF名
+
+        Raises:
+            KeyError: NF名が定義されていない場合
+
+        Returns:
+            List[str]: xCAP候補リスト
+        """
+        return self.nf_candidates[nf_name]
+
+    def find_nfs(self, ipaddrs: Iterable[str] = None, sites: Iterable[str] = None) -> List[str]:
+        """find_nfs 条件に一致するNF名を取得する
+
+        同じ条件の複数キーはいずれかに一致するNF、異なる条件は全てに一致するNFとする
+
+        Args:
+            ipaddrs (Iterable[str], optional): xCAP候補に含むIPアドレス. Defaults to 条件なし.
+            sites (Iterable[str], optional): 局舎プレフィックス. Defaults to 条件なし.
+
+        Returns:
+            List[str]: nf-infos.jsonの定義順のNF名リスト
+        """
+        matched: Dict[str, None] = None
+        for (keys, index, normalize) in ((ipaddrs, self.ipaddr_nfs, normalize_ipaddr), (sites, self.site_nfs, str)):
+            if keys is None:
+                continue
+            found = dict.fromkeys(nf_name for key in keys for nf_name in index.get(normalize(key), []))
+            matched = found if matched is None else {nf_name: None for nf_name in found if nf_name in matched}
+        if matched is None:
+            return list(self.nf_candidates)
+        return sorted(matched, key=self.nf_ranks.__getitem__)
+
+
+def load_topology(store: Any, nf_infos_path: Path, edns_infos_path: Path) -> TopologyIndex:
+    """load_topology 共通設定ストアから対象ノード情報の索引を取得する
+
+    索引は設定バンドルに保存し、NF情報・eDNS情報の内容が変わった場合のみ生成し直す
+
+    Args:
+        store (ConfigStore): 共通設定ストア
+        nf_infos_path (Path): NF情報のパス
+        edns_infos_path (Path): eDNS情報のパス
+
+    Returns:
+        TopologyIndex: 索引
+    """
+    maps = store.get_derived(INDEX_NAME, [nf_infos_path, edns_infos_path],
+                             lambda nf_infos, edns_infos: TopologyIndex(nf_infos, edns_infos).to_dict())
+    return TopologyIndex.from_dict(maps)
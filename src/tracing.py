@@ -0,0 +1,228 @@
+import contextvars
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# 定数宣言
+# 出力するトレースのサービス名(OTLPのresource属性service.name)
+SERVICE_NAME = "xcap_tool"
+# 計装スコープ名(OTLPのscope.name)
+SCOPE_NAME = "src.tracing"
+# スパンの種別(OTLPのSPAN_KIND_INTERNAL)
+SPAN_KIND_INTERNAL = 1
+# スパンのステータス(OTLPのSTATUS_CODE_UNSET/OK/ERROR)
+(STATUS_UNSET, STATUS_OK, STATUS_ERROR) = (0, 1, 2)
+
+# 実行中のスパン(スレッド・asyncioタスク毎)
+CURRENT_SPAN: contextvars.ContextVar = contextvars.ContextVar("CURRENT_SPAN", default=None)
+
+
+class Span(object):
+    """Span トレースのスパン
+
+    withブロックの実行時間を計測し、終了時にトレーサーへ登録する
+    ブロック内で例外が発生した場合はステータスをエラーとし、例外はそのまま送出する
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            tracer (Tracer): 登録先のトレーサー
+            name (str): スパン名
+            parent (Optional[Span]): 親スパン。ルートスパンの場合はNone
+            attributes (Dict[str, Any]): スパン属性
+        """
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent is not None else ""
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.start_time = 0
+        self.end_time = 0
+        self.token: contextvars.Token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """set_attribute スパン属性を設定
+
+        Args:
+            key (str): 属性名
+            value (Any): 属性値
+        """
+        self.attributes[key] = value
+
+    def set_status(self, ok: bool, message: str = "") -> None:
+        """set_status スパンのステータスを設定
+
+        Args:
+            ok (bool): 正常の場合True
+            message (str, optional): エラー内容. Defaults to "".
+        """
+        (self.status, self.status_message) = (STATUS_OK, "") if ok else (STATUS_ERROR, message)
+
+    def __enter__(self) -> "Span":
+        self.start_time = time.time_ns()
+        self.token = CURRENT_SPAN.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.end_time = time.time_ns()
+        CURRENT_SPAN.reset(self.token)
+        if exc is not None:
+            self.set_status(False, f"{exc.__class__.__name__} {exc}")
+        self.tracer.finish(self)
+
+    def to_otlp(self, trace_id: str) -> Dict[str, Any]:
+        """to_otlp OTLP/JSON形式のスパンを取得
+
+        Args:
+            trace_id (str): トレースID
+
+        Returns:
+            Dict[str, Any]: OTLP/JSON形式のスパン
+        """
+        span = {"traceId": trace_id, "spanId": self.span_id, "parentSpanId": self.parent_span_id,
+                "name": self.name, "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(self.start_time), "endTimeUnixNano": str(self.end_time),
+                "attributes": [to_otlp_attribute(key, value) for (key, value) in self.attributes.items()],
+                "status": {"code": self.status}}
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class NoopSpan(object):
+    """NoopSpan トレース無効時のスパン(何も記録しない)
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, ok: bool, message: str = "") -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+
+# トレース無効時のスパン(全呼び出しで共有する)
+NOOP_SPAN = NoopSpan()
+
+
+class Tracer(object):
+    """Tracer トレーサー
+
+    start後に生成したスパンを1つのトレースとして収集し、OTLP/JSON形式のファイルに出力する
+    スパンの親は実行中のスパン(スレッド・asyncioタスク毎)とし、
+    実行中のスパンがない場合(ワーカースレッドなど)はルートスパンとする
+    start前はスパンを記録しない
+    """
+
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        self.enabled = False
+        self.trace_id = ""
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        """start トレースの収集を開始する
+        """
+        self.enabled = True
+        self.trace_id = os.urandom(16).hex()
+        self.root = None
+        self.spans = []
+
+    def stop(self) -> None:
+        """stop トレースの収集を終了する
+        """
+        self.enabled = False
+        self.root = None
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """span スパンを生成する
+
+        withブロックで利用する。トレース無効時は何も記録しないスパンを返す
+        最初に生成したスパンをルートスパンとする
+
+        Args:
+            name (str): スパン名
+            **attributes (Any): スパン属性
+
+        Returns:
+            Any: スパン
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        span = Span(self, name, CURRENT_SPAN.get() or self.root, attributes)
+        if self.root is None:
+            self.root = span
+        return span
+
+    def finish(self, span: Span) -> None:
+        """finish 終了したスパンを登録する
+
+        Args:
+            span (Span): スパン
+        """
+        with self.lock:
+            self.spans.append(span)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """to_otlp OTLP/JSON形式(ExportTraceServiceRequest)のトレースを取得
+
+        Returns:
+            Dict[str, Any]: OTLP/JSON形式のトレース
+        """
+        with self.lock:
+            spans = sorted(self.spans, key=lambda x: x.start_time)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [to_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [span.to_otlp(self.trace_id) for span in spans]}]
+        }]}
+
+    def export(self, path: Path) -> None:
+        """export トレースをファイルに追記する
+
+        OpenTelemetry Collectorのfile exporterと同じく、1回の実行分を1行のJSONとして追記する
+
+        Args:
+            path (Path): 出力先ファイルのパス
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_otlp(), ensure_ascii=False) + "\n")
+
+
+def to_otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """to_otlp_attribute スパン属性をOTLP/JSON形式に変換
+
+    Args:
+        key (str): 属性名
+        value (Any): 属性値
+
+    Returns:
+        Dict[str, Any]: OTLP/JSON形式の属性
+    """
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# 共通トレーサー(--trace指定時のみ収集を開始する)
+TRACER = Tracer()
@@ -0,0 +1,162 @@
+import gzip
+import itertools
+import os
+from pathlib import Path
+import time
+from typing import IO, Dict, List, NamedTuple, Optional
+
+# 定数宣言
+# 1レコード(1コマンドの受信データ)あたりの記録上限(バイト)
+COMMAND_CAP = 4 * 1024 * 1024
+# 1セッションあたりの記録上限(バイト)
+SESSION_CAP = 64 * 1024 * 1024
+# ログに出力するプレビューの長さ(バイト)
+PREVIEW_SIZE = 256
+# 圧縮レベル(受信処理を遅延させないよう速度優先)
+COMPRESS_LEVEL = 1
+# スプールファイル・インデックスファイルの拡張子
+(SPOOL_SUFFIX, INDEX_SUFFIX) = (".spool.gz", ".idx")
+# インデックスファイルの項目(タブ区切り)
+INDEX_FIELDS = ("seq", "offset", "length", "size", "stored", "label")
+
+# スプールファイル名の重複防止用の連番
+_spool_counter = itertools.count(1)
+
+
+class TranscriptRef(NamedTuple):
+    """TranscriptRef スプール済み受信データの参照
+
+    ログには受信データの代わりに本参照を出力します
+    """
+    spool: str
+    seq: int
+    size: int
+    stored: int
+    preview: bytes
+
+    def __str__(self) -> str:
+        truncated = "" if self.stored == self.size else f" (stored {self.stored})"
+        return f"transcript={self.spool}#{self.seq} size={self.size}{truncated} preview={self.preview!r}"
+
+
+class TranscriptSpool(object):
+    """TranscriptSpool NFセッションの受信データ記録(圧縮スプール)
+
+    1セッションの受信データを1つのスプールファイルに、1レコード毎に独立したgzipメンバーとして追記します
+    (スプールファイル全体もgzip形式として展開できます)
+    各レコードの位置はインデックスファイルに記録し、read_recordで1レコードのみを展開できます
+    記録量はレコード毎・セッション毎の上限で打ち切り、打ち切ったバイト数はインデックスに残します
+    スプールファイルは最初のレコード記録時に作成します
+    """
+
+    def __init__(self,
+                 nf_name: str,
+                 spool_dir: Path,
+                 command_cap: int = COMMAND_CAP,
+                 session_cap: int = SESSION_CAP,
+                 preview_size: int = PREVIEW_SIZE) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+            spool_dir (Path): スプールファイルの出力先ディレクトリ
+            command_cap (int, optional): 1レコードあたりの記録上限(バイト). Defaults to COMMAND_CAP.
+            session_cap (int, optional): 1セッションあたりの記録上限(バイト). Defaults to SESSION_CAP.
+            preview_size (int, optional): プレビューの長さ(バイト). Defaults to PREVIEW_SIZE.
+        """
+        self.nf_name = nf_name
+        self.spool_dir = Path(spool_dir)
+        self.command_cap = command_cap
+        self.session_cap = session_cap
+        self.preview_size = preview_size
+        self.path: Optional[Path] = None
+        self.seq = 0
+        self.stored = 0
+        self._spool: Optional[IO[bytes]] = None
+        self._index: Optional[IO[str]] = None
+
+    def record(self, label: str, data: bytes) -> TranscriptRef:
+        """record 受信データ記録
+
+        Args:
+            label (str): レコードの見出し(投入コマンドなど)
+            data (bytes): 受信データ
+
+        Returns:
+            TranscriptRef: 記録した受信データの参照
+        """
+        if self._spool is None:
+            self._open()
+        self.seq += 1
+        size = len(data)
+        stored = data[:max(min(self.command_cap, self.session_cap - self.stored), 0)]
+        offset = self._spool.tell()
+        length = 0
+        if stored:
+            member = gzip.compress(stored, compresslevel=COMPRESS_LEVEL)
+            self._spool.write(member)
+            self._spool.flush()
+            length = len(member)
+            self.stored += len(stored)
+        # 見出しはタブ・改行を含まないよう置換する
+        label = " ".join(str(label or "").split())
+        self._index.write(f"{self.seq}\t{offset}\t{length}\t{size}\t{len(stored)}\t{label}\n")
+        self._index.flush()
+        return TranscriptRef(self.path.name, self.seq, size, len(stored), bytes(data[:self.preview_size]))
+
+    def close(self) -> None:
+        """close スプールファイル・インデックスファイルを閉じる
+        """
+        for f in (self._spool, self._index):
+            if f is not None:
+                f.close()
+        (self._spool, self._index) = (None, None)
+
+    def _open(self) -> None:
+        """_open スプールファイル・インデックスファイル作成
+        """
+        os.makedirs(self.spool_dir, exist_ok=True)
+        name = f"{self.nf_name}_{time.strftime('%Y%m%d%H%M%S')}_{os.getpid()}_{next(_spool_counter)}"
+        self.path = self.spool_dir.joinpath(name + SPOOL_SUFFIX)
+        self._spool = open(self.path, "ab")
+        self._index = open(self.spool_dir.joinpath(name + INDEX_SUFFIX), "a", encoding="utf-8")
+
+
+def read_index(spool_path: Path) -> List[Dict[str, str]]:
+    """read_index インデックス読み込み
+
+    Args:
+        spool_path (Path): スプールファイルのパス
+
+    Returns:
+        List[Dict[str, str]]: レコード毎のインデックス(INDEX_FIELDS参照)
+    """
+    spool_path = Path(spool_path)
+    index_path = spool_path.with_name(spool_path.name[:-len(SPOOL_SUFFIX)] + INDEX_SUFFIX)
+    with open(index_path, "r", encoding="utf-8") as f:
+        return [dict(zip(INDEX_FIELDS, line.rstrip("\n").split("\t"))) for line in f]
+
+
+def read_record(spool_path: Path, seq: int) -> bytes:
+    """read_record 1レコードの受信データ読み込み
+
+    Args:
+        spool_path (Path): スプールファイルのパス
+        seq (int): レコード番号
+
+    Raises:
+        KeyError: レコード番号がインデックスにない場合
+
+    Returns:
+        bytes: 記録した受信データ(記録上限で打ち切った場合は先頭部分のみ)
+    """
+    for entry in read_index(spool_path):
+        if int(entry["seq"]) == seq:
+            break
+    else:
+        raise KeyError(seq)
+    if int(entry["length"]) == 0:
+        return b""
+    with open(spool_path, "rb") as f:
+        f.seek(int(entry["offset"]))
+        return gzip.decompress(f.read(int(entry["length"])))
@@ -0,0 +1,83 @@
+import heapq
+import time
+from typing import Iterable
+
+
+class SystemClock(object):
+    """SystemClock 実時間の時計
+
+    時刻取得・待ち合わせをtimeモジュールで行う
+    """
+    virtual = False
+    """仮想時計か"""
+
+    def monotonic(self) -> float:
+        """monotonic 現在時刻(単調増加)を取得
+
+        Returns:
+            float: 現在時刻(秒)
+        """
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """sleep 待ち合わせ
+
+        Args:
+            seconds (float): 待ち合わせ時間(秒)
+        """
+        time.sleep(seconds)
+
+
+class VirtualClock(object):
+    """VirtualClock 仮想時計
+
+    待ち合わせは実際には待たずに仮想時刻を進める
+    スタブ実行時に、NF毎の処理の所要時間を実時間を掛けずに見積もるために利用する
+    1つのインスタンスは1つのプロセス(1NF)の処理でのみ利用する(スレッド間で共有しない)
+    """
+    virtual = True
+    """仮想時計か"""
+
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        self.elapsed = 0.0
+
+    def monotonic(self) -> float:
+        """monotonic 仮想時刻を取得
+
+        Returns:
+            float: 生成時からの仮想経過時間(秒)
+        """
+        return self.elapsed
+
+    def sleep(self, seconds: float) -> None:
+        """sleep 仮想時刻を進める
+
+        Args:
+            seconds (float): 待ち合わせ時間(秒)
+        """
+        if seconds > 0:
+            self.elapsed += seconds
+
+
+# 実時間の時計(既定)
+SYSTEM_CLOCK = SystemClock()
+
+
+def simulate_makespan(durations: Iterable[float], parallel: int) -> float:
+    """simulate_makespan 並行実行時の全体の所要時間を見積もる
+
+    NF順に、最初に空いたワーカーへ割り当てる(ワーカープール・セマフォと同じ割り当て順)
+
+    Args:
+        durations (Iterable[float]): NF順の各プロセスの所要時間(秒)
+        parallel (int): 同時実行数
+
+    Returns:
+        float: 全体の所要時間(秒)
+    """
+    workers = [0.0] * max(parallel, 1)
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
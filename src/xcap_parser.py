@@ -0,0 +1,61 @@
+import re
+from typing import Dict, Iterable, Iterator, List
+
+# 定数宣言
+# xCAP設定の解析方式(native: 本モジュールの専用パーサ、textfsm: xCAPテンプレート(専用パーサの代替))
+XCAP_PARSER_NATIVE = "native"
+XCAP_PARSER_TEXTFSM = "textfsm"
+XCAP_PARSER = XCAP_PARSER_NATIVE
+# xCAP設定の1行(xcap_template.textfsmの各ルールを1つの正規表現にまとめたもの)
+#   ^\s+ipv6-name-server\s+${ipaddr}$$ / ^\s+priority\s+${priority}$$ / ^\s!$$ -> Record
+XCAP_LINE = re.compile(r"\s(?:(?P<record>!)"
+                       r"|\s*ipv6-name-server\s+(?P<ipaddr>[0-9a-fA-F:]+:[0-9a-fA-F:]+)"
+                       r"|\s*priority\s+(?P<priority>\d+))$")
+
+
+def iter_xcap(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """iter_xcap xCAP設定の行を順に解析し、ipv6-name-serverブロック毎のipaddr・priorityを取得する
+
+    xCAPテンプレート(xcap_template.textfsm)と同じ結果となる
+        ・" !"の行、または入力の終端で、ipaddrがある場合のみ1件とし、ipaddr・priorityをクリアする
+        ・priorityがない場合は空文字とする
+    状態は呼び出し毎に保持するため、複数スレッドから同時に呼び出せる
+
+    Args:
+        lines (Iterable[str]): 改行文字を除いたxCAP設定の行
+
+    Yields:
+        Iterator[Dict[str, str]]: {"ipaddr": ipaddr, "priority": priority}
+    """
+    match = XCAP_LINE.match
+    ipaddr = None
+    priority = ""
+    for line in lines:
+        m = match(line)
+        if m is None:
+            continue
+        kind = m.lastgroup
+        if kind == "ipaddr":
+            ipaddr = m.group("ipaddr")
+        elif kind == "priority":
+            priority = m.group("priority")
+        else:
+            if ipaddr is not None:
+                yield {"ipaddr": ipaddr, "priority": priority}
+            (ipaddr, priority) = (None, "")
+    if ipaddr is not None:
+        yield {"ipaddr": ipaddr, "priority": priority}
+
+
+def parse_xcap(text: str) -> List[Dict[str, str]]:
+    """parse_xcap NFから取得したxCAP設定を解析する
+
+    行分割はxCAPテンプレート(TextFSM)と同じくstr.splitlinesで行う
+
+    Args:
+        text (str): xCAP設定
+
+    Returns:
+        List[Dict[str, str]]: xCAP設定毎のipaddr・priority
+    """
+    return list(iter_xcap(text.splitlines()))
@@ -0,0 +1,247 @@
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from src import xcap_parser
+
+# 定数宣言
+# スナップショットキャッシュディレクトリ
+CACHE_DIR = Path(__file__).resolve().parent.parent.joinpath("cache")
+# スナップショットキャッシュファイル(スタブモードは実機の取得結果と混在しないよう別ファイルとする)
+SNAPSHOT_FILE = CACHE_DIR.joinpath("xcap_snapshot.json")
+SNAPSHOT_STUB_FILE = CACHE_DIR.joinpath("xcap_snapshot_stub.json")
+# スナップショットキャッシュファイルの形式バージョン
+SNAPSHOT_VERSION = 1
+# スナップショットの有効期間(秒)
+SNAPSHOT_TTL = 300.0
+# スナップショットの取得コマンド
+SHOW_COMMAND = "show running-config epg pgw apn xcap ipv6-name-server"
+# スナップショット取得前の事前コマンド
+PRE_COMMAND = "screen-length 0"
+
+
+def snapshot_path(stub: bool = False) -> Path:
+    """snapshot_path スナップショットキャッシュファイルのパスを取得
+
+    Args:
+        stub (bool, optional): スタブモードの場合True. Defaults to False.
+
+    Returns:
+        Path: スナップショットキャッシュファイルのパス
+    """
+    return SNAPSHOT_STUB_FILE if stub else SNAPSHOT_FILE
+
+
+def parse_xcap(raw: str) -> List[Dict[str, str]]:
+    """parse_xcap xCAP設定を解析する(xCAPテンプレートと同じ結果となる専用パーサを利用する)
+
+    Args:
+        raw (str): NFから取得したxCAP設定
+
+    Returns:
+        List[Dict[str, str]]: xCAP設定毎のipaddr・priority
+    """
+    return xcap_parser.parse_xcap(raw)
+
+
+def make_snapshot(raw: str, collected_at: float = None) -> Dict[str, Any]:
+    """make_snapshot NFから取得したxCAP設定からスナップショットを生成する
+
+    Args:
+        raw (str): NFから取得したxCAP設定
+        collected_at (float, optional): 取得日時(エポック秒). Defaults to 現在日時.
+
+    Returns:
+        Dict[str, Any]: スナップショット
+    """
+    return {"collected_at": time.time() if collected_at is None else collected_at, "raw": raw, "xcap": parse_xcap(raw)}
+
+
+class SnapshotCache(object):
+    """SnapshotCache NF毎のxCAPスナップショットのキャッシュファイル
+
+    キャッシュ形式:
+        {"version": SNAPSHOT_VERSION,
+         "snapshots": {NF名: {"collected_at": 取得日時(エポック秒), "raw": 取得結果,
+                              "xcap": [{"ipaddr": ipaddr, "priority": priority}, ...]}, ...}}
+    複数の運用者が同時に実行しても読込途中のファイルを読まないよう、一時ファイルに書き込んでから置き換える
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_FILE) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            path (Path, optional): キャッシュファイルのパス. Defaults to SNAPSHOT_FILE.
+        """
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """load キャッシュファイルを読み込む
+
+        キャッシュファイルがない、または解析できない場合は空とする
+
+        Returns:
+            Dict[str, Dict[str, Any]]: NF名をキーとしたスナップショット
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cache: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != SNAPSHOT_VERSION:
+            return {}
+        return cache.get("snapshots", {})
+
+    def get_fresh(self, nf_names: List[str], ttl: float, now: float = None) -> Dict[str, Dict[str, Any]]:
+        """get_fresh 有効期間内のスナップショットを取得する
+
+        Args:
+            nf_names (List[str]): NF名リスト
+            ttl (float): 有効期間(秒)
+            now (float, optional): 現在日時(エポック秒). Defaults to 現在日時.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: NF名をキーとした有効期間内のスナップショット(有効期間切れ・未取得のNFは含まない)
+        """
+        now = time.time() if now is None else now
+        snapshots = self.load()
+        return {nf_name: snapshots[nf_name] for nf_name in nf_names
+                if nf_name in snapshots and 0 <= now - snapshots[nf_name]["collected_at"] <= ttl}
+
+    def update(self, snapshots: Dict[str, Dict[str, Any]]) -> None:
+        """update スナップショットをキャッシュファイルに反映する
+
+        キャッシュファイルの他NFのスナップショットは保持し、取得日時が新しいスナップショットのみ置き換える
+
+        Args:
+            snapshots (Dict[str, Dict[str, Any]]): NF名をキーとしたスナップショット
+        """
+        with self.lock:
+            merged = self.load()
+            for (nf_name, snapshot) in snapshots.items():
+                if nf_name not in merged or merged[nf_name]["collected_at"] <= snapshot["collected_at"]:
+                    merged[nf_name] = snapshot
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": SNAPSHOT_VERSION, "snapshots": merged}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def fetch_snapshot(client: Any) -> Dict[str, Any]:
+    """fetch_snapshot 1NFからxCAP設定を取得してスナップショットを生成する
+
+    Args:
+        client (Any): 接続クライアント(NFShellClientと同じAPI)
+
+    Returns:
+        Dict[str, Any]: スナップショット
+    """
+    try:
+        client.connect()
+        client.command(PRE_COMMAND)
+        raw = client.command(SHOW_COMMAND).decode()
+    finally:
+        client.close()
+    return make_snapshot(raw)
+
+
+def collect_snapshots(nf_names: List[str], client_factory: Callable[[str], Any],
+                      parallel: int = 1) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """collect_snapshots 全NFのxCAPスナップショットを並行して取得する
+
+    Args:
+        nf_names (List[str]): NF名リスト
+        client_factory (Callable[[str], Any]): NF名から接続クライアントを生成する関数
+        parallel (int, optional): 同時実行数. Defaults to 1.
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]: NF名をキーとした取得できたスナップショット、取得に失敗したNFのエラー内容
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fetch(nf_name: str) -> Dict[str, Any]:
+        return fetch_snapshot(client_factory(nf_name))
+
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(nf_names))), thread_name_prefix="snapshot") as executor:
+        futures = {nf_name: executor.submit(fetch, nf_name) for nf_name in nf_names}
+        for (nf_name, future) in futures.items():
+            try:
+                snapshots[nf_name] = future.result()
+            except Exception as e:
+                errors[nf_name] = f"{e.__class__.__name__} {e}"
+    return (snapshots, errors)
+
+
+class SnapshotShellClient(object):
+    """SnapshotShellClient スナップショットを返す接続クラス
+
+    NFShellClientと同じAPIで、xCAP設定の確認コマンドにスナップショットの取得結果を返す
+    NFには接続しないため、設定変更(設定モード移行)はできない
+    """
+
+    def __init__(self, nf_name: str, snapshot: Dict[str, Any]) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            nf_name (str): NFノード名
+            snapshot (Dict[str, Any]): スナップショット
+        """
+        self.nf_name = nf_name
+        self.snapshot = snapshot
+
+    def connect(self) -> None:
+        """connect 接続開始(何もしない)
+        """
+        pass
+
+    def close(self) -> None:
+        """close 切断処理(何もしない)
+        """
+        pass
+
+    def enter_config_mode(self) -> None:
+        """enter_config_mode 設定モード移行
+
+        Raises:
+            ValueError: スナップショットでは設定変更できないため常に送出
+        """
+        raise ValueError(f"snapshot is read-only. nf_name: {self.nf_name}")
+
+    def exit_config_mode(self, forced=False) -> None:
+        """exit_config_mode 設定モード解除(何もしない)
+
+        Args:
+            forced (bool, optional): 設定モードの強制終了
+        """
+        pass
+
+    def abort(self) -> None:
+        """abort 設定モード強制終了(何もしない)
+        """
+        pass
+
+    def command(self, command: str, timeout: float = 15.0) -> bytes:
+        """command コマンド投入
+
+        Args:
+            command (str): 投入コマンド
+            timeout (float, optional): タイムアウト(利用しない). Defaults to 15.0.
+
+        Raises:
+            ValueError: xCAP設定の確認コマンド・事前コマンド以外の場合
+
+        Returns:
+            bytes: xCAP設定の確認コマンドの場合はスナップショットの取得結果、事前コマンドの場合は空
+        """
+        if command == SHOW_COMMAND:
+            return self.snapshot["raw"].encode()
+        if command == PRE_COMMAND:
+            return b""
+        raise ValueError(f"command is not in the snapshot. nf_name: {self.nf_name}, command: {command}")
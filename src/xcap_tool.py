@@ -2,15 +2,25 @@ import argparse
 from enum import Enum
 import ipaddress
 from json import JSONDecodeError
-import json
 from pathlib import Path
 import sys
-from typing import Any, Dict, List, Set, Tuple
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple
 
 from xgnlog.Log import Level, Log
 
-from src.abc_process import Mode, ProcessStatus, SoutSeverity, logtime
-from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+# NFに接続するモジュール(paramiko・textfsm・asyncio等を読み込む)は、LIST/INFO等で起動を遅くしないよう利用するメソッド内でインポートする
+from src.abc_process import CONVERGE_TIMEOUT, Mode, ProcessStatus, SoutSeverity, logtime
+from src.config_store import CONFIG_STORE, validate_edns_infos, validate_nf_infos
+from src.metrics import ProcessMetrics
+from src.topology import TopologyIndex, load_topology
+from src.tracing import TRACER
+from src.vclock import VirtualClock, simulate_makespan
+from src.xcap_parser import XCAP_PARSER, XCAP_PARSER_NATIVE, XCAP_PARSER_TEXTFSM
+from src.xcap_snapshot import SNAPSHOT_TTL, SnapshotCache, SnapshotShellClient, collect_snapshots, make_snapshot, snapshot_path
+
+if TYPE_CHECKING:
+    import asyncio
 
 
 # 定数宣言
@@ -23,6 +33,8 @@ LOGGER = Log(JOB_ID, Level.DEBUG)
 LOCAL_CONFIG_DIR = Path(__file__).resolve().parent.parent.joinpath("config")
 TOOL_CONF = LOCAL_CONFIG_DIR.joinpath("xcap-tool.json")
 REQUIRED_KEYS = (NF_INFOS, EDNS_INFOS) = ("nf_infos", "edns_infos")
+# 対象ノード情報毎の検証関数
+VALIDATORS = {NF_INFOS: validate_nf_infos, EDNS_INFOS: validate_edns_infos}
 
 # 実行モード不明
 MODE_UNKNOWN = "UNKNOWN"
@@ -58,6 +70,14 @@ class XcapTool(object):
 
     """
 
+    def __init__(self) -> None:
+        """__init__ インスタンス生成
+        """
+        # NF名をキーとした、SHOW/INFOで利用する有効期間内のxCAPスナップショット
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        # 対象ノード情報の索引
+        self.topology: TopologyIndex = None
+
     def sout_message(self, severity: SoutSeverity, body: str, mode: Mode = "", alias: str = "", nf_name: str = None):
         """標準出力に指定した重大度のメッセージを既定のフォーマットで出力する
 
@@ -98,6 +118,33 @@ class XcapTool(object):
                 raise ArgumentParserError("Argument is None, null string or blank only.")
             return val
 
+        def positive_int(val: str):
+            try:
+                ret = int(val)
+            except ValueError:
+                raise ArgumentParserError(f"Argument is not integer. [{val}]")
+            if ret < 1:
+                raise ArgumentParserError(f"Argument must be 1 or more. [{val}]")
+            return ret
+
+        def positive_float(val: str):
+            try:
+                ret = float(val)
+            except ValueError:
+                raise ArgumentParserError(f"Argument is not number. [{val}]")
+            if not ret > 0:
+                raise ArgumentParserError(f"Argument must be greater than 0. [{val}]")
+            return ret
+
+        def non_negative_float(val: str):
+            try:
+                ret = float(val)
+            except ValueError:
+                raise ArgumentParserError(f"Argument is not number. [{val}]")
+            if ret < 0:
+                raise ArgumentParserError(f"Argument must be 0 or more. [{val}]")
+            return ret
+
         def csv(val: str):
             ret: List = val.split(",")
             if "" in ret:
@@ -115,11 +162,27 @@ class XcapTool(object):
             if sys.argv[1] == Mode.list.value:
                 sys.argv.insert(1, NF_NONE)
             parser = ThrowingArgumentParser()
-            parser.add_argument("edns_name", help="target eDNS hostname", type=not_null_str)
+            parser.add_argument("edns_name", help="target eDNS hostname (comma separated to switch several eDNS in one run)", type=not_null_str)
             parser.add_argument("mode", help="exec MODE", choices=valid_mode_list, type=Mode)
             parser.add_argument("blocked_nflist", help="blocked nf name list", type=csv, nargs="?", default="")
             parser.add_argument("-b", "--batch", help="enable batch mode", action="store_true")
             parser.add_argument("-s", "--stub", help="stab mode", action="store_true")
+            parser.add_argument("-p", "--parallel", help="number of NFs processed concurrently", type=positive_int, default=1)
+            parser.add_argument("--agent", help="borrow NF sessions from the session agent listening on this UNIX socket", type=not_null_str, default=None)
+            parser.add_argument("-a", "--asyncio", help="process NFs on a single asyncio event loop (SSH handshakes still run on --parallel worker threads)", action="store_true")
+            parser.add_argument("--converge-timeout", help="seconds to wait for an xCAP change to be reflected before the post check", type=positive_float, default=CONVERGE_TIMEOUT)
+            parser.add_argument("--record", help="record NF sessions into this directory (one file per NF)", type=not_null_str, default=None)
+            parser.add_argument("--replay", help="replay NF sessions recorded by --record from this directory instead of connecting", type=not_null_str, default=None)
+            parser.add_argument("--replay-speed", help="replay timing multiplier (0 replays without waiting)", type=non_negative_float, default=1.0)
+            parser.add_argument("--vclock", help="with --stub, advance a virtual clock instead of sleeping and report the simulated elapsed time", action="store_true")
+            parser.add_argument("--metrics", help="write per-phase timings to this file (Prometheus textfile if it ends with .prom, JSON otherwise)", type=not_null_str, default=None)
+            parser.add_argument("--trace", help="append a trace of the run, NF processes and NF commands to this file (OTLP/JSON, one line per run)", type=not_null_str, default=None)
+            parser.add_argument("--collect", help="before SHOW/INFO, refresh the xCAP snapshot cache from every NF in nf-infos concurrently (--parallel)", action="store_true")
+            parser.add_argument("--fresh", help="ignore the xCAP snapshot cache and connect to the NFs in SHOW/INFO", action="store_true")
+            parser.add_argument("--xcap-parser", help="parser for the xCAP settings read from the NFs (textfsm: the TextFSM template, as a fallback)", choices=[XCAP_PARSER_NATIVE, XCAP_PARSER_TEXTFSM], default=XCAP_PARSER)
+            parser.add_argument("--profile", help="profile the run and write a cProfile dump and an import-time breakdown into the log directory", action="store_true")
+            parser.add_argument("--profile-memory", help="with --profile, also write a tracemalloc snapshot at the end of each process phase", action="store_true")
+            parser.add_argument("--snapshot-ttl", help="seconds an xCAP snapshot answers SHOW/INFO without connecting (0 disables the snapshot cache)", type=non_negative_float, default=SNAPSHOT_TTL)
 
             # 引数を判定し、取得した引数を格納する
             self.args: argparse.Namespace = parser.parse_args()
@@ -143,24 +206,26 @@ class XcapTool(object):
     def load_config(self) -> bool:
         """JSON設定ファイルを読み込む
 
+        設定ファイルは共通設定ストアから取得し、前回実行時から変更がない場合はコンパイル済みの設定バンドルから読み込む
+
         Returns:
             bool: 正常終了の場合True、異常終了の場合False
         """
         LOGGER.output_1st_log("I00105")
 
-        # ツール本体設定存在チェック&解析チェック
-        with open(TOOL_CONF, "r", encoding="utf-8") as f:
-            self.tool_conf: Dict[str, Dict[str, Any]] = json.load(f)
+        # ツール本体設定存在チェック&解析チェック(ストアの設定内容は共有のため、複製して対象ノード情報に置き換える)
+        self.tool_conf: Dict[str, Dict[str, Any]] = dict(CONFIG_STORE.get(TOOL_CONF))
 
         # nf-module設定、nf-type設定
+        file_paths: Dict[str, Path] = {}
         for key in REQUIRED_KEYS:
             try:
                 # 設定存在チェック&解析チェック
                 file_path: Path = None
                 file_path = LOCAL_CONFIG_DIR.joinpath(self.tool_conf[key])
-                # JSON読込
-                with open(file_path, "r", encoding="utf-8") as f:
-                    self.tool_conf[key] = json.load(f)
+                # JSON読込&検証
+                self.tool_conf[key] = CONFIG_STORE.get(file_path, VALIDATORS[key])
+                file_paths[key] = file_path
             except Exception as e:
                 LOGGER.output_1st_log("E00103", file_path)
 
@@ -196,6 +261,9 @@ class XcapTool(object):
                 self.sout_message(SoutSeverity.result, f"[ {ToolResult.ng} ]")
                 return False
 
+        # 対象ノード情報の索引(設定バンドルに保存し、対象ノード情報が変わった場合のみ生成し直す)
+        self.topology = load_topology(CONFIG_STORE, file_paths[NF_INFOS], file_paths[EDNS_INFOS])
+
         LOGGER.output_1st_log("I00106")
 
         return True
@@ -219,13 +287,18 @@ class XcapTool(object):
 
         for nf_name, value in self.smfvoice_configs.items():
             message = f"{nf_name.ljust(max_length_nfname)}: {value['xCAP']}"
+            # スナップショットがある場合は、スナップショット取得時点のNFのxCAP設定を表示
+            if nf_name in self.snapshots:
+                snapshot = self.snapshots[nf_name]
+                collected_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["collected_at"]))
+                message += f" current={[x['ipaddr'] for x in snapshot['xcap']]} (snapshot {collected_at})"
             target_info.append(message)
         # 上記で収集した情報を出力データに追加
         targets = f"\n{''.rjust(12)}".join(target_info)
 
         messages = ""
         messages += f"{'eDNS Name'.rjust(10)}: {self.args.edns_name}\n"
-        messages += f"{'IP ADDR'.rjust(10)}: {self.edns_ip_address}\n"
+        messages += f"{'IP ADDR'.rjust(10)}: {', '.join(self.edns_ip_addresses)}\n"
         messages += f"{'MODE'.rjust(10)}: {self.args.mode}\n"
         messages += f"{'COMMENT'.rjust(10)}: {DispMode[self.args.mode]}\n"
         messages += f"{'BLOCKED NF'.rjust(10)}: {blocked}\n"
@@ -235,9 +308,33 @@ class XcapTool(object):
         print(messages)
         LOGGER.output_1st_log("I00108", messages)
 
-    def get_edns_ipaddr(self) -> str:
+    def get_edns_names(self) -> List[str]:
+        """対象のeDNSホスト名リストを取得する
+
+        eDNSホスト名はカンマ区切りで複数指定でき、重複は指定順に除外する
+
+        Returns:
+            List[str]: eDNSホスト名リスト
+        """
+        return list(dict.fromkeys(x for x in self.args.edns_name.split(",") if x))
+
+    def get_edns_ipaddrs(self) -> List[str]:
+        """対象の全eDNSホスト名に紐づくIPアドレスを取得する
+
+        Raises:
+            Exception: いずれかのeDNSホスト名からIPアドレスの取得に失敗した場合
+
+        Returns:
+            List[str]: eDNSホスト名の指定順のeDNS IPアドレスリスト
+        """
+        return list(dict.fromkeys(self.get_edns_ipaddr(edns_name) for edns_name in self.get_edns_names()))
+
+    def get_edns_ipaddr(self, edns_name: str = None) -> str:
         """対象のeDNSホスト名に紐づくIPアドレスを取得する
 
+        Args:
+            edns_name (str, optional): eDNSホスト名. Defaults to 引数のeDNSホスト名.
+
         Raises:
             Exception: eDNSホスト名からIPアドレスの取得に失敗した場合
 
@@ -245,18 +342,19 @@ class XcapTool(object):
             str: eDNS IPアドレス
         """
         LOGGER.output_1st_log("I00109")
+        edns_name = edns_name or self.args.edns_name
         ipaddr: str = None
         try:
             # eDNS情報取得
-            ipaddr = self.tool_conf[EDNS_INFOS][self.args.edns_name]["ipaddr"]
+            ipaddr = self.get_topology().edns_ipaddr(edns_name)
             ipaddress.ip_address(ipaddr)
 
         except Exception as e:
             self.sout_message(SoutSeverity.error, "eDNS configuration not found.")
-            LOGGER.output_1st_log("E00104", self.args.edns_name)
+            LOGGER.output_1st_log("E00104", edns_name)
             LOGGER.output_2nd_log(Level.CRITICAL, "eDNS情報取得失敗:\n"
                                   "パラメータ:\n"
-                                  f" eDNS: {self.args.edns_name}\n"
+                                  f" eDNS: {edns_name}\n"
                                   f" INFO: {ipaddr}\n"
                                   f" Trace: {e.__class__.__name__} {e}")
             raise e
@@ -267,6 +365,8 @@ class XcapTool(object):
     def get_smfvoice_configs(self) -> Dict[str, Dict[str, List[str]]]:
         """eDNS IPアドレスを元に対象となるSMFvのツール設定情報を取得する
 
+        複数eDNSの場合は、いずれかのeDNS IPアドレスを含むSMFvを対象とする
+
         Raises:
             ValueError: 指定されたeDNS IPアドレスを含むSMFv NFの設定がない場合
             Exception: 何らかの異常が発生した場合
@@ -279,7 +379,8 @@ class XcapTool(object):
         filtered_dict: Dict[str, Dict[str, List[str]]]
 
         try:
-            filtered_dict = dict(filter(lambda item: self.edns_ip_address in item[1]["xCAP"], self.tool_conf[NF_INFOS].items()))
+            nf_infos = self.tool_conf[NF_INFOS]
+            filtered_dict = {nf_name: nf_infos[nf_name] for nf_name in self.get_topology().find_nfs(ipaddrs=self.edns_ip_addresses)}
             # 設定が空の場合
             if not any(filtered_dict):
                 raise ValueError("filtered_list is empty.")
@@ -298,10 +399,61 @@ class XcapTool(object):
         LOGGER.output_1st_log("I00112", filtered_dict)
         return filtered_dict
 
+    def get_topology(self) -> TopologyIndex:
+        """対象ノード情報の索引を取得する
+
+        load_configで取得した索引がない場合は、対象ノード情報から生成する(索引は参照時に生成する)
+
+        Returns:
+            TopologyIndex: 対象ノード情報の索引
+        """
+        if self.topology is None:
+            self.topology = TopologyIndex(self.tool_conf.get(NF_INFOS), self.tool_conf.get(EDNS_INFOS))
+        return self.topology
+
     def main(self) -> bool:
         """main メイン処理
 
         xCAPツールメイン処理
+        プロファイル指定時(--profile)は、メイン処理全体を計測し、終了後に計測結果をログディレクトリへ出力する
+
+        Returns:
+            bool: 成功の場合True、異常発生の場合Falseとなる
+        """
+        if not self.args.profile:
+            return self.run_traced()
+        from src.profiling import RunProfiler, make_run_id
+        profiler = RunProfiler(Path(LOGGER.logdir_2nd), make_run_id(), self.args.profile_memory)
+        profiler.start()
+        try:
+            return self.run_traced()
+        finally:
+            profiler.stop()
+            self.export_profile(profiler)
+
+    def run_traced(self) -> bool:
+        """run_traced メイン処理(トレース収集)
+
+        トレース指定時(--trace)は、メイン処理全体をルートスパンとしてトレースを収集し、終了後にファイルへ出力する
+
+        Returns:
+            bool: 成功の場合True、異常発生の場合Falseとなる
+        """
+        if not self.args.trace:
+            return self.run_main()
+        TRACER.start()
+        try:
+            with TRACER.span("xcap_tool.main", edns_name=self.args.edns_name, mode=self.args.mode.name,
+                             stub=bool(self.args.stub), parallel=self.args.parallel) as span:
+                result = self.run_main()
+                span.set_status(result)
+        finally:
+            TRACER.stop()
+            self.export_trace()
+        return result
+
+    def run_main(self) -> bool:
+        """run_main メイン処理本体
 
         Returns:
             bool: 成功の場合True、異常発生の場合Falseとなる
@@ -324,8 +476,8 @@ class XcapTool(object):
             return True
 
         try:
-            # 対象eDNSホスト名からip addrを取得する
-            self.edns_ip_address: str = self.get_edns_ipaddr()
+            # 対象eDNSホスト名(複数指定可)からip addrを取得する
+            self.edns_ip_addresses: List[str] = self.get_edns_ipaddrs()
             # 対象eDNSホストのip addrが設定可能なSMFv設定を取得
             self.smfvoice_configs: Dict[str, Dict[str, List[str]]] = self.get_smfvoice_configs()
         except Exception:
@@ -334,6 +486,9 @@ class XcapTool(object):
             LOGGER.output_1st_log("I00114")
             return False
 
+        # SHOW/INFOは有効期間内のxCAPスナップショットがあるNFについてスナップショットから応答する
+        self.snapshots = self.load_snapshots()
+
         # 対象内容を表示
         self.info()
 
@@ -366,24 +521,11 @@ class XcapTool(object):
         # 障害NFリストに含まれるeDNSホスト名を取得
         failed_edns_set: Set[str] = set(self.tool_conf[EDNS_INFOS].keys()) & set(self.args.blocked_nflist)
 
-        for nf_name, config in self.smfvoice_configs.items():
-
-            # # SMFv設定内に障害NFリストに含まれるeDNSホスト名のIPアドレスがある場合、対象を削除する
-            # for failed_edns in failed_edns_set:
-            #     failed_edns_ipaddr = self.tool_conf[EDNS_INFOS][failed_edns]["ipaddr"]
-            #     if failed_edns_ipaddr in config["xCAP"]:
-            #         config["xCAP"].remove(failed_edns_ipaddr)
+        # NF毎のプロセスを実行し、NF設定順に結果を集計する
+        process_results: Dict[str, ProcessStatus] = self.run_processes()
 
-            process = EriSmfvoXCAPProcess(self.args.edns_name,
-                                          nf_name,
-                                          self.args.mode,
-                                          self.edns_ip_address,
-                                          config["xCAP"],
-                                          self.args.stub,
-                                          "T23AJ003")
-
-            # プロセス実行
-            process_result = process.run()
+        for nf_name in self.smfvoice_configs.keys():
+            process_result = process_results[nf_name]
 
             # 何らかのNGとなった場合
             if (process_result & ProcessStatus.ng):
@@ -414,11 +556,378 @@ class XcapTool(object):
         LOGGER.output_1st_log("I00121", blocked_nf_list)
         LOGGER.output_1st_log("I00122", result)
 
+        # SHOWでNFに接続して取得したxCAP設定をスナップショットとして保存する(保存に失敗してもツールの結果は変えない)
+        if self.args.mode == Mode.show and self.is_snapshot_enabled():
+            live_snapshots = {nf_name: make_snapshot(self.processes[nf_name].status_result)
+                              for nf_name in self.smfvoice_configs.keys()
+                              if nf_name not in self.snapshots and self.processes[nf_name].status_result is not None}
+            if live_snapshots:
+                self.store_snapshots(live_snapshots)
+
+        # フェーズ毎の所要時間を出力する(出力に失敗してもツールの結果は変えない)
+        if self.args.metrics:
+            self.export_metrics(process_results)
+
         print(f"End Time: {logtime()}", file=sys.stdout)
 
+        # 仮想時計で実行した場合は、模擬所要時間を表示する
+        if self.clocks:
+            simulated = simulate_makespan([self.clocks[nf_name].elapsed for nf_name in self.smfvoice_configs.keys()],
+                                          min(self.args.parallel, len(self.smfvoice_configs)))
+            print(f"Simulated Elapsed: {simulated:.3f}s", file=sys.stdout)
+            LOGGER.output_1st_log("I00124", f"{simulated:.3f}s")
+
         LOGGER.output_1st_log("I00114")
         return False if result == ToolResult.ng else True
 
+    def is_snapshot_enabled(self) -> bool:
+        """xCAPスナップショットキャッシュを利用するか判定する
+
+        有効期間(--snapshot-ttl)が0の場合、--replay・--record指定時はNFのセッションを再現・記録するため利用しない
+
+        Returns:
+            bool: 利用する場合True
+        """
+        return self.args.snapshot_ttl > 0 and not self.args.replay and not self.args.record
+
+    def load_snapshots(self) -> Dict[str, Dict[str, Any]]:
+        """SHOW/INFOで利用する有効期間内のxCAPスナップショットを取得する
+
+        --collect指定時は、先にnf-infosの全NFのスナップショットを取得してキャッシュを更新し、取得結果を利用する
+        --fresh指定時はキャッシュを利用しない
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 対象NFのうち、有効期間内のスナップショットがあるNFのスナップショット
+        """
+        if self.args.mode not in (Mode.show, Mode.info) or not self.is_snapshot_enabled():
+            return {}
+        if self.args.collect:
+            collected = self.collect_snapshots()
+            return {nf_name: collected[nf_name] for nf_name in self.smfvoice_configs.keys() if nf_name in collected}
+        if self.args.fresh:
+            return {}
+        cache = SnapshotCache(snapshot_path(self.args.stub))
+        LOGGER.output_1st_log("I00129", cache.path)
+        snapshots = cache.get_fresh(list(self.smfvoice_configs.keys()), self.args.snapshot_ttl)
+        LOGGER.output_1st_log("I00130", list(snapshots.keys()))
+        return snapshots
+
+    def collect_snapshots(self) -> Dict[str, Dict[str, Any]]:
+        """nf-infosの全NFのxCAPスナップショットを並行して(--parallel)取得し、キャッシュを更新する
+
+        取得に失敗したNFはエラーを出力し、キャッシュの既存のスナップショットを保持する
+
+        Returns:
+            Dict[str, Dict[str, Any]]: NF名をキーとした取得できたスナップショット
+        """
+        nf_names: List[str] = list(self.tool_conf[NF_INFOS].keys())
+        LOGGER.output_1st_log("I00131", nf_names)
+        (snapshots, errors) = collect_snapshots(nf_names, self.get_snapshot_client, self.args.parallel)
+        for (nf_name, error) in errors.items():
+            self.sout_message(SoutSeverity.error, "failed to collect an xCAP snapshot.", nf_name=nf_name)
+            LOGGER.output_1st_log("E00108", nf_name)
+            LOGGER.output_2nd_log(Level.CRITICAL,
+                                  "xCAPスナップショット取得失敗:\n"
+                                  "パラメータ:\n"
+                                  f" NF名: {nf_name}\n"
+                                  f" Trace: {error}")
+        if snapshots:
+            self.store_snapshots(snapshots)
+        self.sout_message(SoutSeverity.info, f"collected xCAP snapshots. SUCCESS={len(snapshots)}, FAILED={len(errors)}")
+        LOGGER.output_1st_log("I00132", [list(snapshots.keys()), list(errors.keys())])
+        return snapshots
+
+    def store_snapshots(self, snapshots: Dict[str, Dict[str, Any]]) -> bool:
+        """xCAPスナップショットをキャッシュファイルに保存する
+
+        Args:
+            snapshots (Dict[str, Dict[str, Any]]): NF名をキーとしたスナップショット
+
+        Returns:
+            bool: 正常終了の場合True、異常終了の場合False
+        """
+        cache = SnapshotCache(snapshot_path(self.args.stub))
+        LOGGER.output_1st_log("I00133", cache.path)
+        try:
+            cache.update(snapshots)
+        except OSError as e:
+            self.sout_message(SoutSeverity.error, f"failed to store xCAP snapshots. file={cache.path}")
+            LOGGER.output_1st_log("E00109", cache.path)
+            LOGGER.output_2nd_log(Level.CRITICAL,
+                                  "xCAPスナップショット保存失敗:\n"
+                                  "パラメータ:\n"
+                                  f" ファイルパス: {cache.path}\n"
+                                  f" Trace: {e.__class__.__name__} {e}")
+            return False
+        LOGGER.output_1st_log("I00134", list(snapshots.keys()))
+        return True
+
+    def get_snapshot_client(self, nf_name: str) -> Any:
+        """xCAPスナップショットの取得に利用する接続クライアントを取得する
+
+        Args:
+            nf_name (str): SMFv NF名
+
+        Returns:
+            Any: 接続クライアント。エージェント指定時はエージェント経由、スタブモードの場合はスタブ
+        """
+        client = self.get_agent_client(nf_name)
+        if client is None:
+            if self.args.stub:
+                from src.eri_connection_stub import NFStubShellClient as StubClient
+                client = StubClient(Mode.show, nf_name, VirtualClock() if self.args.vclock else None)
+            else:
+                from src.eri_connection import NFShellClient
+                client = NFShellClient(nf_name)
+        return client
+
+    def export_metrics(self, process_results: Dict[str, ProcessStatus]) -> bool:
+        """NF毎のプロセスのフェーズ所要時間をメトリクスファイル(--metrics)に出力する
+
+        Args:
+            process_results (Dict[str, ProcessStatus]): NF名をキーとしたプロセスの完了ステータス
+
+        Returns:
+            bool: 正常終了の場合True、異常終了の場合False
+        """
+        LOGGER.output_1st_log("I00125", self.args.metrics)
+        metrics = ProcessMetrics()
+        for nf_name in self.smfvoice_configs.keys():
+            metrics.add(nf_name, self.args.mode.name, process_results[nf_name].name, self.processes[nf_name].phase_times)
+        try:
+            metrics.write(Path(self.args.metrics))
+        except OSError as e:
+            self.sout_message(SoutSeverity.error, f"failed to export metrics. file={self.args.metrics}")
+            LOGGER.output_1st_log("E00106", self.args.metrics)
+            LOGGER.output_2nd_log(Level.CRITICAL,
+                                  "メトリクス出力失敗:\n"
+                                  "パラメータ:\n"
+                                  f" ファイルパス: {self.args.metrics}\n"
+                                  f" Trace: {e.__class__.__name__} {e}")
+            return False
+        LOGGER.output_1st_log("I00126", self.args.metrics)
+        return True
+
+    def export_trace(self) -> bool:
+        """収集したトレースをトレースファイル(--trace)に追記する
+
+        Returns:
+            bool: 正常終了の場合True、異常終了の場合False
+        """
+        LOGGER.output_1st_log("I00127", self.args.trace)
+        try:
+            TRACER.export(Path(self.args.trace))
+        except OSError as e:
+            self.sout_message(SoutSeverity.error, f"failed to export trace. file={self.args.trace}")
+            LOGGER.output_1st_log("E00107", self.args.trace)
+            LOGGER.output_2nd_log(Level.CRITICAL,
+                                  "トレース出力失敗:\n"
+                                  "パラメータ:\n"
+                                  f" ファイルパス: {self.args.trace}\n"
+                                  f" Trace: {e.__class__.__name__} {e}")
+            return False
+        LOGGER.output_1st_log("I00128", self.args.trace)
+        return True
+
+    def export_profile(self, profiler: Any) -> bool:
+        """プロファイル(--profile)の計測結果をログディレクトリに出力し、累積時間上位の関数を障害切り分けログに出力する
+
+        Args:
+            profiler (RunProfiler): 計測を終了したプロファイラ
+
+        Returns:
+            bool: 正常終了の場合True、異常終了の場合False
+        """
+        from src.profiling import PROFILE_ERRORS
+        LOGGER.output_1st_log("I00135", profiler.run_id)
+        try:
+            paths = profiler.write()
+        except PROFILE_ERRORS as e:
+            self.sout_message(SoutSeverity.error, f"failed to export a profile. dir={profiler.log_dir}")
+            LOGGER.output_1st_log("E00110", profiler.run_id)
+            LOGGER.output_2nd_log(Level.CRITICAL,
+                                  "プロファイル出力失敗:\n"
+                                  "パラメータ:\n"
+                                  f" 実行ID: {profiler.run_id}\n"
+                                  f" ディレクトリ: {profiler.log_dir}\n"
+                                  f" Trace: {e.__class__.__name__} {e}")
+            return False
+        LOGGER.output_2nd_log(Level.INFO,
+                              "プロファイル結果:\n"
+                              "パラメータ:\n"
+                              f" 実行ID: {profiler.run_id}\n"
+                              f" ファイルパス: {[str(path) for path in paths]}\n"
+                              f" 累積時間上位:\n{profiler.summary()}")
+        LOGGER.output_1st_log("I00136", [str(path) for path in paths])
+        return True
+
+    def get_agent_client(self, nf_name: str, is_async: bool = False) -> Any:
+        """セッションエージェント指定時(--agent)に、エージェント経由の接続クライアントを取得する
+
+        Args:
+            nf_name (str): SMFv NF名
+            is_async (bool, optional): asyncio版プロセスで利用する場合True. Defaults to False.
+
+        Returns:
+            Any: 接続クライアント。エージェント未指定またはスタブモードの場合はNone
+        """
+        if not self.args.agent or self.args.stub:
+            return None
+        from src.session_agent import AgentShellClient
+        client = AgentShellClient(nf_name, self.args.agent)
+        if is_async:
+            from src.eri_connection_async import AsyncClientAdapter
+            client = AsyncClientAdapter(client)
+        return client
+
+    def get_client(self, nf_name: str, is_async: bool = False) -> Any:
+        """プロセスで利用する接続クライアントを取得する
+
+        --replay指定時はセッション記録の再生クライアント、SHOWで有効期間内のxCAPスナップショットがある場合はスナップショットを返すクライアント、
+        --record指定時(スタブモード以外)はセッションを記録するクライアント、それ以外はエージェント経由の接続クライアント(get_agent_client参照)を返す
+
+        Args:
+            nf_name (str): SMFv NF名
+            is_async (bool, optional): asyncio版プロセスで利用する場合True. Defaults to False.
+
+        Returns:
+            Any: 接続クライアント。プロセス既定のクライアントを利用する場合はNone
+        """
+        if self.args.replay:
+            from src.eri_connection_replay import ReplayShellClient
+            client = ReplayShellClient(nf_name, Path(self.args.replay).joinpath(f"{nf_name}.json"), self.args.replay_speed)
+        elif self.args.mode == Mode.show and nf_name in self.snapshots:
+            client = SnapshotShellClient(nf_name, self.snapshots[nf_name])
+        elif self.args.record and not self.args.stub:
+            from src.eri_connection_replay import RecordingNFShellClient
+            client = RecordingNFShellClient(nf_name, Path(self.args.record).joinpath(f"{nf_name}.json"))
+        else:
+            return self.get_agent_client(nf_name, is_async)
+        if is_async:
+            from src.eri_connection_async import AsyncClientAdapter
+            client = AsyncClientAdapter(client)
+        return client
+
+    def get_clock(self, nf_name: str) -> VirtualClock:
+        """仮想時計指定時(--vclock、スタブモードのみ)に、プロセスで利用する仮想時計を取得する
+
+        取得した仮想時計はNF名をキーとして保持し、実行後の模擬所要時間の算出に利用する
+
+        Args:
+            nf_name (str): SMFv NF名
+
+        Returns:
+            VirtualClock: 仮想時計。仮想時計を利用しない場合はNone
+        """
+        if not (self.args.vclock and self.args.stub) or self.args.replay:
+            return None
+        self.clocks[nf_name] = VirtualClock()
+        return self.clocks[nf_name]
+
+    def run_process(self, nf_name: str, config: Dict[str, List[str]]) -> ProcessStatus:
+        """1NFに対してxCAP IPアドレス参照・更新プロセスを実行する
+
+        Args:
+            nf_name (str): SMFv NF名
+            config (Dict[str, List[str]]): SMFvツール設定
+
+        Returns:
+            ProcessStatus: プロセスの完了ステータス
+        """
+        from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+        process = EriSmfvoXCAPProcess(self.args.edns_name,
+                                      nf_name,
+                                      self.args.mode,
+                                      self.edns_ip_addresses,
+                                      config["xCAP"],
+                                      self.args.stub,
+                                      "T23AJ003",
+                                      self.get_client(nf_name),
+                                      self.args.converge_timeout,
+                                      clock=self.get_clock(nf_name),
+                                      xcap_parser=self.args.xcap_parser)
+        self.processes[nf_name] = process
+
+        # プロセス実行
+        return process.run()
+
+    async def run_process_async(self, nf_name: str, config: Dict[str, List[str]], semaphore: "asyncio.Semaphore") -> ProcessStatus:
+        """1NFに対してxCAP IPアドレス参照・更新プロセスをコルーチンとして実行する
+
+        Args:
+            nf_name (str): SMFv NF名
+            config (Dict[str, List[str]]): SMFvツール設定
+            semaphore (asyncio.Semaphore): 同時実行数制御用セマフォ
+
+        Returns:
+            ProcessStatus: プロセスの完了ステータス
+        """
+        from src.eri_smfvo_xcap_async_process import AsyncEriSmfvoXCAPProcess
+        async with semaphore:
+            process = AsyncEriSmfvoXCAPProcess(self.args.edns_name,
+                                               nf_name,
+                                               self.args.mode,
+                                               self.edns_ip_addresses,
+                                               config["xCAP"],
+                                               self.args.stub,
+                                               "T23AJ003",
+                                               self.get_client(nf_name, True),
+                                               self.args.converge_timeout,
+                                               clock=self.get_clock(nf_name),
+                                               xcap_parser=self.args.xcap_parser)
+            self.processes[nf_name] = process
+
+            # プロセス実行
+            return await process.run_async()
+
+    async def run_processes_async(self, parallel: int) -> Dict[str, ProcessStatus]:
+        """対象となる全NFのプロセスを1つのイベントループ上で並行実行する
+
+        Args:
+            parallel (int): 同時実行数
+
+        Returns:
+            Dict[str, ProcessStatus]: NF名をキーとしたプロセスの完了ステータス
+        """
+        import asyncio
+        semaphore = asyncio.Semaphore(parallel)
+        results = await asyncio.gather(*[self.run_process_async(nf_name, config, semaphore)
+                                         for nf_name, config in self.smfvoice_configs.items()])
+        return dict(zip(self.smfvoice_configs.keys(), results))
+
+    def run_processes(self) -> Dict[str, ProcessStatus]:
+        """対象となる全NFのプロセスを実行する
+
+        同時実行数(--parallel)が1の場合はNF設定順に逐次実行し、
+        2以上の場合は同時実行数を上限としたワーカープールでNF毎のプロセスを並行実行する
+        --asyncio指定時は、同時実行数を上限として1つのイベントループ上でNF毎のプロセスを並行実行する
+        この場合もSSHの鍵交換・認証はブロッキング処理のため、同時実行数のワーカースレッドで実行する
+
+        Returns:
+            Dict[str, ProcessStatus]: NF名をキーとしたプロセスの完了ステータス
+        """
+        parallel: int = min(self.args.parallel, len(self.smfvoice_configs))
+        self.clocks: Dict[str, VirtualClock] = {}
+        self.processes: Dict[str, Any] = {}
+
+        if self.args.asyncio:
+            from src.eri_connection_async import run_event_loop
+            return run_event_loop(self.run_processes_async(max(parallel, 1)), max(parallel, 1))
+
+        if parallel <= 1:
+            return {nf_name: self.run_process(nf_name, config) for nf_name, config in self.smfvoice_configs.items()}
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="xcap") as executor:
+            futures = {nf_name: executor.submit(self.run_process, nf_name, config)
+                       for nf_name, config in self.smfvoice_configs.items()}
+            try:
+                return {nf_name: future.result() for nf_name, future in futures.items()}
+            except BaseException:
+                # 中断時(Ctrl+C等)は逐次実行と同様に未着手のNFを実行せず、実行中のNFの完了のみ待ち合わせる
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
 
 def interactive_check(message: str, continue_list: List[str], abort_list: List[str], case_sensitive: bool = False) -> Tuple[bool, str]:
     """interactive_check 実行継続チェック
@@ -0,0 +1,474 @@
+import socket
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+
+import paramiko
+
+# 既定のログインユーザ・パスワード
+DEFAULT_USERNAME = "kddiadmin"
+DEFAULT_PASSWORD = "kddiadmin"
+# 既定のホスト名(プロンプト表示用)
+DEFAULT_HOSTNAME = "eric-cm-yang-provider-standin"
+# 既定のxCAP ipv6-name-server設定
+DEFAULT_XCAP: List[Tuple[str, str]] = [
+    ("2001:268:200d:1010::6", "100"),
+    ("2001:268:200d:5010::6", "200")
+]
+# ログイン時のバナー
+BANNER = "\r\nWelcome to the Ericsson EPG CLI stand-in\r\n\r\n"
+# プロンプト前に付与されるANSIシーケンス
+ANSI_PREFIX = "\x1b[?7h"
+# 帯域制限時の送信単位(秒分の送信量毎に送信する)
+SEND_SLICE = 0.01
+
+# ホスト鍵(生成に時間がかかるためプロセス内で共有する)
+_HOST_KEY: paramiko.PKey = None
+_HOST_KEY_LOCK = threading.Lock()
+
+
+def get_host_key() -> paramiko.PKey:
+    """get_host_key スタンドイン用ホスト鍵取得
+
+    Returns:
+        paramiko.PKey: ホスト鍵
+    """
+    global _HOST_KEY
+    with _HOST_KEY_LOCK:
+        if _HOST_KEY is None:
+            _HOST_KEY = paramiko.RSAKey.generate(2048)
+        return _HOST_KEY
+
+
+class NodeState(object):
+    """NodeState スタンドインNFの設定状態
+
+    ログインユーザ名単位で保持し、同一ユーザのセッション間で共有する
+    """
+
+    def __init__(self, xcap: List[Tuple[str, str]]) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            xcap (List[Tuple[str, str]]): 初期状態のipv6-name-server設定(IPアドレス, 優先度)
+        """
+        self.lock = threading.Lock()
+        self.running: List[Tuple[str, str]] = list(xcap)
+        self.commit_count = 0
+        # 異常系試験用: 結果行を差し替えるコマンド(コマンド文字列の前方一致)
+        self.replies: Dict[str, List[str]] = {}
+        # 異常系試験用: プロンプトを返却しないコマンド(コマンド文字列の前方一致)
+        self.hangs: Set[str] = set()
+
+
+class EpgCliSession(object):
+    """EpgCliSession EPG CLIのシェルセッションを模擬する
+
+    1行入力毎にエコーバック、コマンド結果、プロンプトを返却する
+    """
+
+    def __init__(self,
+                 channel: paramiko.Channel,
+                 node: NodeState,
+                 username: str,
+                 hostname: str,
+                 latency: float = 0.0,
+                 bandwidth: int = 0) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            channel (paramiko.Channel): シェルチャネル
+            node (NodeState): NF設定状態
+            username (str): ログインユーザ名
+            hostname (str): ホスト名
+            latency (float, optional): ログイン・コマンド毎の応答遅延(秒). Defaults to 0.0.
+            bandwidth (int, optional): 送信帯域(バイト/秒、0の場合は制限なし). Defaults to 0.
+        """
+        self.channel = channel
+        self.node = node
+        self.username = username
+        self.hostname = hostname
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.candidate: List[Tuple[str, str]] = None
+
+    @property
+    def is_config_mode(self) -> bool:
+        """設定モード中かどうか
+
+        Returns:
+            bool: 設定モード中ならTrue
+        """
+        return self.candidate is not None
+
+    def prompt(self) -> str:
+        """現在のモードに応じたプロンプトを取得
+
+        Returns:
+            str: プロンプト文字列
+        """
+        mode = "(config)" if self.is_config_mode else ""
+        return f"{ANSI_PREFIX}{self.username}@{self.hostname}{mode}#"
+
+    def send(self, data: str) -> None:
+        """チャネルへ文字列を送信
+
+        帯域制限時は、SEND_SLICE秒分の送信量毎に帯域に応じた時間を待ち合わせる
+
+        Args:
+            data (str): 送信文字列
+        """
+        payload = data.encode("utf-8")
+        if not self.bandwidth:
+            self.channel.sendall(payload)
+            return
+        size = max(int(self.bandwidth * SEND_SLICE), 1)
+        start = time.monotonic()
+        for offset in range(0, len(payload), size):
+            self.channel.sendall(payload[offset:offset + size])
+            delay = start + (offset + size) / self.bandwidth - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def respond(self, data: str) -> None:
+        """応答遅延後にチャネルへ応答を送信
+
+        Args:
+            data (str): 送信文字列
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self.send(data)
+
+    def serve(self) -> None:
+        """シェルセッションを処理する
+
+        チャネルが閉じられるまで入力を受け付ける
+        """
+        self.respond(BANNER + self.prompt())
+        pending = b""
+        while True:
+            data = self.channel.recv(4096)
+            if not data:
+                break
+            pending += data
+            while True:
+                index = min([i for i in (pending.find(b"\r"), pending.find(b"\n")) if i >= 0], default=-1)
+                if index < 0:
+                    break
+                line = pending[:index].decode("utf-8", "replace")
+                pending = pending[index + 1:].lstrip(b"\n") if pending[index:index + 1] == b"\r" else pending[index + 1:]
+                command = line.strip()
+                if command and any(command.startswith(x) for x in self.node.hangs):
+                    # 応答しないNFを模擬し、エコーバックのみ返却する
+                    self.send(f"{line}\r\n")
+                    continue
+                output = self.execute(command)
+                body = "".join(f"{x}\r\n" for x in output)
+                self.respond(f"{line}\r\n{body}{self.prompt()}")
+
+    def execute(self, command: str) -> List[str]:
+        """1コマンドを実行し、結果行を返却する
+
+        Args:
+            command (str): 入力コマンド
+
+        Returns:
+            List[str]: 結果行
+        """
+        if not command:
+            return []
+        for prefix, reply in self.node.replies.items():
+            if command.startswith(prefix):
+                return list(reply)
+        if command == "screen-length 0":
+            return []
+        if command.startswith("show running-config epg pgw apn xcap ipv6-name-server"):
+            with self.node.lock:
+                return self.render(self.node.running)
+        if command == "config":
+            if not self.is_config_mode:
+                with self.node.lock:
+                    self.candidate = list(self.node.running)
+                return ["Entering configuration mode terminal"]
+            return []
+        if not self.is_config_mode:
+            return ["-------^", "syntax error: unknown command"]
+        return self.execute_config(command)
+
+    def execute_config(self, command: str) -> List[str]:
+        """設定モードのコマンドを実行し、結果行を返却する
+
+        Args:
+            command (str): 入力コマンド
+
+        Returns:
+            List[str]: 結果行
+        """
+        words = command.split()
+        if words[:5] == ["no", "epg", "pgw", "apn", "xcap"] and len(words) == 7 and words[5] == "ipv6-name-server":
+            ipaddr = words[6]
+            if ipaddr not in [x[0] for x in self.candidate]:
+                return ["Error: element does not exist"]
+            self.candidate = [x for x in self.candidate if x[0] != ipaddr]
+            return []
+        if words[:4] == ["epg", "pgw", "apn", "xcap"] and len(words) == 8 and words[4] == "ipv6-name-server" and words[6] == "priority":
+            ipaddr, priority = words[5], words[7]
+            self.candidate = [x for x in self.candidate if x[0] != ipaddr] + [(ipaddr, priority)]
+            return []
+        if command == "show configuration diff":
+            with self.node.lock:
+                running = list(self.node.running)
+            return [f"-{x}" for x in self.render(running) if x not in self.render(self.candidate)] + \
+                [f"+{x}" for x in self.render(self.candidate) if x not in self.render(running)]
+        if command == "validate":
+            return ["Validation complete"]
+        if words[:1] == ["commit"]:
+            with self.node.lock:
+                if self.candidate == self.node.running:
+                    return ["% No modifications to commit."]
+                self.node.running = list(self.candidate)
+                self.node.commit_count += 1
+            return ["Commit complete."]
+        if command == "abort":
+            self.candidate = None
+            return []
+        if command == "end":
+            self.candidate = None
+            return []
+        return ["-------^", "syntax error: unknown command"]
+
+    @staticmethod
+    def render(xcap: List[Tuple[str, str]]) -> List[str]:
+        """ipv6-name-server設定をrunning-config形式の行に変換する
+
+        Args:
+            xcap (List[Tuple[str, str]]): ipv6-name-server設定
+
+        Returns:
+            List[str]: running-config形式の行
+        """
+        if not xcap:
+            return ["% No entries found."]
+        lines = ["epg pgw apn xcap"]
+        for ipaddr, priority in xcap:
+            lines += [f" ipv6-name-server {ipaddr}", f"  priority {priority}", " !"]
+        lines.append("!")
+        return lines
+
+
+class _ServerInterface(paramiko.ServerInterface):
+    """_ServerInterface スタンドイン用SSHサーバインターフェース
+
+    シェル(session)チャネルに加え、踏み台として利用するためのdirect-tcpipチャネルを受け付ける
+    """
+
+    def __init__(self, password: str, on_auth) -> None:
+        self.password = password
+        self.on_auth = on_auth
+        self.shell_requested = threading.Event()
+        self.direct_requests: Dict[int, Tuple[str, int]] = {}
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        if password != self.password:
+            return paramiko.AUTH_FAILED
+        self.on_auth()
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        return paramiko.OPEN_SUCCEEDED if kind == "session" else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_direct_tcpip_request(self, chanid: int, origin: Tuple[str, int], destination: Tuple[str, int]) -> int:
+        self.direct_requests[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, *args, **kwargs) -> bool:
+        return True
+
+    def check_channel_shell_request(self, channel: paramiko.Channel) -> bool:
+        self.shell_requested.set()
+        return True
+
+
+class EriStandinServer(object):
+    """EriStandinServer Ericsson EPG CLIを模擬するローカルSSHサーバ
+
+    NFShellClientの実際の受信処理・プロンプト判定を、実機なしで動作確認するために利用する
+    ログインユーザ名毎にNF設定状態を保持する
+    応答遅延・送信帯域を指定でき、多数の同時セッションを受け付けて負荷試験(benchmarks.bench_standin_load)にも利用する
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 password: str = DEFAULT_PASSWORD,
+                 hostname: str = DEFAULT_HOSTNAME,
+                 xcap: List[Tuple[str, str]] = None,
+                 latency: float = 0.0,
+                 bandwidth: int = 0,
+                 backlog: int = 128) -> None:
+        """__init__ インスタンス生成
+
+        Args:
+            host (str, optional): 待受アドレス. Defaults to "127.0.0.1".
+            port (int, optional): 待受ポート(0の場合は空きポート). Defaults to 0.
+            password (str, optional): ログインパスワード. Defaults to DEFAULT_PASSWORD.
+            hostname (str, optional): プロンプトに表示するホスト名. Defaults to DEFAULT_HOSTNAME.
+            xcap (List[Tuple[str, str]], optional): 初期状態のipv6-name-server設定. Defaults to DEFAULT_XCAP.
+            latency (float, optional): ログイン・コマンド毎の応答遅延(秒). Defaults to 0.0.
+            bandwidth (int, optional): セッション毎の送信帯域(バイト/秒、0の場合は制限なし). Defaults to 0.
+            backlog (int, optional): 接続待ちキューの長さ. Defaults to 128.
+        """
+        self.password = password
+        self.hostname = hostname
+        self.xcap = list(DEFAULT_XCAP if xcap is None else xcap)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.backlog = backlog
+        self.nodes: Dict[str, NodeState] = {}
+        self._nodes_lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._thread: threading.Thread = None
+        self._transports: List[paramiko.Transport] = []
+        self._closed = threading.Event()
+        # 認証成功回数(踏み台のトランスポート共有の確認用)
+        self.auth_count = 0
+        self._auth_lock = threading.Lock()
+        # シェルセッション数(実行中、最大同時)
+        self.active_sessions = 0
+        self.peak_sessions = 0
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """待受アドレス
+
+        Returns:
+            Tuple[str, int]: (アドレス, ポート)
+        """
+        return self._sock.getsockname()
+
+    def node(self, username: str) -> NodeState:
+        """ログインユーザ名に対応するNF設定状態を取得(なければ生成)
+
+        Args:
+            username (str): ログインユーザ名
+
+        Returns:
+            NodeState: NF設定状態
+        """
+        with self._nodes_lock:
+            if username not in self.nodes:
+                self.nodes[username] = NodeState(self.xcap)
+            return self.nodes[username]
+
+    def start(self) -> "EriStandinServer":
+        """待受を開始する
+
+        Returns:
+            EriStandinServer: 自インスタンス
+        """
+        self._sock.listen(self.backlog)
+        self._thread = threading.Thread(target=self._accept_loop, name="standin-accept", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """待受を終了し、全セッションを切断する
+        """
+        self._closed.set()
+        try:
+            self._sock.close()
+        finally:
+            for transport in list(self._transports):
+                transport.close()
+
+    def __enter__(self) -> "EriStandinServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), name="standin-session", daemon=True).start()
+
+    def _count_auth(self) -> None:
+        with self._auth_lock:
+            self.auth_count += 1
+
+    def _handle(self, conn: socket.socket) -> None:
+        transport = paramiko.Transport(conn)
+        self._transports.append(transport)
+        try:
+            transport.add_server_key(get_host_key())
+            server = _ServerInterface(self.password, self._count_auth)
+            transport.start_server(server=server)
+            while True:
+                channel = transport.accept(1)
+                if channel is None:
+                    if not transport.is_active() or self._closed.is_set():
+                        return
+                    continue
+                destination = server.direct_requests.pop(channel.get_id(), None)
+                if destination is None:
+                    break
+                # 踏み台として、direct-tcpipチャネルを接続先へ中継する
+                threading.Thread(target=self._relay, args=(channel, destination), name="standin-relay", daemon=True).start()
+            if not server.shell_requested.wait(10):
+                return
+            username = transport.get_username()
+            with self._sessions_lock:
+                self.active_sessions += 1
+                self.peak_sessions = max(self.peak_sessions, self.active_sessions)
+            try:
+                EpgCliSession(channel, self.node(username), username, self.hostname, self.latency, self.bandwidth).serve()
+            finally:
+                with self._sessions_lock:
+                    self.active_sessions -= 1
+        except (EOFError, OSError, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+            if transport in self._transports:
+                self._transports.remove(transport)
+
+    def _relay(self, channel: paramiko.Channel, destination: Tuple[str, int]) -> None:
+        try:
+            with socket.create_connection(destination, timeout=10) as sock:
+                sock.settimeout(None)
+
+                def upstream() -> None:
+                    try:
+                        while True:
+                            data = channel.recv(32768)
+                            if not data:
+                                break
+                            sock.sendall(data)
+                    except OSError:
+                        pass
+                    finally:
+                        try:
+                            sock.shutdown(socket.SHUT_WR)
+                        except OSError:
+                            pass
+
+                threading.Thread(target=upstream, name="standin-relay-up", daemon=True).start()
+                while True:
+                    data = sock.recv(32768)
+                    if not data:
+                        break
+                    channel.sendall(data)
+        except OSError:
+            pass
+        finally:
+            channel.close()
@@ -78,7 +78,7 @@ class ClientForTest():
 
 
 class StubClientForTest():
-    def __init__(self, mode: Mode, name: str):
+    def __init__(self, mode: Mode, name: str, clock: Any = None):
         pass
 
 
@@ -0,0 +1,150 @@
+import json
+import os
+import pathlib
+import re
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.config_store import ConfigStore, require_keys, validate_edns_infos, validate_nf_infos, validate_stub
+
+NF_INFOS = {"a1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]}}
+
+
+def write_json(path: pathlib.Path, conf: dict, mtime_ns: int = None) -> pathlib.Path:
+    path.write_text(json.dumps(conf), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_config_store01(tmpdir, mocker: MockerFixture):
+    """test_config_store01 ConfigStore試験01 設定バンドル
+
+    試験条件
+    ・設定ファイルを取得後、別インスタンス(別プロセス相当)で同じ設定ファイルを取得する
+    ・同じインスタンスで2回取得する
+
+    試験結果
+    ・初回のみ設定ファイルを解析し、設定バンドルが作成されること
+    ・2回目以降は設定バンドルから同じ設定内容が取得されること
+    ・同じインスタンスでは同じオブジェクトが返却されること
+    """
+    path = write_json(pathlib.Path(tmpdir).joinpath("nf-infos.json"), NF_INFOS)
+    bundle_path = pathlib.Path(tmpdir).joinpath("cache", "config_bundle.marshal")
+    load = mocker.spy(json, "load")
+
+    assert ConfigStore(bundle_path).get(path, validate_nf_infos) == NF_INFOS
+    assert bundle_path.exists()
+
+    store = ConfigStore(bundle_path)
+    conf = store.get(path, validate_nf_infos)
+
+    assert conf == NF_INFOS
+    assert store.get(path) is conf
+    assert load.call_count == 1
+    assert [p.name for p in bundle_path.parent.iterdir()] == [bundle_path.name]
+
+
+def test_config_store02(tmpdir, mocker: MockerFixture):
+    """test_config_store02 ConfigStore試験02 設定ファイルの変更検知
+
+    試験条件
+    ・設定バンドル作成後、設定ファイルの更新日時のみ変更して取得する
+    ・設定ファイルの内容を変更して取得する
+
+    試験結果
+    ・更新日時のみの変更では、ハッシュが一致するため設定ファイルを解析しないこと
+    ・内容の変更では設定ファイルを解析し、変更後の設定内容が取得されること
+    """
+    path = write_json(pathlib.Path(tmpdir).joinpath("nf-infos.json"), NF_INFOS, 1_000_000_000)
+    bundle_path = pathlib.Path(tmpdir).joinpath("config_bundle.marshal")
+    ConfigStore(bundle_path).get(path)
+    load = mocker.spy(json, "load")
+
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert ConfigStore(bundle_path).get(path) == NF_INFOS
+    assert load.call_count == 0
+
+    changed = {"b1-er-s01-smfvoroout-001": NF_INFOS["a1-er-s01-smfvoroout-001"]}
+    write_json(path, changed, 3_000_000_000)
+    assert ConfigStore(bundle_path).get(path) == changed
+    assert load.call_count == 1
+
+
+@pytest.mark.parametrize(("validator", "conf", "error"), [
+    (require_keys("common", "connections", "bastions"), {"common": {}, "connections": {}}, KeyError),
+    (validate_nf_infos, {"a1-er-s01-smfvoroout-001": {}}, KeyError),
+    (validate_nf_infos, {"a1-er-s01-smfvoroout-001": {"xCAP": "2001:268:200d:1010::6"}}, ValueError),
+    (validate_nf_infos, {"a1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:1010::6::6"]}}, ValueError),
+    (validate_edns_infos, {"tys1tb1edns02": {"ipaddr": "tys1tb1edns02"}}, ValueError),
+    (validate_stub, {"status_check": {"command": "^show$", "reply": {}}}, KeyError),
+    (validate_stub, {"status_check": {"command": "^(show$", "reply": {}, "wait": 0}}, re.error),
+])
+def test_config_store03(tmpdir, validator, conf: dict, error: type):
+    """test_config_store03 ConfigStore試験03 設定の検証
+
+    試験条件
+    ・必須キーなし、xCAPなし、xCAPがリストでない、IPアドレス不正、スタブ定義のキーなし、正規表現不正の設定ファイルを取得する
+
+    試験結果
+    ・検証関数の例外が送出されること
+    ・検証に失敗した設定内容は設定バンドルに保存されないこと
+    """
+    path = write_json(pathlib.Path(tmpdir).joinpath("conf.json"), conf)
+    bundle_path = pathlib.Path(tmpdir).joinpath("config_bundle.marshal")
+
+    with pytest.raises(error):
+        ConfigStore(bundle_path).get(path, validator)
+    assert not bundle_path.exists()
+
+
+def test_config_store04(tmpdir):
+    """test_config_store04 ConfigStore試験04 設定ファイルの再読込
+
+    試験条件
+    ・取得済みの設定ファイルの内容を変更して再読込する
+    ・JSONとして解析できない内容に変更して再読込する
+
+    試験結果
+    ・取得済みのオブジェクトに変更後の設定内容が反映され、登録した関数が呼び出されること
+    ・解析できない場合はエラーが返却され、変更前の設定内容を保持すること
+    """
+    path = write_json(pathlib.Path(tmpdir).joinpath("nf-infos.json"), NF_INFOS, 1_000_000_000)
+    store = ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal"))
+    conf = store.get(path, validate_nf_infos)
+    notified = []
+    store.add_listener(path, notified.append)
+
+    assert store.reload() == ([], {})
+
+    changed = {"b1-er-s01-smfvoroout-001": NF_INFOS["a1-er-s01-smfvoroout-001"]}
+    write_json(path, changed, 2_000_000_000)
+    assert store.reload() == ([str(path)], {})
+    assert conf == changed
+    assert notified == [conf]
+
+    path.write_text("{", encoding="utf-8")
+    (reloaded, errors) = store.reload()
+    assert reloaded == []
+    assert isinstance(errors[str(path)], json.JSONDecodeError)
+    assert conf == changed
+
+
+def test_config_store05(tmpdir):
+    """test_config_store05 ConfigStore試験05 設定バンドル書込み不可・バンドル異常
+
+    試験条件
+    ・設定バンドルの配置先ディレクトリが作成できない
+    ・設定バンドルが解析できない
+
+    試験結果
+    ・Exceptionが発生せず、設定ファイルから設定内容が取得されること
+    """
+    path = write_json(pathlib.Path(tmpdir).joinpath("nf-infos.json"), NF_INFOS)
+    pathlib.Path(tmpdir).joinpath("file").write_text("", encoding="utf-8")
+    bundle_path = pathlib.Path(tmpdir).joinpath("config_bundle.marshal")
+    bundle_path.write_bytes(b"broken")
+
+    assert ConfigStore(pathlib.Path(tmpdir).joinpath("file", "config_bundle.marshal")).get(path) == NF_INFOS
+    assert ConfigStore(bundle_path).get(path) == NF_INFOS
@@ -1,5 +1,7 @@
 import pathlib
 import socket
+import threading
+import time
 from typing import Any, List
 import paramiko
 
@@ -8,6 +10,8 @@ import pytest_mock
 from xgnlog.Log import Level
 
 import src.eri_connection as nfshell
+from src.transcript import TranscriptRef, read_record
+from tests.standin_server import DEFAULT_XCAP, EpgCliSession, EriStandinServer
 
 JOB_ID = "T23AJ002"
 
@@ -41,6 +45,20 @@ class Proxy():
         self.cmd = command.split(" ")
 
 
+@pytest.fixture(autouse=True)
+def learned_prompts(mocker: pytest_mock.MockerFixture):
+    # 学習済みプロンプトはプロセス内で共有されるため、試験毎に初期化する
+    mocker.patch.dict("src.eri_connection.LEARNED_PROMPTS", clear=True)
+
+
+@pytest.fixture(autouse=True)
+def transcript_dir(tmpdir, mocker: pytest_mock.MockerFixture) -> pathlib.Path:
+    # セッション記録は試験毎の一時ディレクトリに出力する
+    path = pathlib.Path(tmpdir).joinpath("transcripts")
+    mocker.patch("src.eri_connection.TRANSCRIPT_DIR", new=path)
+    return path
+
+
 def test_get_sock01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
     """test_get_sock01 get_sock試験01 proxycommandなし
 
@@ -240,6 +258,99 @@ def test_get_sock04(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.M
     assert response_value_log_2nd == expected_log_2nd
 
 
+def get_bastion_conf(bastion: EriStandinServer, server: EriStandinServer, nf_names: List[str], password: str = "kddiadmin") -> dict:
+    (bastion_host, bastion_port) = bastion.address
+    (host, port) = server.address
+    return {
+        "common": {"password": "kddiadmin"},
+        "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name, "bastion": "director-1-a1-er-s01-vm-002"}
+                        for nf_name in nf_names},
+        "bastions": {
+            "director-1-a1-er-s01-vm-002": {"host": bastion_host, "port": bastion_port, "username": "eccd", "password": password}
+        }
+    }
+
+
+def test_get_sock05(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_get_sock05 get_sock試験05 踏み台トランスポート共有
+
+    試験条件
+    ・踏み台設定に接続先(host)を指定する
+    ・同一踏み台配下の3NFにNFShellClientで接続し、コマンドを投入する
+
+    試験結果
+    ・全NFでコマンド結果が取得できること
+    ・踏み台への認証が1回のみであること
+    ・NFへの認証がNF毎に行われること
+    ・一次ログに踏み台トランスポート接続(I00234)が1回、再利用(I00235)が2回出力されること
+    """
+    nf_names = ["a1-er-s01-smfvo-001", "a2-er-s01-smfvo-001", "a3-er-s01-smfvo-001"]
+    command = "show running-config epg pgw apn xcap ipv6-name-server"
+    expected_value = "\n".join(EpgCliSession.render(DEFAULT_XCAP)).encode("utf-8")
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    pool = nfshell.BastionPool()
+    mocker.patch("src.eri_connection.BASTION_POOL", new=pool)
+
+    with EriStandinServer() as bastion, EriStandinServer() as server:
+        mocker.patch("src.eri_connection.CONN_CONF", new=get_bastion_conf(bastion, server, nf_names))
+        results = []
+        try:
+            for nf_name in nf_names:
+                client = nfshell.NFShellClient(nf_name)
+                client.connect()
+                results.append(client.command(command))
+                client.close()
+        finally:
+            pool.close_all()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = [x.split(", add_info:")[0] for x in f.readlines()]
+
+    assert results == [expected_value] * len(nf_names)
+    assert bastion.auth_count == 1
+    assert server.auth_count == len(nf_names)
+    assert response_value_log_1st.count(f"job_id:{JOB_ID}, message_id:I00234") == 1
+    assert response_value_log_1st.count(f"job_id:{JOB_ID}, message_id:I00235") == 2
+
+
+def test_get_sock06(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_get_sock06 get_sock試験06 踏み台認証失敗
+
+    試験条件
+    ・踏み台設定に接続先(host)と誤ったパスワードを指定する
+
+    試験結果
+    ・eri_connection.ProxyCommandExceptionが発生すること
+    ・一次ログにE00206が出力されること
+    ・障害切り分けログにパスワードが出力されないこと
+    """
+    bastion_name = "director-1-a1-er-s01-vm-002"
+    nf_name = "a1-er-s01-smfvo-001"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    pool = nfshell.BastionPool()
+    mocker.patch("src.eri_connection.BASTION_POOL", new=pool)
+
+    with EriStandinServer() as bastion, EriStandinServer() as server:
+        mocker.patch("src.eri_connection.CONN_CONF", new=get_bastion_conf(bastion, server, [nf_name], password="wrong-password"))
+        with pytest.raises(nfshell.ProxyCommandException) as exc_info:
+            nfshell.get_sock(bastion_name, server.address[0], server.address[1])
+        pool.close_all()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_2nd: str = f.read()
+
+    assert str(exc_info.value) == bastion_name
+    assert f"job_id:{JOB_ID}, message_id:E00206, add_info:{None}\n" in response_value_log_1st
+    assert response_value_log_2nd.startswith(f"job_id:{JOB_ID}, level:CRITICAL, add_info:踏み台経由チャネル開設異常:")
+    assert "wrong-password" not in response_value_log_2nd
+
+
 def test_init01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
     """test_init01 __init__試験01 インスタンス生成(nf_name: a1-er-s01-smfvo-001)
 
@@ -1021,9 +1132,11 @@ def test_read01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     ・self._is_shell_enable()が1回呼ばれること
     ・self.shell.recv_ready()が2回呼ばれること
     ・self.shell.recv()が1回呼ばれること
+    ・self._wait_readable()が呼ばれないこと
     ・標準出力がないこと
     ・一次ログ出力が想定しているmsg_id、add_infoであること
-    ・障害切り分けログ出力が想定しているlevel、add_infoであること
+    ・障害切り分けログ出力が想定しているlevel、add_info(セッション記録の参照)であること
+    ・受信データがセッション記録に保存されること
     ・関数結果が指定した結果であること
     """
     nf_name = "a1-er-s01-smfvo-001"
@@ -1039,10 +1152,6 @@ def test_read01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
         f"job_id:{JOB_ID}, message_id:I00215, add_info:{None}\n"
     ]
 
-    expected_log_2nd = [
-        f"job_id:{JOB_ID}, level:{Level.DEBUG.name}, add_info:RAW data: {recv_data}\n"
-    ]
-
     logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
     mocker.patch("src.eri_connection.LOGGER", new=logger)
 
@@ -1054,13 +1163,21 @@ def test_read01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     test_mock.recv_ready = mocker.Mock(side_effect=[True, False])
     test_mock.recv = mocker.Mock(return_value=recv_data)
 
+    test_mock._wait_readable = mocker.Mock(return_value=True)
     mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
     mocker.patch.object(client, "_get_prompt", test_mock._get_prompt)
     mocker.patch.object(client, "shell", test_mock)
 
     client.prompt = cmd_prompt.decode("utf-8")
     respose = client._read()
 
+    # 受信データはセッション記録に保存され、ログには参照が出力される
+    ref = TranscriptRef(client.transcript.path.name, 1, len(recv_data), len(recv_data), recv_data)
+    expected_log_2nd = [
+        f"job_id:{JOB_ID}, level:{Level.DEBUG.name}, add_info:RAW data: {ref}\n"
+    ]
+
     # 結果確認
     log_path_1st = get_1st_log_path(tmpdir)
     log_path_2nd = get_2nd_log_path(tmpdir)
@@ -1080,10 +1197,12 @@ def test_read01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     assert test_mock.recv.call_count == 1
     assert test_mock._get_prompt.called is True
     assert test_mock._get_prompt.call_count == 1
+    assert test_mock._wait_readable.call_count == 0
     assert log_path_1st.exists()
     assert response_value_log_1st == expected_log_1st
     assert log_path_2nd.exists()
     assert response_value_log_2nd == expected_log_2nd
+    assert read_record(client.transcript.path, 1) == recv_data
 
 
 def test_read02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
@@ -1097,9 +1216,11 @@ def test_read02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     ・self._is_shell_enable()が1回呼ばれること
     ・self.shell.recv_ready()が4回呼ばれること
     ・self.shell.recv()が3回呼ばれること
+    ・self._wait_readable()が1回呼ばれること
     ・標準出力がないこと
     ・一次ログ出力が想定しているmsg_id、add_infoであること
-    ・障害切り分けログ出力が想定しているlevel、add_infoであること
+    ・障害切り分けログ出力が想定しているlevel、add_info(セッション記録の参照)であること
+    ・受信データがセッション記録に保存されること
     ・関数結果が指定した結果であること
     """
     nf_name = "a1-er-s01-smfvo-001"
@@ -1115,10 +1236,6 @@ def test_read02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
         f"job_id:{JOB_ID}, message_id:I00215, add_info:{None}\n"
     ]
 
-    expected_log_2nd = [
-        f"job_id:{JOB_ID}, level:{Level.DEBUG.name}, add_info:RAW data: {recv_data}\n"
-    ]
-
     logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
     mocker.patch("src.eri_connection.LOGGER", new=logger)
 
@@ -1130,13 +1247,21 @@ def test_read02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     test_mock.recv_ready = mocker.Mock(side_effect=[False, True, True, True, False])
     test_mock.recv = mocker.Mock(side_effect=[command + b"\r\n", expected_value + b"\r\n", cmd_prompt])
 
+    test_mock._wait_readable = mocker.Mock(return_value=True)
     mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
     mocker.patch.object(client, "_get_prompt", test_mock._get_prompt)
     mocker.patch.object(client, "shell", test_mock)
 
     client.prompt = cmd_prompt.decode("utf-8")
     respose = client._read()
 
+    # 受信データはセッション記録に保存され、ログには参照が出力される
+    ref = TranscriptRef(client.transcript.path.name, 1, len(recv_data), len(recv_data), recv_data)
+    expected_log_2nd = [
+        f"job_id:{JOB_ID}, level:{Level.DEBUG.name}, add_info:RAW data: {ref}\n"
+    ]
+
     # 結果確認
     log_path_1st = get_1st_log_path(tmpdir)
     log_path_2nd = get_2nd_log_path(tmpdir)
@@ -1154,10 +1279,12 @@ def test_read02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     assert test_mock.recv_ready.call_count == 5
     assert test_mock.recv.called is True
     assert test_mock.recv.call_count == 3
+    assert test_mock._wait_readable.call_count == 1
     assert log_path_1st.exists()
     assert response_value_log_1st == expected_log_1st
     assert log_path_2nd.exists()
     assert response_value_log_2nd == expected_log_2nd
+    assert read_record(client.transcript.path, 1) == recv_data
 
 
 def test_read03(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
@@ -1228,6 +1355,55 @@ def test_read03(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.Mocke
     assert not log_path_2nd.exists()
 
 
+def test_read04(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_read04 _read試験04 異常試験 (プロンプト未受信タイムアウト)
+
+    試験条件
+    ・nf_name: a1-er-s01-smfvo-001
+    ・timeout: 0.2
+    ・プロンプトを含まないデータ受信後、受信可能にならない
+
+    試験結果
+    ・socket.timeoutが発生すること
+    ・self._wait_readable()に残り待ち時間が指定されること
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    timeout = 0.2
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00201, add_info:{nf_name}\n",
+        f"job_id:{JOB_ID}, message_id:I00202, add_info:{nf_name}\n",
+        f"job_id:{JOB_ID}, message_id:I00213, add_info:{None}\n"
+    ]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+
+    client = nfshell.NFShellClient(nf_name)
+
+    test_mock = mocker.MagicMock()
+    test_mock._is_shell_enable = mocker.Mock(return_value=True)
+    test_mock._wait_readable = mocker.Mock(return_value=False)
+    test_mock.recv_ready = mocker.Mock(side_effect=[True, False])
+    test_mock.recv = mocker.Mock(return_value=b"send command\r\npartial")
+
+    mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
+    mocker.patch.object(client, "shell", test_mock)
+
+    client.prompt = "prompt#"
+    with pytest.raises(socket.timeout):
+        client._read(timeout)
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert test_mock._wait_readable.call_count == 1
+    assert 0 < test_mock._wait_readable.call_args.args[0] <= timeout
+    assert response_value_log_1st == expected_log_1st
+
+
 def test_is_shell_enable01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
     """test_is_shell_enable01 _is_shell_enable試験01 正常試験
 
@@ -2026,8 +2202,10 @@ def test_read_first01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
     ・self._is_shell_enable()が1回呼ばれること
     ・self.shell.recv_ready()が4回呼ばれること
     ・self.shell.recv()が1回呼ばれること
+    ・self._wait_readable()が2回呼ばれること
     ・標準出力がないこと
-    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    ・一次ログ出力が想定しているmsg_id、add_info(I00225はセッション記録の参照)であること
+    ・受信データがセッション記録に保存されること
     ・障害切り分けログ出力がないこと
     ・関数結果が指定した結果であること
     """
@@ -2040,8 +2218,7 @@ def test_read_first01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
         f"job_id:{JOB_ID}, message_id:I00201, add_info:{nf_name}\n",
         f"job_id:{JOB_ID}, message_id:I00202, add_info:{nf_name}\n",
         f"job_id:{JOB_ID}, message_id:I00223, add_info:{None}\n",
-        f"job_id:{JOB_ID}, message_id:I00224, add_info:{cmd_prompt.decode('utf-8')}\n",
-        f"job_id:{JOB_ID}, message_id:I00225, add_info:{recv_data}\n"
+        f"job_id:{JOB_ID}, message_id:I00224, add_info:{cmd_prompt.decode('utf-8')}\n"
     ]
 
     expected_log_2nd = []
@@ -2057,13 +2234,19 @@ def test_read_first01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
     test_mock.recv_ready = mocker.Mock(side_effect=[False, True, True, False])
     test_mock.recv = mocker.Mock(return_value=recv_data)
 
+    test_mock._wait_readable = mocker.Mock(return_value=True)
     mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
     mocker.patch.object(client, "_get_prompt", test_mock._get_prompt)
     mocker.patch.object(client, "shell", test_mock)
 
     client.prompt = cmd_prompt.decode("utf-8")
     respose = client._read_first()
 
+    # 受信データはセッション記録に保存され、ログには参照が出力される
+    ref = TranscriptRef(client.transcript.path.name, 1, len(recv_data), len(recv_data), recv_data)
+    expected_log_1st.append(f"job_id:{JOB_ID}, message_id:I00225, add_info:{ref}\n")
+
     # 結果確認
     log_path_1st = get_1st_log_path(tmpdir)
     log_path_2nd = get_2nd_log_path(tmpdir)
@@ -2079,9 +2262,11 @@ def test_read_first01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
     assert test_mock.recv_ready.call_count == 4
     assert test_mock.recv.called is True
     assert test_mock.recv.call_count == 1
+    assert test_mock._wait_readable.call_count == 2
     assert log_path_1st.exists()
     assert response_value_log_1st == expected_log_1st
     assert not log_path_2nd.exists()
+    assert read_record(client.transcript.path, 1) == recv_data
 
 
 def test_read_first02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
@@ -2142,6 +2327,368 @@ def test_read_first02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
     assert not log_path_2nd.exists()
 
 
+def test_read_first03(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_read_first03 _read_first 異常試験(タイムアウト)
+
+    試験条件
+    ・nf_name: a1-er-s01-smfvo-001
+    ・timeout: 0.2
+    ・受信可能にならない
+
+    試験結果
+    ・eri_connection.SocketTimeoutExceptionが発生すること
+    ・self.shell.recv()が呼ばれないこと
+    ・一次ログにE00204が出力されること
+    ・障害切り分けログにタイムアウトが出力されること
+    ・プロンプトが更新されないこと
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    cmd_prompt = "prompt#"
+    timeout = 0.2
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+
+    client = nfshell.NFShellClient(nf_name)
+
+    test_mock = mocker.MagicMock()
+    test_mock._is_shell_enable = mocker.Mock(return_value=True)
+    test_mock._wait_readable = mocker.Mock(return_value=False)
+    test_mock.recv_ready = mocker.Mock(return_value=False)
+
+    mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
+    mocker.patch.object(client, "shell", test_mock)
+
+    client.prompt = cmd_prompt
+    with pytest.raises(nfshell.SocketTimeoutException):
+        client._read_first(timeout)
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_2nd: str = f.read()
+
+    assert test_mock.recv.called is False
+    assert response_value_log_1st[-1] == f"job_id:{JOB_ID}, message_id:E00204, add_info:{nf_name}\n"
+    assert response_value_log_2nd.startswith(f"job_id:{JOB_ID}, level:CRITICAL, add_info:コマンド投入タイムアウト発生:")
+    assert client.prompt == cmd_prompt
+
+
+def test_read_first04(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_read_first04 _read_first 正常試験(学習済みプロンプト受信)
+
+    試験条件
+    ・nf_name: a1-er-s01-smfvo-001
+    ・同一NFのプロンプト(prompt#)を学習済み
+    ・受信データの最終行が学習済みプロンプト
+
+    試験結果
+    ・プロンプト受信後、受信途切れを待たずに読込完了すること(self._wait_readable()が呼ばれないこと)
+    ・プロンプトが更新されること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    cmd_prompt = b"prompt#"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    nfshell.LEARNED_PROMPTS[nf_name] = {cmd_prompt.decode("utf-8")}
+
+    client = nfshell.NFShellClient(nf_name)
+
+    test_mock = mocker.MagicMock()
+    test_mock._is_shell_enable = mocker.Mock(return_value=True)
+    test_mock._wait_readable = mocker.Mock(return_value=True)
+    test_mock.recv_ready = mocker.Mock(return_value=True)
+    test_mock.recv = mocker.Mock(return_value=b"end\r\n" + cmd_prompt)
+
+    mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
+    mocker.patch.object(client, "shell", test_mock)
+
+    client._read_first()
+
+    assert test_mock.recv.call_count == 1
+    assert test_mock._wait_readable.called is False
+    assert client.prompt == cmd_prompt.decode("utf-8")
+
+
+def test_read_first05(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_read_first05 _read_first 正常試験(プロンプト形式の受信)
+
+    試験条件
+    ・nf_name: a1-er-s01-smfvo-001
+    ・学習済みプロンプトなし
+    ・1回目の受信でバナー、2回目の受信で設定モードのプロンプト形式の最終行を受信
+
+    試験結果
+    ・プロンプト受信後、受信途切れを待たずに読込完了すること
+    ・受信したプロンプトが学習されること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    cmd_prompt = "kddiadmin@eric-cm-yang-provider-c676ff7f9-cfk9w(config)#"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+
+    client = nfshell.NFShellClient(nf_name)
+
+    test_mock = mocker.MagicMock()
+    test_mock._is_shell_enable = mocker.Mock(return_value=True)
+    test_mock._wait_readable = mocker.Mock(return_value=True)
+    test_mock.recv_ready = mocker.Mock(return_value=True)
+    test_mock.recv = mocker.Mock(side_effect=[b"config\r\nEntering configuration mode\r\n", b"\x1b[?7h" + cmd_prompt.encode("utf-8")])
+
+    mocker.patch.object(client, "_is_shell_enable", test_mock._is_shell_enable)
+    mocker.patch.object(client, "_wait_readable", test_mock._wait_readable)
+    mocker.patch.object(client, "shell", test_mock)
+
+    client._read_first()
+
+    assert test_mock.recv.call_count == 2
+    assert test_mock._wait_readable.call_count == 1
+    assert client.prompt == cmd_prompt
+    assert nfshell.LEARNED_PROMPTS[nf_name] == {cmd_prompt}
+
+
+def test_read_first06(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_read_first06 _read_first 正常試験(スタンドインサーバでの設定モード移行/解除)
+
+    試験条件
+    ・スタンドインサーバにNFShellClientで接続し、設定モード移行・解除を行う
+    ・FIRST_READ_QUIET = FIRST_READ_QUIET_MIN = 5.0(受信途切れを待つと5秒以上かかる)
+
+    試験結果
+    ・ログイン・設定モード移行・解除が受信途切れを待たずに完了すること
+    ・各モードのプロンプトが取得・学習されること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.FIRST_READ_QUIET", new=5.0)
+    mocker.patch("src.eri_connection.FIRST_READ_QUIET_MIN", new=5.0)
+
+    with EriStandinServer() as server:
+        (host, port) = server.address
+        mocker.patch("src.eri_connection.CONN_CONF", new={
+            "common": {"password": server.password},
+            "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name}},
+            "bastions": {}
+        })
+        client = nfshell.NFShellClient(nf_name)
+        try:
+            client.connect()
+            start = time.monotonic()
+            client.enter_config_mode()
+            config_prompt = client.prompt
+            client.exit_config_mode()
+            elapsed = time.monotonic() - start
+        finally:
+            client.close()
+
+    exec_prompt = f"{nf_name}@{server.hostname}#"
+    assert elapsed < 2.5
+    assert config_prompt == f"{nf_name}@{server.hostname}(config)#"
+    assert client.prompt == exec_prompt
+    assert nfshell.LEARNED_PROMPTS[nf_name] == {exec_prompt, config_prompt}
+
+
+
+def test_standin01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_standin01 スタンドインサーバ試験01 応答遅延・送信帯域
+
+    試験条件
+    ・スタンドインサーバの応答遅延 = 0.2秒
+    ・送信帯域 = 20000バイト/秒、ipv6-name-server設定100件(約4KBの応答)
+
+    試験結果
+    ・コマンド応答が応答遅延と帯域に応じた時間(0.4秒以上)の後に受信できること
+    ・帯域制限で分割送信された応答が欠けずに受信できること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    xcap = [(f"2001:268:200d:{i:x}::6", str(i)) for i in range(100)]
+    command = "show running-config epg pgw apn xcap ipv6-name-server"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+
+    with EriStandinServer(xcap=xcap, latency=0.2, bandwidth=20000) as server:
+        (host, port) = server.address
+        mocker.patch("src.eri_connection.CONN_CONF", new={
+            "common": {"password": server.password},
+            "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name}},
+            "bastions": {}
+        })
+        client = nfshell.NFShellClient(nf_name)
+        try:
+            client.connect()
+            start = time.monotonic()
+            response_value = client.command(command)
+            elapsed = time.monotonic() - start
+        finally:
+            client.close()
+
+    expected_value = "\n".join(EpgCliSession.render(xcap)).encode("utf-8")
+    assert response_value == expected_value
+    assert elapsed >= 0.2 + len(expected_value) / 20000
+
+
+def test_standin02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_standin02 スタンドインサーバ試験02 同時セッション
+
+    試験条件
+    ・スタンドインサーバに10NF分のNFShellClientで同時に接続し、コマンド投入後に切断する
+    ・応答遅延 = 0.1秒
+
+    試験結果
+    ・全セッションのコマンド応答が受信できること
+    ・最大同時セッション数が10となり、切断後の実行中セッション数が0となること
+    """
+    nf_names = [f"a1-er-s01-smfvo-{i:03}" for i in range(10)]
+    command = "show running-config epg pgw apn xcap ipv6-name-server"
+    barrier = threading.Barrier(len(nf_names))
+    results = {}
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+
+    def session(nf_name: str) -> None:
+        client = nfshell.NFShellClient(nf_name)
+        try:
+            client.connect()
+            barrier.wait(10)
+            results[nf_name] = client.command(command)
+            barrier.wait(10)
+        finally:
+            client.close()
+
+    with EriStandinServer(latency=0.1) as server:
+        (host, port) = server.address
+        mocker.patch("src.eri_connection.CONN_CONF", new={
+            "common": {"password": server.password},
+            "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name} for nf_name in nf_names},
+            "bastions": {}
+        })
+        threads = [threading.Thread(target=session, args=(nf_name,)) for nf_name in nf_names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        deadline = time.monotonic() + 5
+        while server.active_sessions and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    expected_value = "\n".join(EpgCliSession.render(DEFAULT_XCAP)).encode("utf-8")
+    assert results == {nf_name: expected_value for nf_name in nf_names}
+    assert server.peak_sessions == len(nf_names)
+    assert server.active_sessions == 0
+
+def test_prompt_detector01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_prompt_detector01 PromptDetector 受信途切れ待ち時間の調整
+
+    試験条件
+    ・プロンプト以外のデータを0.03秒後、0.2秒後に受信する
+
+    試験結果
+    ・待ち時間の初期値がFIRST_READ_QUIET_MINであること
+    ・待ち時間が受信間隔の2倍に延長され、FIRST_READ_QUIETを上限とすること
+    ・プロンプトと判定されないこと
+    """
+    mocker.patch("time.monotonic", side_effect=[10.0, 10.03, 10.23])
+    buffer = nfshell.ReceiveBuffer()
+    buffer.extend(b"Welcome")
+    detector = nfshell.PromptDetector("a1-er-s01-smfvo-001")
+
+    quiets = [detector.quiet]
+    for _ in range(3):
+        assert detector.is_prompt(buffer) is False
+        quiets.append(detector.quiet)
+
+    assert quiets == [nfshell.FIRST_READ_QUIET_MIN, nfshell.FIRST_READ_QUIET_MIN, pytest.approx(0.06), nfshell.FIRST_READ_QUIET]
+
+
+def test_wait_readable01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_wait_readable01 _wait_readable 正常試験(受信済みデータあり)
+
+    試験条件
+    ・self.shell.recv_ready()がTrue
+
+    試験結果
+    ・Trueが返却されること
+    ・select.select()が呼ばれないこと
+    """
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    client = nfshell.NFShellClient("a1-er-s01-smfvo-001")
+
+    test_mock = mocker.MagicMock()
+    test_mock.recv_ready = mocker.Mock(return_value=True)
+    test_mock.select = mocker.Mock(return_value=([], [], []))
+    mocker.patch("select.select", test_mock.select)
+    mocker.patch.object(client, "shell", test_mock)
+
+    assert client._wait_readable(1) is True
+    assert test_mock.select.called is False
+
+
+def test_wait_readable02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_wait_readable02 _wait_readable 正常試験(select待ち合わせ)
+
+    試験条件
+    ・self.shell.recv_ready()がFalse→True、select.select()が受信可能を返却する
+    ・self.shell.recv_ready()がFalse、select.select()がタイムアウトする
+
+    試験結果
+    ・受信可能時はTrue、タイムアウト時はFalseが返却されること
+    ・select.select()にチャネルと待ち合わせ時間が指定されること
+    """
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    client = nfshell.NFShellClient("a1-er-s01-smfvo-001")
+
+    test_mock = mocker.MagicMock()
+    test_mock.closed = False
+    test_mock.eof_received = False
+    test_mock.recv_ready = mocker.Mock(side_effect=[False, True, False])
+    test_mock.select = mocker.Mock(side_effect=[([test_mock], [], []), ([], [], [])])
+    mocker.patch("select.select", test_mock.select)
+    mocker.patch.object(client, "shell", test_mock)
+
+    assert client._wait_readable(1.5) is True
+    assert client._wait_readable(0.5) is False
+    assert test_mock.select.call_args_list == [mocker.call([test_mock], [], [], 1.5), mocker.call([test_mock], [], [], 0.5)]
+
+
+def test_wait_readable03(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_wait_readable03 _wait_readable 異常試験(チャネル切断)
+
+    試験条件
+    ・受信データがない状態で、待ち合わせ中にチャネルがEOFを受信する
+
+    試験結果
+    ・EOFErrorが発生すること
+    """
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    client = nfshell.NFShellClient("a1-er-s01-smfvo-001")
+
+    test_mock = mocker.MagicMock()
+    test_mock.closed = False
+    test_mock.eof_received = False
+    test_mock.recv_ready = mocker.Mock(return_value=False)
+
+    def receive_eof(*args):
+        test_mock.eof_received = True
+        return ([test_mock], [], [])
+
+    mocker.patch("select.select", receive_eof)
+    mocker.patch.object(client, "shell", test_mock)
+
+    with pytest.raises(EOFError):
+        client._wait_readable(1)
+
+
 def test_get_prompt01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
     """get_prompt01 get_prompt 正常試験
 
@@ -2190,3 +2737,81 @@ def test_get_prompt02(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock
 
     # 結果確認
     assert respose == expected_value
+
+
+def test_get_prompt03(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """get_prompt03 get_prompt 正常試験(マルチバイト文字の分割受信)
+
+    試験条件
+    ・buffer: マルチバイト文字の途中までを受信した最終行
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・未完成の文字を除いたプロンプト文字列が返却されること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    prompt = "\x1b[?7hkddiadmin@ノード#".encode("utf-8")[:-2]
+    expected_value = "kddiadmin@ノー"
+
+    client = nfshell.NFShellClient(nf_name)
+
+    respose = client._get_prompt(prompt)
+
+    # 結果確認
+    assert respose == expected_value
+
+
+def test_receive_buffer01(tmpdir, capsys: pytest.CaptureFixture, mocker: pytest_mock.MockerFixture):
+    """test_receive_buffer01 ReceiveBuffer 正常試験
+
+    試験条件
+    ・改行コード(\\r\\n、\\n、\\r)・空行・末尾改行を含む受信データを分割して追記する
+
+    試験結果
+    ・last_line()がbytes.splitlines()の最終要素と一致すること
+    ・body()がb"\\n".join(bytes.splitlines()[1:-1])と一致すること
+    """
+    datas = [
+        b"",
+        b"prompt#",
+        b"command\r\nprompt#",
+        b"command\r\nline1\r\n\r\nline2\nline3\rprompt#",
+        b"command\r\nline1\r\nprompt#\r\n",
+        b"command\nline1\n\n\nprompt#"
+    ]
+    for data in datas:
+        buffer = nfshell.ReceiveBuffer()
+        for i in range(0, len(data), 3):
+            buffer.extend(data[i:i + 3])
+
+        assert bytes(buffer) == data
+        assert len(buffer) == len(data)
+        assert buffer.last_line() == (data.splitlines() or [b""])[-1]
+        assert buffer.body() == b"\n".join(data.splitlines()[1:-1])
+
+
+def test_new_transcript01(tmpdir, transcript_dir: pathlib.Path, mocker: pytest_mock.MockerFixture):
+    """test_new_transcript01 new_transcript試験01 セッション記録の設定
+
+    試験条件
+    ・CONN_CONFのcommon.transcriptなし
+    ・CONN_CONFのcommon.transcript: dir、command_cap、session_cap、preview_sizeを指定
+
+    試験結果
+    ・設定なしの場合、TRANSCRIPT_DIRにデフォルトの記録上限で出力されること
+    ・設定ありの場合、設定した出力先・記録上限となること
+    """
+    nf_name = "a1-er-s01-smfvo-001"
+    custom_dir = pathlib.Path(tmpdir).joinpath("custom")
+
+    mocker.patch("src.eri_connection.CONN_CONF", new={"common": {}})
+    default = nfshell.new_transcript(nf_name)
+    mocker.patch("src.eri_connection.CONN_CONF", new={"common": {"transcript": {
+        "dir": str(custom_dir), "command_cap": 10, "session_cap": 20, "preview_size": 5
+    }}})
+    custom = nfshell.new_transcript(nf_name)
+
+    assert (default.nf_name, default.spool_dir) == (nf_name, transcript_dir)
+    assert (default.command_cap, default.session_cap, default.preview_size) == (
+        nfshell.COMMAND_CAP, nfshell.SESSION_CAP, nfshell.PREVIEW_SIZE)
+    assert (custom.spool_dir, custom.command_cap, custom.session_cap, custom.preview_size) == (custom_dir, 10, 20, 5)
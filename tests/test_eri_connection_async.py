@@ -0,0 +1,646 @@
+import asyncio
+import pathlib
+import threading
+from typing import Any, Dict, List, Tuple
+
+import pytest
+import pytest_mock
+from xgnlog.Log import Level
+
+from src.abc_process import Mode, ProcessStatus, TargetStatus
+import src.eri_connection_async as nfshell
+from src.eri_connection import SocketTimeoutException, SSHConnectException
+from src.eri_smfvo_xcap_async_process import AsyncEriSmfvoXCAPProcess
+from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+from src.tracing import TRACER
+from src.transcript import read_index, read_record
+from src.vclock import VirtualClock
+from tests.standin_server import DEFAULT_XCAP, EpgCliSession, EriStandinServer
+
+JOB_ID = "T23AJ002"
+
+XCAP = [
+    "2001:268:200d:1010::6",
+    "2001:268:200d:5010::6",
+    "2001:268:200d:500f::6"
+]
+
+
+def get_1st_log_path(tmpdir: str) -> pathlib.Path:
+    return pathlib.Path(tmpdir).joinpath("1st_eri_connection_async.log")
+
+
+def get_2nd_log_path(tmpdir: str) -> pathlib.Path:
+    return pathlib.Path(tmpdir).joinpath("2nd_eri_connection_async.log")
+
+
+class MockLog():
+    def __init__(self, job_id: str, init_level: Level, log_dir: str) -> None:
+        self.job_id = job_id
+        self.init_level = init_level
+        self.log_path_1st = get_1st_log_path(log_dir)
+        self.log_path_2nd = get_2nd_log_path(log_dir)
+
+    def output_1st_log(self, msg_id: str, add_info: Any = None) -> None:
+        with open(self.log_path_1st, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, message_id:{1}, add_info:{2}\n".format(self.job_id, msg_id, add_info))
+
+    def output_2nd_log(self, level: Level, add_info: Any = None) -> None:
+        with open(self.log_path_2nd, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, level:{1}, add_info:{2}\n".format(self.job_id, level.name, add_info))
+
+
+def get_conn_conf(server: EriStandinServer, nf_names: List[str], password: str = "kddiadmin") -> Dict[str, Any]:
+    (host, port) = server.address
+    return {
+        "common": {},
+        "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name, "password": password}
+                        for nf_name in nf_names},
+        "bastions": {}
+    }
+
+
+@pytest.fixture
+def server():
+    with EriStandinServer() as server:
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def transcript_dir(tmpdir, mocker: pytest_mock.MockerFixture) -> pathlib.Path:
+    # セッション記録は試験毎の一時ディレクトリに出力する
+    path = pathlib.Path(tmpdir).joinpath("transcripts")
+    mocker.patch("src.eri_connection.TRANSCRIPT_DIR", new=path)
+    return path
+
+
+def test_command01(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_command01 command試験01 スタンドインSSHサーバへの接続・コマンド投入
+
+    試験条件
+    ・スタンドインSSHサーバに接続する
+    ・"show running-config epg pgw apn xcap ipv6-name-server"を投入する
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・プロンプトがスタンドインSSHサーバのプロンプト(ANSIエスケープ除去)であること
+    ・受信データから投入コマンドおよびプロンプトが削除されていること
+    ・切断後にシェルが利用不可となること
+    ・障害切り分けログにDEBUG以外の出力がないこと
+    ・ログイン時・コマンド投入時の受信データがセッション記録に保存されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    command = "show running-config epg pgw apn xcap ipv6-name-server"
+    expected_value = "\n".join(EpgCliSession.render(DEFAULT_XCAP)).encode("utf-8")
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection_async.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    async def scenario():
+        client = nfshell.AsyncNFShellClient(nf_name)
+        await client.connect()
+        prompt = client.prompt
+        result = await client.command(command)
+        await client.close()
+        return (client, prompt, result)
+
+    (client, prompt, response_value) = asyncio.run(scenario())
+
+    assert prompt == f"{nf_name}@{server.hostname}#"
+    assert response_value == expected_value
+    assert not client._is_shell_enable()
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        assert all(line.startswith(f"job_id:{JOB_ID}, level:DEBUG, ") for line in f if line.startswith("job_id:"))
+    assert [entry["label"] for entry in read_index(client.transcript.path)] == ["login", command]
+    assert expected_value.replace(b"\n", b"\r\n") in read_record(client.transcript.path, 2)
+
+
+def test_command02(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_command02 command試験02 コマンド投入タイムアウト
+
+    試験条件
+    ・スタンドインSSHサーバに接続する
+    ・プロンプトが受信されない状態でコマンドを投入する(timeout=0.2)
+
+    試験結果
+    ・SocketTimeoutExceptionが発生すること
+    ・一次ログにE00204が出力されること
+    ・障害切り分けログにCRITICALが出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection_async.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    async def scenario():
+        client = nfshell.AsyncNFShellClient(nf_name)
+        await client.connect()
+        client.prompt = "unmatched-prompt#"
+        try:
+            await client.command("screen-length 0", timeout=0.2)
+        finally:
+            await client.close()
+
+    with pytest.raises(SocketTimeoutException) as e:
+        asyncio.run(scenario())
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_2nd: List = f.readlines()
+
+    assert str(e.value) == "timed out after 0.2 seconds"
+    assert f"job_id:{JOB_ID}, message_id:E00204, add_info:{nf_name}\n" in response_value_log_1st
+    assert response_value_log_2nd[0].startswith(f"job_id:{JOB_ID}, level:CRITICAL, add_info:コマンド投入タイムアウト発生:")
+
+
+def test_read_first01(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_read_first01 _read_first試験01 初回読み込みタイムアウト
+
+    試験条件
+    ・スタンドインSSHサーバに接続する
+    ・コマンドを投入せず(受信データがない状態で)初回読み込みを行う(timeout=0.2)
+
+    試験結果
+    ・SocketTimeoutExceptionが発生すること
+    ・一次ログにE00204が出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection_async.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    async def scenario():
+        client = nfshell.AsyncNFShellClient(nf_name)
+        await client.connect()
+        try:
+            await client._read_first(0.2)
+        finally:
+            await client.close()
+
+    with pytest.raises(SocketTimeoutException) as e:
+        asyncio.run(scenario())
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert str(e.value) == "timed out after 0.2 seconds"
+    assert f"job_id:{JOB_ID}, message_id:E00204, add_info:{nf_name}\n" in response_value_log_1st
+
+
+def test_connect01(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_connect01 connect試験01 認証失敗
+
+    試験条件
+    ・誤ったパスワードでスタンドインSSHサーバに接続する
+
+    試験結果
+    ・SSHConnectExceptionが発生すること
+    ・一次ログにE00203が出力されること
+    ・障害切り分けログにパスワードが出力されないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.eri_connection_async.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name], password="wrong-password"))
+
+    with pytest.raises(SSHConnectException):
+        asyncio.run(nfshell.AsyncNFShellClient(nf_name).connect())
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_2nd: str = f.read()
+
+    assert f"job_id:{JOB_ID}, message_id:E00203, add_info:{nf_name}\n" in response_value_log_1st
+    assert "wrong-password" not in response_value_log_2nd
+
+
+def test_run_event_loop01(mocker: pytest_mock.MockerFixture):
+    """test_run_event_loop01 run_event_loop試験01 既定Executorのワーカースレッド数
+
+    試験条件
+    ・max_workers = 2
+    ・既定Executorで4つのブロッキング処理を同時に実行する
+
+    試験結果
+    ・コルーチンの戻り値が返ること
+    ・ブロッキング処理が専用のワーカースレッドで実行されること
+    ・同時に実行されるブロッキング処理がmax_workers以下であること
+    """
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def blocking():
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        threading.Event().wait(0.05)
+        with lock:
+            running.pop()
+        return threading.current_thread().name
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*[loop.run_in_executor(None, blocking) for _ in range(4)])
+
+    response_value = nfshell.run_event_loop(scenario(), 2)
+
+    assert all(name.startswith("xcap-io") for name in response_value)
+    assert max(max_running) <= 2
+
+
+def test_run_event_loop02(mocker: pytest_mock.MockerFixture):
+    """test_run_event_loop02 run_event_loop試験02 Windowsのイベントループ選択
+
+    試験条件
+    ・sys.platform = "win32"
+
+    試験結果
+    ・WindowsSelectorEventLoopPolicyがイベントループポリシーに設定されること
+    """
+    policy = mocker.Mock()
+    mocker.patch("src.eri_connection_async.sys.platform", new="win32")
+    mocker.patch("asyncio.WindowsSelectorEventLoopPolicy", new=mocker.Mock(return_value=policy), create=True)
+    set_policy = mocker.patch("asyncio.set_event_loop_policy")
+
+    async def scenario():
+        return "done"
+
+    response_value = nfshell.run_event_loop(scenario())
+
+    assert response_value == "done"
+    set_policy.assert_called_once_with(policy)
+
+
+def test_client_adapter01(mocker: pytest_mock.MockerFixture):
+    """test_client_adapter01 AsyncClientAdapter試験01 同期クライアントのコルーチン化
+
+    試験条件
+    ・同期クライアント(Mock)をAsyncClientAdapterでラップする
+
+    試験結果
+    ・各コルーチンから同期クライアントの同名メソッドが同じ引数で呼び出されること
+    ・commandの戻り値が同期クライアントの戻り値であること
+    """
+    sync_client = mocker.Mock()
+    sync_client.nf_name = "a2-er-s01-smfvoroout-001"
+    sync_client.command = mocker.Mock(return_value=b"result")
+    adapter = nfshell.AsyncClientAdapter(sync_client)
+
+    async def scenario():
+        await adapter.connect()
+        await adapter.enter_config_mode()
+        result = await adapter.command("show", 3.0)
+        await adapter.exit_config_mode(True)
+        await adapter.abort()
+        await adapter.close()
+        return result
+
+    response_value = asyncio.run(scenario())
+
+    assert adapter.nf_name == "a2-er-s01-smfvoroout-001"
+    assert response_value == b"result"
+    sync_client.connect.assert_called_once_with()
+    sync_client.enter_config_mode.assert_called_once_with()
+    sync_client.command.assert_called_once_with("show", 3.0)
+    sync_client.exit_config_mode.assert_called_once_with(True)
+    sync_client.abort.assert_called_once_with()
+    sync_client.close.assert_called_once_with()
+
+
+def test_async_process_run01(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run01 AsyncEriSmfvoXCAPProcess.run試験01 複数NFの並行DOWN
+
+    試験条件
+    ・スタンドインSSHサーバ上の8NFに対して、1つのイベントループでDOWNモードを並行実行する
+    ・edns_ipaddr = "2001:268:200d:1010::6"
+
+    試験結果
+    ・全NFのプロセスがpost_check_okで完了すること
+    ・全NFで削除IPアドレスが削除され、予備IPアドレスが同じ優先度で追加されていること
+    ・全NFでコミットが1回実行されていること
+    ・全NFで変更反映待ちが初回のポーリングで完了すること(CONVERGE_INTERVAL = 5.0)
+    """
+    nf_names = [f"a{i}-er-s01-smfvoroout-001" for i in range(8)]
+    edns_ipaddr = "2001:268:200d:1010::6"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, nf_names))
+    mocker.patch("src.eri_smfvo_xcap_process.CONVERGE_INTERVAL", new=5.0)
+
+    async def scenario():
+        processes = [AsyncEriSmfvoXCAPProcess("tys1tb1edns02", nf_name, Mode.down, edns_ipaddr, XCAP, False)
+                     for nf_name in nf_names]
+        for process in processes:
+            process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, log_dir=tmpdir)
+        return (processes, await asyncio.gather(*[process.run_async() for process in processes]))
+
+    (processes, response_value) = asyncio.run(scenario())
+
+    assert response_value == [ProcessStatus.post_check_ok] * len(nf_names)
+    for process in processes:
+        assert process.before_status == TargetStatus.up
+        assert process.after_status == TargetStatus.down
+        assert process.converge_time < 2.5
+    for nf_name in nf_names:
+        node = server.node(nf_name)
+        assert node.running == [("2001:268:200d:5010::6", "200"), ("2001:268:200d:500f::6", "100")]
+        assert node.commit_count == 1
+
+
+def run_async_process(tmpdir: str, nf_name: str, mode: Mode = Mode.down) -> Tuple[AsyncEriSmfvoXCAPProcess, ProcessStatus]:
+    process = AsyncEriSmfvoXCAPProcess("tys1tb1edns02", nf_name, mode, "2001:268:200d:1010::6", XCAP, False)
+    process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, log_dir=tmpdir)
+    return (process, asyncio.run(process.run_async()))
+
+
+def read_process_1st_log(tmpdir: str) -> List[str]:
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        return [x for x in f.readlines() if x.startswith("job_id:T23AJ003,")]
+
+
+def test_async_process_run02(tmpdir, capsys: pytest.CaptureFixture, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run02 AsyncEriSmfvoXCAPProcess.run試験02 SSH接続失敗
+
+    試験条件
+    ・誤ったパスワードでスタンドインSSHサーバに接続する
+
+    試験結果
+    ・プロセスがssh_ngで完了すること
+    ・SSH接続エラーの標準出力、一次ログE00304が出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name], password="wrong-password"))
+
+    (process, response_value) = run_async_process(tmpdir, nf_name)
+
+    (sout, serr) = capsys.readouterr()
+    assert response_value == ProcessStatus.ssh_ng
+    assert "ssh process coundn't connect to nf or bastion. [ UNKNOWN ]" in sout
+    assert f"job_id:T23AJ003, message_id:E00304, add_info:{nf_name}\n" in read_process_1st_log(tmpdir)
+
+
+def test_async_process_run03(tmpdir, capsys: pytest.CaptureFixture, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run03 AsyncEriSmfvoXCAPProcess.run試験03 事前確認タイムアウト
+
+    試験条件
+    ・スタンドインSSHサーバがshow running-configに応答しない
+    ・コマンド投入タイムアウト = 0.3秒
+
+    試験結果
+    ・プロセスがpre_check_ngで完了すること
+    ・タイムアウトの標準出力、一次ログE00304が出力されること
+    ・SSH接続が切断されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    mocker.patch.object(nfshell.AsyncNFShellClient.command, "__defaults__", (0.3,))
+    server.node(nf_name).hangs.add("show running-config")
+
+    (process, response_value) = run_async_process(tmpdir, nf_name)
+
+    (sout, serr) = capsys.readouterr()
+    assert response_value == ProcessStatus.pre_check_ng
+    assert process.before_status is None
+    assert "ssh connection timeout was happened. [ UNKNOWN ]" in sout
+    assert f"job_id:T23AJ003, message_id:E00304, add_info:{nf_name}\n" in read_process_1st_log(tmpdir)
+    assert not process.client._is_shell_enable()
+
+
+def test_async_process_run04(tmpdir, capsys: pytest.CaptureFixture, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run04 AsyncEriSmfvoXCAPProcess.run試験04 変更コマンドタイムアウト
+
+    試験条件
+    ・スタンドインSSHサーバが削除コマンド(no epg pgw apn xcap ...)に応答しない
+    ・コマンド投入タイムアウト = 0.3秒
+
+    試験結果
+    ・プロセスがchange_ngで完了すること
+    ・abortが実行され、一次ログE00321が出力されること
+    ・NFの設定が変更されず、コミットされていないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    mocker.patch.object(nfshell.AsyncNFShellClient.command, "__defaults__", (0.3,))
+    server.node(nf_name).hangs.add("no epg pgw apn xcap")
+
+    (process, response_value) = run_async_process(tmpdir, nf_name)
+
+    (sout, serr) = capsys.readouterr()
+    log_1st = read_process_1st_log(tmpdir)
+    assert response_value == ProcessStatus.change_ng
+    assert "xcap ipaddr change was failed. abort has done. current status is in use. [ UP ]" in sout
+    assert f"job_id:T23AJ003, message_id:I00308, add_info:{nf_name}\n" in log_1st
+    assert f"job_id:T23AJ003, message_id:E00321, add_info:{[nf_name, Mode.down]}\n" in log_1st
+    assert server.node(nf_name).running == DEFAULT_XCAP
+    assert server.node(nf_name).commit_count == 0
+
+
+def test_async_process_run05(tmpdir, capsys: pytest.CaptureFixture, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run05 AsyncEriSmfvoXCAPProcess.run試験05 正常性検証失敗
+
+    試験条件
+    ・スタンドインSSHサーバのvalidate結果が"Validation complete"を含まない
+
+    試験結果
+    ・プロセスがchange_ngで完了すること
+    ・abortが実行され、一次ログE00322が出力されること
+    ・NFの設定が変更されず、コミットされていないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    server.node(nf_name).replies["validate"] = ["Failed: illegal reference"]
+
+    (process, response_value) = run_async_process(tmpdir, nf_name)
+
+    (sout, serr) = capsys.readouterr()
+    log_1st = read_process_1st_log(tmpdir)
+    assert response_value == ProcessStatus.change_ng
+    assert "commit was failed. abort has done." in sout
+    assert f"job_id:T23AJ003, message_id:I00308, add_info:{nf_name}\n" in log_1st
+    assert f"job_id:T23AJ003, message_id:E00322, add_info:{[nf_name, Mode.down]}\n" in log_1st
+    assert server.node(nf_name).running == DEFAULT_XCAP
+    assert server.node(nf_name).commit_count == 0
+
+
+def test_async_process_run06(tmpdir, capsys: pytest.CaptureFixture, server: EriStandinServer, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run06 AsyncEriSmfvoXCAPProcess.run試験06 コミット失敗
+
+    試験条件
+    ・スタンドインSSHサーバのcommit結果が"Commit complete"を含まない
+
+    試験結果
+    ・プロセスがchange_ngで完了すること
+    ・abortが実行され、一次ログE00322が出力されること
+    ・NFの設定が変更されていないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    server.node(nf_name).replies["commit"] = ["Aborted: the configuration database is locked"]
+
+    (process, response_value) = run_async_process(tmpdir, nf_name)
+
+    (sout, serr) = capsys.readouterr()
+    log_1st = read_process_1st_log(tmpdir)
+    assert response_value == ProcessStatus.change_ng
+    assert "commit was failed. abort has done." in sout
+    assert f"job_id:T23AJ003, message_id:E00322, add_info:{[nf_name, Mode.down]}\n" in log_1st
+    assert server.node(nf_name).running == DEFAULT_XCAP
+    assert server.node(nf_name).commit_count == 0
+
+
+def test_async_process_run07(tmpdir, mocker: pytest_mock.MockerFixture):
+    """test_async_process_run07 AsyncEriSmfvoXCAPProcess.run試験07 フェーズ所要時間の計測
+
+    試験条件
+    ・スタブモード、仮想時計でDOWNモードを同期版・asyncio版それぞれで実行する
+    ・ipaddr_list = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+
+    試験結果
+    ・両プロセスがpost_check_okで完了すること
+    ・実行したフェーズとプロセス全体(run)の所要時間が記録されること
+    ・open_clientがスタブの接続(1秒)と画面設定(0.25秒)の合計となること
+    ・同期版とasyncio版で所要時間が一致すること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    ipaddr_list = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+
+    mocker.patch("src.eri_connection_stub.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+
+    processes = [cls("tys1tb1edns02", nf_name, Mode.down, ipaddr_list[0], ipaddr_list, True, clock=VirtualClock())
+                 for cls in (EriSmfvoXCAPProcess, AsyncEriSmfvoXCAPProcess)]
+    for process in processes:
+        process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, log_dir=tmpdir)
+    response_value = [processes[0].run(), asyncio.run(processes[1].run_async())]
+
+    assert response_value == [ProcessStatus.post_check_ok] * 2
+    assert set(processes[0].phase_times) == {"open_client", "pre_check", "change_status", "to_down", "to_up",
+                                             "commit", "post_check", "close_client", "run"}
+    assert processes[0].phase_times["open_client"] == 1.25
+    assert processes[0].phase_times["run"] == processes[0].clock.elapsed
+    assert processes[0].phase_times == processes[1].phase_times
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_async_process_run08(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture, is_async: bool):
+    """test_async_process_run08 AsyncEriSmfvoXCAPProcess.run試験08 トレースの収集
+
+    試験条件
+    ・トレースの収集を開始し、スタンドインSSHサーバ上のNFに対してDOWNモードを実行する(同期版・asyncio版)
+
+    試験結果
+    ・プロセスがpost_check_okで完了すること
+    ・NF毎のスパン(process.run)の下にフェーズのスパン、その下に接続・コマンド投入・設定モード移行のスパンが出力されること
+    ・コマンド投入のスパンにコマンド、送受信バイト数、ステータスが出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    mocker.patch("src.eri_smfvo_xcap_process.CONVERGE_INTERVAL", new=5.0)
+
+    TRACER.start()
+    try:
+        if is_async:
+            (process, response_value) = run_async_process(tmpdir, nf_name)
+        else:
+            process = EriSmfvoXCAPProcess("tys1tb1edns02", nf_name, Mode.down, "2001:268:200d:1010::6", XCAP, False)
+            process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, log_dir=tmpdir)
+            response_value = process.run()
+    finally:
+        TRACER.stop()
+
+    spans = TRACER.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_id = {span["spanId"]: span for span in spans}
+
+    def parent_name(span):
+        return by_id[span["parentSpanId"]]["name"] if span["parentSpanId"] else None
+
+    def attributes(span):
+        return {x["key"]: list(x["value"].values())[0] for x in span["attributes"]}
+
+    names = {}
+    for span in spans:
+        names.setdefault(span["name"], span)
+    assert response_value == ProcessStatus.post_check_ok
+    assert parent_name(names["process.run"]) is None
+    assert attributes(names["process.run"])["status"] == "post_check_ok"
+    assert parent_name(names["process.open_client"]) == "process.run"
+    assert parent_name(names["nf.connect"]) == "process.open_client"
+    assert parent_name(names["nf.read_first"]) == "nf.connect"
+    assert parent_name(names["process.to_down"]) == "process.change_status"
+    assert parent_name(names["nf.enter_config_mode"]) == "process.to_down"
+    commands = [span for span in spans if span["name"] == "nf.command"]
+    assert {parent_name(span) for span in commands} >= {"process.pre_check", "process.to_down", "process.commit"}
+    show = attributes([span for span in commands if parent_name(span) == "process.pre_check"][0])
+    assert show["command"] == "show running-config epg pgw apn xcap ipv6-name-server"
+    assert show["bytes_sent"] == str(len(show["command"]) + 1)
+    assert int(show["bytes_received"]) > 0
+    assert all(span["status"] == {"code": 1} for span in commands)
+
+
+@pytest.mark.parametrize(("is_async", "running", "expected_value", "expected_running"), [
+    (False, DEFAULT_XCAP, ProcessStatus.post_check_ok, [("2001:268:200d:500f::6", "100"), ("2001:268:200d:501f::6", "200")]),
+    (True, DEFAULT_XCAP, ProcessStatus.post_check_ok, [("2001:268:200d:500f::6", "100"), ("2001:268:200d:501f::6", "200")]),
+    (False, [("2001:268:200d:5010::6", "200"), ("2001:268:200d:500f::6", "100")], ProcessStatus.post_check_ok,
+     [("2001:268:200d:500f::6", "100"), ("2001:268:200d:501f::6", "200")]),
+    (False, [("2001:268:200d:1010::6", "100"), ("2001:268:200d:5010::6", "200"), ("2001:268:200d:500f::6", "300")],
+     ProcessStatus.change_ng, None),
+])
+def test_async_process_run09(tmpdir, server: EriStandinServer, mocker: pytest_mock.MockerFixture, is_async: bool,
+                             running: List[Tuple[str, str]], expected_value: ProcessStatus, expected_running: List[Tuple[str, str]]):
+    """test_async_process_run09 AsyncEriSmfvoXCAPProcess.run試験09 複数eDNSの同時DOWN
+
+    試験条件
+    ・eDNS IPアドレス = ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]
+    ・設定可能IPアドレス = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:500f::6", "2001:268:200d:501f::6"]
+    ・NFの設定が両eDNS設定済み、片方のみ設定済み、予備IPアドレス不足(1件)
+
+    試験結果
+    ・設定済みの全eDNS IPアドレスが削除され、予備IPアドレスが同じ優先度で追加されること
+    ・1セッション・1回のコミットで変更されること
+    ・予備IPアドレスが不足する場合はchange_ngとなり、NFの設定が変更されないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    edns_ipaddrs = ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]
+    ipaddr_list = edns_ipaddrs + ["2001:268:200d:500f::6", "2001:268:200d:501f::6"]
+
+    mocker.patch("src.eri_connection_async.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    mocker.patch("src.eri_smfvo_xcap_process.CONVERGE_INTERVAL", new=5.0)
+    server.node(nf_name).running = list(running)
+
+    cls = AsyncEriSmfvoXCAPProcess if is_async else EriSmfvoXCAPProcess
+    process = cls("tys1tb1edns02,tys1tb2edns02", nf_name, Mode.down, edns_ipaddrs, ipaddr_list, False)
+    process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, log_dir=tmpdir)
+    response_value = asyncio.run(process.run_async()) if is_async else process.run()
+
+    node = server.node(nf_name)
+    assert response_value == expected_value
+    assert server.peak_sessions == 1
+    if expected_running is None:
+        assert node.running == running
+        assert node.commit_count == 0
+    else:
+        assert node.running == expected_running
+        assert node.commit_count == 1
+        assert process.before_status == TargetStatus.up
+        assert process.after_status == TargetStatus.down
@@ -0,0 +1,222 @@
+import json
+import pathlib
+from typing import Any, Dict, List
+
+import pytest
+import pytest_mock
+from xgnlog.Log import Level
+
+from src.abc_process import Mode, ProcessStatus, TargetStatus
+import src.eri_connection_replay as replay
+from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+from tests.standin_server import DEFAULT_XCAP, EpgCliSession, EriStandinServer
+
+JOB_ID = "T23AJ002"
+NF_NAME = "a1-er-s01-smfvoroout-001"
+COMMAND = "show running-config epg pgw apn xcap ipv6-name-server"
+XCAP = [
+    "2001:268:200d:1010::6",
+    "2001:268:200d:5010::6",
+    "2001:268:200d:500f::6"
+]
+
+
+class MockLog():
+    def __init__(self, job_id: str, init_level: Level, log_dir: str) -> None:
+        self.job_id = job_id
+        self.init_level = init_level
+        self.log_path_1st = pathlib.Path(log_dir).joinpath("1st_eri_connection_replay.log")
+        self.log_path_2nd = pathlib.Path(log_dir).joinpath("2nd_eri_connection_replay.log")
+
+    def output_1st_log(self, msg_id: str, add_info: Any = None) -> None:
+        with open(self.log_path_1st, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, message_id:{1}, add_info:{2}\n".format(self.job_id, msg_id, add_info))
+
+    def output_2nd_log(self, level: Level, add_info: Any = None) -> None:
+        with open(self.log_path_2nd, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, level:{1}, add_info:{2}\n".format(self.job_id, level.name, add_info))
+
+
+@pytest.fixture
+def server(tmpdir, mocker: pytest_mock.MockerFixture):
+    mocker.patch("src.eri_connection.LOGGER", new=MockLog(JOB_ID, Level.INFO, tmpdir))
+    mocker.patch("src.eri_connection.TRANSCRIPT_DIR", new=pathlib.Path(tmpdir).joinpath("transcripts"))
+    with EriStandinServer() as server:
+        (host, port) = server.address
+        mocker.patch("src.eri_connection.CONN_CONF", new={
+            "common": {},
+            "connections": {NF_NAME: {"ipaddr": host, "port": port, "username": NF_NAME, "password": server.password}},
+            "bastions": {}
+        })
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def logger(tmpdir, mocker: pytest_mock.MockerFixture):
+    mocker.patch("src.eri_connection_replay.LOGGER", new=MockLog(JOB_ID, Level.INFO, tmpdir))
+
+
+def make_recording(exchanges: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"version": replay.RECORDING_VERSION, "nf_name": NF_NAME, "recorded_at": "2024-01-31 00:00:00",
+            "exchanges": exchanges}
+
+
+def make_exchange(command: str, prompt: str, chunks: List[Any]) -> Dict[str, Any]:
+    return {"command": command, "prompt": prompt,
+            "chunks": [[offset, replay.base64.b64encode(data).decode("ascii")] for (offset, data) in chunks]}
+
+
+def test_record01(tmpdir, server: EriStandinServer):
+    """test_record01 RecordingNFShellClient試験01 セッション記録
+
+    試験条件
+    ・スタンドインSSHサーバに接続し、コマンド投入、設定モード移行・解除を行った後に切断する
+
+    試験結果
+    ・切断時にセッション記録ファイルが保存されること
+    ・ログイン、投入コマンド、config、endの順に受信データとプロンプトが記録されること
+    ・受信データのチャンクの受信時間が昇順に記録されること
+    """
+    path = pathlib.Path(tmpdir).joinpath("recordings", f"{NF_NAME}.json")
+
+    client = replay.RecordingNFShellClient(NF_NAME, path)
+    client.connect()
+    result = client.command(COMMAND)
+    client.enter_config_mode()
+    client.exit_config_mode()
+    client.close()
+
+    recording = replay.load_recording(path)
+    prompt = f"{NF_NAME}@{server.hostname}#"
+    assert result == "\n".join(EpgCliSession.render(DEFAULT_XCAP)).encode("utf-8")
+    assert (recording["version"], recording["nf_name"]) == (replay.RECORDING_VERSION, NF_NAME)
+    assert [(e["command"], e["prompt"]) for e in recording["exchanges"]] == [
+        (replay.LOGIN, prompt), (COMMAND, prompt), ("config", f"{NF_NAME}@{server.hostname}(config)#"), ("end", prompt)
+    ]
+    for exchange in recording["exchanges"]:
+        offsets = [offset for (offset, _) in exchange["chunks"]]
+        assert offsets and offsets == sorted(offsets)
+
+
+def test_replay01(tmpdir, server: EriStandinServer):
+    """test_replay01 ReplayShellClient試験01 記録したセッションの再生
+
+    試験条件
+    ・test_record01と同じ操作を記録したセッション記録ファイルを、time_scale = 0で再生する
+
+    試験結果
+    ・コマンド投入結果が記録時と同じであること
+    ・プロンプト、設定モード状態が記録時と同じく遷移すること
+    """
+    path = pathlib.Path(tmpdir).joinpath(f"{NF_NAME}.json")
+    client = replay.RecordingNFShellClient(NF_NAME, path)
+    client.connect()
+    expected_value = client.command(COMMAND)
+    client.enter_config_mode()
+    client.exit_config_mode()
+    client.close()
+
+    player = replay.ReplayShellClient(NF_NAME, path, time_scale=0)
+    player.connect()
+    response_value = player.command(COMMAND)
+    player.enter_config_mode()
+    config_prompt = player.prompt
+    player.exit_config_mode()
+    player.close()
+
+    assert response_value == expected_value
+    assert config_prompt == f"{NF_NAME}@{server.hostname}(config)#"
+    assert player.prompt == f"{NF_NAME}@{server.hostname}#"
+    assert player.is_config_mode is False
+
+
+def test_replay02(mocker: pytest_mock.MockerFixture):
+    """test_replay02 ReplayShellClient試験02 受信時間の再生
+
+    試験条件
+    ・受信時間0.1秒、0.3秒、0.3秒の3チャンクを記録したコマンド
+    ・time_scale = 0.5
+
+    試験結果
+    ・チャンク間の受信時間の0.5倍ずつ待ち合わせること
+    ・投入コマンド・プロンプトを除いた受信データが返ること
+    """
+    sleep = mocker.patch("src.eri_connection_replay.time.sleep")
+    recording = make_recording([
+        make_exchange(COMMAND, "host#", [(0.1, COMMAND.encode() + b"\r\n"), (0.3, b"line1\r\n"), (0.3, b"line2\r\nhost#")])
+    ])
+
+    player = replay.ReplayShellClient(NF_NAME, recording, time_scale=0.5)
+    response_value = player.command(COMMAND)
+
+    assert response_value == b"line1\nline2"
+    assert [c.args[0] for c in sleep.call_args_list] == pytest.approx([0.05, 0.1])
+
+
+def test_replay03(mocker: pytest_mock.MockerFixture):
+    """test_replay03 ReplayShellClient試験03 投入コマンドの照合
+
+    試験条件
+    ・"show a"、"show b"の順に記録したセッション
+    ・"show b"、"show b"、"show a"、"show c"の順に投入する
+
+    試験結果
+    ・1回目の"show b"は未再生部分から再生されること
+    ・2回目の"show b"、"show a"は再生済みの記録が再生されること
+    ・記録にない"show c"はReplayMismatchExceptionが発生すること
+    """
+    recording = make_recording([
+        make_exchange("show a", "host#", [(0, b"show a\r\na\r\nhost#")]),
+        make_exchange("show b", "host#", [(0, b"show b\r\nb\r\nhost#")]),
+    ])
+
+    player = replay.ReplayShellClient(NF_NAME, recording, time_scale=0)
+
+    assert [player.command("show b"), player.command("show b"), player.command("show a")] == [b"b", b"b", b"a"]
+    with pytest.raises(replay.ReplayMismatchException):
+        player.command("show c")
+
+
+def test_load_recording01(tmpdir):
+    """test_load_recording01 load_recording試験01 形式バージョン不一致
+
+    試験条件
+    ・version = RECORDING_VERSION + 1のセッション記録ファイル
+
+    試験結果
+    ・ValueErrorが発生すること
+    """
+    path = pathlib.Path(tmpdir).joinpath("recording.json")
+    recording = make_recording([])
+    recording["version"] = replay.RECORDING_VERSION + 1
+    path.write_text(json.dumps(recording), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        replay.load_recording(path)
+
+
+def test_process_replay01(tmpdir, server: EriStandinServer):
+    """test_process_replay01 EriSmfvoXCAPProcess試験 記録したセッションによるDOWNの再実行
+
+    試験条件
+    ・スタンドインSSHサーバ上のNFに対するDOWNモードのプロセス実行を記録する
+    ・記録したセッションをtime_scale = 0で再生し、同じDOWNモードのプロセスを実行する
+
+    試験結果
+    ・記録時・再生時ともにプロセスがpost_check_okで完了すること
+    ・再生時の変更前後の状態が記録時と同じであること
+    """
+    path = pathlib.Path(tmpdir).joinpath(f"{NF_NAME}.json")
+
+    def run(client: Any) -> EriSmfvoXCAPProcess:
+        process = EriSmfvoXCAPProcess("tys1tb1edns02", NF_NAME, Mode.down, XCAP[0], XCAP, False, None, client)
+        process._AbcProcess__logger = MockLog("T23AJ003", Level.INFO, tmpdir)
+        process.status = process.run()
+        return process
+
+    recorded = run(replay.RecordingNFShellClient(NF_NAME, path))
+    replayed = run(replay.ReplayShellClient(NF_NAME, path, time_scale=0))
+
+    assert recorded.status == replayed.status == ProcessStatus.post_check_ok
+    assert (replayed.before_status, replayed.after_status) == (TargetStatus.up, TargetStatus.down)
+    assert (replayed.before_status, replayed.after_status) == (recorded.before_status, recorded.after_status)
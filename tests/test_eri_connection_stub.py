@@ -0,0 +1,34 @@
+import re
+
+import pytest
+
+from src.eri_connection_stub import STUB_DISPATCHER, stub_dict
+
+
+@pytest.mark.parametrize("command", [
+    "screen-length 0",
+    "show running-config epg pgw apn xcap ipv6-name-server",
+    "config",
+    "no epg pgw apn xcap ipv6-name-server 2001:268:200d:1010::6",
+    "epg pgw apn xcap ipv6-name-server 2001:268:200d:501f::6 priority 100",
+    "show configuration diff",
+    "validate",
+    "commit comment test",
+    "abort",
+    "end",
+    "exit",
+    "show version",
+    "",
+])
+def test_stub_dispatcher01(command: str):
+    """test_stub_dispatcher01 StubDispatcher試験01 スタブ定義の検索
+
+    試験条件
+    ・スタブ定義の各コマンド、および定義にないコマンド
+
+    試験結果
+    ・スタブ定義を定義順にre.matchした場合と同じ定義が取得できること
+    """
+    expected_value = next(((key, value) for key, value in stub_dict.items() if re.match(str(value["command"]), command)), None)
+
+    assert STUB_DISPATCHER.match(command) == expected_value
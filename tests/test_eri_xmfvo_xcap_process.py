@@ -8,7 +8,7 @@ from xgnlog.Log import Level
 
 from src.abc_process import Mode, ProcessStatus, TargetStatus
 from src.eri_connection import SocketTimeoutException
-from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess
+from src.eri_smfvo_xcap_process import EriSmfvoXCAPProcess, parse_xcap_template
 
 JOB_ID = "T23AJ003"
 
@@ -47,6 +47,40 @@ class StubClientForTest():
         pass
 
 
+XCAP_BEFORE = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n  priority 100\r\n !\r\n ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n!"
+XCAP_AFTER = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n ipv6-name-server 2001:268:200d:500f::6\r\n  priority 100\r\n !\r\n!"
+
+
+def make_converge_process(tmpdir: str, mocker: MockerFixture, results: List[Any], converge_timeout: float = 5.0):
+    """変更反映待ち試験用のプロセスを生成する
+
+    get_statusはresultsの(ステータス, 取得結果)を順に返却し、time.sleepは仮想時計を進める
+    """
+    clock = [100.0]
+    test_mocker = mocker.MagicMock()
+
+    def get_status():
+        (status, status_result) = results.pop(0)
+        process.status_result = status_result
+        return status
+
+    def sleep(seconds: float):
+        clock[0] += seconds
+
+    test_mocker.get_status = mocker.Mock(side_effect=get_status)
+    test_mocker.sleep = mocker.Mock(side_effect=sleep)
+    mocker.patch("time.sleep", test_mocker.sleep)
+    mocker.patch("time.monotonic", lambda: clock[0])
+
+    process = EriSmfvoXCAPProcess("tys1tb1edns02", "a2-er-s01-smfvo-001", Mode.down, "2001:268:200d:1010::6",
+                                  ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:500f::6"],
+                                  False, JOB_ID, test_mocker, converge_timeout)
+    process._AbcProcess__logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    process.add_ipaddr = "2001:268:200d:500f::6"
+    mocker.patch.object(process, "get_status", test_mocker.get_status)
+    return (process, test_mocker)
+
+
 def test_edns_ipaddr01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     """test_edns_ipaddr01 edns_ipaddr試験01 edns_ipaddrプロパティ取得
 
@@ -2748,6 +2782,97 @@ def test_post_check02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixtu
     assert not log_path_2nd.exists()
 
 
+def test_wait_converged01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_wait_converged01 wait_converged試験01 正常系試験 (3回目のポーリングで反映)
+
+    試験条件
+    ・mode = Mode.down
+    ・edns_ipaddr = "2001:268:200d:1010::6"
+    ・add_ipaddr = "2001:268:200d:500f::6"
+    ・get_statusが2回目までは変更前、3回目で変更後の状態を返却する
+
+    試験結果
+    ・関数結果がTrueとなること
+    ・get_statusが3回呼ばれること
+    ・ポーリング間隔が0.25秒、0.5秒と延長されること
+    ・converge_timeが反映までの時間(0.75秒)となること
+    ・標準出力がないこと
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    """
+    nf_name = "a2-er-s01-smfvo-001"
+    results = [(TargetStatus.up, XCAP_BEFORE), (TargetStatus.up, XCAP_BEFORE), (TargetStatus.down, XCAP_AFTER)]
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00344, add_info:{[nf_name, 5.0]}\n",
+        f"job_id:{JOB_ID}, message_id:I00345, add_info:{[nf_name, True, '0.750s']}\n"
+    ]
+
+    (process, test_mocker) = make_converge_process(tmpdir, mocker, results)
+
+    response_value = process.wait_converged()
+
+    (sout, serr) = capsys.readouterr()
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value is True
+    assert test_mocker.get_status.call_count == 3
+    assert test_mocker.sleep.call_args_list == [mocker.call(0.25), mocker.call(0.5)]
+    assert process.converge_time == pytest.approx(0.75)
+    assert sout == ""
+    assert response_value_log_1st == expected_log_1st
+
+
+def test_wait_converged02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_wait_converged02 wait_converged試験02 準正常系試験 (上限時間超過)
+
+    試験条件
+    ・converge_timeout = 1.0
+    ・get_statusが常に変更前の状態を返却する
+
+    試験結果
+    ・関数結果がFalseとなること
+    ・ポーリング間隔が上限時間までの残り時間で打ち切られること
+    ・上限時間経過後のポーリングで終了し、get_statusが4回呼ばれること
+    ・一次ログに反映未確認(False)が出力されること
+    """
+    nf_name = "a2-er-s01-smfvo-001"
+    results = [(TargetStatus.up, XCAP_BEFORE)] * 4
+
+    (process, test_mocker) = make_converge_process(tmpdir, mocker, results, converge_timeout=1.0)
+
+    response_value = process.wait_converged()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value is False
+    assert test_mocker.get_status.call_count == 4
+    assert test_mocker.sleep.call_args_list == [mocker.call(0.25), mocker.call(0.5), mocker.call(0.25)]
+    assert response_value_log_1st[-1] == f"job_id:{JOB_ID}, message_id:I00345, add_info:{[nf_name, False, '1.000s']}\n"
+
+
+def test_wait_converged03(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_wait_converged03 wait_converged試験03 異常系試験 (状態取得失敗)
+
+    試験条件
+    ・get_statusがNone(状態取得失敗)を返却する
+
+    試験結果
+    ・関数結果がFalseとなること
+    ・ポーリングを継続せず、get_statusが1回のみ呼ばれること
+    """
+    results = [(None, None)]
+
+    (process, test_mocker) = make_converge_process(tmpdir, mocker, results)
+
+    response_value = process.wait_converged()
+
+    assert response_value is False
+    assert test_mocker.get_status.call_count == 1
+    assert test_mocker.sleep.called is False
+
+
 def test_necessity_check01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     """test_necessity_check01 necessity_check試験01 正常系試験 (mode: Mode.show, status: TargetStatus.up, 変更不要)
 
@@ -3928,6 +4053,91 @@ def test_parse_result04(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFix
     assert not log_path_2nd.exists()
 
 
+def test_parse_result05(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_parse_result05 parse_result試験05 正常系試験 (xCAPテンプレートで解析)
+
+    試験条件
+    ・edns_name = "tys1tb1edns02"
+    ・nf_name = "a2-er-s01-smfvo-001"
+    ・mode = Mode.down
+    ・xcap_parser = "textfsm"
+    ・edns_ipaddr = "2001:268:200d:1010::6"
+    ・ipaddr_list = [
+            "2001:268:200d:1010::6",
+            "2001:268:200d:5010::6",
+            "2001:268:200d:500f::6"
+        ]
+    ・status_result = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n  priority 100\r\n !\r\n ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n!"
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueとなること
+    ・標準出力が想定しているメッセージ内容であること
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    ・障害切り分けログ出力が想定しているlevel、add_infoであること
+    """
+    edns_name = "tys1tb1edns02"
+    nf_name = "a2-er-s01-smfvo-001"
+    mode = Mode.down
+    edns_ipaddr = "2001:268:200d:1010::6"
+    ipaddr_list = [
+        "2001:268:200d:1010::6",
+        "2001:268:200d:5010::6",
+        "2001:268:200d:500f::6"
+    ]
+    status_result = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n  priority 100\r\n !\r\n ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n!"
+    parsed_list = [
+        {
+            "ipaddr": "2001:268:200d:1010::6",
+            "priority": "100"
+        },
+        {
+            "ipaddr": "2001:268:200d:5010::6",
+            "priority": "200"
+        }
+    ]
+    add_ipaddr = "2001:268:200d:500f::6"
+    priority = "100"
+
+    command_response_value = []
+
+    expected_value = None
+
+    expected_sout = []
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00337, add_info:{nf_name}\n",
+        f"job_id:{JOB_ID}, message_id:I00338, add_info:{[nf_name, parsed_list, add_ipaddr, priority]}\n"
+    ]
+
+    expected_log_2nd = []
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+
+    process = EriSmfvoXCAPProcess(edns_name, nf_name, mode, edns_ipaddr, ipaddr_list, JOB_ID, xcap_parser="textfsm")
+    process._AbcProcess__logger = logger
+
+    response_value = process.parse_result(status_result)
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_1st = get_1st_log_path(tmpdir)
+    log_path_2nd = get_2nd_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_1st, "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert process.parse_xcap is parse_xcap_template
+    assert response_value == expected_value
+    assert process.add_ipaddr == add_ipaddr
+    assert process.priority == priority
+    assert sout_desc == expected_sout
+    assert log_path_1st.exists()
+    assert response_value_log_1st == expected_log_1st
+    assert not log_path_2nd.exists()
+
+
 def test_run01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     """test_run01 run試験01 正常系試験 (OK, mode:Mode.down)
 
@@ -3954,6 +4164,7 @@ def test_run01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     ・open_clientが1回呼ばれること
     ・pre_checkが1回呼ばれること
     ・change_statusが1回呼ばれること
+    ・wait_convergedが1回呼ばれること
     ・post_checkが1回呼ばれること
     ・close_clientが1回呼ばれること
     ・標準出力がないこと
@@ -4003,6 +4214,7 @@ def test_run01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     test_mocker.open_client = mocker.Mock(return_value=open_client)
     test_mocker.pre_check = mocker.Mock(return_value=pre_check)
     test_mocker.change_status = mocker.Mock(return_value=change_status)
+    test_mocker.wait_converged = mocker.Mock(return_value=True)
     test_mocker.post_check = mocker.Mock(return_value=post_check)
     test_mocker.close_client = mocker.Mock(return_value=None)
 
@@ -4018,6 +4230,7 @@ def test_run01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     mocker.patch.object(process, "open_client", test_mocker.open_client)
     mocker.patch.object(process, "pre_check", test_mocker.pre_check)
     mocker.patch.object(process, "change_status", test_mocker.change_status)
+    mocker.patch.object(process, "wait_converged", test_mocker.wait_converged)
     mocker.patch.object(process, "post_check", test_mocker.post_check)
     mocker.patch.object(process, "close_client", test_mocker.close_client)
 
@@ -4039,6 +4252,7 @@ def test_run01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     assert test_mocker.pre_check.call_count == 1
     assert test_mocker.change_status.called == True
     assert test_mocker.change_status.call_count == 1
+    assert test_mocker.wait_converged.call_count == 1
     assert test_mocker.post_check.called == True
     assert test_mocker.post_check.call_count == 1
     assert test_mocker.close_client.called == True
@@ -4681,6 +4895,7 @@ def test_run07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     ・open_clientが1回呼ばれること
     ・pre_checkが1回呼ばれること
     ・change_statusが1回呼ばれること
+    ・wait_convergedが1回呼ばれること
     ・post_checkが1回呼ばれること
     ・close_clientが1回呼ばれること
     ・標準出力がないこと
@@ -4730,6 +4945,7 @@ def test_run07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     test_mocker.open_client = mocker.Mock(return_value=open_client)
     test_mocker.pre_check = mocker.Mock(return_value=pre_check)
     test_mocker.change_status = mocker.Mock(return_value=change_status)
+    test_mocker.wait_converged = mocker.Mock(return_value=True)
     test_mocker.post_check = mocker.Mock(return_value=post_check)
     test_mocker.close_client = mocker.Mock(return_value=None)
 
@@ -4745,6 +4961,7 @@ def test_run07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     mocker.patch.object(process, "open_client", test_mocker.open_client)
     mocker.patch.object(process, "pre_check", test_mocker.pre_check)
     mocker.patch.object(process, "change_status", test_mocker.change_status)
+    mocker.patch.object(process, "wait_converged", test_mocker.wait_converged)
     mocker.patch.object(process, "post_check", test_mocker.post_check)
     mocker.patch.object(process, "close_client", test_mocker.close_client)
 
@@ -4766,6 +4983,7 @@ def test_run07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     assert test_mocker.pre_check.call_count == 1
     assert test_mocker.change_status.called == True
     assert test_mocker.change_status.call_count == 1
+    assert test_mocker.wait_converged.call_count == 1
     assert test_mocker.post_check.called == True
     assert test_mocker.post_check.call_count == 1
     assert test_mocker.close_client.called == True
@@ -0,0 +1,469 @@
+import pathlib
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+import xgnlog.Log as xgnlog
+from xgnlog.Log import Lazy, Level, Log, LogWriter
+
+JOB_ID = "T23AJ001"
+
+MESSAGES = [
+    "INFO,I00101,start xCAP tool",
+    "CRITICAL,E00101,abnormal end xCAP tool",
+    "DEBUG,D00101,debug message",
+]
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    """読み込み済みの設定・メッセージはプロセス内で共有されるため、試験毎に初期化する"""
+    xgnlog.clear_registry()
+    yield
+    xgnlog.clear_registry()
+
+
+@pytest.fixture
+def log_config(tmpdir, mocker: MockerFixture):
+    """ログ出力先・メッセージファイルを試験用ディレクトリに向けた設定ファイルを作成する"""
+    def make(writer: str = "") -> pathlib.Path:
+        root = pathlib.Path(tmpdir)
+        root.joinpath("msg_" + JOB_ID + ".txt").write_text("\n".join(MESSAGES) + "\n", encoding="utf-8")
+        config_path = root.joinpath("Log_config.ini")
+        config_path.write_text(f"[common]\ntool_root_log_dir = {root}\ntool_message_dir = {root}\n{writer}",
+                               encoding="utf-8")
+        mocker.patch("xgnlog.Log.CONFIG_PATH", new=config_path)
+        return root
+    return make
+
+
+@pytest.fixture
+def stamps(mocker: MockerFixture):
+    """ログ出力日時を固定する"""
+    value = {"now": ("2024-01-31 23:59:59", "20240131")}
+    mocker.patch("xgnlog.Log.get_stamps", side_effect=lambda: value["now"])
+    return value
+
+
+def read_lines(path: pathlib.Path) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readlines()
+
+
+def test_get_stamps01(mocker: MockerFixture):
+    """test_get_stamps01 get_stamps試験01 同一秒内の呼び出し
+
+    試験条件
+    ・同一秒内に2回呼び出す
+
+    試験結果
+    ・ログ出力日時とファイル名の日付が取得できること
+    ・2回目はキャッシュした文字列が返り、時刻の書式化を行わないこと
+    """
+    expected = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(1706713199))
+    mocker.patch("xgnlog.Log.time.time", return_value=1706713199.5)
+    strftime = mocker.spy(xgnlog.time, "strftime")
+
+    first = xgnlog.get_stamps()
+    second = xgnlog.get_stamps()
+
+    assert first == (expected, expected[:10].replace("-", ""))
+    assert second == first
+    assert strftime.call_count == 2
+
+
+def test_log_writer01(tmpdir):
+    """test_log_writer01 LogWriter試験01 バッファリング書込み
+
+    試験条件
+    ・同じファイルに3レコード書き込み、flushする
+
+    試験結果
+    ・flush後に3レコードがファイルに書き込まれていること
+    ・ファイルハンドルが開いたまま保持されていること
+    """
+    path = pathlib.Path(tmpdir).joinpath("1st.log")
+    writer = LogWriter(flush_interval=60)
+    try:
+        for i in range(3):
+            writer.write((path,), f"record{i}\n", "20240131", Level.INFO)
+        writer.flush()
+
+        assert read_lines(path) == ["record0\n", "record1\n", "record2\n"]
+        assert list(writer._files) == [path]
+        assert not writer._files[path].closed
+    finally:
+        writer.close()
+
+    assert writer._files == {}
+
+
+def test_log_writer02(tmpdir):
+    """test_log_writer02 LogWriter試験02 日跨ぎ
+
+    試験条件
+    ・1日目のファイルに書き込んだ後、2日目のファイルに書き込む
+
+    試験結果
+    ・それぞれのファイルにレコードが書き込まれていること
+    ・1日目のファイルハンドルが閉じられていること
+    """
+    path_1 = pathlib.Path(tmpdir).joinpath("1st_20240131.log")
+    path_2 = pathlib.Path(tmpdir).joinpath("1st_20240201.log")
+    writer = LogWriter(flush_interval=60)
+    try:
+        writer.write((path_1,), "day1\n", "20240131", Level.INFO)
+        writer.flush()
+        file_1 = writer._files[path_1]
+        writer.write((path_2,), "day2\n", "20240201", Level.INFO)
+        writer.flush()
+
+        assert read_lines(path_1) == ["day1\n"]
+        assert read_lines(path_2) == ["day2\n"]
+        assert file_1.closed
+        assert list(writer._files) == [path_2]
+    finally:
+        writer.close()
+
+
+def test_log_writer03(tmpdir, mocker: MockerFixture):
+    """test_log_writer03 LogWriter試験03 CRITICALレコードの同期書込み
+
+    試験条件
+    ・INFO、CRITICALの順にレコードを書き込む(flushは呼ばない)
+
+    試験結果
+    ・CRITICALレコードの書込みから戻った時点で両レコードがファイルに書き込まれていること
+    ・fsyncが1回呼ばれること
+    """
+    fsync = mocker.patch("xgnlog.Log.os.fsync")
+    path = pathlib.Path(tmpdir).joinpath("2nd.log")
+    writer = LogWriter(flush_interval=60)
+    try:
+        writer.write((path,), "info\n", "20240131", Level.INFO)
+        assert fsync.call_count == 0
+        writer.write((path,), "critical\n", "20240131", Level.CRITICAL)
+
+        assert read_lines(path) == ["info\n", "critical\n"]
+        assert fsync.call_count == 1
+    finally:
+        writer.close()
+
+
+def test_log_writer04(tmpdir):
+    """test_log_writer04 LogWriter試験04 フラッシュ間隔経過
+
+    試験条件
+    ・flush_interval = 0.05
+    ・レコードを書き込み、flushを呼ばずに待つ
+
+    試験結果
+    ・フラッシュ間隔経過後にファイルに書き込まれていること
+    """
+    path = pathlib.Path(tmpdir).joinpath("1st.log")
+    writer = LogWriter(flush_interval=0.05)
+    try:
+        writer.write((path,), "record\n", "20240131", Level.INFO)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not (path.exists() and read_lines(path)):
+            time.sleep(0.01)
+
+        assert read_lines(path) == ["record\n"]
+    finally:
+        writer.close()
+
+
+def test_log_writer05(tmpdir):
+    """test_log_writer05 LogWriter試験05 終了時の書込み
+
+    試験条件
+    ・レコードを書き込み、flushを呼ばずにcloseする
+
+    試験結果
+    ・close後にファイルに書き込まれ、ファイルハンドルが閉じられていること
+    ・書込みスレッドが停止していること
+    """
+    path = pathlib.Path(tmpdir).joinpath("1st.log")
+    writer = LogWriter(flush_interval=60)
+    writer.write((path,), "record\n", "20240131", Level.INFO)
+    thread = writer._thread
+    writer.close()
+
+    assert read_lines(path) == ["record\n"]
+    assert writer._files == {}
+    assert not thread.is_alive()
+
+
+def test_log01(log_config, stamps, mocker: MockerFixture):
+    """test_log01 Log試験01 直接書込み
+
+    試験条件
+    ・設定ファイルにwriterセクションなし
+    ・output_1st_log("I00101")、output_2nd_log(Level.INFO)を呼ぶ
+
+    試験結果
+    ・バッファリング書込みを行わないこと
+    ・呼び出しから戻った時点で1st-log、2nd-logに書き込まれていること
+    """
+    root = log_config()
+    get_writer = mocker.patch("xgnlog.Log.get_writer")
+
+    log = Log(JOB_ID)
+    log.output_1st_log("I00101", "hojo")
+    log.output_2nd_log(Level.INFO, "detail")
+
+    assert log.writer is None
+    get_writer.assert_not_called()
+    assert read_lines(root.joinpath("1st-log", JOB_ID, f"1st_{JOB_ID}_20240131.log")) == [
+        "2024-01-31 23:59:59 I00101 INFO start xCAP tool hojo\n"
+    ]
+    assert read_lines(root.joinpath("2nd-log", JOB_ID, f"2nd_{JOB_ID}_20240131.log")) == [
+        "2024-01-31 23:59:59 I00101 INFO start xCAP tool hojo\n",
+        "2024-01-31 23:59:59 INFO detail\n"
+    ]
+
+
+def test_log02(log_config, stamps, mocker: MockerFixture):
+    """test_log02 Log試験02 バッファリング書込み
+
+    試験条件
+    ・設定ファイルのwriterセクション: mode = buffered、flush_interval = 30、fsync_level = CRITICAL
+    ・output_1st_log("I00101")の後、日付を変えてoutput_1st_log("E00101")を呼ぶ
+
+    試験結果
+    ・設定ファイルの値でログ書込みインスタンスが生成されること
+    ・CRITICALレコードの書込みから戻った時点で1st-log、2nd-logに書き込まれていること
+    ・日付毎のファイルに書き込まれていること
+    """
+    root = log_config("[writer]\nmode = buffered\nflush_interval = 30\nfsync_level = CRITICAL\n")
+    writer = LogWriter(30)
+    get_writer = mocker.patch("xgnlog.Log.get_writer", return_value=writer)
+    fsync = mocker.patch("xgnlog.Log.os.fsync")
+
+    try:
+        log = Log(JOB_ID)
+        log.output_1st_log("I00101")
+        stamps["now"] = ("2024-02-01 00:00:00", "20240201")
+        log.output_1st_log("E00101")
+
+        get_writer.assert_called_once_with(30.0, Level.CRITICAL)
+        assert log.writer is writer
+        assert fsync.call_count == 2
+        for (kind, log_dir) in (("1st", "1st-log"), ("2nd", "2nd-log")):
+            assert read_lines(root.joinpath(log_dir, JOB_ID, f"{kind}_{JOB_ID}_20240131.log")) == [
+                "2024-01-31 23:59:59 I00101 INFO start xCAP tool \n"
+            ]
+            assert read_lines(root.joinpath(log_dir, JOB_ID, f"{kind}_{JOB_ID}_20240201.log")) == [
+                "2024-02-01 00:00:00 E00101 CRITICAL abnormal end xCAP tool \n"
+            ]
+    finally:
+        writer.close()
+
+
+def test_log03(log_config, stamps, mocker: MockerFixture):
+    """test_log03 Log試験03 バッファリング書込み(引数指定)
+
+    試験条件
+    ・設定ファイルにwriterセクションなし
+    ・buffered = True、fsync_levelは設定ファイルのデフォルト
+    ・output_2nd_log(Level.INFO)の後、flushを呼ぶ
+
+    試験結果
+    ・デフォルト値でログ書込みインスタンスが生成されること
+    ・flush後に2nd-logに書き込まれていること
+    """
+    root = log_config()
+    writer = LogWriter(60)
+    get_writer = mocker.patch("xgnlog.Log.get_writer", return_value=writer)
+
+    try:
+        log = Log(JOB_ID, buffered=True)
+        log.output_2nd_log(Level.INFO, "detail")
+        log.flush()
+
+        get_writer.assert_called_once_with(xgnlog.FLUSH_INTERVAL, Level.CRITICAL)
+        assert read_lines(root.joinpath("2nd-log", JOB_ID, f"2nd_{JOB_ID}_20240131.log")) == [
+            "2024-01-31 23:59:59 INFO detail\n"
+        ]
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize(("writer", "expected"), [
+    ("[writer]\nmode = buffered\nflush_interval = x\n", xgnlog.LogConfigKeyError),
+    ("[writer]\nmode = buffered\nfsync_level = WARNING\n", xgnlog.LevelNotFoundError),
+])
+def test_log04(log_config, writer: str, expected: type, mocker: MockerFixture):
+    """test_log04 Log試験04 writerセクションの設定値不正
+
+    試験条件
+    ・flush_intervalが数値でない
+    ・fsync_levelが未定義のレベル
+
+    試験結果
+    ・例外が発生すること
+    """
+    log_config(writer)
+    mocker.patch("xgnlog.Log.get_writer")
+
+    with pytest.raises(expected):
+        Log(JOB_ID)
+
+
+def test_log05(log_config, mocker: MockerFixture):
+    """test_log05 Log試験05 同じジョブID・設定値のインスタンス生成
+
+    試験条件
+    ・Log(JOB_ID)を3回生成する
+    ・Log(JOB_ID, Level.DEBUG)を生成する
+
+    試験結果
+    ・設定ファイル・メッセージファイルの読み込みが1回だけ行われること
+    ・状態の初期化(ディレクトリ作成)は設定値毎に1回だけ行われること
+    ・同じ設定値のインスタンスは状態を共有すること
+    ・設定値が異なるインスタンスはメッセージのみ共有すること
+    """
+    log_config()
+    read = mocker.spy(xgnlog.configparser.ConfigParser, "read")
+    reader = mocker.spy(xgnlog.csv, "reader")
+    setup = mocker.spy(Log, "_setup")
+
+    logs = [Log(JOB_ID) for _ in range(3)]
+    debug_log = Log(JOB_ID, Level.DEBUG)
+
+    assert read.call_count == 1
+    assert reader.call_count == 1
+    assert setup.call_count == 2
+    assert logs[0].__dict__ is logs[1].__dict__ is logs[2].__dict__
+    assert debug_log.__dict__ is not logs[0].__dict__
+    assert debug_log.log_level == Level.DEBUG and logs[0].log_level == Level.INFO
+    assert debug_log.msg is logs[0].msg
+
+
+def test_log06(log_config, mocker: MockerFixture):
+    """test_log06 Log試験06 メッセージのキャッシュファイル
+
+    試験条件
+    ・設定ファイルのcommonセクション: message_cache_dir = 試験用ディレクトリ/cache
+    ・1回目: キャッシュファイルなし
+    ・2回目: 1回目に作成したキャッシュファイルあり
+    ・3回目: 2回目の後にメッセージファイルを更新
+
+    試験結果
+    ・1回目はメッセージファイルを読み込み、キャッシュファイルを作成すること
+    ・2回目はキャッシュファイルからメッセージを読み込むこと
+    ・3回目はメッセージファイルを読み込み直し、更新後のメッセージが取得できること
+    """
+    root = log_config()
+    cache_dir = root.joinpath("cache")
+    config_path = root.joinpath("Log_config.ini")
+    config_path.write_text(config_path.read_text(encoding="utf-8").replace(
+        "[common]\n", f"[common]\nmessage_cache_dir = {cache_dir}\n"), encoding="utf-8")
+    reader = mocker.spy(xgnlog.csv, "reader")
+
+    first = Log(JOB_ID).msg
+    assert reader.call_count == 1
+    assert cache_dir.joinpath(f"msg_{JOB_ID}.json").exists()
+
+    xgnlog.clear_registry()
+    second = Log(JOB_ID).msg
+    assert reader.call_count == 1
+    assert second == first
+    assert second["I00101"] == ("INFO", "start xCAP tool")
+
+    xgnlog.clear_registry()
+    msgfile_path = root.joinpath(f"msg_{JOB_ID}.txt")
+    msgfile_path.write_text("INFO,I00101,start xCAP tool (updated)\n", encoding="utf-8")
+    stat = msgfile_path.stat()
+    xgnlog.os.utime(msgfile_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    third = Log(JOB_ID).msg
+    assert reader.call_count == 2
+    assert third["I00101"] == ("INFO", "start xCAP tool (updated)")
+
+
+def test_log07(log_config, stamps):
+    """test_log07 Log試験07 遅延評価メッセージ
+
+    試験条件
+    ・ログレベル = INFO
+    ・output_2nd_log(Level.DEBUG, Lazy(...))、output_1st_log("D00101", Lazy(...))を呼ぶ
+    ・output_2nd_log(Level.INFO, Lazy(...))、output_1st_log("I00101", [nf_name, Lazy(...)])を呼ぶ
+
+    試験結果
+    ・DEBUGレベルではメッセージ生成関数が呼ばれないこと
+    ・INFOレベルでは生成したメッセージが出力されること
+    ・リストに含まれる場合も文字列をそのまま渡した場合と同じ表記で出力されること
+    """
+    root = log_config()
+    calls = []
+
+    def make(text: str) -> str:
+        calls.append(text)
+        return text
+
+    log = Log(JOB_ID, buffered=False)
+    log.output_2nd_log(Level.DEBUG, Lazy(make, "debug"))
+    log.output_1st_log("D00101", Lazy(make, "debug"))
+    assert calls == []
+
+    log.output_2nd_log(Level.INFO, Lazy(make, "info"))
+    log.output_1st_log("I00101", ["nf", Lazy(make, "status")])
+
+    assert calls == ["info", "status"]
+    assert read_lines(root.joinpath("2nd-log", JOB_ID, f"2nd_{JOB_ID}_20240131.log")) == [
+        "2024-01-31 23:59:59 INFO info\n",
+        f"2024-01-31 23:59:59 I00101 INFO start xCAP tool {['nf', 'status']}\n"
+    ]
+
+
+def test_log08(log_config):
+    """test_log08 Log試験08 is_enabled
+
+    試験条件
+    ・ログレベル = INFO
+    ・Level.DEBUG、"INFO"、Level.CRITICAL、"WARNING"で判定する
+
+    試験結果
+    ・INFO以上のレベルのみTrueとなること
+    ・未定義のレベルは例外が発生すること
+    """
+    log_config()
+    log = Log(JOB_ID, buffered=False)
+
+    assert log.is_enabled(Level.DEBUG) is False
+    assert log.is_enabled("INFO") is True
+    assert log.is_enabled(Level.CRITICAL) is True
+    with pytest.raises(xgnlog.LevelNotFoundError):
+        log.is_enabled("WARNING")
+
+
+@pytest.mark.parametrize(("level", "expected"), [
+    ("CRITICAL", Level.CRITICAL),
+    ("INFO", Level.INFO),
+    ("DEBUG", Level.DEBUG),
+])
+def test_get_Level01(level: str, expected: Level):
+    """test_get_Level01 get_Level試験01 定義済みレベル
+
+    試験条件
+    ・"CRITICAL"、"INFO"、"DEBUG"
+
+    試験結果
+    ・対応する列挙型レベルが取得できること
+    """
+    assert xgnlog.get_Level(level) is expected
+
+
+@pytest.mark.parametrize("level", ["WARNING", "name", "__class__", "", None, ["INFO"]])
+def test_get_Level02(level):
+    """test_get_Level02 get_Level試験02 未定義レベル
+
+    試験条件
+    ・未定義のレベル名、Enumの属性名、空文字、None、リスト
+
+    試験結果
+    ・LevelNotFoundErrorが発生すること
+    """
+    with pytest.raises(xgnlog.LevelNotFoundError):
+        xgnlog.get_Level(level)
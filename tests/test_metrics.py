@@ -0,0 +1,102 @@
+import json
+import pathlib
+
+import pytest
+
+from src.metrics import Histogram, ProcessMetrics
+
+
+def test_histogram01():
+    """test_histogram01 Histogram試験01 累積バケット
+
+    試験条件
+    ・バケット上限(0.5, 1.0, 5.0)に0.2秒、1.0秒、3.0秒、10.0秒を追加する
+
+    試験結果
+    ・各バケットの件数が上限以下の累積件数となること(上限と等しい値は含む)
+    ・+Infが全件数、sumが合計となること
+    """
+    histogram = Histogram((0.5, 1.0, 5.0))
+    for seconds in (0.2, 1.0, 3.0, 10.0):
+        histogram.observe(seconds)
+
+    assert histogram.to_dict() == {"buckets": {"0.5": 1, "1.0": 2, "5.0": 3, "+Inf": 4}, "count": 4, "sum": 14.2}
+
+
+def make_metrics() -> ProcessMetrics:
+    metrics = ProcessMetrics((1.0, 10.0))
+    metrics.add("a1-er-s01-smfvoroout-001", "down", "post_check_ok", {"open_client": 0.5, "run": 5.0})
+    metrics.add("b1-er-s01-smfvoroout-001", "down", "post_check_ok", {"open_client": 1.5, "run": 12.0})
+    metrics.add("c1-er-s01-smfvoroout-001", "down", "pre_check_ng", {"open_client": 0.5, "run": 0.75})
+    return metrics
+
+
+def test_process_metrics01():
+    """test_process_metrics01 ProcessMetrics試験01 JSON形式の出力内容
+
+    試験条件
+    ・3NF分(post_check_ok 2NF、pre_check_ng 1NF)の所要時間を追加する
+
+    試験結果
+    ・NF毎の所要時間が追加順に出力されること
+    ・ヒストグラムがフェーズ・実行モード・完了ステータス毎に集計されること
+    """
+    result = make_metrics().to_dict()
+
+    assert [nf["nf_name"] for nf in result["nfs"]] == ["a1-er-s01-smfvoroout-001", "b1-er-s01-smfvoroout-001", "c1-er-s01-smfvoroout-001"]
+    assert result["nfs"][1] == {"nf_name": "b1-er-s01-smfvoroout-001", "mode": "down", "outcome": "post_check_ok",
+                                "phases": {"open_client": 1.5, "run": 12.0}}
+    histograms = {(h["phase"], h["mode"], h["outcome"]): h for h in result["histograms"]}
+    assert set(histograms) == {("open_client", "down", "post_check_ok"), ("run", "down", "post_check_ok"),
+                               ("open_client", "down", "pre_check_ng"), ("run", "down", "pre_check_ng")}
+    assert histograms[("run", "down", "post_check_ok")]["buckets"] == {"1.0": 0, "10.0": 1, "+Inf": 2}
+    assert histograms[("run", "down", "post_check_ok")]["sum"] == 17.0
+    assert histograms[("open_client", "down", "pre_check_ng")]["count"] == 1
+
+
+def test_process_metrics02():
+    """test_process_metrics02 ProcessMetrics試験02 Prometheus textfile形式の出力内容
+
+    試験条件
+    ・3NF分(post_check_ok 2NF、pre_check_ng 1NF)の所要時間を追加する
+
+    試験結果
+    ・フェーズ所要時間がhistogram(bucket/sum/count)として出力されること
+    ・実行モード・完了ステータス毎のプロセス数、出力時刻が出力されること
+    """
+    lines = make_metrics().to_prometheus().splitlines()
+
+    assert "# TYPE xcap_tool_phase_duration_seconds histogram" in lines
+    assert 'xcap_tool_phase_duration_seconds_bucket{phase="run",mode="down",outcome="post_check_ok",le="10.0"} 1' in lines
+    assert 'xcap_tool_phase_duration_seconds_bucket{phase="run",mode="down",outcome="post_check_ok",le="+Inf"} 2' in lines
+    assert 'xcap_tool_phase_duration_seconds_sum{phase="run",mode="down",outcome="post_check_ok"} 17.000000' in lines
+    assert 'xcap_tool_phase_duration_seconds_count{phase="open_client",mode="down",outcome="pre_check_ng"} 1' in lines
+    assert 'xcap_tool_processes{mode="down",outcome="post_check_ok"} 2' in lines
+    assert 'xcap_tool_processes{mode="down",outcome="pre_check_ng"} 1' in lines
+    assert any(line.startswith("xcap_tool_last_run_timestamp_seconds ") for line in lines)
+
+
+@pytest.mark.parametrize(("file_name", "is_prometheus"), [
+    ("metrics/xcap_tool.prom", True),
+    ("metrics/xcap_tool.json", False),
+])
+def test_process_metrics03(tmpdir, file_name: str, is_prometheus: bool):
+    """test_process_metrics03 ProcessMetrics試験03 メトリクスファイル出力
+
+    試験条件
+    ・拡張子.prom、.jsonのファイルパス(親ディレクトリなし)に出力する
+
+    試験結果
+    ・拡張子.promの場合Prometheus textfile形式、それ以外はJSON形式で出力されること
+    ・親ディレクトリが作成され、一時ファイルが残らないこと
+    """
+    path = pathlib.Path(tmpdir).joinpath(file_name)
+
+    make_metrics().write(path)
+
+    text = path.read_text(encoding="utf-8")
+    if is_prometheus:
+        assert text.startswith("# HELP xcap_tool_phase_duration_seconds ")
+    else:
+        assert len(json.loads(text)["nfs"]) == 3
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
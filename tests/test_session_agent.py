@@ -0,0 +1,339 @@
+import json
+import os
+import pathlib
+from typing import Any, Dict, List
+
+import pytest
+import pytest_mock
+from xgnlog.Log import Level
+
+from src.config_store import ConfigStore
+from src.eri_connection import SocketTimeoutException, SSHConnectException
+from tests.standin_server import DEFAULT_XCAP, EpgCliSession, EriStandinServer
+import src.session_agent as agent
+
+JOB_ID = "T23AJ002"
+
+
+def get_1st_log_path(tmpdir: str) -> pathlib.Path:
+    return pathlib.Path(tmpdir).joinpath("1st_session_agent.log")
+
+
+def get_2nd_log_path(tmpdir: str) -> pathlib.Path:
+    return pathlib.Path(tmpdir).joinpath("2nd_session_agent.log")
+
+
+class MockLog():
+    def __init__(self, job_id: str, init_level: Level, log_dir: str) -> None:
+        self.job_id = job_id
+        self.init_level = init_level
+        self.log_path_1st = get_1st_log_path(log_dir)
+        self.log_path_2nd = get_2nd_log_path(log_dir)
+
+    def output_1st_log(self, msg_id: str, add_info: Any = None) -> None:
+        with open(self.log_path_1st, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, message_id:{1}, add_info:{2}\n".format(self.job_id, msg_id, add_info))
+
+    def output_2nd_log(self, level: Level, add_info: Any = None) -> None:
+        with open(self.log_path_2nd, "a", encoding="utf-8", newline="\n") as f:
+            f.write("job_id:{0}, level:{1}, add_info:{2}\n".format(self.job_id, level.name, add_info))
+
+
+def get_conn_conf(server: EriStandinServer, nf_names: List[str]) -> Dict[str, Any]:
+    (host, port) = server.address
+    return {
+        "common": {"password": "kddiadmin"},
+        "connections": {nf_name: {"ipaddr": host, "port": port, "username": nf_name} for nf_name in nf_names},
+        "bastions": {}
+    }
+
+
+def read_1st_log(tmpdir: str) -> List[str]:
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        return f.readlines()
+
+
+@pytest.fixture
+def server():
+    with EriStandinServer() as server:
+        yield server
+
+
+@pytest.fixture
+def logger(tmpdir, mocker: pytest_mock.MockerFixture):
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.session_agent.LOGGER", new=logger)
+    mocker.patch("src.eri_connection.LOGGER", new=logger)
+    return logger
+
+
+def test_acquire01(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_acquire01 SessionPool.acquire試験01 セッション再利用
+
+    試験条件
+    ・同一NFのセッションを2回貸し出し・返却する
+
+    試験結果
+    ・2回目は1回目と同じ接続済みクライアントが貸し出されること
+    ・一次ログにセッション生成(I00230)、再利用(I00231)の順で出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    pool = agent.SessionPool()
+    try:
+        first = pool.acquire(nf_name)
+        pool.release(nf_name)
+        second = pool.acquire(nf_name)
+        pool.release(nf_name)
+    finally:
+        pool.close_all()
+
+    pool_logs = [x for x in read_1st_log(tmpdir) if "I0023" in x]
+    assert second is first
+    assert pool_logs == [
+        f"job_id:{JOB_ID}, message_id:I00230, add_info:{nf_name}\n",
+        f"job_id:{JOB_ID}, message_id:I00231, add_info:{nf_name}\n",
+        f"job_id:{JOB_ID}, message_id:I00232, add_info:{nf_name}\n"
+    ]
+
+
+def test_acquire02(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_acquire02 SessionPool.acquire試験02 切断済みセッションの再接続
+
+    試験条件
+    ・貸し出したセッションのSSHトランスポートを切断してから返却する
+    ・同一NFのセッションを再度貸し出す
+
+    試験結果
+    ・切断済みセッションは破棄され、新たに接続したクライアントが貸し出されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    pool = agent.SessionPool()
+    try:
+        first = pool.acquire(nf_name)
+        first.get_transport().close()
+        pool.release(nf_name)
+        second = pool.acquire(nf_name)
+        is_healthy = pool.is_healthy(second)
+        pool.release(nf_name)
+    finally:
+        pool.close_all()
+
+    assert second is not first
+    assert is_healthy
+
+
+def test_acquire03(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_acquire03 SessionPool.acquire試験03 応答しないセッションの再接続
+
+    試験条件
+    ・貸し出したセッションのプロンプトを不一致に変更してから返却する(シェル無応答を模擬)
+    ・PROBE_TIMEOUT = 0.2
+    ・同一NFのセッションを再度貸し出す
+
+    試験結果
+    ・SSHトランスポートが有効でも疎通確認で破棄され、新たに接続したクライアントが貸し出されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+    mocker.patch("src.session_agent.PROBE_TIMEOUT", new=0.2)
+
+    pool = agent.SessionPool()
+    try:
+        first = pool.acquire(nf_name)
+        first.prompt = "unmatched-prompt#"
+        pool.release(nf_name)
+        is_active = first.get_transport().is_active()
+        second = pool.acquire(nf_name)
+        pool.release(nf_name)
+    finally:
+        pool.close_all()
+
+    assert is_active
+    assert second is not first
+    assert second.prompt == f"{nf_name}@{server.hostname}#"
+
+
+def test_release01(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_release01 SessionPool.release試験01 設定モード中の返却
+
+    試験条件
+    ・設定モードに移行し設定を投入したまま返却する
+
+    試験結果
+    ・返却時に設定が破棄(abort)され、設定モードが解除されること
+    ・NFの設定が変更されていないこと
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    pool = agent.SessionPool()
+    try:
+        client = pool.acquire(nf_name)
+        client.enter_config_mode()
+        client.command("no epg pgw apn xcap ipv6-name-server 2001:268:200d:1010::6")
+        pool.release(nf_name)
+    finally:
+        pool.close_all()
+
+    assert not client.is_config_mode
+    assert server.node(nf_name).running == DEFAULT_XCAP
+    assert server.node(nf_name).commit_count == 0
+
+
+def test_evict_idle01(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_evict_idle01 SessionPool.evict_idle試験01 アイドルセッション破棄
+
+    試験条件
+    ・idle_timeout = 0
+    ・2NFのセッションを生成し、1NFのみ返却する
+
+    試験結果
+    ・返却済みのセッションのみ破棄されること
+    ・貸し出し中のセッションは破棄されないこと
+    """
+    nf_names = ["a2-er-s01-smfvoroout-001", "b1-er-s01-smfvoroout-001"]
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, nf_names))
+
+    pool = agent.SessionPool(idle_timeout=0)
+    try:
+        pool.acquire(nf_names[0])
+        pool.release(nf_names[0])
+        busy = pool.acquire(nf_names[1])
+        pool.evict_idle()
+        (idle_client, busy_client) = (pool.sessions[nf_names[0]].client, pool.sessions[nf_names[1]].client)
+        pool.release(nf_names[1])
+    finally:
+        pool.close_all()
+
+    assert idle_client is None
+    assert busy_client is busy
+    assert f"job_id:{JOB_ID}, message_id:I00233, add_info:{nf_names[0]}\n" in read_1st_log(tmpdir)
+
+
+def test_agent01(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_agent01 SessionAgent試験01 エージェント経由のコマンド投入
+
+    試験条件
+    ・セッションエージェントを起動し、AgentShellClientで同一NFに2回接続・コマンド投入する
+
+    試験結果
+    ・コマンド結果がNFShellClientと同じ形式(投入コマンド・プロンプト除去)であること
+    ・2回目の接続はエージェントの接続済みセッションが再利用されること
+    ・ソケットファイルが所有者のみ読み書き可能であること
+    ・エージェント停止後にソケットファイルが削除されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    path = str(pathlib.Path(tmpdir).joinpath("agent.sock"))
+    command = "show running-config epg pgw apn xcap ipv6-name-server"
+    expected_value = "\n".join(EpgCliSession.render(DEFAULT_XCAP)).encode("utf-8")
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    with agent.SessionAgent(path) as session_agent:
+        mode = pathlib.Path(path).stat().st_mode & 0o777
+        results = []
+        clients = []
+        for _ in range(2):
+            client = agent.AgentShellClient(nf_name, path)
+            client.connect()
+            results.append(client.command(command))
+            client.close()
+            clients.append(session_agent.pool.sessions[nf_name].client)
+
+    assert results == [expected_value, expected_value]
+    assert clients[0] is clients[1]
+    assert mode == 0o600
+    assert not pathlib.Path(path).exists()
+
+
+def test_agent02(tmpdir, server: EriStandinServer, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_agent02 SessionAgent試験02 エージェント側例外の伝搬
+
+    試験条件
+    ・接続設定にないNFで接続する
+    ・プロンプトが受信されない状態でコマンドを投入する(timeout=0.2)
+
+    試験結果
+    ・接続設定にないNFではKeyErrorが発生すること
+    ・タイムアウト時はSocketTimeoutExceptionが発生し、返却後にセッションが破棄されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    path = str(pathlib.Path(tmpdir).joinpath("agent.sock"))
+    mocker.patch("src.eri_connection.CONN_CONF", new=get_conn_conf(server, [nf_name]))
+
+    with agent.SessionAgent(path) as session_agent:
+        unknown = agent.AgentShellClient("unknown-nf", path)
+        with pytest.raises(KeyError) as e:
+            unknown.connect()
+        unknown.close()
+
+        client = agent.AgentShellClient(nf_name, path)
+        client.connect()
+        session_agent.pool.sessions[nf_name].client.prompt = "unmatched-prompt#"
+        with pytest.raises(SocketTimeoutException):
+            client.command("screen-length 0", 0.2)
+        client.close()
+        discarded = session_agent.pool.sessions[nf_name].client
+
+    assert e.value.args[0] == "unknown-nf"
+    assert discarded is None
+
+
+def test_agent03(tmpdir, logger: MockLog):
+    """test_agent03 AgentShellClient試験01 エージェント未起動
+
+    試験条件
+    ・セッションエージェントが起動していないソケットパスで接続する
+
+    試験結果
+    ・SSHConnectExceptionが発生すること
+    ・一次ログにE00205が出力されること
+    """
+    nf_name = "a2-er-s01-smfvoroout-001"
+    path = str(pathlib.Path(tmpdir).joinpath("agent.sock"))
+
+    client = agent.AgentShellClient(nf_name, path)
+    with pytest.raises(SSHConnectException):
+        client.connect()
+
+    assert f"job_id:{JOB_ID}, message_id:E00205, add_info:{nf_name}\n" in read_1st_log(tmpdir)
+    assert client.sock is None
+
+
+def test_agent04(tmpdir, logger: MockLog, mocker: pytest_mock.MockerFixture):
+    """test_agent04 SessionAgent.reload_config試験01 設定ファイルの再読込
+
+    試験条件
+    ・常駐中に接続設定ファイルへNFを追加して再読込する
+    ・接続設定ファイルをJSONとして解析できない内容に変更して再読込する
+
+    試験結果
+    ・接続設定に追加したNFが反映され、一次ログにI00237が出力されること
+    ・解析できない場合は変更前の接続設定を保持し、一次ログにE00207、障害切り分けログに異常内容が出力されること
+    """
+    conn_path = pathlib.Path(tmpdir).joinpath("connections.json")
+    conn_conf = {"common": {}, "connections": {"a2-er-s01-smfvoroout-001": {}}, "bastions": {}}
+    conn_path.write_text(json.dumps(conn_conf), encoding="utf-8")
+    os.utime(conn_path, ns=(1_000_000_000, 1_000_000_000))
+    store = ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal"))
+    mocker.patch("src.session_agent.CONFIG_STORE", new=store)
+    conf = store.get(conn_path)
+
+    conn_conf["connections"]["b1-er-s01-smfvoroout-001"] = {}
+    conn_path.write_text(json.dumps(conn_conf), encoding="utf-8")
+    os.utime(conn_path, ns=(2_000_000_000, 2_000_000_000))
+    session_agent = agent.SessionAgent(str(pathlib.Path(tmpdir).joinpath("agent.sock")))
+    session_agent.reload_config()
+
+    assert conf == conn_conf
+    assert f"job_id:{JOB_ID}, message_id:I00237, add_info:{[str(conn_path)]}\n" in read_1st_log(tmpdir)
+
+    conn_path.write_text("{", encoding="utf-8")
+    session_agent.reload_config()
+
+    assert conf == conn_conf
+    assert f"job_id:{JOB_ID}, message_id:E00207, add_info:{conn_path}\n" in read_1st_log(tmpdir)
+    assert " Trace: JSONDecodeError " in get_2nd_log_path(tmpdir).read_text(encoding="utf-8")
@@ -0,0 +1,92 @@
+import json
+import pathlib
+
+from pytest_mock import MockerFixture
+
+from src.config_store import ConfigStore
+from src.topology import TopologyIndex, load_topology, normalize_ipaddr, site_of
+
+NF_INFOS = {
+    "tam5-er-s01-smfvo-001": {"xCAP": ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]},
+    "oym3-er-s01-smfvo-001": {"xCAP": ["2001:268:200d:5010::6", "2001:268:200d:500f::6"]},
+    "tam5-er-s02-smfvo-001": {"xCAP": ["2001:268:200D:1010:0::6"]},
+    "chy1-er-s01-smfvo-001": {"xCAP": ["2001:268:200d:500f::6"]}
+}
+EDNS_INFOS = {
+    "tys1tb1edns02": {"ipaddr": "2001:268:200d:1010::6"},
+    "tys1tb2edns02": {"ipaddr": "2001:268:200d:5010::6"}
+}
+
+
+def test_normalize_ipaddr01():
+    """test_normalize_ipaddr01 normalize_ipaddr試験01 IPアドレス正規化
+
+    試験条件
+    ・大文字・ゼロ省略なしのIPv6アドレス、IPアドレスでない文字列を指定する
+
+    試験結果
+    ・IPv6アドレスは小文字・ゼロ省略の表記となること
+    ・IPアドレスでない文字列はそのまま返却されること
+    """
+    assert normalize_ipaddr("2001:0268:200D:1010:0:0:0:6") == "2001:268:200d:1010::6"
+    assert normalize_ipaddr("tys1tb1edns02") == "tys1tb1edns02"
+    assert site_of("tam5-er-s01-smfvo-001") == "tam5"
+
+
+def test_topology_index01():
+    """test_topology_index01 TopologyIndex試験01 索引と検索
+
+    試験条件
+    ・4NF、2eDNSの対象ノード情報から索引を生成する
+    ・IPアドレス、局舎プレフィックス、両方を条件として検索する
+
+    試験結果
+    ・eDNS名からIPアドレス、NF名からxCAP候補リストが取得されること
+    ・表記揺れのあるIPアドレスも同じIPアドレスとして検索されること
+    ・検索結果はnf-infos.jsonの定義順となること
+    ・条件なしの場合は全NF、該当なしの場合は空となること
+    """
+    index = TopologyIndex(NF_INFOS, EDNS_INFOS)
+
+    assert index.edns_ipaddr("tys1tb2edns02") == "2001:268:200d:5010::6"
+    assert index.candidates("chy1-er-s01-smfvo-001") == ["2001:268:200d:500f::6"]
+    assert index.find_nfs(ipaddrs=["2001:268:200d:1010::6"]) == ["tam5-er-s01-smfvo-001", "tam5-er-s02-smfvo-001"]
+    assert index.find_nfs(ipaddrs=["2001:268:200d:500f::6", "2001:268:200d:1010::6"]) == \
+        ["tam5-er-s01-smfvo-001", "oym3-er-s01-smfvo-001", "tam5-er-s02-smfvo-001", "chy1-er-s01-smfvo-001"]
+    assert index.find_nfs(sites=["chy1", "oym3"]) == ["oym3-er-s01-smfvo-001", "chy1-er-s01-smfvo-001"]
+    assert index.find_nfs(ipaddrs=["2001:268:200d:5010::6"], sites=["tam5"]) == ["tam5-er-s01-smfvo-001"]
+    assert index.find_nfs() == list(NF_INFOS)
+    assert index.find_nfs(ipaddrs=["2001:268:200d:ffff::6"]) == []
+
+
+def test_load_topology01(tmpdir, mocker: MockerFixture):
+    """test_load_topology01 load_topology試験01 設定バンドルへの保存
+
+    試験条件
+    ・索引を取得後、別インスタンス(別プロセス相当)で同じ対象ノード情報の索引を取得する
+    ・NF情報の内容を変更して索引を取得する
+
+    試験結果
+    ・2回目は設定バンドルから索引が復元され、索引を生成しないこと
+    ・NF情報の変更後は索引が生成し直されること
+    """
+    nf_path = pathlib.Path(tmpdir).joinpath("nf-infos.json")
+    edns_path = pathlib.Path(tmpdir).joinpath("edns-infos.json")
+    nf_path.write_text(json.dumps(NF_INFOS), encoding="utf-8")
+    edns_path.write_text(json.dumps(EDNS_INFOS), encoding="utf-8")
+    bundle_path = pathlib.Path(tmpdir).joinpath("config_bundle.marshal")
+    expected = TopologyIndex(NF_INFOS, EDNS_INFOS).to_dict()
+    to_dict = mocker.spy(TopologyIndex, "to_dict")
+
+    index = load_topology(ConfigStore(bundle_path), nf_path, edns_path)
+    assert {name: getattr(index, name) for name in TopologyIndex.MAPS} == expected
+    assert to_dict.call_count == 1
+
+    index = load_topology(ConfigStore(bundle_path), nf_path, edns_path)
+    assert to_dict.call_count == 1
+    assert index.find_nfs(ipaddrs=["2001:268:200d:1010::6"]) == ["tam5-er-s01-smfvo-001", "tam5-er-s02-smfvo-001"]
+
+    nf_path.write_text(json.dumps({"tam6-er-s01-smfvo-001": {"xCAP": ["2001:268:200d:1010::6"]}}), encoding="utf-8")
+    index = load_topology(ConfigStore(bundle_path), nf_path, edns_path)
+    assert to_dict.call_count == 2
+    assert index.find_nfs(ipaddrs=["2001:268:200d:1010::6"]) == ["tam6-er-s01-smfvo-001"]
@@ -0,0 +1,124 @@
+import json
+import pathlib
+import threading
+
+import pytest
+
+from src.tracing import NOOP_SPAN, STATUS_ERROR, STATUS_OK, STATUS_UNSET, Tracer
+
+
+def get_spans(tracer: Tracer):
+    return {span["name"]: span for span in tracer.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+
+
+def test_tracer01():
+    """test_tracer01 Tracer試験01 トレース無効時
+
+    試験条件
+    ・startせずにスパンを生成する
+
+    試験結果
+    ・何も記録しないスパンが返され、スパンが収集されないこと
+    """
+    tracer = Tracer()
+
+    with tracer.span("xcap_tool.main", mode="DOWN") as span:
+        span.set_attribute("status", "ok")
+
+    assert span is NOOP_SPAN
+    assert tracer.spans == []
+
+
+def test_tracer02():
+    """test_tracer02 Tracer試験02 スパンの親子関係と属性
+
+    試験条件
+    ・ルートスパン内でスパンを入れ子に生成する
+    ・別スレッド(実行中のスパンなし)でスパンを生成する
+
+    試験結果
+    ・入れ子のスパンは実行中のスパンを親とすること
+    ・別スレッドのスパンはルートスパンを親とすること
+    ・全スパンが同じトレースIDで、属性がOTLP/JSON形式で出力されること
+    """
+    tracer = Tracer()
+    tracer.start()
+
+    def worker():
+        with tracer.span("process.run", nf_name="a1-er-s01-smfvoroout-001"):
+            with tracer.span("nf.command", command="show", timeout=15.0, bytes_received=120, ok=True):
+                pass
+
+    with tracer.span("xcap_tool.main") as root:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    spans = get_spans(tracer)
+    assert spans["xcap_tool.main"]["parentSpanId"] == ""
+    assert spans["process.run"]["parentSpanId"] == root.span_id
+    assert spans["nf.command"]["parentSpanId"] == spans["process.run"]["spanId"]
+    assert len({span["traceId"] for span in spans.values()}) == 1
+    assert spans["nf.command"]["attributes"] == [
+        {"key": "command", "value": {"stringValue": "show"}},
+        {"key": "timeout", "value": {"doubleValue": 15.0}},
+        {"key": "bytes_received", "value": {"intValue": "120"}},
+        {"key": "ok", "value": {"boolValue": True}}
+    ]
+    assert int(spans["xcap_tool.main"]["startTimeUnixNano"]) <= int(spans["process.run"]["startTimeUnixNano"])
+    assert int(spans["process.run"]["endTimeUnixNano"]) <= int(spans["xcap_tool.main"]["endTimeUnixNano"])
+
+
+def test_tracer03():
+    """test_tracer03 Tracer試験03 スパンのステータス
+
+    試験条件
+    ・正常終了、ステータス未設定、例外発生のスパンを生成する
+
+    試験結果
+    ・正常終了はOK、未設定はUNSET、例外発生はERRORとなり例外内容が出力されること
+    ・例外がそのまま送出されること
+    """
+    tracer = Tracer()
+    tracer.start()
+
+    with tracer.span("ok") as span:
+        span.set_status(True)
+    with tracer.span("unset"):
+        pass
+    with pytest.raises(TimeoutError):
+        with tracer.span("error"):
+            raise TimeoutError("no data was received within 15.0 seconds")
+
+    spans = get_spans(tracer)
+    assert spans["ok"]["status"] == {"code": STATUS_OK}
+    assert spans["unset"]["status"] == {"code": STATUS_UNSET}
+    assert spans["error"]["status"] == {"code": STATUS_ERROR, "message": "TimeoutError no data was received within 15.0 seconds"}
+
+
+def test_tracer04(tmpdir):
+    """test_tracer04 Tracer試験04 トレースファイル出力
+
+    試験条件
+    ・2回の実行分のトレースを同じファイルに出力する
+
+    試験結果
+    ・実行毎に1行のOTLP/JSON(ExportTraceServiceRequest)として追記されること
+    ・実行毎にトレースIDが異なること
+    """
+    path = pathlib.Path(tmpdir).joinpath("trace", "xcap_tool.jsonl")
+    tracer = Tracer()
+    for _ in range(2):
+        tracer.start()
+        with tracer.span("xcap_tool.main"):
+            pass
+        tracer.stop()
+        tracer.export(path)
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2
+    resource = lines[0]["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "xcap_tool"}}]
+    assert [span["name"] for span in resource["scopeSpans"][0]["spans"]] == ["xcap_tool.main"]
+    assert lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"] != \
+        lines[1]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
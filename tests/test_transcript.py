@@ -0,0 +1,93 @@
+import gzip
+import pathlib
+
+import pytest
+
+from src.transcript import INDEX_SUFFIX, SPOOL_SUFFIX, TranscriptRef, TranscriptSpool, read_index, read_record
+
+NF_NAME = "a1-er-s01-smfvo-001"
+
+
+def test_record01(tmpdir):
+    """test_record01 record試験01 受信データ記録
+
+    試験条件
+    ・記録上限なし(デフォルト)
+    ・2レコード("login"、"show running-config")を記録する
+
+    試験結果
+    ・最初のレコード記録時にスプールファイル・インデックスファイルが作成されること
+    ・参照にファイル名、レコード番号、サイズ、プレビューが設定されること
+    ・read_recordで各レコードの受信データが取得できること
+    ・スプールファイル全体をgzipとして展開すると全レコードが連結されていること
+    """
+    spool_dir = pathlib.Path(tmpdir).joinpath("transcripts")
+    banner = b"Last login: Thu Jan  1 00:00:00 2024\r\nkddiadmin@host#"
+    output = b"show running-config\r\n" + b"epg pgw apn xcap\r\n" * 100 + b"kddiadmin@host#"
+
+    spool = TranscriptSpool(NF_NAME, spool_dir, preview_size=16)
+    assert not spool_dir.exists()
+    ref_1 = spool.record("login", banner)
+    ref_2 = spool.record("show running-config", bytearray(output))
+    spool.close()
+
+    assert spool.path.name.startswith(NF_NAME) and spool.path.name.endswith(SPOOL_SUFFIX)
+    assert spool.path.with_name(spool.path.name[:-len(SPOOL_SUFFIX)] + INDEX_SUFFIX).exists()
+    assert ref_1 == TranscriptRef(spool.path.name, 1, len(banner), len(banner), banner[:16])
+    assert ref_2 == TranscriptRef(spool.path.name, 2, len(output), len(output), output[:16])
+    assert str(ref_2) == f"transcript={spool.path.name}#2 size={len(output)} preview={output[:16]!r}"
+    assert read_record(spool.path, 1) == banner
+    assert read_record(spool.path, 2) == output
+    with gzip.open(spool.path, "rb") as f:
+        assert f.read() == banner + output
+    assert spool.path.stat().st_size < len(output)
+
+
+def test_record02(tmpdir):
+    """test_record02 record試験02 記録上限
+
+    試験条件
+    ・command_cap = 100、session_cap = 250
+    ・300バイト、100バイト、100バイトの3レコードを記録する
+
+    試験結果
+    ・1レコード目は先頭100バイトのみ記録されること(参照に記録バイト数が出力されること)
+    ・2レコード目は100バイト記録されること
+    ・3レコード目はセッション上限の残り50バイトのみ記録されること
+    ・インデックスに受信サイズと記録サイズが出力されること
+    """
+    data = bytes(range(100)) * 3
+    spool = TranscriptSpool(NF_NAME, pathlib.Path(tmpdir), command_cap=100, session_cap=250)
+    refs = [spool.record("cmd", data), spool.record("cmd", data[:100]), spool.record("cmd\tline\n2", data[:100])]
+    spool.close()
+
+    assert [(ref.size, ref.stored) for ref in refs] == [(300, 100), (100, 100), (100, 50)]
+    assert str(refs[0]).startswith(f"transcript={spool.path.name}#1 size=300 (stored 100) preview=")
+    assert read_record(spool.path, 1) == data[:100]
+    assert read_record(spool.path, 3) == data[:50]
+    assert [(e["size"], e["stored"], e["label"]) for e in read_index(spool.path)] == [
+        ("300", "100", "cmd"), ("100", "100", "cmd"), ("100", "50", "cmd line 2")
+    ]
+
+
+def test_record03(tmpdir):
+    """test_record03 record試験03 セッション上限到達後
+
+    試験条件
+    ・session_cap = 10
+    ・10バイト記録後に20バイトのレコードを記録する
+
+    試験結果
+    ・2レコード目は記録されず、インデックスのみ出力されること
+    ・read_recordで空データが取得できること
+    ・存在しないレコード番号はKeyErrorが発生すること
+    """
+    spool = TranscriptSpool(NF_NAME, pathlib.Path(tmpdir), session_cap=10)
+    spool.record("first", b"0123456789")
+    ref = spool.record("second", b"x" * 20)
+    spool.close()
+
+    assert (ref.size, ref.stored, ref.preview) == (20, 0, b"x" * 20)
+    assert read_record(spool.path, 2) == b""
+    with pytest.raises(KeyError):
+        read_record(spool.path, 3)
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.vclock import SYSTEM_CLOCK, VirtualClock, simulate_makespan
+
+
+def test_virtual_clock01(mocker: MockerFixture):
+    """test_virtual_clock01 VirtualClock試験01 仮想時刻の進行
+
+    試験条件
+    ・1.5秒、0秒、-1秒、0.25秒の順に待ち合わせる
+
+    試験結果
+    ・実際には待ち合わせない(time.sleepが呼ばれない)こと
+    ・仮想時刻が正の待ち合わせ時間の合計(1.75秒)だけ進むこと
+    """
+    sleep = mocker.patch("time.sleep")
+    clock = VirtualClock()
+    start = clock.monotonic()
+
+    for seconds in (1.5, 0, -1, 0.25):
+        clock.sleep(seconds)
+
+    assert sleep.call_count == 0
+    assert clock.monotonic() - start == 1.75
+    assert clock.elapsed == 1.75
+    assert (clock.virtual, SYSTEM_CLOCK.virtual) == (True, False)
+
+
+def test_system_clock01(mocker: MockerFixture):
+    """test_system_clock01 SystemClock試験01 実時間の時計
+
+    試験条件
+    ・time.sleep、time.monotonicをモック化する
+
+    試験結果
+    ・待ち合わせ・時刻取得がtimeモジュールに委譲されること
+    """
+    sleep = mocker.patch("time.sleep")
+    mocker.patch("time.monotonic", return_value=12.5)
+
+    SYSTEM_CLOCK.sleep(0.5)
+
+    sleep.assert_called_once_with(0.5)
+    assert SYSTEM_CLOCK.monotonic() == 12.5
+
+
+@pytest.mark.parametrize(("durations", "parallel", "expected"), [
+    ([3.0, 1.0, 2.0], 1, 6.0),
+    ([3.0, 1.0, 2.0], 2, 3.0),
+    ([1.0, 1.0, 1.0, 4.0], 2, 5.0),
+    ([3.0, 1.0, 2.0], 5, 3.0),
+    ([], 2, 0.0),
+])
+def test_simulate_makespan01(durations, parallel, expected):
+    """test_simulate_makespan01 simulate_makespan試験01 並行実行時の所要時間
+
+    試験条件
+    ・NF毎の所要時間と同時実行数
+
+    試験結果
+    ・NF順に最初に空いたワーカーへ割り当てた場合の全体の所要時間となること
+    """
+    assert simulate_makespan(durations, parallel) == expected
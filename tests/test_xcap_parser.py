@@ -0,0 +1,108 @@
+import json
+import pathlib
+from typing import Iterator, List
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.eri_smfvo_xcap_process import parse_xcap_template
+from src.xcap_parser import iter_xcap, parse_xcap
+
+RAW = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n  priority 100\r\n !\r\n" \
+      " ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n!"
+XCAP = [{"ipaddr": "2001:268:200d:1010::6", "priority": "100"}, {"ipaddr": "2001:268:200d:5010::6", "priority": "200"}]
+STUB_FILE = pathlib.Path(__file__).resolve().parent.parent.joinpath("config", "stub.json")
+
+
+def test_parse_xcap01():
+    """test_parse_xcap01 parse_xcap試験01 正常系試験
+
+    試験条件
+    ・NFから取得したxCAP設定(2件)
+
+    試験結果
+    ・xCAP設定毎のipaddr・priorityが返却されること
+    """
+    assert parse_xcap(RAW) == XCAP
+
+
+@pytest.mark.parametrize("raw", [
+    RAW,
+    RAW.replace("\r\n", "\n"),
+    RAW.replace("\r\n", "\r"),
+    "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n !\r\n ipv6-name-server 2001:268:200d:5010::6",
+    "epg pgw apn xcap\r\n  priority 100\r\n !\r\n ipv6-name-server 2001:268:200d:1010::6\r\n\t!\r\n  !",
+    " ipv6-name-server 2001:268:200d:1010::6 \r\n  priority 100x\r\n !",
+    "ipv6-name-server 2001:268:200d:1010::6\r\n !",
+    "error",
+    "",
+])
+def test_parse_xcap02(raw: str):
+    """test_parse_xcap02 parse_xcap試験02 xCAPテンプレートとの比較
+
+    試験条件
+    ・改行文字(CRLF、LF、CR)、priorityなし、" !"なしで終端、"!"の字下げ違い、解析対象外の行、空文字
+
+    試験結果
+    ・xCAPテンプレートの解析結果と一致すること
+    """
+    assert parse_xcap(raw) == parse_xcap_template(raw)
+
+
+def test_parse_xcap03():
+    """test_parse_xcap03 parse_xcap試験03 スタブ定義の応答
+
+    試験条件
+    ・スタブ定義(stub.json)のxCAP設定の確認コマンドの全応答
+
+    試験結果
+    ・xCAPテンプレートの解析結果と一致すること
+    """
+    with open(STUB_FILE, "r", encoding="utf-8") as f:
+        replies = json.load(f)["status_check"]["reply"]
+    raws = [raw for reply in replies.values() for raw in reply.values()]
+
+    assert raws
+    for raw in raws:
+        assert parse_xcap(raw) == parse_xcap_template(raw)
+
+
+def test_parse_xcap04():
+    """test_parse_xcap04 parse_xcap試験04 複数スレッドからの同時呼び出し
+
+    試験条件
+    ・8スレッドから、異なるxCAP設定をそれぞれ200回解析する
+
+    試験結果
+    ・全ての解析結果が各xCAP設定の解析結果と一致すること
+    """
+    raws = [RAW.replace("1010::6", f"1010::{i}") for i in range(8)]
+
+    def parse(raw: str) -> bool:
+        return all(parse_xcap(raw) == parse_xcap_template(raw) for _ in range(200))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(parse, raws))
+
+
+def test_iter_xcap01():
+    """test_iter_xcap01 iter_xcap試験01 逐次解析
+
+    試験条件
+    ・xCAP設定の行を1行ずつ渡す
+
+    試験結果
+    ・" !"の行を受け取った時点で、xCAP設定が1件ずつ返却されること
+    """
+    read: List[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in RAW.splitlines():
+            read.append(line)
+            yield line
+
+    records = iter_xcap(lines())
+
+    assert next(records) == XCAP[0]
+    assert read == RAW.splitlines()[:4]
+    assert list(records) == XCAP[1:]
@@ -0,0 +1,140 @@
+import json
+import pathlib
+import threading
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.abc_process import Mode
+from src.eri_connection_stub import NFStubShellClient as StubClient
+from src.vclock import VirtualClock
+from src.xcap_snapshot import (PRE_COMMAND, SHOW_COMMAND, SNAPSHOT_VERSION, SnapshotCache, SnapshotShellClient,
+                               collect_snapshots, make_snapshot)
+
+RAW = "epg pgw apn xcap\r\n ipv6-name-server 2001:268:200d:1010::6\r\n  priority 100\r\n !\r\n" \
+      " ipv6-name-server 2001:268:200d:5010::6\r\n  priority 200\r\n !\r\n!"
+XCAP = [{"ipaddr": "2001:268:200d:1010::6", "priority": "100"}, {"ipaddr": "2001:268:200d:5010::6", "priority": "200"}]
+
+
+def test_make_snapshot01():
+    """test_make_snapshot01 make_snapshot試験01 スナップショット生成
+
+    試験条件
+    ・NFから取得したxCAP設定(2件)、取得日時を指定する
+
+    試験結果
+    ・取得日時、取得結果、xCAP設定毎のipaddr・priorityが返却されること
+    """
+    assert make_snapshot(RAW, 100.0) == {"collected_at": 100.0, "raw": RAW, "xcap": XCAP}
+
+
+def test_snapshot_cache01(tmpdir):
+    """test_snapshot_cache01 SnapshotCache試験01 有効期間
+
+    試験条件
+    ・取得日時が100秒前、400秒前、未来のスナップショットを保存し、有効期間300秒で取得する
+
+    試験結果
+    ・有効期間内のスナップショットのみ返却されること
+    ・未取得のNFは返却されないこと
+    """
+    cache = SnapshotCache(pathlib.Path(tmpdir).joinpath("cache", "xcap_snapshot.json"))
+    cache.update({"a": make_snapshot(RAW, 900.0), "b": make_snapshot(RAW, 600.0), "c": make_snapshot(RAW, 1100.0)})
+
+    assert list(cache.get_fresh(["a", "b", "c", "d"], 300.0, now=1000.0)) == ["a"]
+
+
+def test_snapshot_cache02(tmpdir):
+    """test_snapshot_cache02 SnapshotCache試験02 キャッシュファイルの更新
+
+    試験条件
+    ・別スレッドから異なるNFのスナップショットを同時に保存する
+    ・保存済みより古いスナップショットを保存する
+
+    試験結果
+    ・全NFのスナップショットが保持されること
+    ・保存済みより古いスナップショットで置き換えないこと
+    ・一時ファイルが残らないこと
+    """
+    path = pathlib.Path(tmpdir).joinpath("cache", "xcap_snapshot.json")
+    cache = SnapshotCache(path)
+    threads = [threading.Thread(target=cache.update, args=({f"nf{i}": make_snapshot(RAW, 100.0)},)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.update({"nf0": make_snapshot("", 50.0)})
+
+    snapshots = cache.load()
+    assert sorted(snapshots) == [f"nf{i}" for i in range(8)]
+    assert snapshots["nf0"]["collected_at"] == 100.0
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == SNAPSHOT_VERSION
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+@pytest.mark.parametrize("text", [None, "{", json.dumps({"version": 0, "snapshots": {"a": {}}})])
+def test_snapshot_cache03(tmpdir, text: str):
+    """test_snapshot_cache03 SnapshotCache試験03 キャッシュファイル異常
+
+    試験条件
+    ・キャッシュファイルなし、JSON異常、形式バージョン不一致
+
+    試験結果
+    ・Exceptionが発生せず、キャッシュが空となること
+    """
+    path = pathlib.Path(tmpdir).joinpath("xcap_snapshot.json")
+    if text is not None:
+        path.write_text(text, encoding="utf-8")
+
+    assert SnapshotCache(path).load() == {}
+    assert SnapshotCache(path).get_fresh(["a"], 300.0) == {}
+
+
+def test_collect_snapshots01(mocker: MockerFixture):
+    """test_collect_snapshots01 collect_snapshots試験01 並行取得
+
+    試験条件
+    ・スタブで3NFのスナップショットをparallel = 3で取得する(1NFは接続クライアント生成に失敗)
+
+    試験結果
+    ・取得できたNFのスナップショット、失敗したNFのエラー内容が返却されること
+    ・NF毎に接続・事前コマンド・確認コマンド・切断が実行されること
+    """
+    mocker.patch("src.eri_connection_stub.LOGGER")
+    clients = {}
+
+    def client_factory(nf_name: str) -> StubClient:
+        if nf_name == "c":
+            raise KeyError(nf_name)
+        clients[nf_name] = mocker.Mock(wraps=StubClient(Mode.show, nf_name, VirtualClock()))
+        return clients[nf_name]
+
+    (snapshots, errors) = collect_snapshots(["a", "b", "c"], client_factory, 3)
+
+    assert sorted(snapshots) == ["a", "b"]
+    assert snapshots["a"]["xcap"] == XCAP
+    assert errors == {"c": "KeyError 'c'"}
+    assert [c[0] for c in clients["a"].method_calls] == ["connect", "command", "command", "close"]
+    assert [c.args[0] for c in clients["a"].command.call_args_list] == [PRE_COMMAND, SHOW_COMMAND]
+
+
+def test_snapshot_shell_client01():
+    """test_snapshot_shell_client01 SnapshotShellClient試験01 スナップショット応答
+
+    試験条件
+    ・確認コマンド、事前コマンド、その他のコマンド、設定モード移行を実行する
+
+    試験結果
+    ・確認コマンドはスナップショットの取得結果、事前コマンドは空が返却されること
+    ・その他のコマンド、設定モード移行はValueErrorが発生すること
+    """
+    client = SnapshotShellClient("a", make_snapshot(RAW))
+    client.connect()
+
+    assert client.command(SHOW_COMMAND) == RAW.encode()
+    assert client.command(PRE_COMMAND) == b""
+    with pytest.raises(ValueError):
+        client.command("commit")
+    with pytest.raises(ValueError):
+        client.enter_config_mode()
+    client.close()
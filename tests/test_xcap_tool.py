@@ -1,7 +1,13 @@
 from copy import deepcopy
 import io
 import json
+import os
 import pathlib
+import asyncio
+import subprocess
+import sys
+import threading
+import time
 from typing import Any, List
 from datetime import datetime
 
@@ -10,6 +16,7 @@ from pytest_mock import MockerFixture
 from xgnlog.Log import Level
 
 from src.abc_process import Mode, ProcessStatus
+from src.config_store import ConfigStore
 import src.xcap_tool as target
 
 JOB_ID = "T23AJ001"
@@ -80,7 +87,8 @@ class MockProcess:
                  edns_ipaddr: str,
                  ipaddr_list: List[str],
                  stub: bool,
-                 job_id: str):
+                 job_id: str,
+                 client: Any = None):
         pass
 
     def run(self):
@@ -937,6 +945,413 @@ def test_check_args10(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixtu
     assert response_value_log_2nd == expected_log_2nd
 
 
+def test_check_args11(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験11 正常試験 (mode: DOWN, parallel: 4)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・blocked_node = "a1-er-s01-amf-001,a2-er-s01-smfvo-001"
+        ・parallel = 4
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・同時実行数が取得できること
+    ・標準出力がないこと
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    blocked_nf = "a1-er-s01-amf-001,a2-er-s01-smfvo-001"
+    parallel = 4
+    argv = [script_name, edns_name, mode.value, blocked_nf, "--parallel", str(parallel)]
+
+    expected_value = True
+
+    expected_sout = []
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00103, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00104, add_info:{argv[1:]}\n"
+    ]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_1st = get_1st_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_1st, "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value == expected_value
+    assert tool.args.parallel == parallel
+    assert sout_desc == expected_sout
+    assert response_value_log_1st == expected_log_1st
+
+
+def test_check_args12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験12 異常系試験 (parallel: 0)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・parallel = 0
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がFalseとなること
+    ・標準出力が想定しているメッセージ内容であること
+    ・障害切り分けログ出力が想定しているlevel、add_infoであること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    argv = [script_name, edns_name, mode.value, "--parallel", "0"]
+
+    expected_value = False
+    tool_expected_value = "NG"
+
+    logtime = datetime(1994, 12, 3, 12, 34, 56)
+    logtime_str = logtime.isoformat(sep=" ", timespec="seconds")
+
+    expected_sout = [
+        f"[ERROR]:{target.MODE_UNKNOWN}:{logtime_str}:{target.NF_NONE}({target.NF_NONE}):failed to analyse arguments {argv[1:]}.\n",
+        f"[RESULT]:{target.MODE_UNKNOWN}:{logtime_str}:{target.NF_NONE}({target.NF_NONE}):[ {tool_expected_value} ]\n",
+    ]
+
+    expected_log_2nd = [
+        f"job_id:{JOB_ID}, level:{Level.CRITICAL.name}, add_info:引数解析異常発生:\n",
+        "パラメータ:\n",
+        f" 引数: {argv[1:]}\n",
+        " Trace: ArgumentParserError Argument must be 1 or more. [0]\n"
+    ]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    date_mock = mocker.MagicMock()
+    date_mock.now = mocker.Mock(return_value=logtime)
+    mocker.patch("src.abc_process.datetime", new=date_mock)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_2nd = get_2nd_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_2nd, "r", encoding="utf-8") as f:
+        response_value_log_2nd: List = f.readlines()
+
+    assert response_value == expected_value
+    assert sout_desc == expected_sout
+    assert response_value_log_2nd == expected_log_2nd
+
+
+def test_check_args13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験13 正常試験 (mode: DOWN, agent指定)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・blocked_node = "a1-er-s01-amf-001,a2-er-s01-smfvo-001"
+        ・agent = "/run/T23AJ001/agent.sock"
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・セッションエージェントのソケットパスが取得できること
+    ・同時実行数が既定値(1)となること
+    ・変更反映待ちの上限時間が既定値(CONVERGE_TIMEOUT)となること
+    ・標準出力がないこと
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    blocked_nf = "a1-er-s01-amf-001,a2-er-s01-smfvo-001"
+    agent = "/run/T23AJ001/agent.sock"
+    argv = [script_name, edns_name, mode.value, blocked_nf, "--agent", agent]
+
+    expected_value = True
+
+    expected_sout = []
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00103, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00104, add_info:{argv[1:]}\n"
+    ]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_1st = get_1st_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_1st, "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value == expected_value
+    assert tool.args.agent == agent
+    assert tool.args.parallel == 1
+    assert tool.args.converge_timeout == target.CONVERGE_TIMEOUT
+    assert sout_desc == expected_sout
+    assert response_value_log_1st == expected_log_1st
+
+
+def test_check_args14(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験14 正常試験 (mode: DOWN, converge-timeout: 2.5)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・converge_timeout = 2.5
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・変更反映待ちの上限時間が取得できること
+    ・標準出力がないこと
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    argv = [script_name, edns_name, mode.value, "--converge-timeout", "2.5"]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+
+    assert response_value is True
+    assert tool.args.converge_timeout == 2.5
+    assert sout == ""
+
+
+def test_check_args15(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験15 異常系試験 (converge-timeout: 0)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・converge_timeout = 0
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がFalseとなること
+    ・障害切り分けログ出力が想定しているlevel、add_infoであること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    argv = [script_name, edns_name, mode.value, "--converge-timeout", "0"]
+
+    expected_log_2nd = [
+        f"job_id:{JOB_ID}, level:{Level.CRITICAL.name}, add_info:引数解析異常発生:\n",
+        "パラメータ:\n",
+        f" 引数: {argv[1:]}\n",
+        " Trace: ArgumentParserError Argument must be greater than 0. [0]\n"
+    ]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        response_value_log_2nd: List = f.readlines()
+
+    assert response_value is False
+    assert response_value_log_2nd == expected_log_2nd
+
+
+
+def test_check_args16(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験16 正常試験 (record, replay, replay-speed)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・record = "rec"
+        ・replay = "rep"
+        ・replay_speed = 0
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・セッション記録・再生の指定が取得できること
+    ・標準出力がないこと
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+    argv = [script_name, edns_name, mode.value, "--record", "rec", "--replay", "rep", "--replay-speed", "0"]
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=argv)
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+
+    assert response_value is True
+    assert (tool.args.record, tool.args.replay, tool.args.replay_speed) == ("rec", "rep", 0.0)
+    assert sout == ""
+
+
+def test_check_args17(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験17 正常試験 (collect, fresh, snapshot-ttl)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.show
+        ・collect、fresh指定、snapshot_ttl = 0
+        ・上記指定なし
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・スナップショットキャッシュの指定が取得できること
+    ・指定なしの場合、既定の有効期間となること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.show
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value, "--collect", "--fresh", "--snapshot-ttl", "0"])
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert (tool.args.collect, tool.args.fresh, tool.args.snapshot_ttl) == (True, True, 0.0)
+
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value])
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert (tool.args.collect, tool.args.fresh, tool.args.snapshot_ttl) == (False, False, target.SNAPSHOT_TTL)
+
+
+def test_check_args18(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験18 正常試験 (profile, profile-memory)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・profile、profile-memory指定
+        ・上記指定なし
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・プロファイルの指定が取得できること
+    ・指定なしの場合、プロファイルしないこと
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value, "--profile", "--profile-memory"])
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert (tool.args.profile, tool.args.profile_memory) == (True, True)
+
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value])
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert (tool.args.profile, tool.args.profile_memory) == (False, False)
+
+
+def test_check_args19(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """check_args試験19 正常試験 (xcap-parser)
+
+    試験条件
+    ・コマンド引数
+        ・script_name = "xcap_tool.py"
+        ・edns_name = "tys1tb1edns02"
+        ・mode = Mode.down
+        ・xcap-parser = "textfsm"
+        ・上記指定なし
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・解析方式が取得できること
+    ・指定なしの場合、専用パーサ(native)であること
+    """
+    script_name = "xcap_tool.py"
+    edns_name = "tys1tb1edns02"
+    mode = Mode.down
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value, "--xcap-parser", "textfsm"])
+
+    tool = target.XcapTool()
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert tool.args.xcap_parser == "textfsm"
+
+    mocker.patch("sys.argv", new=[script_name, edns_name, mode.value])
+    response_value = tool.check_args()
+
+    assert response_value is True
+    assert tool.args.xcap_parser == "native"
+
 def test_load_config01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     """load_config試験01 正常系試験
 
@@ -981,7 +1396,8 @@ def test_load_config01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixt
     test_mocker.edns_name = edns_name
     test_mocker.mode = mode
     test_mocker.load = mocker.Mock(side_effect=[deepcopy(DICT_TOOL), deepcopy(DICT_SMFV), deepcopy(DICT_EDNS)])
-    mocker.patch("src.xcap_tool.json.load", test_mocker.load)
+    mocker.patch("src.config_store.json.load", test_mocker.load)
+    mocker.patch("src.xcap_tool.CONFIG_STORE", new=ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal")))
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1061,7 +1477,8 @@ def test_load_config02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixt
     test_mocker.edns_name = edns_name
     test_mocker.mode = mode
     test_mocker.load = mocker.Mock(side_effect=[deepcopy(DICT_TOOL), deepcopy(DICT_SMFV), FileNotFoundError("File Not Found")])
-    mocker.patch("src.xcap_tool.json.load", test_mocker.load)
+    mocker.patch("src.config_store.json.load", test_mocker.load)
+    mocker.patch("src.xcap_tool.CONFIG_STORE", new=ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal")))
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1143,7 +1560,8 @@ def test_load_config03(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixt
     test_mocker.edns_name = edns_name
     test_mocker.mode = mode
     test_mocker.load = mocker.Mock(side_effect=[deepcopy(DICT_TOOL), deepcopy(DICT_SMFV), json.JSONDecodeError("filename", "test", 1)])
-    mocker.patch("src.xcap_tool.json.load", test_mocker.load)
+    mocker.patch("src.config_store.json.load", test_mocker.load)
+    mocker.patch("src.xcap_tool.CONFIG_STORE", new=ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal")))
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1225,7 +1643,8 @@ def test_load_config04(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixt
     test_mocker.edns_name = edns_name
     test_mocker.mode = mode
     test_mocker.load = mocker.Mock(side_effect=[deepcopy(DICT_TOOL), deepcopy(DICT_SMFV), KeyError("Key Error")])
-    mocker.patch("src.xcap_tool.json.load", test_mocker.load)
+    mocker.patch("src.config_store.json.load", test_mocker.load)
+    mocker.patch("src.xcap_tool.CONFIG_STORE", new=ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal")))
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1307,7 +1726,8 @@ def test_load_config05(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixt
     test_mocker.edns_name = edns_name
     test_mocker.mode = mode
     test_mocker.load = mocker.Mock(side_effect=[deepcopy(DICT_TOOL), deepcopy(DICT_SMFV), Exception("Test Exception")])
-    mocker.patch("src.xcap_tool.json.load", test_mocker.load)
+    mocker.patch("src.config_store.json.load", test_mocker.load)
+    mocker.patch("src.xcap_tool.CONFIG_STORE", new=ConfigStore(pathlib.Path(tmpdir).joinpath("config_bundle.marshal")))
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1364,6 +1784,7 @@ def test_info01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
     edns_ip_address = "2001:268:200d:1010::6"
     smfvoice_configs = {
         "a2-er-s01-smfvoroout-001": {
@@ -1417,6 +1838,19 @@ def test_info01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -1425,7 +1859,7 @@ def test_info01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     tool = target.XcapTool()
     tool.args = None
     tool.smfvoice_configs = smfvoice_configs
-    tool.edns_ip_address = edns_ip_address
+    tool.edns_ip_addresses = [edns_ip_address]
     mocker.patch.object(tool, "args", test_mocker)
     response_value = tool.info()
 
@@ -1687,6 +2121,57 @@ def test_get_edns_ipaddr03(tmpdir, capsys: pytest.CaptureFixture, mocker: Mocker
     assert response_value_log_2nd == expected_log_2nd
 
 
+@pytest.mark.parametrize(("edns_name", "expected_value"), [
+    ("tys1tb1edns02", ["2001:268:200d:1010::6"]),
+    ("tys1tb3edns02,tys1tb1edns02", ["2001:268:200d:500f::6", "2001:268:200d:1010::6"]),
+    ("tys1tb1edns02,tys1tb2edns02,tys1tb1edns02,", ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]),
+])
+def test_get_edns_ipaddrs01(tmpdir, mocker: MockerFixture, edns_name: str, expected_value: List[str]):
+    """get_edns_ipaddrs試験01 正常系試験 (複数eDNS)
+
+    試験条件
+    ・edns_nameに1件、カンマ区切りで2件、重複・空要素を含む3件を指定する
+
+    試験結果
+    ・指定順のeDNS IPアドレスリストとなり、重複が除外されること
+    """
+    mocker.patch("src.xcap_tool.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = edns_name
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS}
+
+    assert tool.get_edns_ipaddrs() == expected_value
+
+
+def test_get_edns_ipaddrs02(tmpdir, mocker: MockerFixture):
+    """get_edns_ipaddrs試験02 異常系試験 (複数eDNSの一部が未定義)
+
+    試験条件
+    ・edns_name = "tys1tb1edns02,tys1tb9edns02"
+
+    試験結果
+    ・KeyErrorが発生すること
+    ・一次ログE00104に未定義のeDNSホスト名が出力されること
+    """
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02,tys1tb9edns02"
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS}
+
+    with pytest.raises(KeyError):
+        tool.get_edns_ipaddrs()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        assert f"job_id:{JOB_ID}, message_id:E00104, add_info:tys1tb9edns02\n" in f.readlines()
+
+
 def test_get_smfvoice_configs01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
     """get_smfvoice_configs試験01 正常系試験 (OK)
 
@@ -1735,7 +2220,7 @@ def test_get_smfvoice_configs01(tmpdir, capsys: pytest.CaptureFixture, mocker: M
 
     tool = target.XcapTool()
     tool.args = None
-    tool.edns_ip_address = edns_ipaddr
+    tool.edns_ip_addresses = [edns_ipaddr]
     tool.tool_conf = tool_dict
     mocker.patch.object(tool, "args", test_mocker)
     response_value = tool.get_smfvoice_configs()
@@ -1825,7 +2310,7 @@ def test_get_smfvoice_configs02(tmpdir, capsys: pytest.CaptureFixture, mocker: M
 
     tool = target.XcapTool()
     tool.args = None
-    tool.edns_ip_address = edns_ipaddr
+    tool.edns_ip_addresses = [edns_ipaddr]
     tool.tool_conf = tool_dict
     mocker.patch.object(tool, "args", test_mocker)
 
@@ -1913,7 +2398,7 @@ def test_get_smfvoice_configs03(tmpdir, capsys: pytest.CaptureFixture, mocker: M
 
     tool = target.XcapTool()
     tool.args = None
-    tool.edns_ip_address = edns_ipaddr
+    tool.edns_ip_addresses = [edns_ipaddr]
     tool.tool_conf = tool_dict
     mocker.patch.object(tool, "args", test_mocker)
 
@@ -1961,6 +2446,7 @@ def test_get_main01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = False
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2000,6 +2486,19 @@ def test_get_main01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -2049,6 +2548,7 @@ def test_get_main02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = False
     stub = True
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2084,6 +2584,19 @@ def test_get_main02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=DICT_SMFV)
     test_mocker.info = mocker.Mock(return_value=None)
@@ -2140,6 +2653,7 @@ def test_get_main03(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = False
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2174,6 +2688,19 @@ def test_get_main03(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=DICT_SMFV)
     test_mocker.info = mocker.Mock(return_value=None)
@@ -2232,6 +2759,7 @@ def test_get_main04(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = False
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2296,6 +2824,19 @@ def test_get_main04(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
@@ -2303,7 +2844,7 @@ def test_get_main04(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.show_or_unknown)
     mocker.patch("src.xcap_tool.interactive_check", test_mocker.interactive_check)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2357,6 +2898,7 @@ def test_get_main05(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2421,6 +2963,19 @@ def test_get_main05(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
@@ -2428,7 +2983,7 @@ def test_get_main05(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.post_check_ok)
     mocker.patch("src.xcap_tool.interactive_check", test_mocker.interactive_check)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2483,6 +3038,7 @@ def test_get_main06(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvoroout-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2548,12 +3104,25 @@ def test_get_main06(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.ssh_ng)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2608,6 +3177,7 @@ def test_get_main07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2673,12 +3243,25 @@ def test_get_main07(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.pre_check_ng)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2733,6 +3316,7 @@ def test_get_main08(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2798,12 +3382,25 @@ def test_get_main08(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.change_ng)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2858,6 +3455,7 @@ def test_get_main09(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -2923,12 +3521,25 @@ def test_get_main09(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.post_check_ng)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -2983,6 +3594,7 @@ def test_get_main10(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -3048,12 +3660,25 @@ def test_get_main10(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
     test_mocker.Process = mocker.Mock(return_value=MockProcess)
     test_mocker.run = mocker.Mock(return_value=ProcessStatus.exception_ng)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
     mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
@@ -3108,6 +3733,7 @@ def test_get_main11(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
     batch = True
     stub = False
+    parallel = 1
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
@@ -3160,9 +3786,279 @@ def test_get_main11(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
-    test_mocker.get_edns_ipaddr = mocker.Mock(side_effect=ValueError("%r does not appear to be an IPv4 or IPv6 address" % edns_ipaddr))
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.get_edns_ipaddr = mocker.Mock(side_effect=ValueError("%r does not appear to be an IPv4 or IPv6 address" % edns_ipaddr))
+    test_mocker.info = mocker.Mock(return_value=None)
+    test_mocker.run = mocker.Mock(return_value=ProcessStatus.exception_ng)
+
+    date_mock = mocker.MagicMock()
+    date_mock.now = mocker.Mock(return_value=logtime)
+    mocker.patch("src.abc_process.datetime", new=date_mock)
+
+    tool = target.XcapTool()
+    tool.args = None
+    tool.tool_conf = tool_dict
+    mocker.patch.object(tool, "args", test_mocker)
+    mocker.patch.object(tool, "get_edns_ipaddr", test_mocker.get_edns_ipaddr)
+    response_value = tool.main()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_1st = get_1st_log_path(tmpdir)
+    log_path_2nd = get_2nd_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_1st, "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value == expected_value
+    assert sout_desc == expected_sout
+    assert log_path_1st.exists()
+    assert response_value_log_1st == expected_log_1st
+    assert not log_path_2nd.exists()
+
+
+def test_get_main12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """main試験12 異常系試験 (SHOWモード, SMFv設定取得失敗)
+
+    試験条件
+    ・edns_name = "tys1tb1edns02"
+    ・mode = Mode.show
+    ・blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
+    ・batch = True
+    ・stub = False
+    ・SMFv設定取得失敗
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・標準出力が想定しているメッセージ内容であること
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    ・障害切り分けログ出力がないこと
+    """
+    edns_name = "tys1tb1edns02"
+    mode = Mode.show
+    blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
+    batch = True
+    stub = False
+    parallel = 1
+
+    tool_dict = deepcopy(DICT_TOOL)
+    tool_dict["edns_infos"] = DICT_EDNS
+
+    edns_ipaddr = "2001:268:200d:1010::6"
+    smfvoice_configs = {
+        "a2-er-s01-smfvoroout-001": {
+            "xCAP": [
+                "2001:268:200d:1010::6",
+                "2001:268:200d:5010::6",
+                "2001:268:200d:500f::6"
+            ]
+        },
+        "b1-er-s01-smfvoroout-001": {
+            "xCAP": [
+                "2001:268:200d:1010::6",
+                "2001:268:200d:5010::6",
+                "2001:268:200d:500f::6"
+            ]
+        }
+    }
+    expected_success_list = []
+    expected_failed_list = []
+    expected_blocked_list = []
+    tool_expected_value = "NG"
+
+    expected_value = False
+
+    logtime = datetime(1994, 12, 3, 12, 34, 56)
+    logtime_str = logtime.isoformat(sep=" ", timespec="seconds")
+
+    expected_sout = [
+        f"[RESULT]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):[ {tool_expected_value} ]\n"
+    ]
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00113, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00122, add_info:{tool_expected_value}\n",
+        f"job_id:{JOB_ID}, message_id:I00114, add_info:{None}\n"
+    ]
+
+    expected_log_2nd = []
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = edns_name
+    test_mocker.mode = mode
+    test_mocker.blocked_nflist = blocked_nflist
+    test_mocker.batch = batch
+    test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
+    test_mocker.get_smfvoice_configs = mocker.Mock(side_effect=ValueError("filtered_list is empty."))
+    test_mocker.info = mocker.Mock(return_value=None)
+    test_mocker.run = mocker.Mock(return_value=ProcessStatus.exception_ng)
+
+    date_mock = mocker.MagicMock()
+    date_mock.now = mocker.Mock(return_value=logtime)
+    mocker.patch("src.abc_process.datetime", new=date_mock)
+
+    tool = target.XcapTool()
+    tool.args = None
+    tool.tool_conf = tool_dict
+    mocker.patch.object(tool, "args", test_mocker)
+    mocker.patch.object(tool, "get_edns_ipaddr", test_mocker.get_edns_ipaddr)
+    mocker.patch.object(tool, "get_smfvoice_configs", test_mocker.get_smfvoice_configs)
+    response_value = tool.main()
+
+    # 結果確認
+    (sout, serr) = capsys.readouterr()
+    log_path_1st = get_1st_log_path(tmpdir)
+    log_path_2nd = get_2nd_log_path(tmpdir)
+
+    sout_desc: List = sout.splitlines(True)
+    with open(log_path_1st, "r", encoding="utf-8") as f:
+        response_value_log_1st: List = f.readlines()
+
+    assert response_value == expected_value
+    assert sout_desc == expected_sout
+    assert log_path_1st.exists()
+    assert response_value_log_1st == expected_log_1st
+    assert not log_path_2nd.exists()
+
+
+def test_get_main13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """main試験13 準正常系試験 (SHOWモード, 網閉塞中eDNSあり)
+
+    試験条件
+    ・edns_name = "tys1tb1edns02"
+    ・mode = Mode.show
+    ・blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001", "tys1tb3edns02"]
+    ・batch = True
+    ・stub = False
+    ・網閉塞中eDNSあり
+
+    試験結果
+    ・Exceptionが発生しないこと
+    ・関数結果がTrueであること
+    ・標準出力が想定しているメッセージ内容であること
+    ・一次ログ出力が想定しているmsg_id、add_infoであること
+    ・障害切り分けログ出力がないこと
+    """
+    edns_name = "tys1tb1edns02"
+    mode = Mode.show
+    blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001", "tys1tb3edns02"]
+    batch = True
+    stub = False
+    parallel = 1
+
+    tool_dict = deepcopy(DICT_TOOL)
+    tool_dict["edns_infos"] = DICT_EDNS
+
+    edns_ipaddr = "2001:268:200d:1010::6"
+    smfvoice_configs = {
+        "a2-er-s01-smfvoroout-001": {
+            "xCAP": [
+                "2001:268:200d:1010::6",
+                "2001:268:200d:5010::6",
+                "2001:268:200d:500f::6"
+            ]
+        },
+        "b1-er-s01-smfvoroout-001": {
+            "xCAP": [
+                "2001:268:200d:1010::6",
+                "2001:268:200d:5010::6"
+            ]
+        }
+    }
+    expected_success_list = ["a2-er-s01-smfvoroout-001", "b1-er-s01-smfvoroout-001"]
+    expected_failed_list = []
+    expected_blocked_list = []
+    tool_expected_value = "OK"
+
+    expected_value = True
+
+    logtime = datetime(1994, 12, 3, 12, 34, 56)
+    logtime_str = logtime.isoformat(sep=" ", timespec="seconds")
+
+    expected_sout = [
+        f"Start Time: {logtime}\n",
+        f"[RESULT]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):[ {tool_expected_value} ]\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):"
+        f"SUCCESS={len(expected_success_list)}, FAILED={len(expected_failed_list)}, BLOCKED={len(expected_blocked_list)}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):SUCCESSED NF {expected_success_list}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):FAILED NF {expected_failed_list}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):BLOCKED NF {expected_blocked_list}\n",
+        f"End Time: {logtime}\n"
+    ]
+
+    expected_log_1st = [
+        f"job_id:{JOB_ID}, message_id:I00113, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00117, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00118, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00119, add_info:{expected_success_list}\n",
+        f"job_id:{JOB_ID}, message_id:I00120, add_info:{expected_failed_list}\n",
+        f"job_id:{JOB_ID}, message_id:I00121, add_info:{expected_blocked_list}\n",
+        f"job_id:{JOB_ID}, message_id:I00122, add_info:{tool_expected_value}\n",
+        f"job_id:{JOB_ID}, message_id:I00114, add_info:{None}\n"
+    ]
+
+    expected_log_2nd = []
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = edns_name
+    test_mocker.mode = mode
+    test_mocker.blocked_nflist = blocked_nflist
+    test_mocker.batch = batch
+    test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
+    test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
-    test_mocker.run = mocker.Mock(return_value=ProcessStatus.exception_ng)
+    test_mocker.Process = mocker.Mock(return_value=MockProcess)
+    test_mocker.run = mocker.Mock(return_value=ProcessStatus.show_or_unknown)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", test_mocker.Process)
+    mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -3173,6 +4069,8 @@ def test_get_main11(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     tool.tool_conf = tool_dict
     mocker.patch.object(tool, "args", test_mocker)
     mocker.patch.object(tool, "get_edns_ipaddr", test_mocker.get_edns_ipaddr)
+    mocker.patch.object(tool, "get_smfvoice_configs", test_mocker.get_smfvoice_configs)
+    mocker.patch.object(tool, "info", test_mocker.info)
     response_value = tool.main()
 
     # 結果確認
@@ -3191,71 +4089,98 @@ def test_get_main11(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     assert not log_path_2nd.exists()
 
 
-def test_get_main12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
-    """main試験12 異常系試験 (SHOWモード, SMFv設定取得失敗)
+def test_get_main14(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """main試験14 正常系試験 (downモード, 並行実行)
 
     試験条件
     ・edns_name = "tys1tb1edns02"
-    ・mode = Mode.show
-    ・blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
+    ・mode = Mode.down
+    ・blocked_nflist = ["a1-er-s01-amf-001", "b1-er-s01-smfvoroout-001"]
     ・batch = True
     ・stub = False
-    ・SMFv設定取得失敗
+    ・parallel = 3
+    ・NF設定順と逆順にプロセスが完了すること
 
     試験結果
     ・Exceptionが発生しないこと
-    ・関数結果がTrueであること
+    ・関数結果がFalseであること
+    ・全NFのプロセスが並行実行されること
+    ・SUCCESS/FAILED/BLOCKEDの集計がNF設定順となること
     ・標準出力が想定しているメッセージ内容であること
     ・一次ログ出力が想定しているmsg_id、add_infoであること
     ・障害切り分けログ出力がないこと
     """
     edns_name = "tys1tb1edns02"
-    mode = Mode.show
-    blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001"]
+    mode = Mode.down
+    blocked_nflist = ["a1-er-s01-amf-001", "b1-er-s01-smfvoroout-001"]
     batch = True
     stub = False
+    parallel = 3
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
 
     edns_ipaddr = "2001:268:200d:1010::6"
+    xcap = [
+        "2001:268:200d:1010::6",
+        "2001:268:200d:5010::6",
+        "2001:268:200d:500f::6"
+    ]
     smfvoice_configs = {
-        "a2-er-s01-smfvoroout-001": {
-            "xCAP": [
-                "2001:268:200d:1010::6",
-                "2001:268:200d:5010::6",
-                "2001:268:200d:500f::6"
-            ]
-        },
-        "b1-er-s01-smfvoroout-001": {
-            "xCAP": [
-                "2001:268:200d:1010::6",
-                "2001:268:200d:5010::6",
-                "2001:268:200d:500f::6"
-            ]
-        }
+        "a2-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "b1-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "c1-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "d1-er-s01-smfvoroout-001": {"xCAP": xcap}
     }
-    expected_success_list = []
-    expected_failed_list = []
-    expected_blocked_list = []
+    process_results = {
+        "a2-er-s01-smfvoroout-001": ProcessStatus.post_check_ok,
+        "b1-er-s01-smfvoroout-001": ProcessStatus.ssh_ng,
+        "c1-er-s01-smfvoroout-001": ProcessStatus.commit_ng,
+        "d1-er-s01-smfvoroout-001": ProcessStatus.already_changed
+    }
+    expected_success_list = ["a2-er-s01-smfvoroout-001", "d1-er-s01-smfvoroout-001"]
+    expected_failed_list = ["c1-er-s01-smfvoroout-001"]
+    expected_blocked_list = ["b1-er-s01-smfvoroout-001"]
     tool_expected_value = "NG"
 
     expected_value = False
 
     logtime = datetime(1994, 12, 3, 12, 34, 56)
-    logtime_str = logtime.isoformat(sep=" ", timespec="seconds")
 
     expected_sout = [
-        f"[RESULT]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):[ {tool_expected_value} ]\n"
+        f"Start Time: {logtime}\n",
+        f"[RESULT]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):[ {tool_expected_value} ]\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):"
+        f"SUCCESS={len(expected_success_list)}, FAILED={len(expected_failed_list)}, BLOCKED={len(expected_blocked_list)}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):SUCCESSED NF {expected_success_list}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):FAILED NF {expected_failed_list}\n",
+        f"[DETAIL]:{mode}:{logtime}:{edns_name}({target.NF_NONE}):BLOCKED NF {expected_blocked_list}\n",
+        f"End Time: {logtime}\n"
     ]
 
     expected_log_1st = [
         f"job_id:{JOB_ID}, message_id:I00113, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00117, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00118, add_info:{None}\n",
+        f"job_id:{JOB_ID}, message_id:I00119, add_info:{expected_success_list}\n",
+        f"job_id:{JOB_ID}, message_id:I00120, add_info:{expected_failed_list}\n",
+        f"job_id:{JOB_ID}, message_id:I00121, add_info:{expected_blocked_list}\n",
         f"job_id:{JOB_ID}, message_id:I00122, add_info:{tool_expected_value}\n",
         f"job_id:{JOB_ID}, message_id:I00114, add_info:{None}\n"
     ]
 
-    expected_log_2nd = []
+    # 先頭NFほど遅く完了させ、完了順とNF設定順を逆転させる
+    delays = {nf_name: 0.05 * (len(smfvoice_configs) - i) for i, nf_name in enumerate(smfvoice_configs)}
+    thread_names = set()
+
+    class MockParallelProcess:
+        def __init__(self, edns_name, nf_name, mode, edns_ipaddr, ipaddr_list, stub, job_id, client=None, converge_timeout=None, clock=None, xcap_parser=None):
+            self.nf_name = nf_name
+
+        def run(self):
+            thread_names.add(threading.current_thread().name)
+            time.sleep(delays[self.nf_name])
+            return process_results[self.nf_name]
 
     logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
     mocker.patch("src.xcap_tool.LOGGER", new=logger)
@@ -3266,10 +4191,23 @@ def test_get_main12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
-    test_mocker.get_smfvoice_configs = mocker.Mock(side_effect=ValueError("filtered_list is empty."))
+    test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
-    test_mocker.run = mocker.Mock(return_value=ProcessStatus.exception_ng)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", MockParallelProcess)
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -3281,6 +4219,7 @@ def test_get_main12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     mocker.patch.object(tool, "args", test_mocker)
     mocker.patch.object(tool, "get_edns_ipaddr", test_mocker.get_edns_ipaddr)
     mocker.patch.object(tool, "get_smfvoice_configs", test_mocker.get_smfvoice_configs)
+    mocker.patch.object(tool, "info", test_mocker.info)
     response_value = tool.main()
 
     # 結果確認
@@ -3293,64 +4232,72 @@ def test_get_main12(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
         response_value_log_1st: List = f.readlines()
 
     assert response_value == expected_value
+    assert len(thread_names) == parallel
+    assert all(name.startswith("xcap") for name in thread_names)
     assert sout_desc == expected_sout
     assert log_path_1st.exists()
     assert response_value_log_1st == expected_log_1st
     assert not log_path_2nd.exists()
 
 
-def test_get_main13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
-    """main試験13 準正常系試験 (SHOWモード, 網閉塞中eDNSあり)
+def test_get_main15(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """main試験15 正常系試験 (downモード, asyncio並行実行)
 
     試験条件
     ・edns_name = "tys1tb1edns02"
-    ・mode = Mode.show
-    ・blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001", "tys1tb3edns02"]
+    ・mode = Mode.down
+    ・blocked_nflist = ["a1-er-s01-amf-001", "b1-er-s01-smfvoroout-001"]
     ・batch = True
     ・stub = False
-    ・網閉塞中eDNSあり
+    ・parallel = 2
+    ・asyncio = True
+    ・NF設定順と逆順にプロセスが完了すること
 
     試験結果
     ・Exceptionが発生しないこと
-    ・関数結果がTrueであること
+    ・関数結果がFalseであること
+    ・全NFのプロセスが1つのイベントループ上で同時実行数を上限に並行実行されること
+    ・SUCCESS/FAILED/BLOCKEDの集計がNF設定順となること
     ・標準出力が想定しているメッセージ内容であること
     ・一次ログ出力が想定しているmsg_id、add_infoであること
     ・障害切り分けログ出力がないこと
     """
     edns_name = "tys1tb1edns02"
-    mode = Mode.show
-    blocked_nflist = ["a1-er-s01-amf-001", "a2-er-s01-smfvo-001", "tys1tb3edns02"]
+    mode = Mode.down
+    blocked_nflist = ["a1-er-s01-amf-001", "b1-er-s01-smfvoroout-001"]
     batch = True
     stub = False
+    parallel = 2
 
     tool_dict = deepcopy(DICT_TOOL)
     tool_dict["edns_infos"] = DICT_EDNS
 
     edns_ipaddr = "2001:268:200d:1010::6"
+    xcap = [
+        "2001:268:200d:1010::6",
+        "2001:268:200d:5010::6",
+        "2001:268:200d:500f::6"
+    ]
     smfvoice_configs = {
-        "a2-er-s01-smfvoroout-001": {
-            "xCAP": [
-                "2001:268:200d:1010::6",
-                "2001:268:200d:5010::6",
-                "2001:268:200d:500f::6"
-            ]
-        },
-        "b1-er-s01-smfvoroout-001": {
-            "xCAP": [
-                "2001:268:200d:1010::6",
-                "2001:268:200d:5010::6"
-            ]
-        }
+        "a2-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "b1-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "c1-er-s01-smfvoroout-001": {"xCAP": xcap},
+        "d1-er-s01-smfvoroout-001": {"xCAP": xcap}
     }
-    expected_success_list = ["a2-er-s01-smfvoroout-001", "b1-er-s01-smfvoroout-001"]
-    expected_failed_list = []
-    expected_blocked_list = []
-    tool_expected_value = "OK"
+    process_results = {
+        "a2-er-s01-smfvoroout-001": ProcessStatus.post_check_ok,
+        "b1-er-s01-smfvoroout-001": ProcessStatus.ssh_ng,
+        "c1-er-s01-smfvoroout-001": ProcessStatus.commit_ng,
+        "d1-er-s01-smfvoroout-001": ProcessStatus.already_changed
+    }
+    expected_success_list = ["a2-er-s01-smfvoroout-001", "d1-er-s01-smfvoroout-001"]
+    expected_failed_list = ["c1-er-s01-smfvoroout-001"]
+    expected_blocked_list = ["b1-er-s01-smfvoroout-001"]
+    tool_expected_value = "NG"
 
-    expected_value = True
+    expected_value = False
 
     logtime = datetime(1994, 12, 3, 12, 34, 56)
-    logtime_str = logtime.isoformat(sep=" ", timespec="seconds")
 
     expected_sout = [
         f"Start Time: {logtime}\n",
@@ -3374,7 +4321,23 @@ def test_get_main13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
         f"job_id:{JOB_ID}, message_id:I00114, add_info:{None}\n"
     ]
 
-    expected_log_2nd = []
+    # 先頭NFほど遅く完了させ、完了順とNF設定順を逆転させる
+    delays = {nf_name: 0.05 * (len(smfvoice_configs) - i) for i, nf_name in enumerate(smfvoice_configs)}
+    thread_names = set()
+    running = []
+    max_running = []
+
+    class MockAsyncProcess:
+        def __init__(self, edns_name, nf_name, mode, edns_ipaddr, ipaddr_list, stub, job_id, client=None, converge_timeout=None, clock=None, xcap_parser=None):
+            self.nf_name = nf_name
+
+        async def run_async(self):
+            thread_names.add(threading.current_thread().name)
+            running.append(self.nf_name)
+            max_running.append(len(running))
+            await asyncio.sleep(delays[self.nf_name])
+            running.remove(self.nf_name)
+            return process_results[self.nf_name]
 
     logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
     mocker.patch("src.xcap_tool.LOGGER", new=logger)
@@ -3385,13 +4348,24 @@ def test_get_main13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
     test_mocker.blocked_nflist = blocked_nflist
     test_mocker.batch = batch
     test_mocker.stub = stub
+    test_mocker.parallel = parallel
+    test_mocker.asyncio = True
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
     test_mocker.get_edns_ipaddr = mocker.Mock(return_value=edns_ipaddr)
     test_mocker.get_smfvoice_configs = mocker.Mock(return_value=smfvoice_configs)
     test_mocker.info = mocker.Mock(return_value=None)
-    test_mocker.Process = mocker.Mock(return_value=MockProcess)
-    test_mocker.run = mocker.Mock(return_value=ProcessStatus.show_or_unknown)
-    mocker.patch("src.xcap_tool.EriSmfvoXCAPProcess", test_mocker.Process)
-    mocker.patch("tests.test_xcap_tool.MockProcess.run", test_mocker.run)
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", new=mocker.Mock(side_effect=AssertionError))
+    mocker.patch("src.eri_smfvo_xcap_async_process.AsyncEriSmfvoXCAPProcess", MockAsyncProcess)
 
     date_mock = mocker.MagicMock()
     date_mock.now = mocker.Mock(return_value=logtime)
@@ -3416,12 +4390,607 @@ def test_get_main13(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture
         response_value_log_1st: List = f.readlines()
 
     assert response_value == expected_value
+    assert thread_names == {threading.current_thread().name}
+    assert max(max_running) == parallel
     assert sout_desc == expected_sout
     assert log_path_1st.exists()
     assert response_value_log_1st == expected_log_1st
     assert not log_path_2nd.exists()
 
 
+def test_get_smfvoice_configs04(tmpdir, mocker: MockerFixture):
+    """get_smfvoice_configs試験04 正常系試験 (複数eDNS)
+
+    試験条件
+    ・edns_ip_addresses = ["2001:268:200d:5010::6", "2001:268:200d:500f::6"]
+    ・いずれか一方のみを含むNF、両方を含むNF、どちらも含まないNFがある
+
+    試験結果
+    ・いずれかのeDNS IPアドレスを含むNFのみがNF設定順に取得されること
+    """
+    nf_infos = {
+        "a1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]},
+        "b1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:1010::6", "2001:268:200d:1011::6"]},
+        "c1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:5010::6", "2001:268:200d:500f::6"]},
+        "d1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:500f::6", "2001:268:200d:1010::6"]}
+    }
+    mocker.patch("src.xcap_tool.LOGGER", new=MockLog(JOB_ID, Level.INFO, log_dir=tmpdir))
+
+    tool = target.XcapTool()
+    tool.args = mocker.MagicMock()
+    tool.edns_ip_addresses = ["2001:268:200d:5010::6", "2001:268:200d:500f::6"]
+    tool.tool_conf = {"nf_infos": nf_infos}
+
+    assert list(tool.get_smfvoice_configs()) == ["a1-er-s01-smfvoroout-001", "c1-er-s01-smfvoroout-001", "d1-er-s01-smfvoroout-001"]
+
+
+def test_run_processes01(tmpdir, mocker: MockerFixture):
+    """run_processes試験01 並行実行中断時の未着手NFキャンセル
+
+    試験条件
+    ・parallel = 2
+    ・4NFのうち先頭NFのプロセスで、2NF目の開始後にExceptionが発生すること
+    ・先頭NF以外のプロセスは0.1秒後に完了すること
+
+    試験結果
+    ・Exceptionが呼び出し元に送出されること
+    ・実行中のNFの完了を待ち合わせること
+    ・中断時に未着手だったNF(4NF目)のプロセスが実行されないこと
+    """
+    xcap = ["2001:268:200d:1010::6", "2001:268:200d:5010::6"]
+    smfvoice_configs = {f"{x}1-er-s01-smfvoroout-001": {"xCAP": xcap} for x in "abcd"}
+    nf_names = list(smfvoice_configs)
+    started = []
+    finished = []
+    second_started = threading.Event()
+
+    class MockInterruptProcess:
+        def __init__(self, edns_name, nf_name, mode, edns_ipaddr, ipaddr_list, stub, job_id, client=None, converge_timeout=None, clock=None, xcap_parser=None):
+            self.nf_name = nf_name
+
+        def run(self):
+            started.append(self.nf_name)
+            if self.nf_name == nf_names[0]:
+                second_started.wait()
+                raise RuntimeError("interrupted")
+            second_started.set()
+            time.sleep(0.1)
+            finished.append(self.nf_name)
+            return ProcessStatus.post_check_ok
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.parallel = 2
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = False
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.stub = False
+    mocker.patch("src.eri_smfvo_xcap_process.EriSmfvoXCAPProcess", MockInterruptProcess)
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.edns_ip_addresses = ["2001:268:200d:1010::6"]
+    tool.smfvoice_configs = smfvoice_configs
+
+    with pytest.raises(RuntimeError):
+        tool.run_processes()
+
+    # 先頭2NFはワーカースレッド間で開始順が前後しうる
+    assert sorted(started[:2]) == nf_names[:2]
+    assert nf_names[3] not in started
+    assert sorted(finished) == sorted(started[1:])
+
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_run_processes02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture, is_async: bool):
+    """run_processes試験02 仮想時計によるスタブ実行 (stub: True, vclock: True)
+
+    試験条件
+    ・mode = Mode.down
+    ・3NFをparallel = 2で実行する(ワーカープール、asyncio)
+
+    試験結果
+    ・全NFのプロセスがpost_check_okで完了すること
+    ・スタブの待ち合わせ(接続1秒等)を実際には待たないこと
+    ・NF毎の仮想時計が同じ模擬所要時間(1秒以上)となること
+    ・main実行後に模擬所要時間(2NF分)が表示されること
+    """
+    xcap = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+    smfvoice_configs = {f"{x}1-er-s01-smfvoroout-001": {"xCAP": xcap} for x in "abc"}
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.abc_process.Log", new=lambda job_id: MockLog(job_id, Level.INFO, log_dir=tmpdir))
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02"
+    test_mocker.mode = Mode.down
+    test_mocker.blocked_nflist = []
+    test_mocker.batch = True
+    test_mocker.stub = True
+    test_mocker.parallel = 2
+    test_mocker.asyncio = is_async
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = True
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.converge_timeout = 5.0
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS}
+    tool.edns_ip_addresses = [xcap[0]]
+    tool.smfvoice_configs = smfvoice_configs
+    mocker.patch.object(tool, "get_edns_ipaddr", mocker.Mock(return_value=xcap[0]))
+    mocker.patch.object(tool, "get_smfvoice_configs", mocker.Mock(return_value=smfvoice_configs))
+    mocker.patch.object(tool, "info", mocker.Mock(return_value=None))
+
+    start = time.monotonic()
+    response_value = tool.run_processes()
+    elapsed = time.monotonic() - start
+
+    durations = {nf_name: clock.elapsed for nf_name, clock in tool.clocks.items()}
+
+    assert response_value == {nf_name: ProcessStatus.post_check_ok for nf_name in smfvoice_configs}
+    assert elapsed < 1.0
+    assert set(durations) == set(smfvoice_configs)
+    assert len(set(durations.values())) == 1
+    assert list(durations.values())[0] > 1.0
+
+    assert tool.main() is True
+    (sout, serr) = capsys.readouterr()
+    assert f"Simulated Elapsed: {list(durations.values())[0] * 2:.3f}s" in sout.splitlines()
+
+
+@pytest.mark.parametrize(("file_name", "is_writable"), [
+    ("xcap_tool.prom", True),
+    ("xcap_tool.json", True),
+    ("xcap_tool.prom", False),
+])
+def test_export_metrics01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture, file_name: str, is_writable: bool):
+    """export_metrics試験01 フェーズ所要時間のメトリクス出力 (stub: True, vclock: True, metrics指定)
+
+    試験条件
+    ・mode = Mode.down
+    ・2NFを仮想時計でスタブ実行する
+    ・metricsに拡張子.prom、.jsonのファイルパスを指定する
+    ・ファイル出力に失敗する(OSError)
+
+    試験結果
+    ・出力できる場合、関数結果がTrueとなり、一次ログI00125、I00126が出力されること
+    ・拡張子.promの場合Prometheus textfile形式、.jsonの場合JSON形式でNF毎の所要時間が出力されること
+    ・出力できない場合、関数結果がFalseとなり、エラーメッセージ、一次ログE00106、障害切り分けログが出力されること
+    """
+    xcap = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+    smfvoice_configs = {f"{x}1-er-s01-smfvoroout-001": {"xCAP": xcap} for x in "ab"}
+    metrics_path = pathlib.Path(tmpdir).joinpath(file_name)
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.abc_process.Log", new=lambda job_id: MockLog(job_id, Level.INFO, log_dir=tmpdir))
+    if not is_writable:
+        mocker.patch("src.metrics.os.replace", side_effect=PermissionError("Permission denied"))
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02"
+    test_mocker.mode = Mode.down
+    test_mocker.blocked_nflist = []
+    test_mocker.batch = True
+    test_mocker.stub = True
+    test_mocker.parallel = 1
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = True
+    test_mocker.metrics = str(metrics_path)
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.converge_timeout = 5.0
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.edns_ip_addresses = [xcap[0]]
+    tool.smfvoice_configs = smfvoice_configs
+    mocker.patch.object(tool, "get_edns_ipaddr", mocker.Mock(return_value=xcap[0]))
+    mocker.patch.object(tool, "get_smfvoice_configs", mocker.Mock(return_value=smfvoice_configs))
+    mocker.patch.object(tool, "info", mocker.Mock(return_value=None))
+
+    process_results = tool.run_processes()
+    capsys.readouterr()
+    response_value = tool.export_metrics(process_results)
+
+    (sout, serr) = capsys.readouterr()
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+
+    assert response_value is is_writable
+    assert f"job_id:{JOB_ID}, message_id:I00125, add_info:{metrics_path}\n" in log_1st
+    if not is_writable:
+        assert f"failed to export metrics. file={metrics_path}" in sout
+        assert f"job_id:{JOB_ID}, message_id:E00106, add_info:{metrics_path}\n" in log_1st
+        with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+            assert "メトリクス出力失敗" in f.read()
+        return
+    assert f"job_id:{JOB_ID}, message_id:I00126, add_info:{metrics_path}\n" in log_1st
+    text = metrics_path.read_text(encoding="utf-8")
+    if metrics_path.suffix == ".prom":
+        assert 'xcap_tool_processes{mode="down",outcome="post_check_ok"} 2' in text.splitlines()
+        assert 'xcap_tool_phase_duration_seconds_bucket{phase="open_client",mode="down",outcome="post_check_ok",le="2.5"} 2' in text.splitlines()
+    else:
+        nfs = json.loads(text)["nfs"]
+        assert [nf["nf_name"] for nf in nfs] == list(smfvoice_configs)
+        assert nfs[0]["phases"]["open_client"] == 1.25
+        assert nfs[0]["phases"] == nfs[1]["phases"]
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_export_trace01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture, is_async: bool):
+    """export_trace試験01 トレースの出力 (stub: True, trace指定)
+
+    試験条件
+    ・mode = Mode.down
+    ・2NFをparallel = 2で実行する(ワーカープール、asyncio)
+    ・traceにファイルパスを指定する
+
+    試験結果
+    ・関数結果がTrueとなり、一次ログI00127、I00128が出力されること
+    ・ルートスパン(xcap_tool.main)の下にNF毎のスパン(process.run)が出力されること
+    ・main終了後はトレースの収集が終了していること
+    """
+    xcap = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+    smfvoice_configs = {f"{x}1-er-s01-smfvoroout-001": {"xCAP": xcap} for x in "ab"}
+    trace_path = pathlib.Path(tmpdir).joinpath("xcap_tool.jsonl")
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.abc_process.Log", new=lambda job_id: MockLog(job_id, Level.INFO, log_dir=tmpdir))
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02"
+    test_mocker.mode = Mode.down
+    test_mocker.blocked_nflist = []
+    test_mocker.batch = True
+    test_mocker.stub = True
+    test_mocker.parallel = 2
+    test_mocker.asyncio = is_async
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = True
+    test_mocker.metrics = None
+    test_mocker.trace = str(trace_path)
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = False
+    test_mocker.xcap_parser = "native"
+    test_mocker.converge_timeout = 5.0
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS}
+    mocker.patch.object(tool, "get_edns_ipaddr", mocker.Mock(return_value=xcap[0]))
+    mocker.patch.object(tool, "get_smfvoice_configs", mocker.Mock(return_value=smfvoice_configs))
+    mocker.patch.object(tool, "info", mocker.Mock(return_value=None))
+
+    response_value = tool.main()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+    [trace] = [json.loads(line) for line in trace_path.read_text(encoding="utf-8").splitlines()]
+    spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    [root] = [span for span in spans if span["name"] == "xcap_tool.main"]
+    runs = [span for span in spans if span["name"] == "process.run"]
+
+    assert response_value is True
+    assert f"job_id:{JOB_ID}, message_id:I00127, add_info:{trace_path}\n" in log_1st
+    assert f"job_id:{JOB_ID}, message_id:I00128, add_info:{trace_path}\n" in log_1st
+    assert root["parentSpanId"] == ""
+    assert root["status"] == {"code": 1}
+    assert len(runs) == len(smfvoice_configs)
+    assert all(span["parentSpanId"] == root["spanId"] for span in runs)
+    assert sorted(x["value"]["stringValue"] for span in runs for x in span["attributes"] if x["key"] == "nf_name") == \
+        list(smfvoice_configs)
+    assert target.TRACER.enabled is False
+
+
+def make_profile_tool(tmpdir, mocker: MockerFixture, logger: MockLog) -> target.XcapTool:
+    xcap = ["2001:268:200d:1010::6", "2001:268:200d:5010::6", "2001:268:200d:501f::6"]
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.abc_process.Log", new=lambda job_id: MockLog(job_id, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.profiling.make_run_id", return_value="19941203123456_100")
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02"
+    test_mocker.mode = Mode.down
+    test_mocker.blocked_nflist = []
+    test_mocker.batch = True
+    test_mocker.stub = True
+    test_mocker.parallel = 2
+    test_mocker.asyncio = False
+    test_mocker.agent = None
+    test_mocker.record = None
+    test_mocker.replay = None
+    test_mocker.vclock = True
+    test_mocker.metrics = None
+    test_mocker.trace = None
+    test_mocker.collect = False
+    test_mocker.fresh = False
+    test_mocker.snapshot_ttl = 0
+    test_mocker.profile = True
+    test_mocker.profile_memory = True
+    test_mocker.xcap_parser = "native"
+    test_mocker.converge_timeout = 5.0
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS}
+    mocker.patch.object(tool, "get_edns_ipaddr", mocker.Mock(return_value=xcap[0]))
+    mocker.patch.object(tool, "get_smfvoice_configs",
+                        mocker.Mock(return_value={f"{x}1-er-s01-smfvoroout-001": {"xCAP": xcap} for x in "ab"}))
+    mocker.patch.object(tool, "info", mocker.Mock(return_value=None))
+    return tool
+
+
+def test_profile01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_profile01 プロファイル試験01 計測結果の出力 (stub: True, profile、profile-memory指定)
+
+    試験条件
+    ・mode = Mode.down
+    ・2NFをparallel = 2で実行する(ワーカープール)
+
+    試験結果
+    ・関数結果がTrueとなり、一次ログI00135、I00136が出力されること
+    ・ログディレクトリに実行IDを付与したcProfileの計測結果、インポート時間内訳、フェーズ毎のメモリスナップショットが出力されること
+    ・ワーカースレッドで実行したプロセスも計測されること
+    ・障害切り分けログに累積時間上位の関数が出力されること
+    ・main終了後はフェーズ終了時に呼び出す関数が解除されていること
+    """
+    import pstats
+    import tracemalloc
+
+    from src.abc_process import PHASE_HOOKS
+
+    log_dir = pathlib.Path(tmpdir).joinpath("2nd-log", JOB_ID)
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    logger.logdir_2nd = log_dir
+    tool = make_profile_tool(tmpdir, mocker, logger)
+
+    response_value = tool.main()
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_2nd = f.read()
+    prefix = "xcap_tool_19941203123456_100"
+    stats = pstats.Stats(str(log_dir.joinpath(f"{prefix}.prof")))
+    snapshots = sorted(log_dir.glob(f"{prefix}_*.tracemalloc"))
+
+    assert response_value is True
+    assert f"job_id:{JOB_ID}, message_id:I00135, add_info:19941203123456_100\n" in log_1st
+    assert any(x.startswith(f"job_id:{JOB_ID}, message_id:I00136, add_info:") for x in log_1st)
+    assert any(func == "run_process" for (_, _, func) in stats.stats)
+    assert any(func == "run" and file.endswith("eri_smfvo_xcap_process.py") for (file, _, func) in stats.stats)
+    assert "src.xcap_tool" in log_dir.joinpath(f"{prefix}.importtime.txt").read_text(encoding="utf-8")
+    assert any(x.name.endswith("_a1-er-s01-smfvoroout-001_open_client.tracemalloc") for x in snapshots)
+    assert isinstance(tracemalloc.Snapshot.load(str(snapshots[0])), tracemalloc.Snapshot)
+    assert f"プロファイル結果:\nパラメータ:\n 実行ID: 19941203123456_100\n" in log_2nd
+    assert "cumulative" in log_2nd
+    assert PHASE_HOOKS == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_profile02 プロファイル試験02 計測結果の出力失敗
+
+    試験条件
+    ・インポート時間の計測に失敗する
+
+    試験結果
+    ・mainの関数結果はメイン処理の結果(True)となること
+    ・出力失敗のエラーが標準出力、一次ログE00110、障害切り分けログに出力されること
+    """
+    import subprocess
+
+    log_dir = pathlib.Path(tmpdir).joinpath("2nd-log", JOB_ID)
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    logger.logdir_2nd = log_dir
+    tool = make_profile_tool(tmpdir, mocker, logger)
+    mocker.patch("src.profiling.measure_import_time", side_effect=subprocess.CalledProcessError(1, "python"))
+
+    response_value = tool.main()
+
+    (sout, serr) = capsys.readouterr()
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_2nd = f.read()
+
+    assert response_value is True
+    assert f"failed to export a profile. dir={log_dir}" in sout
+    assert f"job_id:{JOB_ID}, message_id:E00110, add_info:19941203123456_100\n" in log_1st
+    assert "プロファイル出力失敗:\nパラメータ:\n 実行ID: 19941203123456_100\n" in log_2nd
+    assert "Trace: CalledProcessError" in log_2nd
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_snapshot01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture, is_async: bool):
+    """test_snapshot01 xCAPスナップショット試験01 SHOW/INFOのスナップショット応答
+
+    試験条件
+    ・スタブモード、nf-infosに3NF(対象2NF)、parallel = 2
+    ・1回目: mode = Mode.show、collect指定
+    ・2回目: mode = Mode.show
+    ・3回目: mode = Mode.show、fresh指定
+    ・4回目: mode = Mode.info、snapshot_ttl = 0
+
+    試験結果
+    ・1回目はnf-infosの全NFのスナップショットがキャッシュに保存され、対象NFはスナップショットから応答すること
+    ・2回目はキャッシュの有効期間内のスナップショットから応答し、INFOにスナップショットのxCAP設定が表示されること
+    ・3回目はNFに接続して応答し、取得結果でキャッシュが更新されること
+    ・4回目はキャッシュを利用しないこと
+    """
+    from src.eri_connection_stub import NFStubShellClient as StubClient
+    from src.xcap_snapshot import SnapshotCache, SnapshotShellClient
+
+    cache_path = pathlib.Path(tmpdir).joinpath("cache", "xcap_snapshot_stub.json")
+    nf_infos = dict(DICT_SMFV, **{"c1-er-s01-smfvoroout-001": {"xCAP": ["2001:268:200d:5010::6", "2001:268:200d:500f::6"]}})
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.abc_process.Log", new=lambda job_id: MockLog(job_id, Level.INFO, log_dir=tmpdir))
+    mocker.patch("src.xcap_snapshot.SNAPSHOT_STUB_FILE", new=cache_path)
+
+    def run(mode: Mode, collect: bool = False, fresh: bool = False, snapshot_ttl: float = target.SNAPSHOT_TTL) -> target.XcapTool:
+        test_mocker = mocker.MagicMock()
+        test_mocker.edns_name = "tys1tb1edns02"
+        test_mocker.mode = mode
+        test_mocker.blocked_nflist = []
+        test_mocker.batch = True
+        test_mocker.stub = True
+        test_mocker.parallel = 2
+        test_mocker.asyncio = is_async
+        test_mocker.agent = None
+        test_mocker.record = None
+        test_mocker.replay = None
+        test_mocker.vclock = True
+        test_mocker.metrics = None
+        test_mocker.trace = None
+        test_mocker.collect = collect
+        test_mocker.fresh = fresh
+        test_mocker.snapshot_ttl = snapshot_ttl
+        test_mocker.profile = False
+        test_mocker.xcap_parser = "native"
+        test_mocker.converge_timeout = 5.0
+
+        tool = target.XcapTool()
+        tool.args = test_mocker
+        tool.tool_conf = {"edns_infos": DICT_EDNS, "nf_infos": nf_infos}
+        assert tool.main() is True
+        return tool
+
+    def clients(tool: target.XcapTool) -> List[Any]:
+        return [type(p.client.client if is_async else p.client) for p in tool.processes.values()]
+
+    # 1回目: 全NFのスナップショットを取得し、スナップショットから応答する
+    tool = run(Mode.show, collect=True)
+    cached = SnapshotCache(cache_path).load()
+    assert sorted(cached) == sorted(nf_infos)
+    assert cached["a2-er-s01-smfvoroout-001"]["xcap"] == [{"ipaddr": "2001:268:200d:1010::6", "priority": "100"},
+                                                          {"ipaddr": "2001:268:200d:5010::6", "priority": "200"}]
+    assert sorted(tool.snapshots) == sorted(DICT_SMFV)
+    assert clients(tool) == [SnapshotShellClient] * 2
+
+    # 2回目: キャッシュの有効期間内のスナップショットから応答する
+    capsys.readouterr()
+    tool = run(Mode.show)
+    (sout, serr) = capsys.readouterr()
+    assert clients(tool) == [SnapshotShellClient] * 2
+    assert "current=['2001:268:200d:1010::6', '2001:268:200d:5010::6'] (snapshot " in sout
+    assert sout.count("current xCAP ipaddr is in use.") == 2
+
+    # 3回目: NFに接続して応答し、キャッシュを更新する
+    collected_at = cached["a2-er-s01-smfvoroout-001"]["collected_at"]
+    tool = run(Mode.show, fresh=True)
+    assert tool.snapshots == {}
+    assert clients(tool) == [StubClient] * 2
+    assert SnapshotCache(cache_path).load()["a2-er-s01-smfvoroout-001"]["collected_at"] >= collected_at
+
+    # 4回目: キャッシュを利用しない
+    capsys.readouterr()
+    tool = run(Mode.info, snapshot_ttl=0)
+    (sout, serr) = capsys.readouterr()
+    assert tool.snapshots == {}
+    assert "current=" not in sout
+
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+    assert f"job_id:{JOB_ID}, message_id:I00131, add_info:{list(nf_infos)}\n" in log_1st
+    assert f"job_id:{JOB_ID}, message_id:I00133, add_info:{cache_path}\n" in log_1st
+
+
+def test_snapshot02(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture):
+    """test_snapshot02 xCAPスナップショット試験02 取得・保存失敗
+
+    試験条件
+    ・nf-infosの1NFでスナップショットの取得に失敗する
+    ・キャッシュファイルの保存に失敗する
+
+    試験結果
+    ・取得できたNFのみ返却されること
+    ・取得失敗、保存失敗のエラーが標準出力、一次ログE00108、E00109、障害切り分けログに出力されること
+    """
+    from src.eri_connection_stub import NFStubShellClient as StubClient
+
+    cache_path = pathlib.Path(tmpdir).joinpath("cache", "xcap_snapshot_stub.json")
+
+    logger = MockLog(JOB_ID, Level.INFO, log_dir=tmpdir)
+    mocker.patch("src.xcap_tool.LOGGER", new=logger)
+    mocker.patch("src.eri_connection_stub.LOGGER", new=logger)
+    mocker.patch("src.xcap_snapshot.SNAPSHOT_STUB_FILE", new=cache_path)
+    mocker.patch("src.xcap_snapshot.os.replace", side_effect=PermissionError("Permission denied"))
+
+    test_mocker = mocker.MagicMock()
+    test_mocker.edns_name = "tys1tb1edns02"
+    test_mocker.mode = Mode.show
+    test_mocker.stub = True
+    test_mocker.parallel = 2
+    test_mocker.agent = None
+    test_mocker.vclock = True
+
+    tool = target.XcapTool()
+    tool.args = test_mocker
+    tool.tool_conf = {"edns_infos": DICT_EDNS, "nf_infos": DICT_SMFV}
+
+    def get_snapshot_client(nf_name: str) -> Any:
+        if nf_name == "b1-er-s01-smfvoroout-001":
+            raise KeyError(nf_name)
+        return StubClient(Mode.show, nf_name, target.VirtualClock())
+    mocker.patch.object(tool, "get_snapshot_client", new=get_snapshot_client)
+
+    snapshots = tool.collect_snapshots()
+
+    (sout, serr) = capsys.readouterr()
+    with open(get_1st_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_1st = [x for x in f.readlines() if x.startswith(f"job_id:{JOB_ID},")]
+    with open(get_2nd_log_path(tmpdir), "r", encoding="utf-8") as f:
+        log_2nd = f.read()
+
+    assert list(snapshots) == ["a2-er-s01-smfvoroout-001"]
+    assert "(b1-er-s01-smfvoroout-001):failed to collect an xCAP snapshot." in sout
+    assert f"failed to store xCAP snapshots. file={cache_path}" in sout
+    assert "collected xCAP snapshots. SUCCESS=1, FAILED=1" in sout
+    assert f"job_id:{JOB_ID}, message_id:E00108, add_info:b1-er-s01-smfvoroout-001\n" in log_1st
+    assert f"job_id:{JOB_ID}, message_id:E00109, add_info:{cache_path}\n" in log_1st
+    assert " Trace: KeyError 'b1-er-s01-smfvoroout-001'\n" in log_2nd
+    assert " Trace: PermissionError Permission denied\n" in log_2nd
+    assert not cache_path.exists()
+
 def test_interactive_check01(tmpdir, capsys: pytest.CaptureFixture, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch):
     """test_interactive_check01 interactive_check試験01 正常系試験 (interractive: "y")
 
@@ -3555,3 +5124,33 @@ def test_interactive_check03(tmpdir, capsys: pytest.CaptureFixture, mocker: Mock
     assert sout_desc == expected_sout
     assert not log_path_1st.exists()
     assert not log_path_2nd.exists()
+
+
+# ツールのインポート時に読み込まないモジュール(NFに接続する場合のみ読み込む)
+LAZY_MODULES = ["paramiko", "textfsm", "asyncio", "concurrent.futures", "src.eri_connection", "src.eri_connection_async",
+                "src.eri_connection_replay", "src.eri_connection_stub", "src.session_agent",
+                "src.eri_smfvo_xcap_process", "src.eri_smfvo_xcap_async_process"]
+# ツールのインポート時間の上限(秒)
+IMPORT_BUDGET = 1.0
+
+
+def test_import01():
+    """test_import01 インポート試験01 遅延インポート
+
+    試験条件
+    ・新しいPythonプロセスでxcap_toolをインポートする
+
+    試験結果
+    ・NFに接続するモジュール(paramiko、textfsm、asyncio等)が読み込まれないこと
+    ・インポート時間が上限以内であること
+    """
+    code = ("import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import src.xcap_tool\n"
+            "print(json.dumps({'elapsed': time.perf_counter() - start, 'modules': sorted(sys.modules)}))\n")
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(target.__file__).resolve().parent.parent))
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.getcwd(), env=env, capture_output=True, text=True, check=True)
+    imported = json.loads(result.stdout.splitlines()[-1])
+
+    assert [m for m in LAZY_MODULES if m in imported["modules"]] == []
+    assert imported["elapsed"] < IMPORT_BUDGET
@@ -1,11 +1,16 @@
+import atexit
 import collections
 import configparser
 import csv
-import datetime
+import json
 from enum import Enum
 import os
 import pathlib
-from typing import Any
+import queue
+import signal
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO, Tuple
 
 
 # 定数宣言
@@ -16,6 +21,8 @@ CONFIG_PATH = CURRENT_DIR.joinpath("Log_config.ini")
 # 1st-log、2ndログ出力先ルートディレクトリ
 LOG_ROOT_1ST_DIR = CURRENT_DIR.parent.joinpath("1st-log")
 LOG_ROOT_2ND_DIR = CURRENT_DIR.parent.joinpath("2nd-log")
+# バッファリング書込みのフラッシュ間隔(秒)のデフォルト値
+FLUSH_INTERVAL = 1.0
 
 
 # ログレベル、メッセージレベル定義
@@ -25,6 +32,40 @@ class Level(Enum):
     DEBUG = 10
 
 
+# レベルを示す文字列と列挙型レベルの対応表
+LEVELS = {level.name: level for level in Level}
+
+
+class Lazy(object):
+    """ 遅延評価するログメッセージ
+
+    ログ出力が必要と判定された場合にのみ関数を呼び出してメッセージを生成する
+    出力しないレベルのログでは、大きなコマンド結果などの文字列化を行わない
+
+    Examples:
+        LOGGER.output_2nd_log(Level.DEBUG, Lazy(lambda: f"RAW data: {bytes(buffer)}"))
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        """コンストラクタ
+
+        Args:
+            func (Callable): メッセージを生成する関数
+            args (Any): 関数の引数
+        """
+        self.func = func
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args))
+
+    def __repr__(self) -> str:
+        # 補助メッセージのリストに含まれる場合もメッセージをそのまま出力した場合と同じ表記にする
+        return repr(self.func(*self.args))
+
+
 class ArgError(Exception):
     pass
 
@@ -45,15 +86,323 @@ class MessageIdError(Exception):
     pass
 
 
+# 日時文字列のキャッシュ(エポック秒, ログ出力日時, ログファイル名の日付)
+_stamp_cache: Tuple[int, str, str] = (-1, "", "")
+
+
+def get_stamps() -> Tuple[str, str]:
+    """get_stamps 日時文字列取得
+
+    ログ出力日時(YYYY-mm-dd HH:MM:SS)とログファイル名の日付(YYYYmmdd)を取得する
+    同一秒内の呼び出しではキャッシュした文字列を返す
+
+    Returns:
+        Tuple[str, str]: ログ出力日時, ログファイル名の日付
+    """
+    global _stamp_cache
+    now = int(time.time())
+    if now != _stamp_cache[0]:
+        local = time.localtime(now)
+        _stamp_cache = (now, time.strftime('%Y-%m-%d %H:%M:%S', local), time.strftime('%Y%m%d', local))
+    return _stamp_cache[1:]
+
+
+class _FlushRequest(object):
+    """ 書込みスレッドへのフラッシュ要求 """
+
+    def __init__(self, sync: bool):
+        self.sync = sync
+        self.done = threading.Event()
+
+
+class LogWriter(object):
+    """ バッファリングログ書込みクラス
+
+    ログファイルのハンドルを開いたまま保持し、ログレコードをバックグラウンドスレッドでまとめて書き込む
+    書込み済みのレコードはflush_interval秒毎にフラッシュし、
+    fsync_level以上のレコードはファイルへの同期(fsync)完了まで呼び出し元を待ち合わせる
+    日付が変わった場合は保持しているハンドルを閉じ、新しい日付のファイルを開き直す
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, fsync_level: Optional[Level] = Level.CRITICAL):
+        """コンストラクタ
+
+        Args:
+            flush_interval (float, optional): フラッシュ間隔(秒). Defaults to FLUSH_INTERVAL.
+            fsync_level (Level, optional): 同期書込みを行うレベル. Noneの場合は同期書込みを行わない. Defaults to Level.CRITICAL.
+        """
+        self.flush_interval = flush_interval
+        self.fsync_level = fsync_level
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._files: Dict[pathlib.Path, TextIO] = {}
+        self._day = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def write(self, paths: Tuple[pathlib.Path, ...], text: str, day: str, level: Level) -> None:
+        """ログレコードを書込みキューに追加する
+
+        Args:
+            paths (Tuple[pathlib.Path, ...]): ログファイルのパス(1st-log、2nd-log)
+            text (str): ログレコード
+            day (str): ログ出力日(YYYYmmdd)
+            level (Level): ログレコードのレベル
+        """
+        self._start()
+        for path in paths:
+            self._queue.put((path, text, day))
+        if self.fsync_level is not None and level.value >= self.fsync_level.value:
+            self.flush(sync=True)
+
+    def flush(self, sync: bool = False) -> None:
+        """キュー済みのログレコードを書き込み、フラッシュが完了するまで待ち合わせる
+
+        Args:
+            sync (bool, optional): ファイルへの同期(fsync)も行うか. Defaults to False.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        request = _FlushRequest(sync)
+        self._queue.put(request)
+        request.done.wait()
+
+    def close(self) -> None:
+        """キュー済みのログレコードを書き込み、書込みスレッドを停止してファイルを閉じる
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="xgnlog-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """書込みスレッド本体
+        """
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_files(False)
+                last_flush = time.monotonic()
+                continue
+
+            if item is None:
+                self._flush_files(False)
+                self._close_files()
+                return
+            elif isinstance(item, _FlushRequest):
+                self._flush_files(item.sync)
+                last_flush = time.monotonic()
+                item.done.set()
+                continue
+
+            (path, text, day) = item
+            if day != self._day:
+                # 日跨ぎ: 前日のファイルを閉じる
+                self._close_files()
+                self._day = day
+            f = self._files.get(path)
+            if f is None:
+                f = self._files[path] = open(path, 'a', encoding='utf-8')
+            f.write(text)
+
+            if self._queue.empty() and time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_files(False)
+                last_flush = time.monotonic()
+
+    def _flush_files(self, sync: bool) -> None:
+        for f in self._files.values():
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+
+    def _close_files(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+# バッファリング書込みで共有するログ書込みインスタンス
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer(flush_interval: float = FLUSH_INTERVAL, fsync_level: Optional[Level] = Level.CRITICAL) -> LogWriter:
+    """get_writer 共有ログ書込みインスタンス取得
+
+    初回呼び出し時にログ書込みインスタンスを生成し、プロセス終了時・SIGTERM受信時に書込み完了を待ち合わせるよう登録する
+    2回目以降は生成済みのインスタンスを返す(引数は初回のみ有効)
+
+    Args:
+        flush_interval (float, optional): フラッシュ間隔(秒). Defaults to FLUSH_INTERVAL.
+        fsync_level (Level, optional): 同期書込みを行うレベル. Defaults to Level.CRITICAL.
+
+    Returns:
+        LogWriter: ログ書込みインスタンス
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = LogWriter(flush_interval, fsync_level)
+            atexit.register(_writer.close)
+            _install_sigterm_flush(_writer)
+    return _writer
+
+
+def _install_sigterm_flush(writer: LogWriter) -> None:
+    """SIGTERM受信時にログ書込みを完了させてから元のハンドラに処理を引き継ぐ
+
+    シグナルハンドラはメインスレッドでのみ登録できるため、それ以外では登録しない(終了時の書込みはatexitで行う)
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handler(signum, frame):
+        writer.close()
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            signal.signal(signum, previous if previous is not None else signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    signal.signal(signal.SIGTERM, handler)
+
+
+# 読み込み済みの設定ファイル(パス: 設定)
+_configs: Dict[str, configparser.ConfigParser] = {}
+# 読み込み済みのメッセージファイル(パス: メッセージID毎の(メッセージレベル, メッセージ内容))
+_catalogs: Dict[str, Dict[str, Tuple[str, str]]] = {}
+# 生成済みLogインスタンスの状態(設定ファイル・ジョブID・設定値: インスタンスの状態)
+_registry: Dict[tuple, Dict[str, Any]] = {}
+_registry_lock = threading.RLock()
+
+
+def load_config(config_path: pathlib.Path) -> configparser.ConfigParser:
+    """load_config 設定ファイル読み込み
+
+    設定ファイルはプロセス内で1回だけ読み込み、2回目以降は読み込み済みの設定を返す
+
+    Args:
+        config_path (pathlib.Path): 設定ファイルのパス
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+
+    Returns:
+        configparser.ConfigParser: 設定
+    """
+    with _registry_lock:
+        config = _configs.get(str(config_path))
+        if config is None:
+            if not config_path.exists():
+                raise FileNotFoundError(str(config_path.resolve()))
+            config = configparser.ConfigParser()
+            config.read(config_path)
+            _configs[str(config_path)] = config
+    return config
+
+
+def load_messages(msgfile_path: pathlib.Path, cache_dir: Optional[pathlib.Path] = None) -> Dict[str, Tuple[str, str]]:
+    """load_messages メッセージファイル読み込み
+
+    メッセージファイルはプロセス内で1回だけ読み込み、2回目以降は読み込み済みのメッセージを返す
+    cache_dirを指定した場合、メッセージファイルを変換したキャッシュファイル(msg_<JOB_ID>.json)を
+    メッセージファイルの更新日時・サイズが一致する間は利用し、一致しない場合は再作成する
+    (キャッシュファイルの読み書きに失敗した場合はメッセージファイルを読み込む)
+
+    Args:
+        msgfile_path (pathlib.Path): メッセージファイルのパス
+        cache_dir (pathlib.Path, optional): キャッシュファイルのディレクトリ. Defaults to None.
+
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+
+    Returns:
+        Dict[str, Tuple[str, str]]: メッセージID毎の(メッセージレベル, メッセージ内容)
+    """
+    with _registry_lock:
+        msg = _catalogs.get(str(msgfile_path))
+        if msg is not None:
+            return msg
+
+        try:
+            stat = msgfile_path.stat()
+        except OSError:
+            raise FileNotFoundError(str(msgfile_path.resolve()))
+        validator = [stat.st_mtime_ns, stat.st_size]
+
+        msg = None
+        cache_path = cache_dir.joinpath(msgfile_path.stem + '.json') if cache_dir else None
+        if cache_path:
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache['source'] == validator:
+                    msg = collections.defaultdict(str, {k: tuple(v) for (k, v) in cache['messages'].items()})
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        if msg is None:
+            msg = collections.defaultdict(str)
+            with open(msgfile_path, 'r', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                for row in reader:
+                    msg[row[1]] = (row[0], row[2])
+            if cache_path:
+                _write_message_cache(cache_path, validator, msg)
+
+        _catalogs[str(msgfile_path)] = msg
+    return msg
+
+
+def _write_message_cache(cache_path: pathlib.Path, validator: list, msg: Dict[str, Tuple[str, str]]) -> None:
+    """メッセージのキャッシュファイルを作成する(作成に失敗した場合は何もしない)"""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        os.makedirs(cache_path.parent, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': validator, 'messages': msg}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def clear_registry() -> None:
+    """clear_registry 読み込み済みの設定・メッセージと生成済みLogインスタンスの状態を破棄する
+
+    以降に生成するLogインスタンスは設定ファイル・メッセージファイルを読み込み直す
+    """
+    with _registry_lock:
+        _configs.clear()
+        _catalogs.clear()
+        _registry.clear()
+
+
 class Log(object):
     """ 共通ログ出力機能のクラス定義 """
 
-    def __init__(self, job_id: str, log_level: Level = Level.INFO, fname_1st = None, fname_2nd = None, output_both_flg = True):
+    def __init__(self, job_id: str, log_level: Level = Level.INFO, fname_1st = None, fname_2nd = None, output_both_flg = True, buffered = None):
         """ログ出力処理初期化
 
         ジョブIDのディレクトリ作成
         ログレベルとメッセージファイルの内容をメモリ上に保持
         Log_config.iniで定義したメッセージファイルを読み込みます
+        同じジョブID・設定値のインスタンスが生成済みの場合は、ファイルを読み込まずにその状態を共有します
 
         Args:
             job_id (str): ジョブID
@@ -61,6 +410,7 @@ class Log(object):
             fname_1st (str): 1st-logのログファイル名. Defaults to None
             fname_2nd (str): 2nd-logのログファイル名. Defaults to None
             output_both_flg (bool): 1st-log出力時に2nd-logにも出力するか判別.True:出力する、False:出力しない Defaults to False
+            buffered (bool): バッファリング書込みを行うか.Noneの場合はLog_config.iniのwriterセクションに従う Defaults to None
 
         Raises:
             ArgError: 引数エラーの場合
@@ -80,19 +430,32 @@ class Log(object):
             raise ArgError(f'Argument Type is not string. [fname_2nd:{fname_2nd}]')
         elif not isinstance(output_both_flg, bool):
             raise ArgError(f'Argument Type is not bool. [output_both_flg:{output_both_flg}]')
+        elif buffered is not None and not isinstance(buffered, bool):
+            raise ArgError(f'Argument Type is not bool. [buffered:{buffered}]')
+
+        # 同じ設定ファイル・ジョブID・設定値のインスタンスが生成済みの場合は状態を共有する
+        key = (str(CONFIG_PATH), job_id, str(log_level), fname_1st or None, fname_2nd or None, output_both_flg, buffered)
+        with _registry_lock:
+            state = _registry.get(key)
+            if state is None:
+                self._setup(job_id, log_level, fname_1st, fname_2nd, output_both_flg, buffered)
+                _registry[key] = self.__dict__
+            else:
+                self.__dict__ = state
 
+    def _setup(self, job_id: str, log_level: Any, fname_1st: str, fname_2nd: str, output_both_flg: bool, buffered: bool) -> None:
+        """ログ出力処理の状態を初期化する
+
+        引数・例外はコンストラクタと同じ
+        """
         # ログレベルのリファレンスチェックと型変換
         if not isinstance(log_level, Level):
             self.log_level = get_Level(log_level)
         else:
             self.log_level = log_level
 
-        # 設定ファイルの存在チェックと読み込み
-        if not CONFIG_PATH.exists():
-            raise FileNotFoundError(str(CONFIG_PATH.resolve()))
-
-        config = configparser.ConfigParser()
-        config.read(CONFIG_PATH)
+        # 設定ファイルの読み込み
+        config = load_config(CONFIG_PATH)
 
         # ログ出力先ルートディレクトリ＋ジョブIDのパス生成
         try:
@@ -110,17 +473,12 @@ class Log(object):
         if not self.logdir_2nd.exists():
             os.makedirs(self.logdir_2nd)
 
-        # メッセージファイルの存在チェックと読み込み
-        self.msg = collections.defaultdict(str)
+        # メッセージファイルの読み込み
+        # message_cache_dirが設定されている場合は事前変換済みのメッセージファイルを利用する
         msgfile_name = 'msg_' + job_id + '.txt'
         msgfile_path = tool_message_dir.joinpath(msgfile_name)
-        if not msgfile_path.exists():
-            raise FileNotFoundError(str(msgfile_path.resolve()))
-
-        with open(msgfile_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                self.msg[row[1]] = (row[0], row[2])
+        cache_dir = config['common'].get('message_cache_dir')
+        self.msg = load_messages(msgfile_path, pathlib.Path(cache_dir) if cache_dir else None)
 
         # ログファイル名を設定
         self.log_filename_1st = None
@@ -137,6 +495,24 @@ class Log(object):
         # ジョブIDを設定
         self.job_id = job_id
 
+        # 書込み方式を設定(バッファリング書込みの場合は共有のログ書込みインスタンスを使う)
+        # [writer]
+        # mode = buffered | direct
+        # flush_interval = フラッシュ間隔(秒)
+        # fsync_level = 同期書込みを行うレベル(NONEの場合は同期書込みなし)
+        writer_conf = config['writer'] if config.has_section('writer') else {}
+        if buffered is None:
+            buffered = writer_conf.get('mode', 'direct') == 'buffered'
+        self.writer = None
+        if buffered:
+            try:
+                flush_interval = float(writer_conf.get('flush_interval', FLUSH_INTERVAL))
+                fsync_level = writer_conf.get('fsync_level', Level.CRITICAL.name)
+                fsync_level = None if fsync_level == 'NONE' else get_Level(fsync_level)
+            except ValueError:
+                raise LogConfigKeyError(f"Config has invalid value (flush_interval) [flush_interval:{writer_conf.get('flush_interval')}]")
+            self.writer = get_writer(flush_interval, fsync_level)
+
     def output_1st_log(self, msg_id, hojo_msg: Any = "") -> None:
         """一次切り分けログ（1st-log）出力処理
 
@@ -145,7 +521,7 @@ class Log(object):
 
         Args:
             msg_id (str): メッセージID
-            hojo_msg (Any, optional): 補助メッセージ. Defaults to None.
+            hojo_msg (Any, optional): 補助メッセージ(Lazyの場合は出力時のみ生成). Defaults to None.
 
         Raises:
             ArgError: 引数エラーの場合
@@ -166,24 +542,24 @@ class Log(object):
 
         # ログ出力要否を判別
         # メッセージレベルがログレベルを下回る場合、終了(ログ出力なし)
-        if get_Level(tmp_msg_level).value < self.log_level.value:
+        msg_level = get_Level(tmp_msg_level)
+        if msg_level.value < self.log_level.value:
             return None
 
+        (now, today) = get_stamps()
+
         # ログファイルのパスを生成
         if self.log_filename_1st:
             tmp_filename = self.log_filename_1st
         else:
-            tmp_filename = '1st_' + self.job_id + '_' + datetime.datetime.today().strftime('%Y%m%d') + '.log'
+            tmp_filename = '1st_' + self.job_id + '_' + today + '.log'
         logpath_1st = self.logdir_1st.joinpath(tmp_filename)
 
-        tmp_msg = datetime.datetime.today().strftime('%Y-%m-%d %H:%M:%S')
-        tmp_msg = "{0} {1} {2} {3} {4}\n".format(tmp_msg, msg_id, tmp_msg_level, tmp_msg_text, hojo_msg)
+        tmp_msg = "{0} {1} {2} {3} {4}\n".format(now, msg_id, tmp_msg_level, tmp_msg_text, hojo_msg)
 
-        # 1stログファイルに書込み
-        with open(logpath_1st, 'a', encoding='utf-8') as f:
-            f.write(tmp_msg)
+        logpaths = [logpath_1st]
 
-        # 2ndログファイルに書込み
+        # 2ndログファイルのパスを追加
         if self.output_both_flg:
             # ログファイルのパスを生成
             if self.log_filename_2nd:
@@ -192,10 +568,11 @@ class Log(object):
                 # 1st-log出力時に取得した1st_ジョブID_YYYYMMDD.log形式のファイル名を使う（日跨ぎ時の対応）
                 tmp_filename = tmp_filename.replace('1st', '2nd')
             else:
-                tmp_filename = '2nd_' + self.job_id + '_' + datetime.datetime.today().strftime('%Y%m%d') + '.log'
-            logpath_2nd = self.logdir_2nd.joinpath(tmp_filename)
-            with open(logpath_2nd, 'a', encoding='utf-8') as f:
-                f.write(tmp_msg)
+                tmp_filename = '2nd_' + self.job_id + '_' + today + '.log'
+            logpaths.append(self.logdir_2nd.joinpath(tmp_filename))
+
+        # 1st-log(、2nd-log)ログファイルに書込み
+        self._write(tuple(logpaths), tmp_msg, today, msg_level)
 
     def output_2nd_log(self, msg_level: Any, msg_text: Any = "") -> None:
         """障害解析ログ（2nd-log）出力処理
@@ -204,7 +581,7 @@ class Log(object):
 
         Args:
             msg_level (str | Level): レベルを示す文字列またはLevelインスタンス
-            msg_text (Any, optional): メッセージ内容. Defaults to None.
+            msg_text (Any, optional): メッセージ内容(Lazyの場合は出力時のみ生成). Defaults to None.
 
         Raises:
             ArgError: 引数エラーの場合
@@ -224,19 +601,64 @@ class Log(object):
         if msg_level.value < self.log_level.value:
             return None
 
+        (now, today) = get_stamps()
+
         # ログファイルのパスを生成
         if self.log_filename_2nd:
             tmp_filename = self.log_filename_2nd
         else:
-            tmp_filename = '2nd_' + self.job_id + '_' + datetime.datetime.today().strftime('%Y%m%d') + '.log'
+            tmp_filename = '2nd_' + self.job_id + '_' + today + '.log'
         logpath_2nd = self.logdir_2nd.joinpath(tmp_filename)
 
-        tmp_msg = datetime.datetime.today().strftime('%Y-%m-%d %H:%M:%S')
-        tmp_msg = "{0} {1} {2}\n".format(tmp_msg, msg_level.name, msg_text)
+        tmp_msg = "{0} {1} {2}\n".format(now, msg_level.name, msg_text)
 
         # ログファイルに書込み
-        with open(logpath_2nd, 'a', encoding='utf-8') as f:
-            f.write(tmp_msg)
+        self._write((logpath_2nd,), tmp_msg, today, msg_level)
+
+    def is_enabled(self, level: Any) -> bool:
+        """指定レベルのログが出力されるか判定する
+
+        出力されない場合に、ログメッセージの生成自体を省略する用途に使う
+
+        Args:
+            level (str | Level): レベルを示す文字列またはLevelインスタンス
+
+        Raises:
+            LevelNotFoundError: 該当レベルがない場合
+
+        Returns:
+            bool: True:出力される、False:出力されない
+        """
+        if not isinstance(level, Level):
+            level = get_Level(level)
+        return level.value >= self.log_level.value
+
+    def flush(self) -> None:
+        """バッファリング書込み中のログをファイルに書き込む
+
+        直接書込みの場合は何もしない
+        """
+        if self.writer:
+            self.writer.flush()
+
+    def _write(self, paths: Tuple[pathlib.Path, ...], text: str, today: str, level: Level) -> None:
+        """ログファイル書込み
+
+        バッファリング書込みの場合はログ書込みインスタンスのキューに追加し、
+        直接書込みの場合はファイルを開いて追記する
+
+        Args:
+            paths (Tuple[pathlib.Path, ...]): ログファイルのパス
+            text (str): ログレコード
+            today (str): ログ出力日(YYYYmmdd)
+            level (Level): ログレコードのレベル
+        """
+        if self.writer:
+            self.writer.write(paths, text, today, level)
+            return
+        for path in paths:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(text)
 
 
 def get_Level(level: str) -> Level:
@@ -254,8 +676,8 @@ def get_Level(level: str) -> Level:
         Level: 対応する列挙型レベル
     """
     try:
-        res = eval(f"Level.{level}")
-    except:
+        res = LEVELS[level]
+    except (KeyError, TypeError):
         raise LevelNotFoundError(f"Level={level} Not Found")
 
     return res